@@ -0,0 +1,193 @@
+"""
+Benchmark of the anchor placements of the jitter-minimized router (satgen.ANCHOR_PLACEMENTS: "strided",
+"farthest_point", "orbit_balanced") on Kuiper-630 with ground stations at the most populous cities.
+
+For each placement and number of anchors, a few time steps of algorithm_jitter_minimized are generated. It
+reports the speed/quality tuning curve:
+
+(a) runtime per time step (the cold start, which fills the lookahead window and computes all anchor paths,
+    is reported separately from the steady-state time steps)
+(b) mean path stretch: the length of the path along the forwarding state (ground station to ground station)
+    divided by the length of the true shortest path over the ISLs at that time step
+(c) fraction of the ground station pairs with a path along the forwarding state
+
+The number of anchors and the placement of a dynamic state generation run are set with the num_anchors and
+anchor_placement arguments of generate_dynamic_state (and help_dynamic_state).
+"""
+
+import sys
+sys.path.append("../../satgenpy")
+import satgen
+from satgen.dynamic_state.generate_dynamic_state import generate_dynamic_state_at
+import math
+import exputil
+import numpy as np
+import time
+from scipy.sparse.csgraph import dijkstra
+
+# WGS72 value
+EARTH_RADIUS = 6378135.0
+
+# Kuiper-630 parameters
+ALTITUDE_M = 630000
+SATELLITE_CONE_RADIUS_M = ALTITUDE_M / math.tan(math.radians(30.0))
+MAX_GSL_LENGTH_M = math.sqrt(math.pow(SATELLITE_CONE_RADIUS_M, 2) + math.pow(ALTITUDE_M, 2))
+MAX_ISL_LENGTH_M = 2 * math.sqrt(math.pow(EARTH_RADIUS + ALTITUDE_M, 2) - math.pow(EARTH_RADIUS + 80000, 2))
+NUM_ORBS = 34
+NUM_SATS_PER_ORB = 34
+
+# Sweep: number of anchors, ground stations, time steps (the first is the cold start)
+NUM_ANCHORS = [12, 24, 48, 96, 144]
+NUM_GROUND_STATIONS = 10
+TIME_STEP_MS = 1000
+NUM_TIME_STEPS = 3
+
+local_shell = exputil.LocalShell()
+local_shell.remove_force_recursive("temp/gen_data")
+local_shell.make_full_dir("temp/gen_data")
+output_dir = "temp/gen_data"
+
+# Ground stations, TLEs and ISLs
+print("Generating ground stations, TLEs and ISLs...")
+satgen.extend_ground_stations(
+    "../../paper/satellite_networks_state/input_data/ground_stations_cities_sorted_by_estimated_2025_pop_top_100.basic.txt",
+    output_dir + "/ground_stations_all.txt"
+)
+with open(output_dir + "/ground_stations_all.txt", "r") as f_in, open(output_dir + "/ground_stations.txt", "w+") as f_out:
+    for line in f_in.readlines()[:NUM_GROUND_STATIONS]:
+        f_out.write(line)
+satgen.generate_tles_from_scratch_with_sgp(
+    output_dir + "/tles.txt",
+    "Kuiper-630",
+    NUM_ORBS,
+    NUM_SATS_PER_ORB,
+    False,  # phase diff
+    51.9,  # inclination
+    0.0000001,  # eccentricity (near-circular)
+    0.0,  # arg of perigee
+    14.80  # mean motion (rev/day)
+)
+satgen.generate_plus_grid_isls(output_dir + "/isls.txt", NUM_ORBS, NUM_SATS_PER_ORB, isl_shift=0, idx_offset=0)
+ground_stations = satgen.read_ground_stations_extended(output_dir + "/ground_stations.txt")
+tles = satgen.read_tles(output_dir + "/tles.txt")
+satellites = tles["satellites"]
+num_satellites = len(satellites)
+list_isls = satgen.read_isls(output_dir + "/isls.txt", num_satellites)
+list_gsl_interfaces_info = satgen.generate_simple_gsl_interfaces_info(
+    output_dir + "/gsl_interfaces_info.txt", num_satellites, len(ground_stations),
+    len(ground_stations), 1, len(ground_stations), 1
+)
+list_gsl_interfaces_info = satgen.read_gsl_interfaces_info(
+    output_dir + "/gsl_interfaces_info.txt", num_satellites, len(ground_stations)
+)
+interface_table = satgen.InterfaceTable(num_satellites, list_isls)
+propagator = satgen.create_propagator("sgp4", tles["epoch"], satellites)
+times_ns = [i * TIME_STEP_MS * 1000 * 1000 for i in range(NUM_TIME_STEPS)]
+
+# True shortest paths over the ISLs (ground station to ground station) and the graphs to measure paths in
+print("True shortest paths...")
+graph_states = satgen.generate_graph_states_at(
+    tles["epoch"], times_ns, satellites, ground_stations, list_isls, list_gsl_interfaces_info,
+    MAX_GSL_LENGTH_M, MAX_ISL_LENGTH_M, False, propagator, interface_table=interface_table
+)
+shortest_m = []
+for graph_state in graph_states:
+    distances_m = dijkstra(graph_state["sat_net_graph_only_satellites_with_isls"].to_scipy_sparse(), directed=True)
+    in_range = graph_state["ground_station_satellites_in_range"]
+    per_pair = {}
+    for src_gid in range(len(ground_stations)):
+        for dst_gid in range(len(ground_stations)):
+            if src_gid != dst_gid:
+                per_pair[(src_gid, dst_gid)] = min(
+                    [math.inf] + [
+                        src_m + distances_m[src_sid, dst_sid] + dst_m
+                        for (src_m, src_sid) in in_range[src_gid] for (dst_m, dst_sid) in in_range[dst_gid]
+                    ]
+                )
+    shortest_m.append(per_pair)
+
+
+def forwarding_path_length_m(fstate, graph_state, src_gid, dst_gid):
+    """
+    :return: Length of the path along the forwarding state from the source to the destination ground station
+             (None if the packet is dropped or loops)
+    """
+    isl_graph = graph_state["sat_net_graph_only_satellites_with_isls"]
+    gsl_m = {
+        (num_satellites + gid, sid): distance_m
+        for gid, in_range in enumerate(graph_state["ground_station_satellites_in_range"])
+        for (distance_m, sid) in in_range
+    }
+    dst_node_id = num_satellites + dst_gid
+    node = num_satellites + src_gid
+    length_m = 0.0
+    visited = set()
+    while node != dst_node_id:
+        next_hop = fstate[(node, dst_node_id)][0]
+        if next_hop == -1 or node in visited:
+            return None
+        visited.add(node)
+        if node >= num_satellites:
+            length_m += gsl_m[(node, next_hop)]
+        elif next_hop >= num_satellites:
+            length_m += gsl_m[(next_hop, node)]
+        else:
+            length_m += isl_graph.edges[(node, next_hop)]["weight"]
+        node = next_hop
+    return length_m
+
+
+# Each placement with each number of anchors
+results = []
+for anchor_placement in satgen.ANCHOR_PLACEMENTS:
+    for num_anchors in NUM_ANCHORS:
+        print("%s with %d anchors..." % (anchor_placement, num_anchors))
+        run_dir = output_dir + "/dynamic_state_%s_%d" % (anchor_placement, num_anchors)
+        local_shell.make_full_dir(run_dir)
+        prev_output = None
+        elapsed = []
+        stretches = []
+        num_delivered = 0
+        num_pairs = 0
+        for i, time_since_epoch_ns in enumerate(times_ns):
+            start_time = time.time()
+            prev_output = generate_dynamic_state_at(
+                run_dir, tles["epoch"], time_since_epoch_ns, TIME_STEP_MS * 1000 * 1000, satellites,
+                ground_stations, list_isls, list_gsl_interfaces_info, MAX_GSL_LENGTH_M, MAX_ISL_LENGTH_M,
+                "algorithm_jitter_minimized", prev_output, False, propagator,
+                interface_table=interface_table, num_anchors=num_anchors, anchor_placement=anchor_placement
+            )
+            elapsed.append(time.time() - start_time)
+            for (src_gid, dst_gid), true_length_m in shortest_m[i].items():
+                num_pairs += 1
+                length_m = forwarding_path_length_m(prev_output["fstate"], graph_states[i], src_gid, dst_gid)
+                if length_m is not None:
+                    num_delivered += 1
+                    stretches.append(length_m / true_length_m)
+        results.append((
+            anchor_placement, len(prev_output["router"].anchors), elapsed[0], float(np.mean(elapsed[1:])),
+            float(np.mean(stretches)) if len(stretches) > 0 else math.nan, num_delivered / num_pairs
+        ))
+
+# Results
+print("")
+print("=" * 80)
+print("BENCHMARK RESULTS - Anchor placement (Kuiper-630, %d ground stations)" % len(ground_stations))
+print("=" * 80)
+print("%-16s %8s %14s %14s %10s %10s" % ("Placement", "Anchors", "Cold start", "Per step", "Stretch", "Delivered"))
+for anchor_placement, num_anchors, cold_start_s, per_step_s, mean_stretch, delivered in results:
+    print("%-16s %8d %11.1f ms %11.1f ms %10.4f %9.1f%%" % (
+        anchor_placement, num_anchors, cold_start_s * 1000.0, per_step_s * 1000.0, mean_stretch, delivered * 100.0
+    ))
+print("=" * 80)
+
+with open(output_dir + "/benchmark_anchor_placement.txt", "w") as f:
+    f.write("Algorithm: Anchor placement (jitter-minimized)\n")
+    for anchor_placement, num_anchors, cold_start_s, per_step_s, mean_stretch, delivered in results:
+        f.write("Configuration: %s, %d anchors\n" % (anchor_placement, num_anchors))
+        f.write("Cold start: %.3f ms\n" % (cold_start_s * 1000.0))
+        f.write("Time per timestep: %.3f ms\n" % (per_step_s * 1000.0))
+        f.write("Mean path stretch: %.6f\n" % mean_stretch)
+        f.write("Delivered: %.6f\n" % delivered)
+
+print("Done!")
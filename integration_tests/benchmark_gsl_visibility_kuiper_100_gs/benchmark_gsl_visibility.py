@@ -0,0 +1,115 @@
+"""
+Benchmark of the GSL visibility computation (satellites in range of each ground station)
+on Kuiper-630 with the 100 most populous cities as ground stations:
+
+(a) full spatial index (KD-tree) query every time step (ground_station_satellites_in_range_m)
+(b) incremental tracking across time steps with different guard bands (GslVisibilityTracker)
+
+The satellite positions are propagated beforehand, such that only the visibility computation is timed.
+"""
+
+import sys
+sys.path.append("../../satgenpy")
+import satgen
+import math
+import exputil
+import time
+
+# WGS72 value
+EARTH_RADIUS = 6378135.0
+
+# Kuiper-630 parameters
+ALTITUDE_M = 630000
+SATELLITE_CONE_RADIUS_M = ALTITUDE_M / math.tan(math.radians(30.0))
+MAX_GSL_LENGTH_M = math.sqrt(math.pow(SATELLITE_CONE_RADIUS_M, 2) + math.pow(ALTITUDE_M, 2))
+NUM_ORBS = 34
+NUM_SATS_PER_ORB = 34
+
+# Time steps
+TIME_STEP_MS = 100
+DURATION_S = 200
+
+# Guard bands to evaluate
+GUARD_BANDS_M = [10000.0, 25000.0, 50000.0, 100000.0, 200000.0]
+
+local_shell = exputil.LocalShell()
+local_shell.remove_force_recursive("temp/gen_data")
+local_shell.make_full_dir("temp/gen_data")
+output_dir = "temp/gen_data"
+
+# Ground stations and TLEs
+print("Generating ground stations and TLEs...")
+satgen.extend_ground_stations(
+    "../../paper/satellite_networks_state/input_data/ground_stations_cities_sorted_by_estimated_2025_pop_top_100.basic.txt",
+    output_dir + "/ground_stations.txt"
+)
+satgen.generate_tles_from_scratch_with_sgp(
+    output_dir + "/tles.txt",
+    "Kuiper-630",
+    NUM_ORBS,
+    NUM_SATS_PER_ORB,
+    False,  # phase diff
+    51.9,  # inclination
+    0.0000001,  # eccentricity (near-circular)
+    0.0,  # arg of perigee
+    14.80  # mean motion (rev/day)
+)
+ground_stations = satgen.read_ground_stations_extended(output_dir + "/ground_stations.txt")
+tles = satgen.read_tles(output_dir + "/tles.txt")
+ground_station_positions = satgen.ground_station_positions_m(ground_stations)
+
+# Satellite positions of all time steps
+print("Propagating...")
+times_ns = list(range(0, DURATION_S * 1000 * 1000 * 1000, TIME_STEP_MS * 1000 * 1000))
+propagator = satgen.create_propagator("sgp4", tles["epoch"], tles["satellites"])
+satellite_positions_m = propagator.satellite_positions_m_at_times(times_ns)
+
+# (a) Full KD-tree query every time step
+print("Full spatial index query every time step...")
+start_time = time.time()
+expected = [
+    satgen.ground_station_satellites_in_range_m(ground_station_positions, satellite_positions_m[i], MAX_GSL_LENGTH_M)
+    for i in range(len(times_ns))
+]
+full_elapsed = time.time() - start_time
+
+# (b) Incremental tracking
+tracker_results = []
+for guard_band_m in GUARD_BANDS_M:
+    print("Incremental tracking with a guard band of %.0f m..." % guard_band_m)
+    tracker = satgen.GslVisibilityTracker(ground_station_positions, MAX_GSL_LENGTH_M, guard_band_m)
+    start_time = time.time()
+    result = [tracker.satellites_in_range(satellite_positions_m[i]) for i in range(len(times_ns))]
+    elapsed = time.time() - start_time
+    if result != expected:
+        raise ValueError("Incremental tracking differs from the full query (guard band %.0f m)" % guard_band_m)
+    tracker_results.append((guard_band_m, elapsed, tracker.num_refreshes))
+
+# Results
+num_in_range = sum(sum(len(x) for x in per_time) for per_time in expected) / len(times_ns)
+print("")
+print("=" * 60)
+print("BENCHMARK RESULTS - GSL visibility (Kuiper-630, %d ground stations)" % len(ground_stations))
+print("=" * 60)
+print("Time steps: %d (%d ms)" % (len(times_ns), TIME_STEP_MS))
+print("Avg. GSLs in range per time step: %.1f" % num_in_range)
+print("Full query: %.3f ms per time step" % (full_elapsed / len(times_ns) * 1000.0))
+for guard_band_m, elapsed, num_refreshes in tracker_results:
+    print("Tracker (guard band %6.0f m): %.3f ms per time step, %d refreshes, %.2fx speedup" % (
+        guard_band_m, elapsed / len(times_ns) * 1000.0, num_refreshes, full_elapsed / elapsed
+    ))
+print("=" * 60)
+
+with open(output_dir + "/benchmark_gsl_visibility.txt", "w") as f:
+    f.write("Algorithm: GSL visibility\n")
+    f.write("Satellites: %d\n" % len(tles["satellites"]))
+    f.write("Ground stations: %d\n" % len(ground_stations))
+    f.write("Timesteps: %d\n" % len(times_ns))
+    f.write("Time per timestep (full query): %.3f ms\n" % (full_elapsed / len(times_ns) * 1000.0))
+    for guard_band_m, elapsed, num_refreshes in tracker_results:
+        f.write("Time per timestep (tracker, guard band %.0f m): %.3f ms\n" % (
+            guard_band_m, elapsed / len(times_ns) * 1000.0
+        ))
+        f.write("Refreshes (tracker, guard band %.0f m): %d\n" % (guard_band_m, num_refreshes))
+
+print("Done!")
@@ -0,0 +1,166 @@
+"""
+Benchmark of the shortest path backends (satgen.shortest_path_backend_names(): "scipy", "networkx", "csr")
+on the ISL graphs of three constellations, for each of their three APIs:
+
+(a) all_pairs_distances:    all-pairs shortest path distances
+(b) shortest_path_trees:    shortest path trees towards the satellites in range of the 100 most populous cities
+(c) k_shortest_paths:       3 shortest paths between random satellite pairs
+
+The satellite positions are propagated and the graph snapshots built beforehand, such that only the
+shortest path calculations are timed. It reports per constellation which backend wins each API, and
+checks that all backends yield the same distances.
+
+The backend of a dynamic state generation run is selected with the shortest_path_backend argument of
+generate_dynamic_state (and help_dynamic_state) or the SATGEN_SHORTEST_PATH_BACKEND environment variable.
+"""
+
+import sys
+sys.path.append("../../satgenpy")
+import satgen
+import math
+import exputil
+import numpy as np
+import time
+
+# WGS72 value
+EARTH_RADIUS = 6378135.0
+
+# Constellations: (name, TLEs (file or generation parameters), number of orbits, satellites per orbit,
+# ISL shift, maximum GSL length)
+CONSTELLATIONS = [
+    (
+        "25x25", "../../paper/satellite_networks_state/input_data/legacy/starlink_tles_25x25.txt",
+        25, 25, 1, 1089686.0
+    ),
+    (
+        "Kuiper-630", (51.9, 14.80),
+        34, 34, 0, math.sqrt(math.pow(630000 / math.tan(math.radians(30.0)), 2) + math.pow(630000, 2))
+    ),
+    (
+        "Starlink-1584", (53.0, 15.19),
+        72, 22, 0, math.sqrt(math.pow(940700, 2) + math.pow(550000, 2))
+    ),
+]
+
+# Time steps (at which the graph is taken), number of random pairs for the k-shortest paths
+TIME_STEPS_S = [0, 60]
+NUM_PAIRS = 20
+K = 3
+
+local_shell = exputil.LocalShell()
+local_shell.remove_force_recursive("temp/gen_data")
+local_shell.make_full_dir("temp/gen_data")
+output_dir = "temp/gen_data"
+
+# Ground stations
+satgen.extend_ground_stations(
+    "../../paper/satellite_networks_state/input_data/ground_stations_cities_sorted_by_estimated_2025_pop_top_100.basic.txt",
+    output_dir + "/ground_stations.txt"
+)
+ground_stations = satgen.read_ground_stations_extended(output_dir + "/ground_stations.txt")
+ground_station_positions = satgen.ground_station_positions_m(ground_stations)
+
+backend_names = satgen.shortest_path_backend_names()
+results = []
+for name, tle_source, num_orbs, num_sats_per_orb, isl_shift, max_gsl_length_m in CONSTELLATIONS:
+    print("")
+    print("%s: generating TLEs, ISLs and graphs..." % name)
+
+    # TLEs and ISLs
+    tles_filename = output_dir + "/tles_" + name + ".txt"
+    if isinstance(tle_source, str):
+        local_shell.copy_file(tle_source, tles_filename)
+    else:
+        inclination_degree, mean_motion_rev_per_day = tle_source
+        satgen.generate_tles_from_scratch_manual(
+            tles_filename, name, num_orbs, num_sats_per_orb, True, inclination_degree, 0.0000001, 0.0,
+            mean_motion_rev_per_day
+        )
+    isls_filename = output_dir + "/isls_" + name + ".txt"
+    satgen.generate_plus_grid_isls(isls_filename, num_orbs, num_sats_per_orb, isl_shift=isl_shift, idx_offset=0)
+    tles = satgen.read_tles(tles_filename)
+    num_satellites = len(tles["satellites"])
+    list_isls = satgen.read_isls(isls_filename, num_satellites)
+
+    # Graph snapshots (ISL lengths as weights) and the satellites in range of the ground stations
+    times_ns = [t * 1000 * 1000 * 1000 for t in TIME_STEPS_S]
+    propagator = satgen.create_propagator("sgp4", tles["epoch"], tles["satellites"])
+    satellite_positions_m = propagator.satellite_positions_m_at_times(times_ns)
+    isls = np.array(list_isls, dtype=np.int64)
+    snapshots = []
+    roots = []
+    for i in range(len(times_ns)):
+        positions = satellite_positions_m[i]
+        isl_lengths_m = np.linalg.norm(positions[isls[:, 0]] - positions[isls[:, 1]], axis=1)
+        snapshots.append(satgen.GraphSnapshot.from_edges(num_satellites, isls, isl_lengths_m))
+        in_range = satgen.ground_station_satellites_in_range_m(ground_station_positions, positions, max_gsl_length_m)
+        roots.append(sorted(set(sid for per_gs in in_range for (_, sid) in per_gs)))
+    rng = np.random.default_rng(1)
+    pairs = [tuple(int(x) for x in rng.choice(num_satellites, 2, replace=False)) for _ in range(NUM_PAIRS)]
+
+    # Each API with each backend
+    elapsed = {}
+    distances = {}
+    for backend_name in backend_names:
+        backend = satgen.get_shortest_path_backend(backend_name)
+        print("  %s..." % backend_name)
+
+        start_time = time.time()
+        all_pairs = [backend.all_pairs_distances(snapshot) for snapshot in snapshots]
+        elapsed[("all_pairs_distances", backend_name)] = (time.time() - start_time) / len(snapshots)
+
+        start_time = time.time()
+        trees = [backend.shortest_path_trees(snapshot, r) for snapshot, r in zip(snapshots, roots)]
+        elapsed[("shortest_path_trees", backend_name)] = (time.time() - start_time) / len(snapshots)
+
+        start_time = time.time()
+        k_paths = [backend.k_shortest_paths(snapshot, pairs, K) for snapshot in snapshots]
+        elapsed[("k_shortest_paths", backend_name)] = (time.time() - start_time) / len(snapshots)
+
+        distances[backend_name] = (all_pairs, [d for d, _ in trees], [[p[0] for p in k] for k in k_paths])
+
+    # All backends must yield the same distances (and the same first shortest path lengths)
+    reference = distances[backend_names[0]]
+    for backend_name in backend_names[1:]:
+        for i in range(len(snapshots)):
+            if not np.allclose(distances[backend_name][0][i], reference[0][i], rtol=1e-12, atol=0.0) \
+                    or not np.allclose(distances[backend_name][1][i], reference[1][i], rtol=1e-12, atol=0.0):
+                raise ValueError("Backend %s yields other distances than %s" % (backend_name, backend_names[0]))
+            for path, reference_path in zip(distances[backend_name][2][i], reference[2][i]):
+                length = sum(snapshots[i].edges[(path[j], path[j + 1])]["weight"] for j in range(len(path) - 1))
+                reference_length = sum(
+                    snapshots[i].edges[(reference_path[j], reference_path[j + 1])]["weight"]
+                    for j in range(len(reference_path) - 1)
+                )
+                if not math.isclose(length, reference_length, rel_tol=1e-12):
+                    raise ValueError("Backend %s yields other shortest paths than %s" % (backend_name, backend_names[0]))
+
+    results.append((name, num_satellites, int(np.mean([len(r) for r in roots])), elapsed))
+
+# Results
+apis = ["all_pairs_distances", "shortest_path_trees", "k_shortest_paths"]
+print("")
+print("=" * 80)
+print("BENCHMARK RESULTS - Shortest path backends")
+print("=" * 80)
+for name, num_satellites, num_roots, elapsed in results:
+    print("%s (%d satellites, %d tree roots, %d k-shortest pairs):" % (name, num_satellites, num_roots, NUM_PAIRS))
+    for api in apis:
+        winner = min(backend_names, key=lambda b: elapsed[(api, b)])
+        print("  %-20s %s -> winner: %s" % (
+            api,
+            ", ".join("%s %.1f ms" % (b, elapsed[(api, b)] * 1000.0) for b in backend_names),
+            winner
+        ))
+print("=" * 80)
+
+with open(output_dir + "/benchmark_shortest_path_backends.txt", "w") as f:
+    f.write("Algorithm: Shortest path backends\n")
+    for name, num_satellites, num_roots, elapsed in results:
+        f.write("Constellation: %s (%d satellites)\n" % (name, num_satellites))
+        for api in apis:
+            for backend_name in backend_names:
+                f.write("Time per timestep (%s, %s): %.3f ms\n" % (api, backend_name, elapsed[(api, backend_name)] * 1000.0))
+            f.write("Winner (%s): %s\n" % (api, min(backend_names, key=lambda b: elapsed[(api, b)])))
+
+print("Done!")
@@ -1,8 +1,19 @@
 from .distance_tools import (
+    ephem_date,
+    ephem_date_at,
+    ephem_date_from_julian_date,
     distance_m_between_satellites,
     distance_m_ground_station_to_satellite,
     geodesic_distance_m_between_ground_stations,
     straight_distance_m_between_ground_stations,
     create_basic_ground_station_for_satellite_shadow,
-    geodetic2cartesian
+    geodetic2cartesian,
+    sub_satellite_points_degrees,
+    ground_station_positions_m,
+    distances_m_between_satellite_pairs,
+    distances_m_ground_station_to_satellites,
+    ground_station_satellites_in_range_m
+)
+from .gsl_visibility_tracker import (
+    GslVisibilityTracker
 )
@@ -22,25 +22,77 @@
 
 import math
 import ephem
+import numpy as np
+from scipy.spatial import cKDTree
 from geopy.distance import great_circle
 
 
-def distance_m_between_satellites(sat1, sat2, epoch_str, date_str):
+# Julian date of the ephem (Dublin Julian day) zero point: 1899-12-31 12:00
+EPHEM_DATE_TO_JULIAN_DATE = 2415020.0
+
+# Nanoseconds in a day
+NS_PER_DAY = 86400 * 1000 * 1000 * 1000
+
+
+def ephem_date(epoch):
+    """
+    Numeric ephem date (Dublin Julian date) of an epoch.
+
+    The epoch is interpreted the same way as ephem interprets str(epoch), such that
+    the distance functions yield exactly the same values as when given the string.
+
+    :param epoch:   Epoch (astropy Time, string, or an ephem date as float which is returned as is)
+
+    :return: Ephem date (float, days since 1899-12-31 12:00)
+    """
+    if isinstance(epoch, (int, float)):
+        return float(epoch)
+    return float(ephem.Date(str(epoch)))
+
+
+def ephem_date_at(epoch_date, time_since_epoch_ns):
+    """
+    Numeric ephem date of a time instant relative to the epoch.
+
+    For millisecond-aligned time instants this is identical to parsing str(epoch + time_since_epoch_ns * u.ns)
+    (the string is rounded to milliseconds, this is not).
+
+    :param epoch_date:              Ephem date of the epoch (float, see ephem_date())
+    :param time_since_epoch_ns:     Time since epoch in nanoseconds (int)
+
+    :return: Ephem date (float, days since 1899-12-31 12:00)
+    """
+    return epoch_date + time_since_epoch_ns / NS_PER_DAY
+
+
+def ephem_date_from_julian_date(julian_date):
+    """
+    Numeric ephem date of a Julian date.
+
+    :param julian_date: Julian date (float)
+
+    :return: Ephem date (float, days since 1899-12-31 12:00)
+    """
+    return julian_date - EPHEM_DATE_TO_JULIAN_DATE
+
+
+def distance_m_between_satellites(sat1, sat2, epoch, date):
     """
     Computes the straight distance between two satellites in meters.
 
     :param sat1:       The first satellite
     :param sat2:       The other satellite
-    :param epoch_str:  Epoch time of the observer (string)
-    :param date_str:   The time instant when the distance should be measured (string)
+    :param epoch:      Epoch time of the observer (string, or ephem date float as by ephem_date())
+    :param date:       The time instant when the distance should be measured (string, or ephem date float
+                       as by ephem_date_at(), which avoids parsing a string for every distance)
 
     :return: The distance between the satellites in meters
     """
 
     # Create an observer somewhere on the planet
     observer = ephem.Observer()
-    observer.epoch = epoch_str
-    observer.date = date_str
+    observer.epoch = epoch
+    observer.date = date
     observer.lat = 0
     observer.lon = 0
     observer.elevation = 0
@@ -64,22 +116,22 @@ def distance_m_between_satellites(sat1, sat2, epoch_str, date_str):
     return math.sqrt(sat1.range ** 2 + sat2.range ** 2 - (2 * sat1.range * sat2.range * math.cos(angle_radians)))
 
 
-def distance_m_ground_station_to_satellite(ground_station, satellite, epoch_str, date_str):
+def distance_m_ground_station_to_satellite(ground_station, satellite, epoch, date):
     """
     Computes the straight distance between a ground station and a satellite in meters
 
     :param ground_station:  The ground station
     :param satellite:       The satellite
-    :param epoch_str:       Epoch time of the observer (ground station) (string)
-    :param date_str:        The time instant when the distance should be measured (string)
+    :param epoch:           Epoch time of the observer (ground station) (string, or ephem date float)
+    :param date:            The time instant when the distance should be measured (string, or ephem date float)
 
     :return: The distance between the ground station and the satellite in meters
     """
 
     # Create an observer on the planet where the ground station is
     observer = ephem.Observer()
-    observer.epoch = epoch_str
-    observer.date = date_str
+    observer.epoch = epoch
+    observer.date = date
     observer.lat = str(ground_station["latitude_degrees_str"])   # Very important: string argument is in degrees.
     observer.lon = str(ground_station["longitude_degrees_str"])  # DO NOT pass a float as it is interpreted as radians
     observer.elevation = ground_station["elevation_m_float"]
@@ -138,18 +190,18 @@ def straight_distance_m_between_ground_stations(ground_station_1, ground_station
     return polygon_side_m
 
 
-def create_basic_ground_station_for_satellite_shadow(satellite, epoch_str, date_str):
+def create_basic_ground_station_for_satellite_shadow(satellite, epoch, date):
     """
     Calculate the (latitude, longitude) of the satellite shadow on the Earth and creates a ground station there.
 
     :param satellite:   Satellite
-    :param epoch_str:   Epoch (string)
-    :param date_str:    Time moment (string)
+    :param epoch:       Epoch (string, or ephem date float)
+    :param date:        Time moment (string, or ephem date float)
 
     :return: Basic ground station
     """
 
-    satellite.compute(date_str, epoch=epoch_str)
+    satellite.compute(date, epoch=epoch)
 
     return {
         "gid": -1,
@@ -196,3 +248,99 @@ def geodetic2cartesian(lat_degrees, lon_degrees, ele_m):
     z = (v * (1.0 - e * e) + ele_m) * math.sin(lat)
 
     return x, y, z
+
+
+def sub_satellite_points_degrees(satellite_positions_m):
+    """
+    Compute the sub-satellite points of many satellites at once.
+
+    The latitude is geocentric, the same as the sublat / sublong ephem computes for a satellite
+    (and thus as create_basic_ground_station_for_satellite_shadow).
+
+    :param satellite_positions_m: Numpy array (N, 3) of satellite Cartesian positions in meters
+
+    :return: Tuple of numpy arrays (N,) (latitude in degrees, longitude in degrees)
+    """
+    x = satellite_positions_m[:, 0]
+    y = satellite_positions_m[:, 1]
+    z = satellite_positions_m[:, 2]
+    return np.degrees(np.arctan2(z, np.hypot(x, y))), np.degrees(np.arctan2(y, x))
+
+
+def ground_station_positions_m(ground_stations):
+    """
+    Compute the Cartesian (Earth-centered Earth-fixed) positions of ground stations.
+
+    :param ground_stations: List of ground stations
+
+    :return: Numpy array (G, 3) of positions in meters
+    """
+    positions_m = np.zeros((len(ground_stations), 3))
+    for i, ground_station in enumerate(ground_stations):
+        positions_m[i] = geodetic2cartesian(
+            float(ground_station["latitude_degrees_str"]),
+            float(ground_station["longitude_degrees_str"]),
+            ground_station["elevation_m_float"]
+        )
+    return positions_m
+
+
+def distances_m_between_satellite_pairs(satellite_positions_m, list_pairs):
+    """
+    Computes the straight distance between many pairs of satellites at once.
+
+    :param satellite_positions_m:   Numpy array (N, 3) of satellite positions in meters
+    :param list_pairs:              List of (a, b) satellite id pairs (e.g., the ISLs)
+
+    :return: Numpy array (len(list_pairs),) of distances in meters
+    """
+    if len(list_pairs) == 0:
+        return np.zeros(0)
+    pairs = np.asarray(list_pairs, dtype=np.int64)
+    return np.linalg.norm(satellite_positions_m[pairs[:, 0]] - satellite_positions_m[pairs[:, 1]], axis=1)
+
+
+def distances_m_ground_station_to_satellites(ground_station_position_m, satellite_positions_m):
+    """
+    Computes the straight distance between a ground station and every satellite at once.
+
+    :param ground_station_position_m:   Ground station position (3,) in meters
+    :param satellite_positions_m:       Numpy array (N, 3) of satellite positions in meters
+
+    :return: Numpy array (N,) of distances in meters
+    """
+    return np.linalg.norm(satellite_positions_m - ground_station_position_m, axis=1)
+
+
+def ground_station_satellites_in_range_m(ground_station_positions, satellite_positions_m, max_gsl_length_m):
+    """
+    Finds for each ground station the satellites within range using a spatial index (KD-tree)
+    over the satellite positions, instead of computing the distance to every satellite.
+
+    The output is exactly the same as filtering distances_m_ground_station_to_satellites()
+    by the maximum GSL length, i.e., per ground station the in-range satellites in ascending sid order.
+
+    :param ground_station_positions:    Numpy array (G, 3) of ground station positions in meters
+    :param satellite_positions_m:       Numpy array (N, 3) of satellite positions in meters
+    :param max_gsl_length_m:            Maximum GSL length in meters
+
+    :return: List (G) of lists of (distance in meters, sid)
+    """
+
+    # The tree radius is slightly enlarged, as the tree's distance computation can differ
+    # in the last bits; candidates are filtered by the exact distances afterwards
+    satellite_tree = cKDTree(satellite_positions_m)
+    candidates_per_ground_station = satellite_tree.query_ball_point(
+        ground_station_positions, max_gsl_length_m * (1.0 + 1e-9)
+    )
+
+    result = []
+    for gid, candidates in enumerate(candidates_per_ground_station):
+        sids = np.sort(np.asarray(candidates, dtype=np.int64))
+        distances_m = distances_m_ground_station_to_satellites(ground_station_positions[gid], satellite_positions_m[sids])
+        result.append([
+            (float(distance_m), int(sid))
+            for distance_m, sid in zip(distances_m, sids)
+            if distance_m <= max_gsl_length_m
+        ])
+    return result
@@ -0,0 +1,78 @@
+import numpy as np
+from scipy.spatial import cKDTree
+
+
+# Default guard band around the maximum GSL length (a LEO satellite moves ~7.5 km per second,
+# so with this guard band the candidates are refreshed about once every 25 seconds)
+GSL_VISIBILITY_GUARD_BAND_M = 200000.0
+
+
+class GslVisibilityTracker:
+    """
+    Incremental tracker of the satellites in range of each ground station across consecutive time steps.
+
+    At a refresh, a spatial index (KD-tree) query finds for each ground station the candidate satellites
+    within the maximum GSL length plus a guard band. As long as no satellite has moved further than the
+    guard band since that refresh, no other satellite can have come within range, so only the distances
+    to the candidates are computed (as a single numpy operation over all ground stations). Once a satellite
+    has moved further, the candidates are refreshed.
+
+    The output is exactly the same as that of ground_station_satellites_in_range_m().
+    """
+
+    def __init__(self, ground_station_positions, max_gsl_length_m, guard_band_m=GSL_VISIBILITY_GUARD_BAND_M):
+        if guard_band_m < 0:
+            raise ValueError("Guard band must be non-negative")
+        self.ground_station_positions = np.asarray(ground_station_positions, dtype=np.float64)
+        self.max_gsl_length_m = max_gsl_length_m
+        self.guard_band_m = guard_band_m
+        self.reference_satellite_positions_m = None
+        self.candidate_gids = None
+        self.candidate_sids = None
+        self.candidate_offsets = None
+        self.num_refreshes = 0
+        self.num_updates = 0
+
+    def _refresh(self, satellite_positions_m):
+        """
+        Find the candidate satellites of each ground station using a KD-tree query.
+
+        :param satellite_positions_m:   Numpy array (N, 3) of satellite positions in meters
+        """
+        satellite_tree = cKDTree(satellite_positions_m)
+        candidates_per_ground_station = satellite_tree.query_ball_point(
+            self.ground_station_positions, (self.max_gsl_length_m + self.guard_band_m) * (1.0 + 1e-9)
+        )
+        sids_per_ground_station = [np.sort(np.asarray(c, dtype=np.int64)) for c in candidates_per_ground_station]
+        counts = np.array([len(sids) for sids in sids_per_ground_station], dtype=np.int64)
+        self.candidate_offsets = np.concatenate(([0], np.cumsum(counts)))
+        self.candidate_gids = np.repeat(np.arange(len(self.ground_station_positions)), counts)
+        self.candidate_sids = (
+            np.concatenate(sids_per_ground_station) if len(sids_per_ground_station) > 0 else np.zeros(0, np.int64)
+        )
+        self.reference_satellite_positions_m = np.array(satellite_positions_m)
+        self.num_refreshes += 1
+
+    def satellites_in_range(self, satellite_positions_m):
+        """
+        Satellites in range of each ground station at the next time step.
+
+        :param satellite_positions_m:   Numpy array (N, 3) of satellite positions in meters
+
+        :return: List (G) of lists of (distance in meters, sid) in ascending sid order
+        """
+        if self.reference_satellite_positions_m is None \
+                or self.reference_satellite_positions_m.shape != satellite_positions_m.shape \
+                or np.max(np.linalg.norm(satellite_positions_m - self.reference_satellite_positions_m, axis=1),
+                          initial=0.0) > self.guard_band_m:
+            self._refresh(satellite_positions_m)
+        self.num_updates += 1
+
+        # Exact distances to the candidates only (computed the same way as ground_station_satellites_in_range_m)
+        distances_m = np.linalg.norm(
+            satellite_positions_m[self.candidate_sids] - self.ground_station_positions[self.candidate_gids], axis=1
+        )
+        in_range = distances_m <= self.max_gsl_length_m
+        in_range_pairs = list(zip(distances_m[in_range].tolist(), self.candidate_sids[in_range].tolist()))
+        bounds = np.concatenate(([0], np.cumsum(in_range)))[self.candidate_offsets].tolist()
+        return [in_range_pairs[bounds[gid]:bounds[gid + 1]] for gid in range(len(self.ground_station_positions))]
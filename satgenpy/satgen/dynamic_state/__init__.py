@@ -2,5 +2,36 @@ from .helper_dynamic_state import (
     help_dynamic_state
 )
 from .generate_dynamic_state import (
-    generate_dynamic_state
+    generate_dynamic_state,
+    generate_graph_state_at,
+    generate_graph_states_at,
+    generate_window_geometry_at
+)
+from .anchor_shortest_paths import AnchorShortestPathTrees
+from .anchor_placement import (
+    ANCHOR_PLACEMENTS,
+    select_anchors,
+    orbital_planes
+)
+from .demand_set import (
+    check_demand_set,
+    restrict_to_demand_set
+)
+from .dynamic_shortest_paths import DynamicShortestPathTrees
+from .csr_k_shortest_paths import CsrKShortestPaths
+from .forwarding_decision_cache import ForwardingDecisionCache
+from .k_paths_cache import KShortestPathsCache
+from .graph_snapshot import (
+    GraphSnapshot,
+    as_graph_snapshot
+)
+from .lookahead_window import LookaheadWindow
+from .shortest_path_backends import (
+    ShortestPathBackend,
+    ScipyShortestPathBackend,
+    NetworkxShortestPathBackend,
+    CsrShortestPathBackend,
+    register_shortest_path_backend,
+    get_shortest_path_backend,
+    shortest_path_backend_names
 )
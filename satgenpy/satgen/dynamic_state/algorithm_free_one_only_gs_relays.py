@@ -21,6 +21,7 @@
 # SOFTWARE.
 
 from .fstate_calculation import *
+from .dynamic_shortest_paths import DynamicShortestPathTrees
 
 
 def algorithm_free_one_only_gs_relays(
@@ -32,7 +33,10 @@ def algorithm_free_one_only_gs_relays(
         num_isls_per_sat,
         list_gsl_interfaces_info,
         prev_output,
-        enable_verbose_logs
+        enable_verbose_logs,
+        shortest_path_backend=None,  # Shortest path backend (name or instance, None for the default)
+        demand_set=None,  # Demand set (list of (source, destination) ground station pairs, None for all pairs)
+        shortest_path_method="floyd_warshall"  # "floyd_warshall" or "dijkstra" (reverse shortest path trees)
 ):
     """
     FREE-ONE ONLY OVER GROUND STATION RELAYS ALGORITHM
@@ -98,10 +102,15 @@ def algorithm_free_one_only_gs_relays(
     # FORWARDING STATE
     #
 
-    # Previous forwarding state (to only write delta)
+    # Previous forwarding state (to only write delta) and shortest path trees (to update incrementally,
+    # only with "dijkstra")
     prev_fstate = None
+    shortest_path_trees = None
     if prev_output is not None:
         prev_fstate = prev_output["fstate"]
+        shortest_path_trees = prev_output.get("shortest_path_trees")
+    if shortest_path_trees is None and shortest_path_method == "dijkstra":
+        shortest_path_trees = DynamicShortestPathTrees(shortest_path_backend=shortest_path_backend)
 
     # GID to satellite GSL interface index
     gid_to_sat_gsl_if_idx = [0] * len(ground_stations)  # (Only one GSL interface per satellite, so the first)
@@ -117,12 +126,17 @@ def algorithm_free_one_only_gs_relays(
         gid_to_sat_gsl_if_idx,
         {},
         prev_fstate,
-        enable_verbose_logs
+        enable_verbose_logs,
+        shortest_path_method=shortest_path_method,
+        shortest_path_trees=shortest_path_trees,
+        shortest_path_backend=shortest_path_backend,
+        demand_set=demand_set
     )
 
     if enable_verbose_logs:
         print("")
 
     return {
-        "fstate": fstate
+        "fstate": fstate,
+        "shortest_path_trees": shortest_path_trees
     }
@@ -21,6 +21,7 @@
 # SOFTWARE.
 
 from .fstate_calculation import *
+from .dynamic_shortest_paths import DynamicShortestPathTrees
 
 
 def algorithm_free_one_only_over_isls(
@@ -34,7 +35,9 @@ def algorithm_free_one_only_over_isls(
         sat_neighbor_to_if,
         list_gsl_interfaces_info,
         prev_output,
-        enable_verbose_logs
+        enable_verbose_logs,
+        shortest_path_backend=None,  # Shortest path backend (name or instance, None for the default)
+        demand_set=None  # Demand set (list of (source, destination) ground station pairs, None for all pairs)
 ):
     """
     FREE-ONE ONLY OVER INTER-SATELLITE LINKS ALGORITHM
@@ -88,10 +91,14 @@ def algorithm_free_one_only_over_isls(
     # FORWARDING STATE
     #
 
-    # Previous forwarding state (to only write delta)
+    # Previous forwarding state (to only write delta) and shortest path trees (to update incrementally)
     prev_fstate = None
+    shortest_path_trees = None
     if prev_output is not None:
         prev_fstate = prev_output["fstate"]
+        shortest_path_trees = prev_output.get("shortest_path_trees")
+    if shortest_path_trees is None:
+        shortest_path_trees = DynamicShortestPathTrees(shortest_path_backend=shortest_path_backend)
 
     # GID to satellite GSL interface index
     gid_to_sat_gsl_if_idx = [0] * len(ground_stations)  # (Only one GSL interface per satellite, so the first)
@@ -108,12 +115,16 @@ def algorithm_free_one_only_over_isls(
         ground_station_satellites_in_range,
         sat_neighbor_to_if,
         prev_fstate,
-        enable_verbose_logs
+        enable_verbose_logs,
+        shortest_path_trees=shortest_path_trees,
+        shortest_path_backend=shortest_path_backend,
+        demand_set=demand_set
     )
 
     if enable_verbose_logs:
         print("")
 
     return {
-        "fstate": fstate
+        "fstate": fstate,
+        "shortest_path_trees": shortest_path_trees
     }
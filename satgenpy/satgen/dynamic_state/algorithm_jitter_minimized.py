@@ -1,20 +1,49 @@
+import concurrent.futures
 from .fstate_calculation import *
+from .lookahead_window import LookaheadWindow
+from .anchor_placement import ANCHOR_PLACEMENTS, select_anchors
+from .forwarding_decision_cache import ForwardingDecisionCache
 
 
 class JitterMinimizedRouter:
-    def __init__(self, lookahead_steps=10, hysteresis_threshold=0.1, num_anchors=12):
+    def __init__(self, lookahead_steps=10, hysteresis_threshold=0.1, num_anchors=12, num_workers=1,
+                 anchor_placement="strided", anchor_reselection_interval=None, incremental_forwarding=False):
         """
         Initialize jitter-minimized router with configurable parameters
+
+        The anchors are placed by anchor_placement (one of anchor_placement.ANCHOR_PLACEMENTS) at the first
+        time step, and placed again every anchor_reselection_interval time steps (None: never). When they
+        change, the anchor data of the whole window is computed again.
+
+        With incremental_forwarding, the forwarding decisions are carried across time steps
+        (ForwardingDecisionCache), and only those whose inputs changed are calculated again.
+
+        At cold start, the geometry and the anchor data of all time steps of the window are needed at once.
+        These are independent per time step, so with num_workers > 1 they are computed by a pool of that
+        many worker processes (which is shut down after the cold start, as afterwards a single time step is
+        added per call).
         """
+        if num_workers < 1:
+            raise ValueError("Number of worker processes must be at least one")
+        if anchor_placement not in ANCHOR_PLACEMENTS:
+            raise ValueError("Unknown anchor placement: " + str(anchor_placement))
+        if anchor_reselection_interval is not None and anchor_reselection_interval < 1:
+            raise ValueError("Anchor re-selection interval must be at least one time step")
         self.lookahead_steps = lookahead_steps
         self.hysteresis_threshold = hysteresis_threshold
         self.num_anchors = num_anchors
+        self.num_workers = num_workers
+        self.anchor_placement = anchor_placement
+        self.anchor_reselection_interval = anchor_reselection_interval
 
         # Persistent state
         self.anchors = []
         self.previous_paths = {}
-        self.future_graphs_cache = []
-        self.current_graph_index = 0
+        self.window = None
+        self.prefetched_geometry = {}
+        self.process_pool = None  # Only during the cold start
+        self.decision_cache = ForwardingDecisionCache() if incremental_forwarding else None
+        self.num_steps = 0  # Time steps for which the forwarding state was calculated
 
     def validate_interface_conditions(self, list_gsl_interfaces_info, satellites, ground_stations):
         """
@@ -32,7 +61,7 @@ class JitterMinimizedRouter:
                 if list_gsl_interfaces_info[i]["aggregate_max_bandwidth"] != 1.0:
                     raise ValueError("Ground station aggregate max. bandwidth is not equal to 1.0")
 
-    def initialize_graphs(
+    def initialize_window(
             self,
             epoch,
             time_since_epoch_ns,
@@ -44,28 +73,46 @@ class JitterMinimizedRouter:
             max_gsl_length_m,
             max_isl_length_m,
             enable_verbose_logs,
-            generate_graph_state_at,
+            generate_window_geometry_at,
+            interface_table=None,
     ):
         """
-        Fill graph cache for initial look ahead
+        Fill the lookahead window: the ISL topology and interface numbering are built once, and
+        the geometry of all its time steps is computed in one batched call
         """
         if enable_verbose_logs:
             print(f"  > Initializing first {self.lookahead_steps} future network states")
-        for i in range(self.lookahead_steps):
-            if enable_verbose_logs:
-                print(
-                    f"  > Generating network state graph for T = {time_since_epoch_ns + time_step_ns * i}")
-            self.future_graphs_cache.append(generate_graph_state_at(
+        if self.num_workers > 1:
+            self.process_pool = concurrent.futures.ProcessPoolExecutor(max_workers=self.num_workers)
+        times_since_epoch_ns = [time_since_epoch_ns + time_step_ns * i for i in range(self.lookahead_steps)]
+        try:
+            window_geometry = generate_window_geometry_at(
                 epoch,
-                time_since_epoch_ns + time_step_ns * i,
+                times_since_epoch_ns,
                 satellites,
                 ground_stations,
                 list_isls,
                 list_gsl_interfaces_info,
                 max_gsl_length_m,
                 max_isl_length_m,
-                enable_verbose_logs
-            ))
+                enable_verbose_logs,
+                process_pool=self.process_pool
+            )
+        except BaseException:
+            self.shutdown_process_pool()
+            raise
+        self.window = LookaheadWindow(
+            len(satellites), list_isls, self.lookahead_steps, window_geometry["isl_distances_m"].dtype, interface_table
+        )
+        self.window.push_window_geometry(times_since_epoch_ns, window_geometry)
+
+    def shutdown_process_pool(self):
+        """
+        Shut down the worker processes of the cold start (if any)
+        """
+        if self.process_pool is not None:
+            self.process_pool.shutdown()
+            self.process_pool = None
 
     def write_bandwidth_files(self, output_dynamic_state_dir, time_since_epoch_ns,
                               satellites, ground_stations, list_gsl_interfaces_info,
@@ -110,71 +157,71 @@ class JitterMinimizedRouter:
             max_gsl_length_m,
             max_isl_length_m,
             enable_verbose_logs,
-            generate_graph_state_at,
+            generate_window_geometry_at,
     ):
+        next_time_since_epoch_ns = time_since_epoch_ns + time_step_ns * self.lookahead_steps
         if enable_verbose_logs:
-            print(
-                f"  > Generating network state graph for T = {time_since_epoch_ns + time_step_ns * self.lookahead_steps}")
-
-        # Replace the oldest graph state in cache
-        self.future_graphs_cache[self.current_graph_index] = generate_graph_state_at(
-            epoch,
-            time_since_epoch_ns + time_step_ns * self.lookahead_steps,
-            satellites,
-            ground_stations,
-            list_isls,
-            list_gsl_interfaces_info,
-            max_gsl_length_m,
-            max_isl_length_m,
-            enable_verbose_logs
-        )
+            print(f"  > Generating network state graph for T = {next_time_since_epoch_ns}")
+
+        # Geometry is generated a window at a time (one batched geometry computation)
+        if next_time_since_epoch_ns not in self.prefetched_geometry:
+            window_times_since_epoch_ns = [
+                next_time_since_epoch_ns + time_step_ns * i for i in range(self.lookahead_steps)
+            ]
+            window_geometry = generate_window_geometry_at(
+                epoch,
+                window_times_since_epoch_ns,
+                satellites,
+                ground_stations,
+                list_isls,
+                list_gsl_interfaces_info,
+                max_gsl_length_m,
+                max_isl_length_m,
+                enable_verbose_logs
+            )
+            self.prefetched_geometry = {
+                t: (window_geometry["isl_distances_m"][i], window_geometry["ground_station_satellites_in_range"][i])
+                for i, t in enumerate(window_times_since_epoch_ns)
+            }
 
-        # Increment the current graph state index
-        self.current_graph_index = (self.current_graph_index + 1) % self.lookahead_steps
+        # Move the window one time step forward (overwrites the weights of the oldest time step)
+        isl_distances_m, ground_station_satellites_in_range = self.prefetched_geometry.pop(next_time_since_epoch_ns)
+        self.window.push(next_time_since_epoch_ns, isl_distances_m, ground_station_satellites_in_range)
 
-    def select_anchors_simple(self, num_anchors, satellites, sat_net_graph, enable_verbose_logs=False):
+    def select_anchors(self, num_anchors, satellites, sat_net_graph, enable_verbose_logs=False):
         """
-        Simple anchor selection by evenly spreading anchor IDs across the constellation
+        Select the anchors (see anchor_placement.select_anchors()) at the first time step, and again
+        every anchor_reselection_interval time steps (if set) on the graph of that time step
+
+        :return: True if the anchors changed
         """
-        if self.anchors:  # Already selected
+        if self.anchors and (
+                self.anchor_reselection_interval is None or self.num_steps % self.anchor_reselection_interval != 0
+        ):
             if enable_verbose_logs:
                 print(f"  > Using existing {len(self.anchors)} anchors: {self.anchors}")
-            return self.anchors
-        
-        num_satellites = len(satellites)
-        
-        step = num_satellites // num_anchors
-        
-        selected_anchors = []
-        for i in range(num_anchors):
-            anchor_id = i * step
-            
-            # Make sure anchor exists in graph and has connections
-            if anchor_id in sat_net_graph.nodes() and sat_net_graph.degree(anchor_id) >= 2:
-                selected_anchors.append(anchor_id)
-            else:
-                # If satellite does not exist or is not valid, find nearest valid satellite
-                for offset in range(1, step):
-                    candidate = anchor_id + offset
-                    if candidate < num_satellites and candidate in sat_net_graph.nodes() and sat_net_graph.degree(candidate) >= 2:
-                        selected_anchors.append(candidate)
-                        break
-        
-        self.anchors = selected_anchors
-        
+            return False
+
+        anchors = select_anchors(self.anchor_placement, num_anchors, satellites, sat_net_graph)
+        changed = anchors != self.anchors
+        self.anchors = anchors
+
         if enable_verbose_logs:
-            print(f"  > Selected {len(self.anchors)} anchors evenly distributed across {num_satellites} satellites")
+            print(f"  > Selected {len(self.anchors)} anchors ({self.anchor_placement}) across {len(satellites)} satellites")
             print(f"    Anchor IDs: {self.anchors}")
-        
-        return self.anchors
+
+        return changed
     
     def calculate_forwarding_state(self, output_dynamic_state_dir, time_since_epoch_ns, satellites, ground_stations,
                                    sat_net_graph_only_satellites_with_isls,
                                    ground_station_satellites_in_range, num_isls_per_sat,
                                    sat_neighbor_to_if, list_gsl_interfaces_info, prev_fstate,
-                                   enable_verbose_logs, num_anchors, prev_anchor_data=None):
+                                   enable_verbose_logs, num_anchors, prev_anchor_data=None, demand_set=None):
         """
         Calculate forwarding state using anchor-based LMSR jitter-minimized paths
+
+        With a demand set (list of (source, destination) ground station pairs), only the entries along the
+        paths of its pairs are calculated (all others drop)
         """
 
         if enable_verbose_logs:
@@ -192,40 +239,44 @@ class JitterMinimizedRouter:
         # Each ground station has a GSL interface on every satellite allocated only for itself
         gid_to_sat_gsl_if_idx = list(range(len(ground_stations)))
 
-        # Select anchors if not already done
-        self.select_anchors_simple(num_anchors, satellites, sat_net_graph_only_satellites_with_isls, enable_verbose_logs)
+        # Select anchors if not already done (or again), the anchor data of other anchors cannot be reused
+        if self.select_anchors(num_anchors, satellites, sat_net_graph_only_satellites_with_isls, enable_verbose_logs):
+            prev_anchor_data = None
 
         # Build lists for lookahead horizon in proper order
-        future_graphs = []
-        future_gs_in_range = []
-        future_num_isls = []
-        future_sat_neighbor_to_if = []
-        for i in range(self.lookahead_steps):
-            idx = (self.current_graph_index + i) % self.lookahead_steps
-            future_graphs.append(self.future_graphs_cache[idx]['sat_net_graph_only_satellites_with_isls'])
-            future_gs_in_range.append(self.future_graphs_cache[idx]['ground_station_satellites_in_range'])
-            future_num_isls.append(self.future_graphs_cache[idx]['num_isls_per_sat'])
-            future_sat_neighbor_to_if.append(self.future_graphs_cache[idx]['sat_neighbor_to_if'])
+        # (the ISL interface numbering is static, so every time step shares the same one)
+        future_graphs = [self.window.isl_graph_at(i) for i in range(len(self.window))]
+        future_gs_in_range = [self.window.ground_station_satellites_in_range_at(i) for i in range(len(self.window))]
+        future_num_isls = [self.window.num_isls_per_sat] * len(self.window)
+        future_sat_neighbor_to_if = [self.window.sat_neighbor_to_if] * len(self.window)
 
         if enable_verbose_logs:
             print(f"  > Using {len(self.anchors)} anchors with {self.lookahead_steps}-step lookahead")
 
-        # Use anchor-based LMSR path calculation with complete forwarding state
-        fstate, new_anchor_data = calculate_anchor_lmsr_path_complete_forwarding(
-            output_dynamic_state_dir,
-            time_since_epoch_ns,
-            len(satellites),
-            len(ground_stations),
-            future_graphs,
-            future_num_isls,
-            gid_to_sat_gsl_if_idx,
-            future_gs_in_range,
-            future_sat_neighbor_to_if,
-            self.anchors,
-            prev_fstate,
-            prev_anchor_data,
-            enable_verbose_logs
-        )
+        # Use anchor-based LMSR path calculation with complete forwarding state (the worker processes of the
+        # cold start are shut down afterwards, also if it fails)
+        try:
+            fstate, new_anchor_data = calculate_anchor_lmsr_path_complete_forwarding(
+                output_dynamic_state_dir,
+                time_since_epoch_ns,
+                len(satellites),
+                len(ground_stations),
+                future_graphs,
+                future_num_isls,
+                gid_to_sat_gsl_if_idx,
+                future_gs_in_range,
+                future_sat_neighbor_to_if,
+                self.anchors,
+                prev_fstate,
+                prev_anchor_data,
+                enable_verbose_logs,
+                self.process_pool,
+                demand_set=demand_set,
+                decision_cache=self.decision_cache
+            )
+        finally:
+            self.shutdown_process_pool()
+        self.num_steps += 1
 
         if enable_verbose_logs:
             print(f"  > Generated forwarding state with {len(fstate)} entries")
@@ -246,7 +297,14 @@ def algorithm_jitter_minimized_lookahead(
         list_isls,
         max_gsl_length_m,
         max_isl_length_m,
-        generate_graph_state_at, # Generator function (./generator_dynamic_state.generate_graph_state_at)
+        generate_window_geometry_at,  # Generator function (./generate_dynamic_state.generate_window_geometry_at)
+        interface_table=None,  # Interface identifiers (satgen.interfaces.InterfaceTable, built once per run)
+        num_workers=1,  # Worker processes for the cold start of the router (1: compute everything in this process)
+        demand_set=None,  # Demand set (list of (source, destination) ground station pairs, None for all pairs)
+        num_anchors=60,  # Number of anchors of the router
+        anchor_placement="strided",  # Anchor placement (see anchor_placement.select_anchors())
+        anchor_reselection_interval=None,  # Time steps after which the anchors are placed again (None: never)
+        incremental_forwarding=False,  # Only calculate the forwarding decisions whose inputs changed again
 ):
     """
     JITTER MINIMIZED LOOKAHEAD ALGORITHM
@@ -280,20 +338,21 @@ def algorithm_jitter_minimized_lookahead(
             max_gsl_length_m,
             max_isl_length_m,
             enable_verbose_logs,
-            generate_graph_state_at,
+            generate_window_geometry_at,
         )
     else:
-        # Use 60 anchors for good performance with jitter reduction
-        num_anchors = 60
-        
         # Create router with 10-step lookahead
-        router = JitterMinimizedRouter(lookahead_steps=10, num_anchors=num_anchors)
+        router = JitterMinimizedRouter(
+            lookahead_steps=10, num_anchors=num_anchors, num_workers=num_workers,
+            anchor_placement=anchor_placement, anchor_reselection_interval=anchor_reselection_interval,
+            incremental_forwarding=incremental_forwarding
+        )
 
         if enable_verbose_logs:
             print(f"  > Created new jitter-minimized router with {num_anchors} anchors, 10-step lookahead ({len(satellites)} satellites)")
 
-        # Initialize graphs
-        router.initialize_graphs(
+        # Initialize lookahead window
+        router.initialize_window(
             epoch,
             time_since_epoch_ns,
             time_step_ns,
@@ -304,7 +363,8 @@ def algorithm_jitter_minimized_lookahead(
             max_gsl_length_m,
             max_isl_length_m,
             enable_verbose_logs,
-            generate_graph_state_at,
+            generate_window_geometry_at,
+            interface_table,
         )
 
     # Validate interface conditions (same as free_gs_one_sat_many_only_over_isls)
@@ -319,7 +379,7 @@ def algorithm_jitter_minimized_lookahead(
         satellites,
         ground_stations,
         list_gsl_interfaces_info,
-        router.future_graphs_cache[router.current_graph_index]['num_isls_per_sat'],
+        router.window.num_isls_per_sat,
         enable_verbose_logs
     )
 
@@ -336,15 +396,16 @@ def algorithm_jitter_minimized_lookahead(
         time_since_epoch_ns,
         satellites,
         ground_stations,
-        router.future_graphs_cache[router.current_graph_index]['sat_net_graph_only_satellites_with_isls'],
-        router.future_graphs_cache[router.current_graph_index]['ground_station_satellites_in_range'],
-        router.future_graphs_cache[router.current_graph_index]['num_isls_per_sat'],
-        router.future_graphs_cache[router.current_graph_index]['sat_neighbor_to_if'],
+        router.window.isl_graph_at(0),
+        router.window.ground_station_satellites_in_range_at(0),
+        router.window.num_isls_per_sat,
+        router.window.sat_neighbor_to_if,
         list_gsl_interfaces_info,
         prev_fstate,
         enable_verbose_logs,
         router.num_anchors,
-        prev_anchor_data
+        prev_anchor_data,
+        demand_set
     )
     
     # Write forwarding state file
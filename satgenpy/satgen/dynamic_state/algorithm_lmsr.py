@@ -1,16 +1,24 @@
 from .fstate_calculation import *
+from .lookahead_window import LookaheadWindow
+from .k_paths_cache import KShortestPathsCache
+from .shortest_path_backends import get_shortest_path_backend
 
 
 class LMSRRouter:
-    def __init__(self, lookahead_steps=10):
+    def __init__(self, lookahead_steps=10, shortest_path_backend=None):
         """
         Initialize jitter-minimized router with configurable parameters
+
+        The k-shortest paths of the time steps of the window are kept in a cache owned by the router (see
+        KShortestPathsCache), from which they are evicted once their time step falls behind the window
         """
         self.lookahead_steps = lookahead_steps
+        self.shortest_path_backend = get_shortest_path_backend(shortest_path_backend)
 
         # Persistent state
-        self.future_graphs_cache = []
-        self.current_graph_index = 0
+        self.window = None
+        self.prefetched_geometry = {}
+        self.k_paths_cache = KShortestPathsCache()
 
     def validate_interface_conditions(self, list_gsl_interfaces_info, satellites, ground_stations):
         """
@@ -28,7 +36,7 @@ class LMSRRouter:
                 if list_gsl_interfaces_info[i]["aggregate_max_bandwidth"] != 1.0:
                     raise ValueError("Ground station aggregate max. bandwidth is not equal to 1.0")
 
-    def initialize_graphs(
+    def initialize_window(
             self,
             epoch,
             time_since_epoch_ns,
@@ -40,28 +48,31 @@ class LMSRRouter:
             max_gsl_length_m,
             max_isl_length_m,
             enable_verbose_logs,
-            generate_graph_state_at,
+            generate_window_geometry_at,
+            interface_table=None,
     ):
         """
-        Fill graph cache for initial look ahead
+        Fill the lookahead window: the ISL topology and interface numbering are built once, and
+        the geometry of all its time steps is computed in one batched call
         """
         if enable_verbose_logs:
             print(f"  > Initializing first {self.lookahead_steps} future network states")
-        for i in range(self.lookahead_steps):
-            if enable_verbose_logs:
-                print(
-                    f"  > Generating network state graph for T = {time_since_epoch_ns + time_step_ns * i}")
-            self.future_graphs_cache.append(generate_graph_state_at(
-                epoch,
-                time_since_epoch_ns + time_step_ns * i,
-                satellites,
-                ground_stations,
-                list_isls,
-                list_gsl_interfaces_info,
-                max_gsl_length_m,
-                max_isl_length_m,
-                enable_verbose_logs
-            ))
+        times_since_epoch_ns = [time_since_epoch_ns + time_step_ns * i for i in range(self.lookahead_steps)]
+        window_geometry = generate_window_geometry_at(
+            epoch,
+            times_since_epoch_ns,
+            satellites,
+            ground_stations,
+            list_isls,
+            list_gsl_interfaces_info,
+            max_gsl_length_m,
+            max_isl_length_m,
+            enable_verbose_logs
+        )
+        self.window = LookaheadWindow(
+            len(satellites), list_isls, self.lookahead_steps, window_geometry["isl_distances_m"].dtype, interface_table
+        )
+        self.window.push_window_geometry(times_since_epoch_ns, window_geometry)
 
     def write_bandwidth_files(self, output_dynamic_state_dir, time_since_epoch_ns,
                               satellites, ground_stations, list_gsl_interfaces_info,
@@ -106,38 +117,50 @@ class LMSRRouter:
             max_gsl_length_m,
             max_isl_length_m,
             enable_verbose_logs,
-            generate_graph_state_at,
+            generate_window_geometry_at,
     ):
+        next_time_since_epoch_ns = time_since_epoch_ns + time_step_ns * self.lookahead_steps
         if enable_verbose_logs:
-            print(
-                f"  > Generating network state graph for T = {time_since_epoch_ns + time_step_ns * self.lookahead_steps}")
-
-        # Replace the oldest graph state in cache
-        self.future_graphs_cache[self.current_graph_index] = generate_graph_state_at(
-            epoch,
-            time_since_epoch_ns + time_step_ns * self.lookahead_steps,
-            satellites,
-            ground_stations,
-            list_isls,
-            list_gsl_interfaces_info,
-            max_gsl_length_m,
-            max_isl_length_m,
-            enable_verbose_logs
-        )
+            print(f"  > Generating network state graph for T = {next_time_since_epoch_ns}")
+
+        # Geometry is generated a window at a time (one batched geometry computation)
+        if next_time_since_epoch_ns not in self.prefetched_geometry:
+            window_times_since_epoch_ns = [
+                next_time_since_epoch_ns + time_step_ns * i for i in range(self.lookahead_steps)
+            ]
+            window_geometry = generate_window_geometry_at(
+                epoch,
+                window_times_since_epoch_ns,
+                satellites,
+                ground_stations,
+                list_isls,
+                list_gsl_interfaces_info,
+                max_gsl_length_m,
+                max_isl_length_m,
+                enable_verbose_logs
+            )
+            self.prefetched_geometry = {
+                t: (window_geometry["isl_distances_m"][i], window_geometry["ground_station_satellites_in_range"][i])
+                for i, t in enumerate(window_times_since_epoch_ns)
+            }
 
-        # Increment the current graph state index
-        self.current_graph_index = (self.current_graph_index + 1) % self.lookahead_steps
+        # Move the window one time step forward (overwrites the weights of the oldest time step)
+        isl_distances_m, ground_station_satellites_in_range = self.prefetched_geometry.pop(next_time_since_epoch_ns)
+        self.window.push(next_time_since_epoch_ns, isl_distances_m, ground_station_satellites_in_range)
 
     def calculate_forwarding_state(self, output_dynamic_state_dir, time_since_epoch_ns, satellites, ground_stations,
                                    sat_net_graph_only_satellites_with_isls,
                                    ground_station_satellites_in_range, num_isls_per_sat,
                                    sat_neighbor_to_if, list_gsl_interfaces_info, prev_fstate,
-                                   prev_dist_sat_nets_without_gs, enable_verbose_logs):
+                                   prev_dist_sat_nets_without_gs, enable_verbose_logs, demand_set=None):
         """
         Calculate forwarding state using LMSR algorithm from
         S. Sun, R. Zhang, K. Liu, Z. Sun, Q. Tang, and T. Huang,
         ‘LMSR: A Low-Jitter Multiple Slots Routing Algorithm in LEO Satellite Networks’,
         in 2025 IEEE Wireless Communications and Networking Conference (WCNC), 2025, pp. 1–6.
+
+        With a demand set (list of (source, destination) ground station pairs), only the entries along the
+        paths of its pairs are calculated
         """
 
         if enable_verbose_logs:
@@ -169,11 +192,16 @@ class LMSRRouter:
             sat_neighbor_to_if,
             prev_fstate,
             prev_dist_sat_nets_without_gs,
-            enable_verbose_logs
+            enable_verbose_logs,
+            shortest_path_backend=self.shortest_path_backend,
+            demand_set=demand_set,
+            k_paths_cache=self.k_paths_cache,
+            window_times_since_epoch_ns=[self.window.time_since_epoch_ns_at(i) for i in range(len(self.window))]
         )
 
         if enable_verbose_logs:
             print(f"  > Generated forwarding state with {len(fstate)} entries")
+            print(f"  > K-paths cache: {self.k_paths_cache.stats()}")
 
         return fstate, prev_dist_sat_nets_without_gs
 
@@ -191,7 +219,10 @@ def algorithm_lmsr(
         list_isls,
         max_gsl_length_m,
         max_isl_length_m,
-        generate_graph_state_at,  # Generator function (./generator_dynamic_state.generate_graph_state_at)
+        generate_window_geometry_at,  # Generator function (./generate_dynamic_state.generate_window_geometry_at)
+        interface_table=None,  # Interface identifiers (satgen.interfaces.InterfaceTable, built once per run)
+        shortest_path_backend=None,  # Shortest path backend (name or instance, None for the default)
+        demand_set=None,  # Demand set (list of (source, destination) ground station pairs, None for all pairs)
 ):
     """
     LMSR ALGORITHM
@@ -224,16 +255,16 @@ def algorithm_lmsr(
             max_gsl_length_m,
             max_isl_length_m,
             enable_verbose_logs,
-            generate_graph_state_at,
+            generate_window_geometry_at,
         )
     else:
-        router = LMSRRouter()
+        router = LMSRRouter(shortest_path_backend=shortest_path_backend)
 
         if enable_verbose_logs:
             print("  > Created new jitter-minimized router instance")
 
-        # Initialize graphs
-        router.initialize_graphs(
+        # Initialize lookahead window
+        router.initialize_window(
             epoch,
             time_since_epoch_ns,
             time_step_ns,
@@ -244,7 +275,8 @@ def algorithm_lmsr(
             max_gsl_length_m,
             max_isl_length_m,
             enable_verbose_logs,
-            generate_graph_state_at,
+            generate_window_geometry_at,
+            interface_table,
         )
 
     # Validate interface conditions (same as free_gs_one_sat_many_only_over_isls)
@@ -259,7 +291,7 @@ def algorithm_lmsr(
         satellites,
         ground_stations,
         list_gsl_interfaces_info,
-        router.future_graphs_cache[router.current_graph_index]['num_isls_per_sat'],
+        router.window.num_isls_per_sat,
         enable_verbose_logs
     )
 
@@ -279,14 +311,15 @@ def algorithm_lmsr(
         time_since_epoch_ns,
         satellites,
         ground_stations,
-        [router.future_graphs_cache[(router.current_graph_index + i) % router.lookahead_steps]['sat_net_graph_only_satellites_with_isls'] for i in range(len(router.future_graphs_cache))],
-        [router.future_graphs_cache[(router.current_graph_index + i) % router.lookahead_steps]['ground_station_satellites_in_range'] for i in range(len(router.future_graphs_cache))],
-        [router.future_graphs_cache[(router.current_graph_index + i) % router.lookahead_steps]['num_isls_per_sat'] for i in range(len(router.future_graphs_cache))],
-        [router.future_graphs_cache[(router.current_graph_index + i) % router.lookahead_steps]['sat_neighbor_to_if'] for i in range(len(router.future_graphs_cache))],
+        [router.window.isl_graph_at(i) for i in range(len(router.window))],
+        [router.window.ground_station_satellites_in_range_at(i) for i in range(len(router.window))],
+        [router.window.num_isls_per_sat] * len(router.window),
+        [router.window.sat_neighbor_to_if] * len(router.window),
         list_gsl_interfaces_info,
         prev_fstate,
         prev_dist_sat_nets_without_gs,
-        enable_verbose_logs
+        enable_verbose_logs,
+        demand_set
     )
 
     if enable_verbose_logs:
@@ -0,0 +1,141 @@
+import numpy as np
+from satgen.tles import satellite_ephem_to_elements
+from .graph_snapshot import as_graph_snapshot
+
+
+# Anchor placements (see select_anchors())
+ANCHOR_PLACEMENTS = ("strided", "farthest_point", "orbit_balanced")
+
+
+def select_anchors(anchor_placement, num_anchors, satellites, sat_net_graph):
+    """
+    Select the anchors of the jitter-minimized router.
+
+    - "strided": every (V / num_anchors)-th satellite identifier (as before)
+    - "farthest_point": k-center on ISL hop distance (select_anchors_farthest_point())
+    - "orbit_balanced": the same number of anchors in every orbital plane (select_anchors_orbit_balanced())
+
+    Only satellites with at least two ISLs in the graph can be anchors.
+
+    :param anchor_placement:    Anchor placement (one of ANCHOR_PLACEMENTS)
+    :param num_anchors:         Number of anchors
+    :param satellites:          List of satellites (ephem.EarthSatellite)
+    :param sat_net_graph:       Graph with only the satellites and their ISLs (GraphSnapshot or nx.Graph)
+
+    :return: List of anchor satellite identifiers
+    """
+    if num_anchors < 1:
+        raise ValueError("Number of anchors must be at least one")
+    graph = as_graph_snapshot(sat_net_graph)
+    if anchor_placement == "strided":
+        return select_anchors_strided(num_anchors, len(satellites), graph)
+    elif anchor_placement == "farthest_point":
+        return select_anchors_farthest_point(num_anchors, len(satellites), graph)
+    elif anchor_placement == "orbit_balanced":
+        return select_anchors_orbit_balanced(num_anchors, orbital_planes(satellites), graph)
+    else:
+        raise ValueError("Unknown anchor placement: " + str(anchor_placement))
+
+
+def select_anchors_strided(num_anchors, num_satellites, graph):
+    """
+    Anchors spread evenly across the satellite identifiers: every (V / num_anchors)-th satellite, or else
+    the next satellite after it which has at least two ISLs.
+
+    :param num_anchors:     Number of anchors
+    :param num_satellites:  Number of satellites
+    :param graph:           GraphSnapshot with only the satellites and their ISLs
+
+    :return: List of anchor satellite identifiers
+    """
+    step = num_satellites // num_anchors
+    degrees = np.diff(graph.indptr)
+    anchors = []
+    for i in range(num_anchors):
+        for candidate in [i * step] + list(range(i * step + 1, min(i * step + step, num_satellites))):
+            if candidate < graph.num_nodes and degrees[candidate] >= 2:
+                anchors.append(candidate)
+                break
+    return anchors
+
+
+def select_anchors_farthest_point(num_anchors, num_satellites, graph):
+    """
+    Greedy k-center (farthest-point) anchors on the ISL hop distance: the first anchor is the first satellite
+    with at least two ISLs, and each next anchor is the satellite farthest (in hops) from its nearest anchor.
+    This bounds the number of hops to the nearest anchor within twice the optimum. Among the satellites equally
+    many hops away, the one farthest in meters (ISL lengths of the graph) is taken, so the anchors follow the
+    geometry when they are selected again. Satellites without a path to any anchor are taken first.
+
+    :param num_anchors:     Number of anchors
+    :param num_satellites:  Number of satellites
+    :param graph:           GraphSnapshot with only the satellites and their ISLs
+
+    :return: List of anchor satellite identifiers (fewer if fewer satellites have two ISLs)
+    """
+    from scipy.sparse.csgraph import dijkstra
+    adjacency = graph.to_scipy_sparse()
+    candidates = np.flatnonzero(np.diff(graph.indptr)[:num_satellites] >= 2)
+    hops_to_anchor = np.full(num_satellites, np.inf)
+    meters_to_anchor = np.full(num_satellites, np.inf)
+    anchors = []
+    while len(anchors) < min(num_anchors, len(candidates)):
+        if len(anchors) == 0:
+            anchor = int(candidates[0])
+        else:
+            # Farthest in hops, then in meters, then the lowest identifier
+            order = np.lexsort((candidates, -meters_to_anchor[candidates], -hops_to_anchor[candidates]))
+            anchor = int(candidates[order[0]])
+        anchors.append(anchor)
+        hops = dijkstra(adjacency, directed=True, unweighted=True, indices=anchor)[:num_satellites]
+        meters = dijkstra(adjacency, directed=True, indices=anchor)[:num_satellites]
+        hops_to_anchor = np.minimum(hops_to_anchor, hops)
+        meters_to_anchor = np.minimum(meters_to_anchor, meters)
+        hops_to_anchor[anchor] = -1  # Never again
+    return anchors
+
+
+def select_anchors_orbit_balanced(num_anchors, planes, graph):
+    """
+    The same number of anchors in every orbital plane (differing by at most one), evenly spaced along the
+    orbit and shifted by half the spacing in every other plane, such that the anchors form a staggered grid
+    over the constellation. A satellite with fewer than two ISLs is replaced by the nearest one along its
+    orbit which has two.
+
+    :param num_anchors:     Number of anchors
+    :param planes:          List of orbital planes, each a list of satellite identifiers in along-track order
+                            (as returned by orbital_planes())
+    :param graph:           GraphSnapshot with only the satellites and their ISLs
+
+    :return: List of anchor satellite identifiers
+    """
+    degrees = np.diff(graph.indptr)
+    anchors_per_plane = np.diff((np.arange(len(planes) + 1) * num_anchors) // len(planes))
+    anchors = []
+    for p, (plane, plane_anchors) in enumerate(zip(planes, anchors_per_plane)):
+        for i in range(plane_anchors):
+            position = int(round((i + 0.5 * (p % 2)) * len(plane) / plane_anchors)) % len(plane)
+            for offset in range(len(plane)):
+                candidate = plane[(position + (offset + 1) // 2 * (1 if offset % 2 == 1 else -1)) % len(plane)]
+                if degrees[candidate] >= 2 and candidate not in anchors:
+                    anchors.append(candidate)
+                    break
+    return anchors
+
+
+def orbital_planes(satellites):
+    """
+    Group the satellites into orbital planes: the satellites with the same inclination and right ascension
+    of the ascending node, ordered by RAAN. Within a plane, the satellites are in along-track order (argument
+    of latitude at epoch).
+
+    :param satellites:  List of satellites (ephem.EarthSatellite)
+
+    :return: List of orbital planes, each a list of satellite identifiers
+    """
+    planes = {}
+    for sid, satellite in enumerate(satellites):
+        elements = satellite_ephem_to_elements(satellite)
+        inclination, raan, argument_of_perigee, mean_anomaly = elements[2:6]
+        planes.setdefault((raan, inclination), []).append(((argument_of_perigee + mean_anomaly) % 360.0, sid))
+    return [[sid for _, sid in sorted(planes[key])] for key in sorted(planes)]
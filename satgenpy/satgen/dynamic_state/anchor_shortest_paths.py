@@ -0,0 +1,194 @@
+from collections.abc import Mapping
+import numpy as np
+
+
+class AnchorShortestPathTrees:
+    """
+    Result of the multi-source Dijkstra from all anchors of a time step (compute_anchor_data_for_timestep()),
+    stored as one shortest path tree per anchor: the distances from the anchor and the parent (predecessor
+    towards the anchor) of every node, as arrays (k, V). Paths are not stored, but reconstructed by
+    following the parents only when a caller asks for one.
+
+    The multi-source Dijkstra does not complete every tree: a node which has found its nearest anchor is
+    not expanded further by the other anchors. Each tree is complete for the nodes which matter, i.e.,
+    the nodes nearest to its anchor and the paths to the other anchors it discovered first.
+
+    The lookups of before are available as the mappings nearest_anchor (node -> (anchor, distance, path))
+    and anchor_to_anchor ((anchor_src, anchor_dst) -> {'distance', 'path', 'next_hop'}). These also offer
+    methods to look up only the distance or next hop, without reconstructing a path.
+    """
+
+    def __init__(self, anchors, distances, parents, nearest_anchor_indices, anchor_pairs):
+        """
+        :param anchors:                 List of anchor node identifiers (one tree per anchor)
+        :param distances:               Numpy array (k, V) of distances from each anchor (inf if not reached)
+        :param parents:                 Numpy array (k, V) of the parent of each node in the tree of each
+                                        anchor (-1 for the anchor itself and if not reached)
+        :param nearest_anchor_indices:  Numpy array (V) of the index of the nearest anchor of each node
+                                        (-1 if none)
+        :param anchor_pairs:            Dictionary (anchor_src, anchor_dst) -> index of the anchor whose tree
+                                        holds the path between the two anchors
+        """
+        self.anchors = list(anchors)
+        self.distances = distances
+        self.parents = parents
+        self.nearest_anchor_indices = nearest_anchor_indices
+        self.anchor_pairs = anchor_pairs
+        self.nearest_anchor = NearestAnchorLookup(self)
+        self.anchor_to_anchor = AnchorToAnchorLookup(self)
+
+    def path(self, anchor_idx, node):
+        """
+        Path in the shortest path tree of an anchor.
+
+        :param anchor_idx:  Index of the anchor (in anchors)
+        :param node:        Node identifier (reached in the tree of the anchor)
+
+        :return: Path [anchor, ..., node]
+        """
+        parents = self.parents[anchor_idx]
+        path = [node]
+        while parents[path[-1]] != -1:
+            path.append(int(parents[path[-1]]))
+        path.reverse()
+        return path
+
+    def dense_arrays(self, anchors):
+        """
+        Nearest anchors and anchor-to-anchor distances as dense arrays, indexed by the position of the
+        anchors in a given list (such that the arrays of several time steps line up).
+
+        :param anchors:     List of anchor node identifiers (at least those of the trees)
+
+        :return: (nearest_anchor_positions, nearest_anchor_distances, anchor_distances): numpy arrays (V) of
+                 the position in anchors of the nearest anchor of each node (-1 if none), (V) of the distance to
+                 it (inf if none) and (A, A) of the distances between anchors (inf if no path was found)
+        """
+        position = {anchor: i for i, anchor in enumerate(anchors)}
+        tree_positions = np.array([position[anchor] for anchor in self.anchors], dtype=np.int64)
+        nodes = np.flatnonzero(self.nearest_anchor_indices != -1)
+        nearest_anchor_positions = np.full(len(self.nearest_anchor_indices), -1, dtype=np.int64)
+        nearest_anchor_positions[nodes] = tree_positions[self.nearest_anchor_indices[nodes]]
+        nearest_anchor_distances = np.full(len(self.nearest_anchor_indices), np.inf)
+        nearest_anchor_distances[nodes] = self.distances[self.nearest_anchor_indices[nodes], nodes]
+        anchor_distances = np.full((len(anchors), len(anchors)), np.inf)
+        for (src_anchor, dst_anchor), anchor_idx in self.anchor_pairs.items():
+            anchor_distances[position[src_anchor], position[dst_anchor]] = self.distances[
+                anchor_idx, dst_anchor if self.anchors[anchor_idx] == src_anchor else src_anchor
+            ]
+        return nearest_anchor_positions, nearest_anchor_distances, anchor_distances
+
+    def to_dict(self):
+        """
+        :return: Anchor data as dictionaries with the paths in full (as compute_anchor_data_for_timestep()
+                 returned before)
+        """
+        return {
+            'nearest_anchor': dict(self.nearest_anchor.items()),
+            'anchor_to_anchor': dict(self.anchor_to_anchor.items())
+        }
+
+
+class NearestAnchorLookup(Mapping):
+    """
+    Mapping node -> (nearest anchor, distance, path [anchor, ..., node]) of AnchorShortestPathTrees.
+    """
+
+    def __init__(self, trees):
+        self.trees = trees
+
+    def anchor_and_distance(self, node):
+        """
+        :param node:    Node identifier
+
+        :return: (nearest anchor, distance), or (None, inf) if the node has none
+        """
+        if node not in self:
+            return None, float('inf')
+        anchor_idx = int(self.trees.nearest_anchor_indices[node])
+        return self.trees.anchors[anchor_idx], float(self.trees.distances[anchor_idx, node])
+
+    def __getitem__(self, node):
+        if node not in self:
+            raise KeyError(node)
+        anchor_idx = int(self.trees.nearest_anchor_indices[node])
+        return (
+            self.trees.anchors[anchor_idx],
+            float(self.trees.distances[anchor_idx, node]),
+            self.trees.path(anchor_idx, node)
+        )
+
+    def __contains__(self, node):
+        return (
+            isinstance(node, (int, np.integer))
+            and 0 <= node < len(self.trees.nearest_anchor_indices)
+            and self.trees.nearest_anchor_indices[node] != -1
+        )
+
+    def __iter__(self):
+        return iter(np.flatnonzero(self.trees.nearest_anchor_indices != -1).tolist())
+
+    def __len__(self):
+        return int(np.count_nonzero(self.trees.nearest_anchor_indices != -1))
+
+
+class AnchorToAnchorLookup(Mapping):
+    """
+    Mapping (anchor_src, anchor_dst) -> {'distance', 'path' [anchor_src, ..., anchor_dst], 'next_hop'}
+    of AnchorShortestPathTrees.
+    """
+
+    def __init__(self, trees):
+        self.trees = trees
+
+    def distance(self, src_anchor, dst_anchor):
+        """
+        :param src_anchor:  Source anchor
+        :param dst_anchor:  Destination anchor
+
+        :return: Distance between the anchors (inf if no path was found)
+        """
+        anchor_idx = self.trees.anchor_pairs.get((src_anchor, dst_anchor))
+        if anchor_idx is None:
+            return float('inf')
+        return float(self.trees.distances[anchor_idx, self.other_anchor(anchor_idx, src_anchor, dst_anchor)])
+
+    def next_hop(self, src_anchor, dst_anchor):
+        """
+        :param src_anchor:  Source anchor
+        :param dst_anchor:  Destination anchor
+
+        :return: First hop from the source anchor towards the destination anchor (None if no path was found)
+        """
+        anchor_idx = self.trees.anchor_pairs.get((src_anchor, dst_anchor))
+        if anchor_idx is None:
+            return None
+        if self.trees.anchors[anchor_idx] == dst_anchor:
+            # Path in the tree of the destination anchor: the parent of the source anchor
+            return int(self.trees.parents[anchor_idx, src_anchor])
+        return self.trees.path(anchor_idx, dst_anchor)[1]
+
+    def other_anchor(self, anchor_idx, src_anchor, dst_anchor):
+        return dst_anchor if self.trees.anchors[anchor_idx] == src_anchor else src_anchor
+
+    def __getitem__(self, key):
+        anchor_idx = self.trees.anchor_pairs[key]
+        src_anchor, dst_anchor = key
+        if self.trees.anchors[anchor_idx] == src_anchor:
+            path = self.trees.path(anchor_idx, dst_anchor)
+        else:
+            path = self.trees.path(anchor_idx, src_anchor)[::-1]
+        return {
+            'distance': self.distance(src_anchor, dst_anchor),
+            'path': path,
+            'next_hop': path[1]
+        }
+
+    def __contains__(self, key):
+        return key in self.trees.anchor_pairs
+
+    def __iter__(self):
+        return iter(self.trees.anchor_pairs)
+
+    def __len__(self):
+        return len(self.trees.anchor_pairs)
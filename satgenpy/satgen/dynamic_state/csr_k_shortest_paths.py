@@ -0,0 +1,197 @@
+import heapq
+from .graph_snapshot import as_graph_snapshot
+
+
+class CsrKShortestPaths:
+    """
+    Yen's k-shortest loopless paths directly on the CSR arrays of a graph snapshot, without copying the graph.
+
+    Where find_k_shortest_paths() copies the nx.Graph for every spur node and removes the edges and nodes
+    from it, this removes them by setting a flag in a node mask and an edge (CSR entry) mask, which are
+    cleared again after the spur path is found. The buffers of the bidirectional Dijkstra (distances,
+    predecessors and heaps) are allocated once and reused by every search: an entry is only valid if it
+    carries the stamp of the current search, such that they do not have to be reset either.
+
+    The bidirectional Dijkstra is that of networkx (nx.shortest_path() with a weight), and the neighbors
+    are visited in the same order, hence the paths (also among paths of equal length) are exactly those of
+    find_k_shortest_paths() on the equivalent nx.Graph (with nodes 0 to n - 1 in order). As graph.copy()
+    adds the edges again node by node, the spur paths are searched with the neighbor order of the copy.
+    """
+
+    def __init__(self, graph):
+        """
+        :param graph:   GraphSnapshot or nx.Graph (with nodes 0 to n - 1)
+        """
+        graph = as_graph_snapshot(graph)
+        self.num_nodes = graph.num_nodes
+        indptr = graph.indptr.tolist()
+        indices = graph.indices.tolist()
+        self.weights = graph.weights.tolist()
+
+        # Per node its (neighbor, weight, CSR entry) in neighbor order, and the CSR entry of each neighbor
+        self.adjacency = [
+            list(zip(indices[indptr[u]:indptr[u + 1]], self.weights[indptr[u]:indptr[u + 1]],
+                     range(indptr[u], indptr[u + 1])))
+            for u in range(self.num_nodes)
+        ]
+        self.entry_of = [
+            dict(zip(indices[indptr[u]:indptr[u + 1]], range(indptr[u], indptr[u + 1])))
+            for u in range(self.num_nodes)
+        ]
+
+        # Neighbor order of graph.copy(): edge (u, v) with u < v is added when node u reaches neighbor v
+        def copy_order(u, v, entry):
+            return (u, entry - indptr[u]) if u < v else (v, self.entry_of[v][u] - indptr[v])
+        self.copy_adjacency = [
+            sorted(self.adjacency[u], key=lambda edge: copy_order(u, edge[0], edge[2]))
+            for u in range(self.num_nodes)
+        ]
+
+        # Removed nodes and edges (both directions of an edge are removed)
+        self.removed_nodes = bytearray(self.num_nodes)
+        self.removed_entries = bytearray(len(indices))
+
+        # Search buffers, per direction (forward from the source, backward from the target)
+        self.stamp = 0
+        self.final_stamps = [[0] * self.num_nodes, [0] * self.num_nodes]
+        self.seen_stamps = [[0] * self.num_nodes, [0] * self.num_nodes]
+        self.seen_distances = [[0.0] * self.num_nodes, [0.0] * self.num_nodes]
+        self.predecessors = [[-1] * self.num_nodes, [-1] * self.num_nodes]
+        self.fringes = [[], []]
+
+    def k_shortest_paths(self, source, target, k):
+        """
+        :param source:  Source node
+        :param target:  Target node
+        :param k:       Maximum number of paths
+
+        :return: List of up to k paths (each a list of nodes), shortest first (empty if the target is unreachable)
+        """
+        if not (0 <= source < self.num_nodes and 0 <= target < self.num_nodes):
+            raise ValueError("Source and target must be nodes of the graph")
+        path = self.shortest_path(source, target)
+        if path is None:
+            return []
+        found = [(self.path_length(path), path)]
+        candidates = []  # Heap of candidate paths
+        known = {(found[0][0], tuple(path))}  # Paths found or candidate
+
+        for _ in range(1, k):
+            prev_path = found[-1][1]
+            for i in range(len(prev_path) - 1):
+                spur_node = prev_path[i]
+                root_path = prev_path[:i + 1]
+
+                # Remove the edges of the paths found sharing this root, and the root path nodes (except spur)
+                removed_entries = []
+                for _, path in found:
+                    if len(path) > i + 1 and path[:i + 1] == root_path:
+                        removed_entries.append(self.entry_of[path[i]][path[i + 1]])
+                        removed_entries.append(self.entry_of[path[i + 1]][path[i]])
+                for entry in removed_entries:
+                    self.removed_entries[entry] = 1
+                for node in root_path[:-1]:
+                    self.removed_nodes[node] = 1
+
+                spur_path = self._bidirectional_dijkstra(spur_node, target, self.copy_adjacency)
+
+                for entry in removed_entries:
+                    self.removed_entries[entry] = 0
+                for node in root_path[:-1]:
+                    self.removed_nodes[node] = 0
+
+                if spur_path is not None:
+                    total_path = root_path[:-1] + spur_path
+                    total_length = self.path_length(total_path)
+                    if (total_length, tuple(total_path)) not in known:
+                        known.add((total_length, tuple(total_path)))
+                        heapq.heappush(candidates, (total_length, total_path))
+
+            if not candidates:
+                break
+            found.append(heapq.heappop(candidates))
+
+        return [path for _, path in found]
+
+    def shortest_path(self, source, target):
+        """
+        Bidirectional Dijkstra over the nodes and edges which are not removed.
+
+        :param source:  Source node
+        :param target:  Target node
+
+        :return: Shortest path (list of nodes), or None if the target is unreachable
+        """
+        return self._bidirectional_dijkstra(source, target, self.adjacency)
+
+    def _bidirectional_dijkstra(self, source, target, adjacency):
+        if source == target:
+            return [source]
+        self.stamp += 1
+        stamp = self.stamp
+        final_stamps, seen_stamps, seen_distances, predecessors = (
+            self.final_stamps, self.seen_stamps, self.seen_distances, self.predecessors
+        )
+        fringes = self.fringes
+        fringes[0].clear()
+        fringes[1].clear()
+        for direction, root in enumerate((source, target)):
+            seen_stamps[direction][root] = stamp
+            seen_distances[direction][root] = 0
+            predecessors[direction][root] = -1
+            heapq.heappush(fringes[direction], (0, direction, root))
+        count = 2
+
+        # Shortest path discovered so far, through the meeting node
+        final_distance = None
+        meeting_node = -1
+        direction = 1
+        while fringes[0] and fringes[1]:
+            direction = 1 - direction
+            dist, _, v = heapq.heappop(fringes[direction])
+            if final_stamps[direction][v] == stamp:
+                continue
+            final_stamps[direction][v] = stamp
+            if final_stamps[1 - direction][v] == stamp:
+                return self._meeting_path(meeting_node)
+
+            final, seen, distances, other_seen, other_distances = (
+                final_stamps[direction], seen_stamps[direction], seen_distances[direction],
+                seen_stamps[1 - direction], seen_distances[1 - direction]
+            )
+            for w, cost, entry in adjacency[v]:
+                if self.removed_nodes[w] or self.removed_entries[entry] or final[w] == stamp:
+                    continue
+                length = dist + cost
+                if seen[w] != stamp or length < distances[w]:
+                    seen[w] = stamp
+                    distances[w] = length
+                    heapq.heappush(fringes[direction], (length, count, w))
+                    count += 1
+                    predecessors[direction][w] = v
+                    if other_seen[w] == stamp:
+                        distance_w = length + other_distances[w]
+                        if final_distance is None or final_distance > distance_w:
+                            final_distance, meeting_node = distance_w, w
+        return None
+
+    def _meeting_path(self, meeting_node):
+        path = []
+        node = meeting_node
+        while node != -1:
+            path.append(node)
+            node = self.predecessors[0][node]
+        path.reverse()
+        node = self.predecessors[1][meeting_node]
+        while node != -1:
+            path.append(node)
+            node = self.predecessors[1][node]
+        return path
+
+    def path_length(self, path):
+        """
+        :param path:    List of nodes
+
+        :return: Sum of the edge weights along the path (in path order)
+        """
+        return sum(self.weights[self.entry_of[path[j]][path[j + 1]]] for j in range(len(path) - 1))
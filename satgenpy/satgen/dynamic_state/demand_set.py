@@ -0,0 +1,72 @@
+def check_demand_set(demand_set, num_ground_stations):
+    """
+    Check a demand set: the (source, destination) ground station pairs an experiment carries traffic between.
+
+    :param demand_set:              Iterable of (source ground station id, destination ground station id) pairs
+                                    (ground station identifiers, i.e., not offset by the number of satellites)
+    :param num_ground_stations:     Number of ground stations
+
+    :return: Demand set as a list of distinct pairs (in the given order)
+    """
+    pairs = []
+    for pair in demand_set:
+        if len(pair) != 2:
+            raise ValueError("Demand must be a (source, destination) ground station pair: " + str(pair))
+        src_gid, dst_gid = int(pair[0]), int(pair[1])
+        if not (0 <= src_gid < num_ground_stations and 0 <= dst_gid < num_ground_stations):
+            raise ValueError("Demand ground station identifier out of range: " + str(pair))
+        if src_gid == dst_gid:
+            raise ValueError("Demand must be between two different ground stations: " + str(pair))
+        if (src_gid, dst_gid) not in pairs:
+            pairs.append((src_gid, dst_gid))
+    if len(pairs) == 0:
+        raise ValueError("Demand set must contain at least one ground station pair")
+    return pairs
+
+
+def demand_destination_gids(demand_set, num_ground_stations):
+    """
+    :param demand_set:              List of (source, destination) ground station pairs, or None for all pairs
+    :param num_ground_stations:     Number of ground stations
+
+    :return: Sorted list of the destination ground station identifiers forwarding state is needed for
+    """
+    if demand_set is None:
+        return list(range(num_ground_stations))
+    return sorted(set(dst_gid for _, dst_gid in demand_set))
+
+
+def restrict_to_demand_set(demand_set, num_satellites, next_hop_decision_of):
+    """
+    Restrict the next hop decisions to the paths of a demand set. From the source ground station of each
+    pair, the next hops are followed until the destination ground station is reached (or the packet is
+    dropped). Only the nodes on the way keep their decision, every other node drops (-1, -1, -1), such that
+    only the decisions along the paths are ever calculated.
+
+    :param demand_set:              List of (source, destination) ground station pairs, or None for all pairs
+    :param num_satellites:          Number of satellites
+    :param next_hop_decision_of:    Function (node, destination ground station id) -> next hop decision
+
+    :return: Function (node, destination ground station id) -> next hop decision (without a demand
+             set, next_hop_decision_of itself)
+    """
+    if demand_set is None:
+        return next_hop_decision_of
+
+    path_decisions = {}
+    for src_gid, dst_gid in demand_set:
+        dst_gs_node_id = num_satellites + dst_gid
+        node = num_satellites + src_gid
+
+        # Paths towards the same destination merge, and a forwarding loop returns to a node of its own path
+        while node != dst_gs_node_id and (node, dst_gs_node_id) not in path_decisions:
+            next_hop_decision = tuple(next_hop_decision_of(node, dst_gid))
+            path_decisions[(node, dst_gs_node_id)] = next_hop_decision
+            if next_hop_decision[0] == -1:
+                break
+            node = next_hop_decision[0]
+
+    def path_decision_of(node, dst_gid):
+        return path_decisions.get((node, num_satellites + dst_gid), (-1, -1, -1))
+
+    return path_decision_of
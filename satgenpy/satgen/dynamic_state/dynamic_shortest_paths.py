@@ -0,0 +1,316 @@
+import heapq
+import numpy as np
+from .graph_snapshot import as_graph_snapshot
+from .shortest_path_backends import get_shortest_path_backend
+
+
+class DynamicShortestPathTrees:
+    """
+    Shortest path trees towards a set of root nodes, carried from one time step to the next.
+
+    Between consecutive time steps the ISL topology is fixed and the edge weights change only slightly,
+    so most shortest path trees remain valid. Instead of a Dijkstra from every root at every time step,
+    update() warm-starts from the trees of the previous time step:
+
+    1. The distances along each carried tree are re-calculated with the new edge weights, level by
+       level (vectorized over all trees). A tree edge which no longer exists cuts off its subtree,
+       whose distances become infinite.
+    2. Every edge is checked (vectorized over all trees) whether it now offers a shorter distance
+       than the tree, i.e., whether the changed edge weights changed the ordering of the paths.
+    3. Trees without such an edge are still shortest path trees and are kept as-is. Only the other
+       trees are re-relaxed, starting from the nodes with such an edge.
+
+    If more than max_invalid_fraction of the trees would have to be re-relaxed, all trees are instead
+    recomputed from scratch (by the shortest path backend, by default a Dijkstra from every root). Roots
+    which were not a root before are always calculated from scratch, and the trees of roots which are no
+    longer requested are dropped.
+
+    The distance of a node is the sum of the edge weights along its tree path (summed starting at the
+    root, as Dijkstra does), and all edges satisfy dist[v] <= dist[u] + w(u, v) (in floating point).
+    Such distances are unique, hence they are bit-for-bit the same as those of a Dijkstra from
+    scratch (GraphSnapshot.shortest_path_trees_to). Among paths of exactly equal length, a carried
+    tree keeps its next hop, which can differ from the one a Dijkstra from scratch would choose.
+    """
+
+    def __init__(self, max_invalid_fraction=0.5, shortest_path_backend=None):
+        if not 0.0 <= max_invalid_fraction <= 1.0:
+            raise ValueError("Maximum fraction of invalidated trees must be in [0, 1]")
+        self.max_invalid_fraction = max_invalid_fraction
+        self.shortest_path_backend = get_shortest_path_backend(shortest_path_backend)
+
+        # Trees of the previous time step (per root, arrays (k, V))
+        self.indptr = None
+        self.indices = None
+        self.roots = []
+        self.distances = None
+        self.predecessors = None  # -1 for the root itself and if unreachable
+        self.predecessor_entries = None  # CSR entry of the edge of a node to its predecessor (E if none)
+        self.depths = None  # Number of edges on the tree path (-1 if unreachable)
+        # (The last two are None if not yet determined)
+
+        self.statistics = {
+            "num_updates": 0,
+            "num_full_recomputes": 0,
+            "num_trees_calculated": 0,
+            "num_trees_kept": 0,
+            "num_trees_repaired": 0,
+            "num_nodes_relaxed": 0
+        }
+
+    def update(self, graph, roots):
+        """
+        Update the shortest path trees to the graph of the next time step.
+
+        :param graph:   GraphSnapshot (or nx.Graph) of the time step
+        :param roots:   List of root (target) node identifiers
+
+        :return: (distances, next_hops), both numpy arrays (V, k), as GraphSnapshot.shortest_path_trees_to(roots)
+        """
+        graph = as_graph_snapshot(graph)
+        roots = [int(r) for r in roots]
+        if len(roots) > 0 and (min(roots) < 0 or max(roots) >= graph.num_nodes):
+            raise ValueError("Root is not a node of the graph")
+        self.statistics["num_updates"] += 1
+
+        # Trees can only be carried over if the nodes are the same
+        row_of_root = {}
+        if self.indptr is not None and len(self.indptr) == len(graph.indptr):
+            row_of_root = {r: i for i, r in enumerate(self.roots)}
+        carried_rows = [i for i, r in enumerate(roots) if r in row_of_root]
+        new_rows = [i for i, r in enumerate(roots) if r not in row_of_root]
+        if len(carried_rows) == 0:
+            return self.recompute(graph, roots)
+
+        # Carried trees
+        carried_roots = [roots[i] for i in carried_rows]
+        previous_rows = [row_of_root[r] for r in carried_roots]
+        carried_predecessors = self.predecessors[previous_rows]
+        if self.depths is not None:
+            carried_depths = self.depths[previous_rows]
+        else:
+            carried_depths = self.tree_depths(carried_roots, carried_predecessors)
+        if (self.predecessor_entries is not None and np.array_equal(self.indptr, graph.indptr)
+                and np.array_equal(self.indices, graph.indices)):
+            carried_entries = self.predecessor_entries[previous_rows]
+        else:
+            carried_entries = self.edge_entries(graph, carried_predecessors)
+
+        # Distances along the carried trees (cutting off the subtrees of edges which no longer exist)
+        carried_distances = self.tree_distances(
+            graph, carried_roots, carried_predecessors, carried_entries, carried_depths
+        )
+        cut_off = np.isinf(carried_distances)
+        carried_predecessors[cut_off] = -1
+        carried_entries[cut_off] = len(graph.indices)
+        carried_depths[cut_off] = -1
+
+        # Too many invalidated trees: a full recompute is cheaper than re-relaxing them all
+        shorter_edges = self.shorter_edges(graph, carried_distances)
+        invalid = np.flatnonzero(np.any(shorter_edges, axis=1))
+        if len(invalid) > self.max_invalid_fraction * len(roots):
+            return self.recompute(graph, roots)
+
+        # Re-relax the invalidated trees, keep the others
+        if len(invalid) > 0:
+            adjacency = self.adjacency_lists(graph)
+            sources = np.repeat(np.arange(graph.num_nodes), np.diff(graph.indptr))
+            for j in invalid.tolist():
+                self.relax(
+                    adjacency,
+                    carried_distances[j],
+                    carried_predecessors[j],
+                    np.unique(sources[shorter_edges[j]])
+                )
+            carried_entries[invalid] = self.edge_entries(graph, carried_predecessors[invalid])
+            carried_depths[invalid] = self.tree_depths(
+                [carried_roots[j] for j in invalid], carried_predecessors[invalid]
+            )
+        self.statistics["num_trees_repaired"] += len(invalid)
+        self.statistics["num_trees_kept"] += len(carried_rows) - len(invalid)
+
+        # All trees carried over
+        if len(new_rows) == 0:
+            self.store(graph, roots, carried_distances, carried_predecessors, carried_entries, carried_depths)
+            return carried_distances.T, carried_predecessors.T
+
+        # Roots without a carried tree are calculated from scratch
+        new_roots = [roots[i] for i in new_rows]
+        new_distances, new_next_hops = self.shortest_path_backend.shortest_path_trees(graph, new_roots)
+        self.statistics["num_trees_calculated"] += len(new_rows)
+
+        distances = np.empty((len(roots), graph.num_nodes))
+        predecessors = np.empty((len(roots), graph.num_nodes), dtype=np.int64)
+        predecessor_entries = np.empty((len(roots), graph.num_nodes), dtype=np.int64)
+        depths = np.empty((len(roots), graph.num_nodes), dtype=np.int64)
+        distances[carried_rows] = carried_distances
+        predecessors[carried_rows] = carried_predecessors
+        predecessor_entries[carried_rows] = carried_entries
+        depths[carried_rows] = carried_depths
+        distances[new_rows] = new_distances.T
+        predecessors[new_rows] = new_next_hops.T
+        predecessor_entries[new_rows] = self.edge_entries(graph, new_next_hops.T)
+        depths[new_rows] = self.tree_depths(new_roots, new_next_hops.T)
+        self.store(graph, roots, distances, predecessors, predecessor_entries, depths)
+        return distances.T, predecessors.T
+
+    def recompute(self, graph, roots):
+        """
+        Calculate all trees from scratch (discarding the carried trees). Their tree edges and depths
+        are only determined by the next update() (if carried), as the next time step often falls back
+        to a full recompute as well.
+
+        :param graph:   GraphSnapshot of the time step
+        :param roots:   List of root (target) node identifiers
+
+        :return: (distances, next_hops), both numpy arrays (V, k)
+        """
+        distances, next_hops = self.shortest_path_backend.shortest_path_trees(graph, roots)
+        self.store(graph, list(roots), distances.T, next_hops.T, None, None)
+        self.statistics["num_full_recomputes"] += 1
+        self.statistics["num_trees_calculated"] += len(roots)
+        return distances, next_hops
+
+    def store(self, graph, roots, distances, predecessors, predecessor_entries, depths):
+        self.indptr = graph.indptr
+        self.indices = graph.indices
+        self.roots = roots
+        self.distances = distances
+        self.predecessors = predecessors
+        self.predecessor_entries = predecessor_entries
+        self.depths = depths
+
+    @staticmethod
+    def edge_entries(graph, predecessors):
+        """
+        :param graph:           GraphSnapshot
+        :param predecessors:    Numpy array (k, V) of the predecessor of each node in each tree
+
+        :return: Numpy array (k, V) of the CSR entry of the edge of each node to its predecessor
+                 (len(graph.indices) if it has none or it is not an edge of the graph)
+        """
+        # Binary search of the (node, predecessor) key among the sorted (source, neighbor) keys of all entries
+        sources = np.repeat(np.arange(graph.num_nodes), np.diff(graph.indptr))
+        entry_keys = sources * graph.num_nodes + graph.indices
+        order = np.argsort(entry_keys, kind="stable")
+        sorted_keys = np.append(entry_keys[order], -1)
+        keys = np.arange(graph.num_nodes)[None, :] * graph.num_nodes + predecessors
+        positions = np.searchsorted(sorted_keys[:-1], keys)
+        is_edge = (predecessors >= 0) & (sorted_keys[positions] == keys)
+        return np.where(is_edge, np.append(order, len(graph.indices))[positions], len(graph.indices))
+
+    @staticmethod
+    def tree_depths(roots, predecessors):
+        """
+        Number of edges on the tree path of each node, by pointer jumping (O(log depth) vectorized steps).
+
+        :param roots:           List (k) of root node identifiers
+        :param predecessors:    Numpy array (k, V) of the predecessor of each node in each tree
+
+        :return: Numpy array (k, V) of depths (0 for the root, -1 if unreachable)
+        """
+        num_trees, num_nodes = predecessors.shape
+        has_predecessor = predecessors >= 0
+        successors = np.where(has_predecessor, predecessors, np.arange(num_nodes)[None, :])
+        depths = has_predecessor.astype(np.int64)
+        while True:
+            next_successors = np.take_along_axis(successors, successors, axis=1)
+            if np.array_equal(next_successors, successors):
+                break
+            depths = depths + np.take_along_axis(depths, successors, axis=1)
+            successors = next_successors
+
+        # Nodes whose path does not end at the root are unreachable
+        reaches_root = successors == np.asarray(roots, dtype=np.int64).reshape(num_trees, 1)
+        return np.where(reaches_root, depths, -1)
+
+    @staticmethod
+    def tree_distances(graph, roots, predecessors, predecessor_entries, depths):
+        """
+        Distances along the given trees with the edge weights of the graph, calculated level by level
+        (each tree level at once for all trees), i.e., summed starting at the root.
+
+        :param graph:                   GraphSnapshot
+        :param roots:                   List (k) of root node identifiers
+        :param predecessors:            Numpy array (k, V) of the predecessor of each node in each tree
+        :param predecessor_entries:     Numpy array (k, V) of the CSR entry of the edge to the predecessor
+        :param depths:                  Numpy array (k, V) of the depth of each node in each tree
+
+        :return: Numpy array (k, V) of distances (inf if the tree path to a node no longer exists)
+        """
+        num_trees, num_nodes = predecessors.shape
+        tree_offsets = np.arange(num_trees)[:, None] * num_nodes
+        distances = np.full(num_trees * num_nodes, np.inf)
+        distances[tree_offsets[:, 0] + np.asarray(roots, dtype=np.int64)] = 0.0
+        if num_trees == 0:
+            return distances.reshape(num_trees, num_nodes)
+
+        # Nodes of all trees ordered by depth (the unreachable ones, at depth -1, first), such that each
+        # level is a contiguous slice (a stable sort of small integers is a radix sort)
+        flat_depths = depths.ravel()
+        max_depth = int(np.max(flat_depths))
+        order = np.argsort(flat_depths.astype(np.int16 if max_depth < 32767 else np.int64), kind="stable")
+        level_starts = np.searchsorted(flat_depths[order], np.arange(max_depth + 2))
+        position = np.empty(len(order), dtype=np.int64)
+        position[order] = np.arange(len(order))
+
+        # In this order, each level gathers from the (already calculated) level before it
+        ordered_distances = distances[order]
+        ordered_parents = position[(tree_offsets + np.maximum(predecessors, 0)).ravel()[order]]
+        ordered_weights = np.append(graph.weights, np.inf)[predecessor_entries.ravel()[order]]
+        for level in range(1, max_depth + 1):
+            start, end = level_starts[level], level_starts[level + 1]
+            ordered_distances[start:end] = ordered_distances[ordered_parents[start:end]] + ordered_weights[start:end]
+        distances[order] = ordered_distances
+        return distances.reshape(num_trees, num_nodes)
+
+    @staticmethod
+    def shorter_edges(graph, distances):
+        """
+        :param graph:       GraphSnapshot
+        :param distances:   Numpy array (k, V) of distances along each tree
+
+        :return: Numpy array (k, E) of whether CSR entry (u, v) offers a shorter distance: dist[u] + w(u, v) < dist[v]
+        """
+        return np.repeat(distances, np.diff(graph.indptr), axis=1) + graph.weights < distances[:, graph.indices]
+
+    @staticmethod
+    def adjacency_lists(graph):
+        """
+        :param graph:   GraphSnapshot
+
+        :return: List (V) of lists of (neighbor, weight)
+        """
+        indptr = graph.indptr.tolist()
+        edges = list(zip(graph.indices.tolist(), graph.weights.tolist()))
+        return [edges[indptr[u]:indptr[u + 1]] for u in range(graph.num_nodes)]
+
+    def relax(self, adjacency, distances, predecessors, start_nodes):
+        """
+        Re-relax a tree in place, starting from the nodes which have an edge offering a shorter
+        distance. As the distances are those of existing paths, relaxing (in order of distance)
+        until no edge offers a shorter distance yields the shortest path tree.
+
+        :param adjacency:       List (V) of lists of (neighbor, weight)
+        :param distances:       Numpy array (V,) of distances along the tree (modified)
+        :param predecessors:    Numpy array (V,) of predecessors in the tree (modified)
+        :param start_nodes:     Numpy array of the nodes which have an edge offering a shorter distance
+        """
+        dist = distances.tolist()
+        pred = predecessors.tolist()
+        heap = [(dist[u], u) for u in start_nodes.tolist()]
+        heapq.heapify(heap)
+        num_relaxed = 0
+        while heap:
+            dist_u, u = heapq.heappop(heap)
+            if dist_u > dist[u]:
+                continue
+            num_relaxed += 1
+            for v, w in adjacency[u]:
+                dist_v = dist_u + w
+                if dist_v < dist[v]:
+                    dist[v] = dist_v
+                    pred[v] = u
+                    heapq.heappush(heap, (dist_v, v))
+        distances[:] = dist
+        predecessors[:] = pred
+        self.statistics["num_nodes_relaxed"] += num_relaxed
@@ -0,0 +1,117 @@
+import numpy as np
+
+
+class ForwardingDecisionCache:
+    """
+    Next hop decisions of a satellite towards a destination ground station of the anchor-based LMSR
+    (calculate_anchor_lmsr_path_complete_forwarding()), carried across time steps along with the facts
+    each one depends on, such that only the decisions whose facts changed are calculated again.
+
+    A decision of a satellite towards a ground station depends on:
+
+    (a) The egress satellite: the satellite in range of the ground station with the lowest jitter (and mean
+        distance) over the lookahead window. It changes with the visibility of the ground station, and when
+        the minimum or maximum distance of the window leaves its slot (or a new slot exceeds it).
+    (b) The nearest anchor of the satellite and its parent towards it, at the first time step of the window.
+    (c) The path from the nearest anchor of the egress satellite to it, at the first time step of the window.
+    (d) For an anchor, the paths between anchors (anchors are always calculated again, as they are few).
+
+    The facts (b) and (c) are tracked as a version per satellite, increased whenever it differs from
+    the previous time step. A decision is calculated again if its egress satellite or one of the
+    versions it was calculated at changed. The ISL topology (neighbors and interfaces) does not change.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """
+        Forget all decisions (e.g., because the anchors changed)
+        """
+        self.anchor_of = None  # Nearest anchor of each satellite at the first time step of the previous window
+        self.parent_of = None  # Parent towards it
+        self.satellite_versions = None  # Version of (nearest anchor, parent) of each satellite
+        self.egress_paths = {}  # Egress satellite -> path from its nearest anchor (of the previous window)
+        self.egress_path_versions = None  # Version of the path of each egress satellite
+        self.entries = {}  # Destination ground station id -> decisions and the versions they were calculated at
+        self.num_calculated = 0
+        self.num_reused = 0
+
+    def advance(self, anchor_of, parent_of, egress_paths):
+        """
+        Move to the next time step: compare its facts to those of the previous time step.
+
+        :param anchor_of:       Numpy array (V) of the nearest anchor of each satellite (at the first time step
+                                of the window, -1 if none)
+        :param parent_of:       Numpy array (V) of the parent of each satellite towards its nearest anchor
+                                (-1 for an anchor and if none)
+        :param egress_paths:    Dictionary of each satellite in range of a destination ground station to the
+                                path from its nearest anchor to it (tuple, or None if it has no nearest anchor)
+        """
+        if self.anchor_of is None or len(self.anchor_of) != len(anchor_of):
+            self.reset()
+            self.satellite_versions = np.zeros(len(anchor_of), dtype=np.int64)
+            self.egress_path_versions = np.zeros(len(anchor_of), dtype=np.int64)
+        else:
+            self.satellite_versions += (anchor_of != self.anchor_of) | (parent_of != self.parent_of)
+
+        # A satellite which was not in range of a destination ground station before has no known path
+        for egress_sat, path in egress_paths.items():
+            if egress_sat not in self.egress_paths or self.egress_paths[egress_sat] != path:
+                self.egress_path_versions[egress_sat] += 1
+
+        self.anchor_of = anchor_of
+        self.parent_of = parent_of
+        self.egress_paths = egress_paths
+        self.num_calculated = 0
+        self.num_reused = 0
+
+    def outdated(self, dst_gid, best_dst_sats, always):
+        """
+        :param dst_gid:         Destination ground station id
+        :param best_dst_sats:   Numpy array (V) of the egress satellite of each satellite (-1 if none)
+        :param always:          Numpy array (V) of the satellites which are always calculated again
+
+        :return: Numpy array (V) of the satellites whose decision must be calculated again
+        """
+        entry = self.entries.get(dst_gid)
+        if entry is None:
+            return np.ones(len(best_dst_sats), dtype=bool)
+        return (
+            always
+            | (best_dst_sats != entry["best_dst_sats"])
+            | (self.satellite_versions != entry["satellite_versions"])
+            | (self.egress_path_versions[np.maximum(best_dst_sats, 0)] != entry["egress_path_versions"])
+        )
+
+    def decision(self, dst_gid, sat):
+        """
+        :return: Decision of a satellite towards a destination ground station (reused)
+        """
+        self.num_reused += 1
+        return self.entries[dst_gid]["decisions"][sat]
+
+    def store(self, dst_gid, sat, best_dst_sat, decision):
+        """
+        Store a decision along with the facts it was calculated at.
+
+        :param dst_gid:         Destination ground station id
+        :param sat:             Satellite
+        :param best_dst_sat:    Egress satellite (-1 if none)
+        :param decision:        Next hop decision
+        """
+        entry = self.entries.get(dst_gid)
+        if entry is None:
+            num_satellites = len(self.satellite_versions)
+            entry = {
+                "best_dst_sats": np.full(num_satellites, -2, dtype=np.int64),  # Never an egress satellite
+                "satellite_versions": np.zeros(num_satellites, dtype=np.int64),
+                "egress_path_versions": np.zeros(num_satellites, dtype=np.int64),
+                "decisions": [None] * num_satellites
+            }
+            self.entries[dst_gid] = entry
+        entry["best_dst_sats"][sat] = best_dst_sat
+        entry["satellite_versions"][sat] = self.satellite_versions[sat]
+        entry["egress_path_versions"][sat] = self.egress_path_versions[max(best_dst_sat, 0)]
+        entry["decisions"][sat] = decision
+        self.num_calculated += 1
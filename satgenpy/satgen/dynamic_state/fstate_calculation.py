@@ -1,5 +1,12 @@
+import itertools
 import math
 import networkx as nx
+import numpy as np
+from .anchor_shortest_paths import AnchorShortestPathTrees
+from .demand_set import demand_destination_gids, restrict_to_demand_set
+from .graph_snapshot import GraphSnapshot, as_graph_snapshot
+from .k_paths_cache import KShortestPathsCache
+from .shortest_path_backends import get_shortest_path_backend
 
 
 def calculate_fstate_shortest_path_without_gs_relaying(
@@ -13,13 +20,166 @@ def calculate_fstate_shortest_path_without_gs_relaying(
         ground_station_satellites_in_range_candidates,
         sat_neighbor_to_if,
         prev_fstate,
-        enable_verbose_logs
+        enable_verbose_logs,
+        shortest_path_method="dijkstra",
+        shortest_path_trees=None,
+        shortest_path_backend=None,
+        demand_set=None
 ):
-    # Calculate shortest path distances
-    if enable_verbose_logs:
-        print("  > Calculating Floyd-Warshall for graph without ground-station relays")
-    # (Note: Numpy has a deprecation warning here because of how networkx uses matrices)
-    dist_sat_net_without_gs = nx.floyd_warshall_numpy(sat_net_graph_only_satellites_with_isls)
+    """
+    Forwarding state over only ISLs, via the satellite in range of the destination ground station
+    which promises the shortest path.
+
+    Only distances to satellites in range of a ground station are needed, so by default ("dijkstra")
+    these are calculated by a single-source shortest path from each of those satellites. With
+    "floyd_warshall", the all-pairs distances are calculated instead (as before). Both yield the
+    same distances up to floating point rounding (see GraphSnapshot.shortest_path_distances_to).
+
+    With a demand set, only the destination ground stations of its pairs are calculated, and only the
+    entries along the paths of its pairs are kept (all others drop, see restrict_to_demand_set()).
+
+    :param shortest_path_method:    "dijkstra" (only to ground station visible satellites) or "floyd_warshall"
+    :param shortest_path_trees:     DynamicShortestPathTrees carried across time steps (only with "dijkstra"),
+                                    or None to calculate the Dijkstra from scratch
+    :param shortest_path_backend:   Shortest path backend (name, instance, or None for the default; see
+                                    get_shortest_path_backend())
+    :param demand_set:              List of (source, destination) ground station pairs, or None for all pairs
+
+    :return: Forwarding state dictionary (node, destination ground station node) -> next hop decision
+    """
+
+    # Graph as CSR arrays, with the neighbors of each satellite padded to the same number (V, D)
+    graph = as_graph_snapshot(sat_net_graph_only_satellites_with_isls)
+    neighbors, entries = graph.padded_neighbors()
+    backend = get_shortest_path_backend(shortest_path_backend)
+
+    # Destination ground stations (columns) the next hop decisions are calculated for
+    dst_gids = demand_destination_gids(demand_set, num_ground_stations)
+    dst_col = [-1] * num_ground_stations
+    for col, dst_gid in enumerate(dst_gids):
+        dst_col[dst_gid] = col
+
+    # Calculate shortest path distances to the satellites: dist_to_sat[(node, sat_col[sat])]
+    if shortest_path_method == "dijkstra":
+        visible_sats = sorted(set(
+            sid for gid in dst_gids for (_, sid) in ground_station_satellites_in_range_candidates[gid]
+        ))
+        if enable_verbose_logs:
+            print("  > Calculating Dijkstra from %d ground station visible satellites" % len(visible_sats))
+        if shortest_path_trees is not None:
+            dist_to_sat, _ = shortest_path_trees.update(graph, visible_sats)
+        else:
+            dist_to_sat, _ = backend.shortest_path_trees(graph, visible_sats)
+        sat_col = np.full(num_satellites, -1, dtype=np.int64)
+        sat_col[visible_sats] = np.arange(len(visible_sats))
+    elif shortest_path_method == "floyd_warshall":
+        if enable_verbose_logs:
+            print("  > Calculating Floyd-Warshall for graph without ground-station relays")
+        dist_to_sat = backend.all_pairs_distances(graph)
+        sat_col = np.arange(num_satellites)
+    else:
+        raise ValueError("Unknown shortest path method: " + str(shortest_path_method))
+
+    # Padding: the padding neighbor (row) and the padding satellite (column) are at infinite distance
+    dist_to_sat = np.pad(dist_to_sat, ((0, 1), (0, 1)), constant_values=np.inf)
+    sat_col = np.append(sat_col, dist_to_sat.shape[1] - 1)
+
+    # Satellites in range of each ground station padded to the same number (G, M), ordered by satellite
+    # identifier such that the first of equal distance possibilities is the one sorted(possibilities) yields
+    max_in_range = max([1] + [len(in_range) for in_range in ground_station_satellites_in_range_candidates])
+    in_range_sats = np.full((num_ground_stations, max_in_range), num_satellites, dtype=np.int64)
+    in_range_gsl_m = np.full((num_ground_stations, max_in_range), np.inf)
+    for gid, in_range in enumerate(ground_station_satellites_in_range_candidates):
+        for i, (distance_m, sid) in enumerate(sorted(in_range, key=lambda b: b[1])):
+            in_range_sats[gid, i] = sid
+            in_range_gsl_m[gid, i] = distance_m
+
+    # Satellites to ground stations
+    # From the satellites attached to the destination ground station,
+    # select the one which promises the shortest path to the destination ground station (getting there + last hop)
+    sat_ids = np.arange(num_satellites)[:, None]
+    gids = np.array(dst_gids, dtype=np.int64)[None, :]
+    via_dst_sat_m = (
+        dist_to_sat[:num_satellites][:, sat_col[in_range_sats[dst_gids]]] + in_range_gsl_m[dst_gids]
+    )  # (V, G, M)
+    best_dst_sat_idx = np.argmin(via_dst_sat_m, axis=2)
+    dist_satellite_to_ground_station = np.take_along_axis(
+        via_dst_sat_m, best_dst_sat_idx[:, :, None], axis=2
+    )[:, :, 0]  # (V, G), inf if none is reachable
+    dst_sats = in_range_sats[gids, best_dst_sat_idx]  # (V, G), the padding satellite if none is reachable
+
+    # Among its neighbors, find the first (in neighbor order) which promises the
+    # lowest distance to reach the destination satellite
+    via_neighbor_m = (
+        np.append(graph.weights, np.inf)[entries][:, None, :]
+        +
+        dist_to_sat[neighbors[:, None, :], sat_col[dst_sats][:, :, None]]
+    )  # (V, G, D)
+    best_neighbor_idx = np.argmin(via_neighbor_m, axis=2)
+    has_next_hop = np.take_along_axis(via_neighbor_m, best_neighbor_idx[:, :, None], axis=2)[:, :, 0] < 1000000000000000
+    next_hop_entries = entries[sat_ids, best_neighbor_idx]
+
+    # Interfaces of each CSR entry (and of the padding entry)
+    indices = graph.indices.tolist()
+    sources = np.repeat(np.arange(num_satellites), np.diff(graph.indptr)).tolist()
+    my_if_of_entry = np.array(
+        [sat_neighbor_to_if[(a, b)] for a, b in zip(sources, indices)] + [-1], dtype=np.int64
+    )
+    next_hop_if_of_entry = np.array(
+        [sat_neighbor_to_if[(b, a)] for a, b in zip(sources, indices)] + [-1], dtype=np.int64
+    )
+
+    # By default, if there is no satellite in range for the destination ground station or
+    # it is not reachable, it will be dropped (indicated by -1). If the current node is the
+    # destination satellite, the next hop is the ground station itself.
+    is_dst_sat = sat_ids == dst_sats
+    next_hop_decisions = np.stack([
+        np.where(
+            is_dst_sat,
+            num_satellites + gids,
+            np.where(has_next_hop, neighbors[sat_ids, best_neighbor_idx], -1)
+        ),
+        np.where(
+            is_dst_sat,
+            np.append(np.asarray(num_isls_per_sat, dtype=np.int64), 0)[dst_sats]
+            + np.asarray(gid_to_sat_gsl_if_idx, dtype=np.int64)[gids],
+            np.where(has_next_hop, my_if_of_entry[next_hop_entries], -1)
+        ),
+        np.where(
+            is_dst_sat,
+            0,
+            np.where(has_next_hop, next_hop_if_of_entry[next_hop_entries], -1)
+        )
+    ], axis=2).tolist()
+
+    # Ground stations to ground stations
+    # Choose the source satellite which promises the shortest path
+    via_src_sat_m = (
+        in_range_gsl_m[:, :, None]
+        +
+        np.append(dist_satellite_to_ground_station, np.full((1, len(dst_gids)), np.inf), axis=0)[in_range_sats]
+    )  # (G, M, G)
+    best_src_sat_idx = np.argmin(via_src_sat_m, axis=1)
+    has_src_sat = np.take_along_axis(via_src_sat_m, best_src_sat_idx[:, None, :], axis=1)[:, 0, :] < math.inf
+    src_sats = in_range_sats[np.arange(num_ground_stations)[:, None], best_src_sat_idx]  # (G, G)
+    gs_next_hop_decisions = np.stack([
+        np.where(has_src_sat, src_sats, -1),
+        np.where(has_src_sat, 0, -1),
+        np.where(
+            has_src_sat,
+            np.append(np.asarray(num_isls_per_sat, dtype=np.int64), 0)[src_sats]
+            + np.asarray(gid_to_sat_gsl_if_idx, dtype=np.int64)[:, None],
+            -1
+        )
+    ], axis=2).tolist()
+
+    def next_hop_decision_of(node, dst_gid):
+        if node < num_satellites:
+            return next_hop_decisions[node][dst_col[dst_gid]]
+        return gs_next_hop_decisions[node - num_satellites][dst_col[dst_gid]]
+
+    # With a demand set, only the decisions along the paths of its pairs (all others drop)
+    fstate_decision_of = restrict_to_demand_set(demand_set, num_satellites, next_hop_decision_of)
 
     # Forwarding state
     fstate = {}
@@ -31,66 +191,10 @@ def calculate_fstate_shortest_path_without_gs_relaying(
     with open(output_filename, "w+") as f_out:
 
         # Satellites to ground stations
-        # From the satellites attached to the destination ground station,
-        # select the one which promises the shortest path to the destination ground station (getting there + last hop)
-        dist_satellite_to_ground_station = {}
         for curr in range(num_satellites):
             for dst_gid in range(num_ground_stations):
                 dst_gs_node_id = num_satellites + dst_gid
-
-                # Among the satellites in range of the destination ground station,
-                # find the one which promises the shortest distance
-                possible_dst_sats = ground_station_satellites_in_range_candidates[dst_gid]
-                possibilities = []
-                for b in possible_dst_sats:
-                    if not math.isinf(dist_sat_net_without_gs[(curr, b[1])]):  # Must be reachable
-                        possibilities.append(
-                            (
-                                dist_sat_net_without_gs[(curr, b[1])] + b[0],
-                                b[1]
-                            )
-                        )
-                possibilities = list(sorted(possibilities))
-
-                # By default, if there is no satellite in range for the
-                # destination ground station, it will be dropped (indicated by -1)
-                next_hop_decision = (-1, -1, -1)
-                distance_to_ground_station_m = float("inf")
-                if len(possibilities) > 0:
-                    dst_sat = possibilities[0][1]
-                    distance_to_ground_station_m = possibilities[0][0]
-
-                    # If the current node is not that satellite, determine how to get to the satellite
-                    if curr != dst_sat:
-
-                        # Among its neighbors, find the one which promises the
-                        # lowest distance to reach the destination satellite
-                        best_distance_m = 1000000000000000
-                        for neighbor_id in sat_net_graph_only_satellites_with_isls.neighbors(curr):
-                            distance_m = (
-                                    sat_net_graph_only_satellites_with_isls.edges[(curr, neighbor_id)]["weight"]
-                                    +
-                                    dist_sat_net_without_gs[(neighbor_id, dst_sat)]
-                            )
-                            if distance_m < best_distance_m:
-                                next_hop_decision = (
-                                    neighbor_id,
-                                    sat_neighbor_to_if[(curr, neighbor_id)],
-                                    sat_neighbor_to_if[(neighbor_id, curr)]
-                                )
-                                best_distance_m = distance_m
-
-                    else:
-                        # This is the destination satellite, as such the next hop is the ground station itself
-                        next_hop_decision = (
-                            dst_gs_node_id,
-                            num_isls_per_sat[dst_sat] + gid_to_sat_gsl_if_idx[dst_gid],
-                            0
-                        )
-
-                # In any case, save the distance of the satellite to the ground station to re-use
-                # when we calculate ground station to ground station forwarding
-                dist_satellite_to_ground_station[(curr, dst_gs_node_id)] = distance_to_ground_station_m
+                next_hop_decision = tuple(fstate_decision_of(curr, dst_gid))
 
                 # Write to forwarding state
                 if not prev_fstate or prev_fstate[(curr, dst_gs_node_id)] != next_hop_decision:
@@ -104,38 +208,12 @@ def calculate_fstate_shortest_path_without_gs_relaying(
                 fstate[(curr, dst_gs_node_id)] = next_hop_decision
 
         # Ground stations to ground stations
-        # Choose the source satellite which promises the shortest path
         for src_gid in range(num_ground_stations):
             for dst_gid in range(num_ground_stations):
                 if src_gid != dst_gid:
                     src_gs_node_id = num_satellites + src_gid
                     dst_gs_node_id = num_satellites + dst_gid
-
-                    # Among the satellites in range of the source ground station,
-                    # find the one which promises the shortest distance
-                    possible_src_sats = ground_station_satellites_in_range_candidates[src_gid]
-                    possibilities = []
-                    for a in possible_src_sats:
-                        best_distance_offered_m = dist_satellite_to_ground_station[(a[1], dst_gs_node_id)]
-                        if not math.isinf(best_distance_offered_m):
-                            possibilities.append(
-                                (
-                                    a[0] + best_distance_offered_m,
-                                    a[1]
-                                )
-                            )
-                    possibilities = sorted(possibilities)
-
-                    # By default, if there is no satellite in range for one of the
-                    # ground stations, it will be dropped (indicated by -1)
-                    next_hop_decision = (-1, -1, -1)
-                    if len(possibilities) > 0:
-                        src_sat_id = possibilities[0][1]
-                        next_hop_decision = (
-                            src_sat_id,
-                            0,
-                            num_isls_per_sat[src_sat_id] + gid_to_sat_gsl_if_idx[src_gid]
-                        )
+                    next_hop_decision = tuple(fstate_decision_of(src_gs_node_id, dst_gid))
 
                     # Update forwarding state
                     if not prev_fstate or prev_fstate[(src_gs_node_id, dst_gs_node_id)] != next_hop_decision:
@@ -162,13 +240,129 @@ def calculate_fstate_shortest_path_with_gs_relaying(
         gid_to_sat_gsl_if_idx,
         sat_neighbor_to_if,
         prev_fstate,
-        enable_verbose_logs
+        enable_verbose_logs,
+        shortest_path_method="floyd_warshall",
+        shortest_path_trees=None,
+        shortest_path_backend=None,
+        demand_set=None
 ):
-    # Calculate shortest paths
-    if enable_verbose_logs:
-        print("  > Calculating Floyd-Warshall for graph including ground-station relays")
-    # (Note: Numpy has a deprecation warning here because of how networkx uses matrices)
-    dist_sat_net = nx.floyd_warshall_numpy(sat_net_graph)
+    """
+    Forwarding state over the complete graph (including ground station relays) towards every ground station.
+
+    By default ("floyd_warshall"), the all-pairs distances are calculated, and the next hop is the first
+    neighbor (in neighbor order) which promises the lowest distance. Only shortest paths to ground stations
+    are needed, so with "dijkstra" a single shortest path tree is calculated towards each destination ground
+    station instead (a reverse single-source Dijkstra), and the next hop of a node is its predecessor in that
+    tree. Both differ only among equal length paths (up to rounding), hence "dijkstra" is opt-in.
+
+    With a demand set, only the trees towards the destination ground stations of its pairs are calculated,
+    and only the entries along the paths of its pairs are kept (all others drop, see restrict_to_demand_set()).
+
+    :param shortest_path_method:    "dijkstra" (one tree per destination ground station) or "floyd_warshall"
+    :param shortest_path_trees:     DynamicShortestPathTrees carried across time steps (only with "dijkstra"),
+                                    or None to calculate the Dijkstra from scratch
+    :param shortest_path_backend:   Shortest path backend (name, instance, or None for the default; see
+                                    get_shortest_path_backend())
+    :param demand_set:              List of (source, destination) ground station pairs, or None for all pairs
+
+    :return: Forwarding state dictionary (node, destination ground station node) -> next hop decision
+    """
+
+    # Graph as CSR arrays, with the neighbors of each node padded to the same number (V, D)
+    graph = as_graph_snapshot(sat_net_graph)
+    neighbors, entries = graph.padded_neighbors()
+    backend = get_shortest_path_backend(shortest_path_backend)
+    num_nodes = num_satellites + num_ground_stations
+
+    # Destination ground stations (columns) the next hop decisions are calculated for
+    dst_gids = demand_destination_gids(demand_set, num_ground_stations)
+    dst_col = [-1] * num_ground_stations
+    for col, dst_gid in enumerate(dst_gids):
+        dst_col[dst_gid] = col
+    dst_gs_node_ids = num_satellites + np.array(dst_gids, dtype=np.int64)
+    node_ids = np.arange(graph.num_nodes)[:, None]
+
+    # Interfaces of each CSR entry (and of the padding entry), determined
+    # by the node identifiers of the current node and the neighbor
+    indices = graph.indices.tolist()
+    weights = graph.weights.tolist()
+    sources = np.repeat(np.arange(graph.num_nodes), np.diff(graph.indptr)).tolist()
+    my_if_of_entry = []
+    next_hop_if_of_entry = []
+    for current_node_id, neighbor_id, weight in zip(sources, indices, weights):
+
+        # Any neighbor must be reachable
+        if math.isinf(weight):
+            raise ValueError("Neighbor cannot be unreachable")
+
+        if current_node_id >= num_satellites and neighbor_id < num_satellites:  # GS to sat.
+            my_if_of_entry.append(0)
+            next_hop_if_of_entry.append(
+                num_isls_per_sat[neighbor_id] + gid_to_sat_gsl_if_idx[current_node_id - num_satellites]
+            )
+
+        elif current_node_id < num_satellites and neighbor_id >= num_satellites:  # Sat. to GS
+            my_if_of_entry.append(
+                num_isls_per_sat[current_node_id] + gid_to_sat_gsl_if_idx[neighbor_id - num_satellites]
+            )
+            next_hop_if_of_entry.append(0)
+
+        elif current_node_id < num_satellites and neighbor_id < num_satellites:  # Sat. to sat.
+            my_if_of_entry.append(sat_neighbor_to_if[(current_node_id, neighbor_id)])
+            next_hop_if_of_entry.append(sat_neighbor_to_if[(neighbor_id, current_node_id)])
+
+        else:  # GS to GS
+            raise ValueError("GS-to-GS link cannot exist")
+
+    my_if_of_entry = np.array(my_if_of_entry + [-1], dtype=np.int64)
+    next_hop_if_of_entry = np.array(next_hop_if_of_entry + [-1], dtype=np.int64)
+
+    # Satellites and ground stations to ground stations: the neighbor slot of the next hop (V, G)
+    if shortest_path_method == "dijkstra":
+        if enable_verbose_logs:
+            print("  > Calculating Dijkstra towards %d ground stations including ground-station relays"
+                  % len(dst_gids))
+
+        # The next hop is the predecessor in the shortest path tree of the destination
+        if shortest_path_trees is not None:
+            _, next_hops = shortest_path_trees.update(graph, dst_gs_node_ids)
+        else:
+            _, next_hops = backend.shortest_path_trees(graph, dst_gs_node_ids)
+        has_next_hop = next_hops >= 0
+        best_neighbor_idx = np.argmax(neighbors[:, None, :] == next_hops[:, :, None], axis=2)
+
+    elif shortest_path_method == "floyd_warshall":
+        if enable_verbose_logs:
+            print("  > Calculating Floyd-Warshall for graph including ground-station relays")
+        dist_sat_net = backend.all_pairs_distances(graph)
+
+        # Among its neighbors, find the first (in neighbor order) which promises
+        # the lowest distance (next-hop + distance the next hop node promises)
+        dist_to_dst_gs = np.append(
+            dist_sat_net[:, dst_gs_node_ids], np.full((1, len(dst_gids)), np.inf), axis=0
+        )
+        via_neighbor_m = np.append(graph.weights, np.inf)[entries][:, :, None] + dist_to_dst_gs[neighbors]  # (V, D, G)
+        best_neighbor_idx = np.argmin(via_neighbor_m, axis=1)
+        has_next_hop = (
+            np.take_along_axis(via_neighbor_m, best_neighbor_idx[:, None, :], axis=1)[:, 0, :] < 1000000000000000
+        )
+
+    else:
+        raise ValueError("Unknown shortest path method: " + str(shortest_path_method))
+    next_hop_entries = entries[node_ids, best_neighbor_idx]
+
+    # If no neighbor can reach the destination, it will be dropped (indicated by -1)
+    next_hop_decisions = np.stack([
+        np.where(has_next_hop, neighbors[node_ids, best_neighbor_idx], -1),
+        np.where(has_next_hop, my_if_of_entry[next_hop_entries], -1),
+        np.where(has_next_hop, next_hop_if_of_entry[next_hop_entries], -1)
+    ], axis=2).tolist()
+
+    def next_hop_decision_of(node, dst_gid):
+        return next_hop_decisions[node][dst_col[dst_gid]]
+
+    # With a demand set, only the decisions along the paths of its pairs (all others drop)
+    fstate_decision_of = restrict_to_demand_set(demand_set, num_satellites, next_hop_decision_of)
 
     # Forwarding state
     fstate = {}
@@ -180,69 +374,13 @@ def calculate_fstate_shortest_path_with_gs_relaying(
     with open(output_filename, "w+") as f_out:
 
         # Satellites and ground stations to ground stations
-        for current_node_id in range(num_satellites + num_ground_stations):
+        for current_node_id in range(num_nodes):
             for dst_gid in range(num_ground_stations):
                 dst_gs_node_id = num_satellites + dst_gid
 
                 # Cannot forward to itself
                 if current_node_id != dst_gs_node_id:
-
-                    # Among its neighbors, find the one which promises the
-                    # lowest distance to reach the destination satellite
-                    next_hop_decision = (-1, -1, -1)
-                    best_distance_m = 1000000000000000
-                    for neighbor_id in sat_net_graph.neighbors(current_node_id):
-
-                        # Any neighbor must be reachable
-                        if math.isinf(dist_sat_net[(current_node_id, neighbor_id)]):
-                            raise ValueError("Neighbor cannot be unreachable")
-
-                        # Calculate distance = next-hop + distance the next hop node promises
-                        distance_m = (
-                                sat_net_graph.edges[(current_node_id, neighbor_id)]["weight"]
-                                +
-                                dist_sat_net[(neighbor_id, dst_gs_node_id)]
-                        )
-                        if (
-                                not math.isinf(dist_sat_net[(neighbor_id, dst_gs_node_id)])
-                                and
-                                distance_m < best_distance_m
-                        ):
-
-                            # Check node identifiers to determine what are the
-                            # correct interface identifiers
-                            if current_node_id >= num_satellites and neighbor_id < num_satellites:  # GS to sat.
-                                my_if = 0
-                                next_hop_if = (
-                                        num_isls_per_sat[neighbor_id]
-                                        +
-                                        gid_to_sat_gsl_if_idx[current_node_id - num_satellites]
-                                )
-
-                            elif current_node_id < num_satellites and neighbor_id >= num_satellites:  # Sat. to GS
-                                my_if = (
-                                        num_isls_per_sat[current_node_id]
-                                        +
-                                        gid_to_sat_gsl_if_idx[neighbor_id - num_satellites]
-                                )
-                                next_hop_if = 0
-
-                            elif current_node_id < num_satellites and neighbor_id < num_satellites:  # Sat. to sat.
-                                my_if = sat_neighbor_to_if[(current_node_id, neighbor_id)]
-                                next_hop_if = sat_neighbor_to_if[(neighbor_id, current_node_id)]
-
-                            else:  # GS to GS
-                                raise ValueError("GS-to-GS link cannot exist")
-
-                            # Write the next-hop decision
-                            next_hop_decision = (
-                                neighbor_id,  # Next-hop node identifier
-                                my_if,  # My outgoing interface id
-                                next_hop_if  # Next-hop incoming interface id
-                            )
-
-                            # Update best distance found
-                            best_distance_m = distance_m
+                    next_hop_decision = tuple(fstate_decision_of(current_node_id, dst_gid))
 
                     # Write to forwarding state
                     if not prev_fstate or prev_fstate[(current_node_id, dst_gs_node_id)] != next_hop_decision:
@@ -273,108 +411,106 @@ def compute_anchor_data_for_timestep(graph, anchors, enable_verbose_logs=False):
     
     Complexity: O(V log V + E) - SINGLE Dijkstra run!
     This is the theoretical minimum - you can't do better!
+
+    Only a distance and a parent (predecessor) array per anchor are kept, no paths: the returned
+    'nearest_anchor' and 'anchor_to_anchor' lookups reconstruct a path from the parents only when it
+    is asked for (see AnchorShortestPathTrees).
     """
     import heapq
-    
-    anchor_data = {
-        'nearest_anchor': {},      # satellite_id -> (anchor_id, distance, path)
-        'anchor_to_anchor': {}     # (anchor_src, anchor_dst) -> {'distance', 'next_hop', 'path'}
-    }
-    
-    anchor_set = set(anchors)
-    
-    # Priority queue: (distance, current_node, source_anchor, path)
+
+    # Graph as CSR arrays (the neighbors of a node are indices[indptr[node]:indptr[node + 1]])
+    graph = as_graph_snapshot(graph)
+    indptr = graph.indptr.tolist()
+    indices = graph.indices.tolist()
+    weights = graph.weights.tolist()
+    num_nodes = graph.num_nodes
+
+    # One tree per anchor (anchors outside of the graph are skipped)
+    tree_anchors = list(dict.fromkeys(a for a in anchors if 0 <= a < num_nodes))
+    anchor_idx_of = {anchor: i for i, anchor in enumerate(tree_anchors)}
+    is_anchor = [False] * num_nodes
+    for anchor in tree_anchors:
+        is_anchor[anchor] = True
+
+    # Per anchor: best known distance and parent of each node (-1 for the anchor itself and if not reached)
+    dist = [[math.inf] * num_nodes for _ in tree_anchors]
+    parent = [[-1] * num_nodes for _ in tree_anchors]
+    nearest_anchor_indices = [-1] * num_nodes
+    anchor_pairs = {}  # (anchor_src, anchor_dst) -> index of the anchor whose tree holds the path
+
+    # Priority queue: (distance, current_node, source_anchor)
+    # (a (node, source anchor) is only pushed again with a strictly smaller distance, so entries never tie)
     pq = []
-    visited = set()  # Nodes that have found their nearest anchor
-    best_distance = {}  # (node, source_anchor) -> best known distance to avoid reprocessing
-    
+    visited = [False] * num_nodes  # Nodes that have found their nearest anchor
+
     # Initialize: Add all anchors to priority queue
-    for anchor in anchors:
-        if anchor in graph.nodes():
-            heapq.heappush(pq, (0.0, anchor, anchor, [anchor]))
-            visited.add(anchor)  # Anchors are their own nearest anchor
-            anchor_data['nearest_anchor'][anchor] = (anchor, 0.0, [anchor])
-            best_distance[(anchor, anchor)] = 0.0
-    
+    for i, anchor in enumerate(tree_anchors):
+        heapq.heappush(pq, (0.0, anchor, anchor))
+        visited[anchor] = True  # Anchors are their own nearest anchor
+        nearest_anchor_indices[anchor] = i
+        dist[i][anchor] = 0.0
+
     if enable_verbose_logs:
         print(f"      Running single multi-source BFS from {len(anchors)} anchors")
-    
+
     # Multi-source Dijkstra
     nodes_processed = 0
     while pq:
-        current_dist, current_node, source_anchor, path = heapq.heappop(pq)
-        
+        current_dist, current_node, source_anchor = heapq.heappop(pq)
+        source_idx = anchor_idx_of[source_anchor]
+        source_dist = dist[source_idx]
+
         # Skip if we've already processed this (node, source) pair with a better distance
-        key = (current_node, source_anchor)
-        if key in best_distance and current_dist > best_distance[key]:
+        if current_dist > source_dist[current_node]:
             continue
-            
+
         nodes_processed += 1
-        
+
         # If this is a non-anchor node that hasn't been visited, this is its nearest anchor
-        if current_node not in anchor_set and current_node not in visited:
-            anchor_data['nearest_anchor'][current_node] = (source_anchor, current_dist, path)
-            visited.add(current_node)
+        if not visited[current_node]:
+            nearest_anchor_indices[current_node] = source_idx
+            visited[current_node] = True
             # Still need to explore from this node to potentially reach other anchors!
-        
+
         # If this is an anchor node, track distance for anchor-to-anchor routing
-        if current_node in anchor_set and current_node != source_anchor:
-            pair_key = (source_anchor, current_node)
-            if pair_key not in anchor_data['anchor_to_anchor']:
-                # Store the path from source_anchor to current_node (which is also an anchor)
-                anchor_data['anchor_to_anchor'][pair_key] = {
-                    'distance': current_dist,
-                    'path': path,
-                    'next_hop': path[1] if len(path) > 1 else current_node
-                }
-                
-                # ALSO store the reverse path (for bidirectional lookup)
-                # Since ISLs are undirected, distance is the same
-                # Reverse path: [current_node, ..., source_anchor]
-                reverse_path = list(reversed(path))
-                reverse_pair_key = (current_node, source_anchor)
-                anchor_data['anchor_to_anchor'][reverse_pair_key] = {
-                    'distance': current_dist,
-                    'path': reverse_path,
-                    'next_hop': reverse_path[1] if len(reverse_path) > 1 else source_anchor
-                }
-                
-                # Since ISLs are bidirectional, also store the reverse path
-                reverse_path = list(reversed(path))
-                reverse_key = (current_node, source_anchor)
-                if reverse_key not in anchor_data['anchor_to_anchor']:
-                    anchor_data['anchor_to_anchor'][reverse_key] = {
-                        'distance': current_dist,  # Same distance in both directions
-                        'path': reverse_path,
-                        'next_hop': reverse_path[1] if len(reverse_path) > 1 else source_anchor
-                    }
-        
+        # (the first anchor to discover a pair holds its path in both directions, as ISLs are undirected)
+        elif is_anchor[current_node] and current_node != source_anchor:
+            if (source_anchor, current_node) not in anchor_pairs:
+                anchor_pairs[(source_anchor, current_node)] = source_idx
+                anchor_pairs[(current_node, source_anchor)] = source_idx
+
         # Explore neighbors (for both anchor-to-anchor paths and reaching non-anchor nodes)
-        for neighbor in graph.neighbors(current_node):
+        source_parent = parent[source_idx]
+        for k in range(indptr[current_node], indptr[current_node + 1]):
+            neighbor = indices[k]
             # Skip if neighbor has already found its nearest anchor (unless it's an anchor itself)
-            if neighbor in visited and neighbor not in anchor_set:
+            if visited[neighbor] and not is_anchor[neighbor]:
                 continue
-            
-            edge_weight = graph.edges[(current_node, neighbor)]['weight']
-            new_dist = current_dist + edge_weight
-            new_path = path + [neighbor]
-            
+
             # Only add to queue if this is a better path
-            neighbor_key = (neighbor, source_anchor)
-            if neighbor_key not in best_distance or new_dist < best_distance[neighbor_key]:
-                best_distance[neighbor_key] = new_dist
-                heapq.heappush(pq, (new_dist, neighbor, source_anchor, new_path))
-    
+            new_dist = current_dist + weights[k]
+            if new_dist < source_dist[neighbor]:
+                source_dist[neighbor] = new_dist
+                source_parent[neighbor] = current_node
+                heapq.heappush(pq, (new_dist, neighbor, source_anchor))
+
+    anchor_trees = AnchorShortestPathTrees(
+        tree_anchors,
+        np.array(dist, dtype=float).reshape(len(tree_anchors), num_nodes),
+        np.array(parent, dtype=np.int64).reshape(len(tree_anchors), num_nodes),
+        np.array(nearest_anchor_indices, dtype=np.int64),
+        anchor_pairs
+    )
+    anchor_data = {
+        'nearest_anchor': anchor_trees.nearest_anchor,      # satellite_id -> (anchor_id, distance, path)
+        'anchor_to_anchor': anchor_trees.anchor_to_anchor   # (anchor_src, anchor_dst) -> {'distance', 'next_hop', 'path'}
+    }
+
     if enable_verbose_logs:
         print(f"      Processed {nodes_processed} node visits")
         print(f"      Found nearest anchor for {len(anchor_data['nearest_anchor'])} nodes")
         print(f"      Computed {len(anchor_data['anchor_to_anchor'])} anchor-to-anchor paths")
-        # DEBUG: Check specific anchor pair
-        if (0, 130) in anchor_data['anchor_to_anchor']:
-            print(f"      Anchor 0 → Anchor 130: distance={anchor_data['anchor_to_anchor'][(0, 130)]['distance']}")
-        else:
-            print(f"      WARNING: Anchor 0 → Anchor 130 NOT in anchor_to_anchor!")
-    
+
     return anchor_data
 
 
@@ -391,7 +527,10 @@ def calculate_anchor_lmsr_path_complete_forwarding(
         anchors,
         prev_fstate,
         prev_anchor_data,
-        enable_verbose_logs
+        enable_verbose_logs,
+        process_pool=None,
+        demand_set=None,
+        decision_cache=None
 ):
     """
     MAXIMALLY EFFICIENT Anchor-based LMSR with Complete Forwarding State
@@ -405,6 +544,17 @@ def calculate_anchor_lmsr_path_complete_forwarding(
     Total: O(N × (V log V + E)) + O(V²) for sat-to-sat entries
     
     Speedup: ~4,400x faster than LMSR with full Dijkstra per source-destination pair
+
+    Without previous anchor data (cold start), the anchor data of all timesteps is computed, in parallel
+    if a process_pool (e.g., concurrent.futures.ProcessPoolExecutor) is given
+
+    With a demand_set (list of (source, destination) ground station pairs), only the destination ground
+    stations of its pairs are calculated, and only the entries along the paths of its pairs are kept
+    (all others drop, see restrict_to_demand_set())
+
+    With a decision_cache (ForwardingDecisionCache, carried across timesteps), the satellite-to-ground-station
+    decisions of the previous timestep are reused, and only those whose egress satellite, nearest anchor or
+    anchor paths changed are calculated again (the cache is reset at a cold start)
     """
     
     if enable_verbose_logs:
@@ -413,9 +563,6 @@ def calculate_anchor_lmsr_path_complete_forwarding(
         print(f"    Lookahead: {len(sat_net_graph_only_satellites_with_isls)} timesteps")
         print(f"    Total multi-source Dijkstra runs: {len(sat_net_graph_only_satellites_with_isls)}")
     
-    # DEBUG: Disabled for performance
-    debug_enabled = False
-    
     # Compute anchor data for each timestep (ONE multi-source Dijkstra per timestep)
     anchor_data_by_timestep = []
     
@@ -432,13 +579,21 @@ def calculate_anchor_lmsr_path_complete_forwarding(
             enable_verbose_logs
         )
         anchor_data_by_timestep.append(new_timestep_data)
+    elif process_pool is not None:
+        if enable_verbose_logs:
+            print(f"    > Computing all {len(sat_net_graph_only_satellites_with_isls)} timesteps in parallel")
+        anchor_data_by_timestep = list(process_pool.map(
+            compute_anchor_data_for_timestep,
+            [as_graph_snapshot(graph) for graph in sat_net_graph_only_satellites_with_isls],
+            itertools.repeat(anchors)
+        ))
     else:
         if enable_verbose_logs:
             print(f"    > Computing all {len(sat_net_graph_only_satellites_with_isls)} timesteps")
         for i, graph in enumerate(sat_net_graph_only_satellites_with_isls):
-            if enable_verbose_logs or (debug_enabled and i == 0):
+            if enable_verbose_logs:
                 print(f"      Timestep {i}/{len(sat_net_graph_only_satellites_with_isls)}")
-            timestep_data = compute_anchor_data_for_timestep(graph, anchors, (enable_verbose_logs or debug_enabled) and i == 0)
+            timestep_data = compute_anchor_data_for_timestep(graph, anchors, enable_verbose_logs and i == 0)
             anchor_data_by_timestep.append(timestep_data)
     
     # Helper functions - all O(1) lookups
@@ -450,45 +605,46 @@ def calculate_anchor_lmsr_path_complete_forwarding(
             return anchor, path, distance
         return None, [], float('inf')
     
-    def get_anchor_to_anchor_distance(src_anchor, dst_anchor, timestep_idx):
-        """O(1) lookup"""
-        anchor_data = anchor_data_by_timestep[timestep_idx]
-        key = (src_anchor, dst_anchor)
-        if key in anchor_data['anchor_to_anchor']:
-            return anchor_data['anchor_to_anchor'][key]['distance']
-        return float('inf')
-    
     def get_anchor_to_anchor_next_hop(src_anchor, dst_anchor, timestep_idx):
-        """O(1) lookup"""
-        anchor_data = anchor_data_by_timestep[timestep_idx]
-        key = (src_anchor, dst_anchor)
-        if key in anchor_data['anchor_to_anchor']:
-            return anchor_data['anchor_to_anchor'][key]['next_hop']
-        return None
+        """Lookup (reconstructs the path from the parents)"""
+        return anchor_data_by_timestep[timestep_idx]['anchor_to_anchor'].next_hop(src_anchor, dst_anchor)
+    
+    # Dense window arrays, indexed by the position of the anchor in window_anchors (with one more position
+    # for "no anchor"): nearest anchor and distance to it (T x V), anchor-to-anchor distances (T x A x A)
+    num_timesteps = len(sat_net_graph_only_satellites_with_isls)
+    window_anchors = list(dict.fromkeys(
+        anchor for anchor_data in anchor_data_by_timestep for anchor in anchor_data['nearest_anchor'].trees.anchors
+    ))
+    num_window_anchors = len(window_anchors)
+    nearest_anchor_positions = np.full((num_timesteps, num_satellites), num_window_anchors, dtype=np.int64)
+    nearest_anchor_distances = np.full((num_timesteps, num_satellites), np.inf)
+    anchor_distances = np.full((num_timesteps, num_window_anchors + 1, num_window_anchors + 1), np.inf)
+    for t, anchor_data in enumerate(anchor_data_by_timestep):
+        positions, distances, between_anchors = anchor_data['nearest_anchor'].trees.dense_arrays(window_anchors)
+        positions = positions[:num_satellites]
+        nearest_anchor_positions[t, :len(positions)] = np.where(positions == -1, num_window_anchors, positions)
+        nearest_anchor_distances[t, :len(positions)] = distances[:num_satellites]
+        anchor_distances[t, :num_window_anchors, :num_window_anchors] = between_anchors
+
+        # Same anchor: source → anchor → destination
+        anchor_distances[t, np.arange(num_window_anchors), np.arange(num_window_anchors)] = 0.0
     
-    def compute_anchor_path_distance_at_timestep(source_sat, dest_sat, timestep_idx):
+    def compute_anchor_path_distances(source_sats, dest_sats):
         """
         Compute distance: source → ingress_anchor → egress_anchor → destination
-        All lookups are O(1)!
+        Vectorized over all timesteps, sources and destinations (inf if there is no such path)
+        Returns: numpy array (T, len(source_sats), len(dest_sats))
         """
-        if source_sat == dest_sat:
-            return 0.0
-        
-        ingress_anchor, _, ingress_distance = find_nearest_anchor_at_timestep(source_sat, timestep_idx)
-        egress_anchor, _, egress_distance = find_nearest_anchor_at_timestep(dest_sat, timestep_idx)
-        
-        if ingress_anchor is None or egress_anchor is None:
-            return float('inf')
-        
-        if ingress_anchor == egress_anchor:
-            # Same anchor: source → anchor → destination
-            return ingress_distance + egress_distance
-        else:
-            # Different anchors: source → ingress → egress → destination
-            anchor_distance = get_anchor_to_anchor_distance(ingress_anchor, egress_anchor, timestep_idx)
-            if math.isinf(anchor_distance):
-                return float('inf')
-            return ingress_distance + anchor_distance + egress_distance
+        source_sats = np.asarray(source_sats, dtype=np.int64)
+        dest_sats = np.asarray(dest_sats, dtype=np.int64)
+        ingress = nearest_anchor_positions[:, source_sats]
+        egress = nearest_anchor_positions[:, dest_sats]
+        distances = (
+            nearest_anchor_distances[:, source_sats, None]
+            + anchor_distances[np.arange(num_timesteps)[:, None, None], ingress[:, :, None], egress[:, None, :]]
+        ) + nearest_anchor_distances[:, None, dest_sats]
+        distances[:, source_sats[:, None] == dest_sats[None, :]] = 0.0
+        return distances
     
     def route_through_anchors_lmsr(source_sat, dest_sat, current_timestep=0):
         """
@@ -500,17 +656,14 @@ def calculate_anchor_lmsr_path_complete_forwarding(
             return dest_sat, 0.0
         
         # Compute distances across all timesteps
-        distances_across_time = [
-            compute_anchor_path_distance_at_timestep(source_sat, dest_sat, t)
-            for t in range(len(sat_net_graph_only_satellites_with_isls))
-        ]
+        distances_across_time = compute_anchor_path_distances([source_sat], [dest_sat])[:, 0, 0]
         
-        if any(math.isinf(d) for d in distances_across_time):
+        if np.any(np.isinf(distances_across_time)):
             return None, float('inf')
         
         # Calculate jitter: range of delays (max - min)
-        min_distance = min(distances_across_time)
-        max_distance = max(distances_across_time)
+        min_distance = float(np.min(distances_across_time))
+        max_distance = float(np.max(distances_across_time))
         jitter_metric = max_distance - min_distance
         
         # BUT: Use CURRENT timestep for actual routing decision
@@ -521,14 +674,6 @@ def calculate_anchor_lmsr_path_complete_forwarding(
         if ingress_anchor is None or egress_anchor is None:
             return None, float('inf')
         
-        # DEBUG
-        debug_routing = source_sat in [100, 101, 130] and dest_sat in [102, 103]
-        if debug_routing:
-            print(f"      route_through_anchors_lmsr({source_sat}, {dest_sat}):")
-            print(f"        ingress_anchor={ingress_anchor}, egress_anchor={egress_anchor}")
-            print(f"        ingress_path={ingress_path}, egress_path={egress_path}")
-            print(f"        jitter_metric={jitter_metric:.2f}m (range: {min_distance:.2f}-{max_distance:.2f})")
-        
         # Determine next hop using CURRENT timestep topology
         # NOTE: Paths are stored as [anchor, ..., node] from multi-source Dijkstra
         # To route FROM node TO anchor, we reverse the path
@@ -575,11 +720,157 @@ def calculate_anchor_lmsr_path_complete_forwarding(
                     # Path has only 1 element, shouldn't happen
                     return None, float('inf')
         
-        if debug_routing:
-            print(f"        next_hop={next_hop}")
-        
         return next_hop, jitter_metric
     
+    # Satellites to ground stations
+    if enable_verbose_logs:
+        print("  > Computing satellite-to-ground-station routes")
+    
+    # Destination ground stations the routes are calculated for (with a demand set, only those of its pairs)
+    dst_gids = demand_destination_gids(demand_set, num_ground_stations)
+    dst_col = [-1] * num_ground_stations
+    for col, dst_gid in enumerate(dst_gids):
+        dst_col[dst_gid] = col
+    
+    # Distances across time for all (curr_sat, candidate dst_sat) of each destination ground station at
+    # once: jitter (max - min) and mean are reductions along the time axis
+    # Primary: minimize jitter, Secondary: minimize mean delay (+ GSL), then the lowest satellite
+    best_dst_sat_per_gid = []  # Per dst_gid: best dst_sat of each curr_sat (-1 if none is valid)
+    best_possibility_per_gid = []  # Per dst_gid: (jitter, mean_distance + gsl_distance) of the best dst_sat
+    num_valid_per_gid = []  # Per dst_gid: number of valid dst_sat of each curr_sat
+    for dst_gid in dst_gids:
+        possible_dst_sats = ground_station_satellites_in_range_candidates[0][dst_gid]
+        dst_sats = np.array([dst_sat for _, dst_sat in possible_dst_sats], dtype=np.int64)
+        gsl_distances = np.array([gsl_distance for gsl_distance, _ in possible_dst_sats], dtype=float)
+        if len(dst_sats) == 0:
+            best_dst_sat_per_gid.append(np.full(num_satellites, -1, dtype=np.int64))
+            best_possibility_per_gid.append((np.full(num_satellites, np.inf), np.full(num_satellites, np.inf)))
+            num_valid_per_gid.append(np.zeros(num_satellites, dtype=np.int64))
+            continue
+        distances_across_time = compute_anchor_path_distances(np.arange(num_satellites), dst_sats)
+        valid = np.all(np.isfinite(distances_across_time), axis=0)
+        with np.errstate(invalid="ignore"):
+            jitter = np.max(distances_across_time, axis=0) - np.min(distances_across_time, axis=0)
+            mean_distance = np.mean(distances_across_time, axis=0)
+        jitter = np.where(valid, jitter, np.inf)
+        total_distance = np.where(valid, mean_distance + gsl_distances[None, :], np.inf)
+        best = np.lexsort((np.broadcast_to(dst_sats, jitter.shape), total_distance, jitter), axis=-1)[:, 0]
+        num_valid = np.sum(valid, axis=1)
+        best_dst_sat_per_gid.append(np.where(num_valid > 0, dst_sats[best], -1))
+        best_possibility_per_gid.append((
+            jitter[np.arange(num_satellites), best],
+            total_distance[np.arange(num_satellites), best]
+        ))
+        num_valid_per_gid.append(num_valid)
+    
+    # Which decisions are outdated: compare the facts at the first timestep to those of the previous timestep
+    outdated_per_gid = []
+    if decision_cache is not None:
+        if prev_anchor_data is None or len(prev_anchor_data) == 0:
+            decision_cache.reset()
+        trees = anchor_data_by_timestep[0]['nearest_anchor'].trees
+        nearest_anchor_indices = np.full(num_satellites, -1, dtype=np.int64)
+        nearest_anchor_indices[:len(trees.nearest_anchor_indices)] = trees.nearest_anchor_indices[:num_satellites]
+        has_anchor = nearest_anchor_indices != -1
+        sat_ids = np.arange(num_satellites)
+        anchor_of = np.where(has_anchor, np.array(trees.anchors + [-1])[nearest_anchor_indices], -1)
+        parent_of = np.full(num_satellites, -1, dtype=np.int64)
+        parent_of[has_anchor] = trees.parents[nearest_anchor_indices[has_anchor], sat_ids[has_anchor]]
+        egress_paths = {}
+        for dst_gid in dst_gids:
+            for _, dst_sat in ground_station_satellites_in_range_candidates[0][dst_gid]:
+                if dst_sat not in egress_paths:
+                    egress_paths[dst_sat] = (
+                        tuple(trees.path(nearest_anchor_indices[dst_sat], dst_sat)) if has_anchor[dst_sat] else None
+                    )
+        decision_cache.advance(anchor_of, parent_of, egress_paths)
+        is_anchor = np.zeros(num_satellites, dtype=bool)
+        is_anchor[[anchor for anchor in anchors if 0 <= anchor < num_satellites]] = True
+        for col, dst_gid in enumerate(dst_gids):
+            outdated_per_gid.append(decision_cache.outdated(dst_gid, best_dst_sat_per_gid[col], is_anchor).tolist())
+    
+    def sat_to_gs_decision(curr_sat, dst_gid):
+        """Next hop decision of a satellite towards a destination ground station (reused if not outdated)"""
+        if decision_cache is None:
+            return calculate_sat_to_gs_decision(curr_sat, dst_gid)
+        col = dst_col[dst_gid]
+        if not outdated_per_gid[col][curr_sat]:
+            return decision_cache.decision(dst_gid, curr_sat)
+        next_hop_decision = calculate_sat_to_gs_decision(curr_sat, dst_gid)
+        decision_cache.store(dst_gid, curr_sat, int(best_dst_sat_per_gid[col][curr_sat]), next_hop_decision)
+        return next_hop_decision
+    
+    def calculate_sat_to_gs_decision(curr_sat, dst_gid):
+        """Next hop decision of a satellite towards a destination ground station"""
+        dst_gs_node_id = num_satellites + dst_gid
+        col = dst_col[dst_gid]
+        
+        # Egress satellite with the lowest jitter (and mean distance) towards the ground station, if any
+        dst_sat = int(best_dst_sat_per_gid[col][curr_sat])
+        
+        next_hop_decision = (-1, -1, -1)
+        
+        if dst_sat != -1:
+            if curr_sat != dst_sat:
+                # Use anchor-based routing with loop prevention
+                # Get next hop from efficient anchor computation
+                next_hop, _ = route_through_anchors_lmsr(curr_sat, dst_sat, current_timestep=0)
+                
+                if next_hop is not None and next_hop in sat_net_graph_only_satellites_with_isls[0].neighbors(curr_sat):
+                    next_hop_decision = (
+                        next_hop,
+                        sat_neighbor_to_if[0][(curr_sat, next_hop)],
+                        sat_neighbor_to_if[0][(next_hop, curr_sat)]
+                    )
+            else:
+                # Satellite can directly see the ground station
+                # Its GSL interfaces come after all its ISL interfaces
+                num_isl_ifs = num_isls_per_sat[0][curr_sat]
+                # Which GSL interface to use? GS_id maps to GSL interface index
+                gsl_if_idx = gid_to_sat_gsl_if_idx[dst_gid]
+                next_hop_decision = (
+                    dst_gs_node_id,
+                    num_isl_ifs + gsl_if_idx,  # My interface (satellite's GSL interface for this GS)
+                    0  # Next hop interface (ground station's GSL interface 0)
+                )
+        
+        return next_hop_decision
+    
+    def gs_to_gs_decision(src_gid, dst_gid):
+        """Next hop decision of a ground station towards a destination ground station"""
+        col = dst_col[dst_gid]
+        possible_src_sats = ground_station_satellites_in_range_candidates[0][src_gid]
+        
+        # Via the source satellite with the lowest GSL distance + (mean) distance to the destination ground station
+        possibilities = []
+        for gsl_distance, src_sat in possible_src_sats:
+            if best_dst_sat_per_gid[col][src_sat] != -1:
+                sat_to_dst_distance = float(best_possibility_per_gid[col][1][src_sat])
+                possibilities.append((gsl_distance + sat_to_dst_distance, src_sat))
+        
+        possibilities = sorted(possibilities)
+        
+        next_hop_decision = (-1, -1, -1)
+        if possibilities:
+            _, src_sat = possibilities[0]
+            # The satellite's GSL interface comes after all its ISL interfaces
+            num_isl_ifs = num_isls_per_sat[0][src_sat]
+            sat_gsl_if_id = num_isl_ifs
+            next_hop_decision = (
+                src_sat,  # Next hop satellite
+                0,  # My interface (ground station's GSL interface 0)
+                sat_gsl_if_id  # Next hop interface (satellite's GSL interface)
+            )
+        return next_hop_decision
+    
+    def next_hop_decision_of(node, dst_gid):
+        if node < num_satellites:
+            return sat_to_gs_decision(node, dst_gid)
+        return gs_to_gs_decision(node - num_satellites, dst_gid)
+    
+    # With a demand set, only the decisions along the paths of its pairs (all others drop)
+    fstate_decision_of = restrict_to_demand_set(demand_set, num_satellites, next_hop_decision_of)
+    
     # Generate forwarding state
     fstate = {}
     output_filename = output_dynamic_state_dir + "/fstate_" + str(time_since_epoch_ns) + ".txt"
@@ -590,91 +881,10 @@ def calculate_anchor_lmsr_path_complete_forwarding(
     with open(output_filename, "w+") as f_out:
         
         # Satellites to ground stations
-        if enable_verbose_logs:
-            print("  > Computing satellite-to-ground-station routes")
-        
-        dist_satellite_to_ground_station = {}
-        
-        # DEBUG: Check what satellites can see each GS
-        if enable_verbose_logs:
-            for gid in range(num_ground_stations):
-                sats_in_range = ground_station_satellites_in_range_candidates[0][gid]
-                sat_ids = [sat_id for _, sat_id in sats_in_range]
-                print(f"    GS {gid} (node {num_satellites + gid}) can see {len(sat_ids)} satellites: {sat_ids[:20]}...")
-        
         for curr_sat in range(num_satellites):
             for dst_gid in range(num_ground_stations):
                 dst_gs_node_id = num_satellites + dst_gid
-                
-                possible_dst_sats = ground_station_satellites_in_range_candidates[0][dst_gid]
-                
-                # DEBUG: For satellite 0, show details
-                if enable_verbose_logs and curr_sat == 0:
-                    print(f"    Satellite {curr_sat} routing to GS {dst_gid}: {len(possible_dst_sats)} candidate satellites")
-                
-                possibilities = []
-                for gsl_distance, dst_sat in possible_dst_sats:
-                    distances_across_time = [
-                        compute_anchor_path_distance_at_timestep(curr_sat, dst_sat, t)
-                        for t in range(len(sat_net_graph_only_satellites_with_isls))
-                    ]
-                    
-                    if not any(math.isinf(d) for d in distances_across_time):
-                        # Calculate jitter: range of delays (max - min)
-                        min_distance = min(distances_across_time)
-                        max_distance = max(distances_across_time)
-                        jitter = max_distance - min_distance
-                        mean_distance = sum(distances_across_time) / len(distances_across_time)
-                        
-                        # Primary: minimize jitter, Secondary: minimize mean delay
-                        possibilities.append((jitter, mean_distance + gsl_distance, dst_sat))
-                    elif curr_sat == 0 and dst_gid == 1:  # Debug: satellite 0 to Dalian
-                        print(f"      DEBUG: Sat {curr_sat} → Sat {dst_sat} (can see GS {dst_gid}): Has inf distance")
-                        print(f"        Distances across time: {distances_across_time[:3]}...")
-                
-                possibilities = sorted(possibilities)
-                
-                # DEBUG
-                if curr_sat == 0 and dst_gid == 1:
-                    print(f"    DEBUG: Satellite 0 routing to GS 1 (Dalian): {len(possibilities)} valid possibilities")
-                    if len(possibilities) > 0:
-                        print(f"      Best: jitter={possibilities[0][0]}, mean_distance={possibilities[0][1]}, via sat {possibilities[0][2]}")
-                    else:
-                        print(f"      NO VALID ROUTES!")
-                        print(f"      Checked {len(possible_dst_sats)} satellites that can see Dalian")
-
-                
-                next_hop_decision = (-1, -1, -1)
-                distance_to_ground_station_m = float('inf')
-                
-                if possibilities:
-                    _, mean_dist, dst_sat = possibilities[0]
-                    distance_to_ground_station_m = mean_dist
-                    
-                    if curr_sat != dst_sat:
-                        # Use anchor-based routing with loop prevention
-                        # Get next hop from efficient anchor computation
-                        next_hop, max_dist = route_through_anchors_lmsr(curr_sat, dst_sat, current_timestep=0)
-                        
-                        if next_hop is not None and next_hop in sat_net_graph_only_satellites_with_isls[0].neighbors(curr_sat):
-                            next_hop_decision = (
-                                next_hop,
-                                sat_neighbor_to_if[0][(curr_sat, next_hop)],
-                                sat_neighbor_to_if[0][(next_hop, curr_sat)]
-                            )
-                    else:
-                        # Satellite can directly see the ground station
-                        # Count number of ISL interfaces for this satellite to find GSL interface
-                        num_isl_ifs = sum(1 for (a, b) in sat_neighbor_to_if[0].keys() if a == curr_sat)
-                        # Which GSL interface to use? GS_id maps to GSL interface index
-                        gsl_if_idx = gid_to_sat_gsl_if_idx[dst_gid]
-                        next_hop_decision = (
-                            dst_gs_node_id,
-                            num_isl_ifs + gsl_if_idx,  # My interface (satellite's GSL interface for this GS)
-                            0  # Next hop interface (ground station's GSL interface 0)
-                        )
-                
-                dist_satellite_to_ground_station[(curr_sat, dst_gs_node_id)] = distance_to_ground_station_m
+                next_hop_decision = fstate_decision_of(curr_sat, dst_gid)
                 
                 if not prev_fstate or prev_fstate.get((curr_sat, dst_gs_node_id)) != next_hop_decision:
                     f_out.write("%d,%d,%d,%d,%d\n" % (
@@ -692,32 +902,7 @@ def calculate_anchor_lmsr_path_complete_forwarding(
                 if src_gid != dst_gid:
                     src_gs_node_id = num_satellites + src_gid
                     dst_gs_node_id = num_satellites + dst_gid
-                    
-                    possible_src_sats = ground_station_satellites_in_range_candidates[0][src_gid]
-                    
-                    possibilities = []
-                    for gsl_distance, src_sat in possible_src_sats:
-                        sat_to_dst_distance = dist_satellite_to_ground_station.get(
-                            (src_sat, dst_gs_node_id), float('inf')
-                        )
-                        
-                        if not math.isinf(sat_to_dst_distance):
-                            possibilities.append((gsl_distance + sat_to_dst_distance, src_sat))
-                    
-                    possibilities = sorted(possibilities)
-                    
-                    next_hop_decision = (-1, -1, -1)
-                    if possibilities:
-                        _, src_sat = possibilities[0]
-                        # The satellite's GSL interface comes after all its ISL interfaces
-                        # Count number of ISL interfaces for this satellite
-                        num_isl_ifs = sum(1 for (a, b) in sat_neighbor_to_if[0].keys() if a == src_sat)
-                        sat_gsl_if_id = num_isl_ifs
-                        next_hop_decision = (
-                            src_sat,  # Next hop satellite
-                            0,  # My interface (ground station's GSL interface 0)
-                            sat_gsl_if_id  # Next hop interface (satellite's GSL interface)
-                        )
+                    next_hop_decision = fstate_decision_of(src_gs_node_id, dst_gid)
                     
                     if not prev_fstate or prev_fstate.get((src_gs_node_id, dst_gs_node_id)) != next_hop_decision:
                         f_out.write("%d,%d,%d,%d,%d\n" % (
@@ -731,6 +916,9 @@ def calculate_anchor_lmsr_path_complete_forwarding(
         num_sat_to_gs = sum(1 for (src, dst) in fstate.keys() if src < num_satellites and dst >= num_satellites)
         num_gs_to_gs = sum(1 for (src, dst) in fstate.keys() if src >= num_satellites and dst >= num_satellites)
         print(f"    Satellite-to-GS: {num_sat_to_gs}, GS-to-GS: {num_gs_to_gs}")
+        if decision_cache is not None:
+            print(f"    Satellite-to-GS decisions calculated: {decision_cache.num_calculated}, "
+                  f"reused: {decision_cache.num_reused}")
     
     return fstate, anchor_data_by_timestep[1:]
 
@@ -817,10 +1005,6 @@ def calculate_path_delay_sequence(path, sat_net_graphs, weight='weight'):
     return delays, True
 
 
-# Global cache for k-shortest paths across all timesteps (sliding window)
-# Key: (src, dst, absolute_timestep) -> [path1, path2, path3]
-_global_k_paths_cache = {}
-
 def calculate_lmsr(
         output_dynamic_state_dir,
         time_since_epoch_ns,
@@ -834,7 +1018,11 @@ def calculate_lmsr(
         prev_fstate,
         prev_dist_sat_nets_without_gs,
         enable_verbose_logs,
-        k_paths=3
+        k_paths=3,
+        shortest_path_backend=None,
+        demand_set=None,
+        k_paths_cache=None,
+        window_times_since_epoch_ns=None
 ):
     """
     LMSR (Low-jitter Multiple Slots Routing) with k-shortest paths and delay equalization.
@@ -850,11 +1038,19 @@ def calculate_lmsr(
        - For each timestep, pick candidate path closest to the anchor delay
        - This equalizes delays across the time horizon
     4. Use path_selection[current_timestep] to determine next hop
+
+    The k-shortest paths and the distances to the destination satellites are calculated by the
+    shortest path backend (name, instance, or None for the default; see get_shortest_path_backend()).
+
+    With a demand set (list of (source, destination) ground station pairs), only the entries along the paths
+    of its pairs are calculated: the k-shortest paths and distances of only the satellites along the way.
+
+    The k-shortest paths are kept in k_paths_cache (KShortestPathsCache, carried across timesteps by the
+    router) under the absolute time of each timestep of the window (window_times_since_epoch_ns, required
+    with a cache), such that only those of the newest timestep are calculated. Without a cache, they are only
+    kept during this call.
     """
     
-    print(f"  > ENTERED calculate_lmsr function")
-    print(f"  > enable_verbose_logs={enable_verbose_logs}")
-    
     if enable_verbose_logs:
         print(f"  > LMSR: Computing {k_paths}-shortest paths with jitter equalization across time")
         print(f"  > Graph type check: {type(sat_net_graph_only_satellites_with_isls)}")
@@ -864,18 +1060,38 @@ def calculate_lmsr(
     # Validate input
     if not isinstance(sat_net_graph_only_satellites_with_isls, list):
         raise ValueError(f"Expected list of graphs, got {type(sat_net_graph_only_satellites_with_isls)}")
+
+    # The backend calculates on graph snapshots, the path delays are looked up in an nx.Graph
+    backend = get_shortest_path_backend(shortest_path_backend)
+    sat_net_snapshots_only_satellites_with_isls = [
+        as_graph_snapshot(graph) for graph in sat_net_graph_only_satellites_with_isls
+    ]
+    sat_net_graph_only_satellites_with_isls = [
+        graph.to_networkx() if isinstance(graph, GraphSnapshot) else graph
+        for graph in sat_net_graph_only_satellites_with_isls
+    ]
     
     num_timesteps = len(sat_net_graph_only_satellites_with_isls)
     current_timestep_idx = 0
     fstate = {}
     
-    # Calculate absolute timestep (in seconds since epoch)
-    current_absolute_timestep = time_since_epoch_ns // 1000000000
+    # Absolute time of each timestep of the window (in nanoseconds since epoch), the k-paths of the timesteps
+    # before the window are no longer needed. A cache carried across calls is keyed by these times, hence
+    # they must be given; a cache of only this call merely needs a distinct key per timestep.
+    if k_paths_cache is None:
+        k_paths_cache = KShortestPathsCache()
+        if window_times_since_epoch_ns is None:
+            window_times_since_epoch_ns = [time_since_epoch_ns + t for t in range(num_timesteps)]
+    elif window_times_since_epoch_ns is None:
+        raise ValueError("The time of each timestep of the window is required with a k-paths cache")
+    if len(window_times_since_epoch_ns) != num_timesteps:
+        raise ValueError("Expected the time of each of the %d timesteps of the window" % num_timesteps)
+    k_paths_cache.evict_before(window_times_since_epoch_ns[0])
     
     if enable_verbose_logs:
         print(f"  > Validated: {num_timesteps} graph objects in lookahead window")
-        print(f"  > Current absolute timestep: {current_absolute_timestep}")
-        print(f"  > Global k-paths cache size: {len(_global_k_paths_cache)} entries")
+        print(f"  > Current time: {window_times_since_epoch_ns[0]} ns")
+        print(f"  > K-paths cache size: {len(k_paths_cache)} entries")
     
     # OPTIMIZATION: Sliding window cache for k-shortest paths
     # Only compute paths for timesteps not already in global cache
@@ -892,29 +1108,24 @@ def calculate_lmsr(
     
     # Compute paths only for new timesteps (sliding window approach)
     new_computations = 0
-    cache_hits = 0
     
-    for t in range(num_timesteps):
-        absolute_t = current_absolute_timestep + t
-        
-        for src in range(num_satellites):
-            for dst in unique_dst_satellites:
-                if src != dst:
-                    cache_key = (src, dst, absolute_t)
-                    
-                    if cache_key not in _global_k_paths_cache:
-                        # Cache miss - compute and store
-                        _global_k_paths_cache[cache_key] = find_k_shortest_paths(
-                            sat_net_graph_only_satellites_with_isls[t],
-                            src, dst, k=k_paths
-                        )
-                        new_computations += 1
-                    else:
-                        cache_hits += 1
+    # With a demand set, the k-shortest paths are only calculated along its paths (on a cache miss, see below)
+    if demand_set is None:
+        for t in range(num_timesteps):
+            missing_pairs = k_paths_cache.missing_pairs(
+                window_times_since_epoch_ns[t],
+                ((src, dst) for src in range(num_satellites) for dst in unique_dst_satellites if src != dst)
+            )
+
+            # Cache misses - compute (all of this timestep at once) and store
+            if missing_pairs:
+                k_paths_lists = backend.k_shortest_paths(sat_net_graph_only_satellites_with_isls[t], missing_pairs, k_paths)
+                for (src, dst), k_paths_list in zip(missing_pairs, k_paths_lists):
+                    k_paths_cache.put(window_times_since_epoch_ns[t], src, dst, k_paths_list)
+                new_computations += len(missing_pairs)
     
     if enable_verbose_logs:
-        print(f"  > K-paths cache: {cache_hits} hits, {new_computations} new computations")
-        print(f"  > Global cache now contains {len(_global_k_paths_cache)} path sets")
+        print(f"  > K-paths cache: {new_computations} new computations, {k_paths_cache.stats()}")
     
     # Progress tracking
     current_timestep_seconds = time_since_epoch_ns // 1000000000
@@ -926,246 +1137,291 @@ def calculate_lmsr(
     if enable_verbose_logs:
         print(f"  > Computing satellite-to-ground-station forwarding entries...")
     
-    sat_progress = 0
-    for curr in range(num_satellites):
-        # Progress indicator after each satellite (disabled for cleaner output)
-        # if enable_verbose_logs:
-        #     print(f"    Processing satellite {curr}/{num_satellites} ({100*curr//num_satellites}%)")
-        for dst_gid in range(num_ground_stations):
-            dst_node_id = num_satellites + dst_gid
-            
-            # Find satellites in range at current timestep
-            dst_sats_in_range = ground_station_satellites_in_range_candidates[current_timestep_idx][dst_gid]
-            
-            if not dst_sats_in_range:
+    # Shortest path distances from every satellite (tree rooted at the satellite, as nx.shortest_path_length),
+    # with a demand set only from the satellites along its paths (when first needed)
+    dist_from_sat = None
+    if demand_set is None:
+        dist_from_sat, _ = backend.shortest_path_trees(
+            sat_net_snapshots_only_satellites_with_isls[current_timestep_idx], list(range(num_satellites))
+        )
+    dist_from_path_sat = {}
+
+    def distances_from(curr):
+        """Shortest path distances (V) from a satellite"""
+        if dist_from_sat is not None:
+            return dist_from_sat[:, curr]
+        if curr not in dist_from_path_sat:
+            dist_from_path_sat[curr] = backend.shortest_path_trees(
+                sat_net_snapshots_only_satellites_with_isls[current_timestep_idx], [curr]
+            )[0][:, 0]
+        return dist_from_path_sat[curr]
+
+    def k_paths_at(src, dst, t):
+        """k-shortest paths between two satellites at a timestep of the window (from the cache, else calculated)"""
+        if src == dst:
+            return []
+        paths = k_paths_cache.get(window_times_since_epoch_ns[t], src, dst)
+        if paths is None:
+            paths = backend.k_shortest_paths(sat_net_graph_only_satellites_with_isls[t], [(src, dst)], k_paths)[0]
+            k_paths_cache.put(window_times_since_epoch_ns[t], src, dst, paths)
+        return paths
+
+    def route_sat_to_gs(curr, dst_gid):
+        """Forwarding entry of a satellite towards a ground station (and the reverse entries along its path)"""
+        curr_distances = distances_from(curr)
+        dst_node_id = num_satellites + dst_gid
+        
+        # Find satellites in range at current timestep
+        dst_sats_in_range = ground_station_satellites_in_range_candidates[current_timestep_idx][dst_gid]
+        
+        if not dst_sats_in_range:
+            return
+        
+        # Find best destination satellite
+        best_dst_sat = None
+        best_initial_dist = float('inf')
+        
+        for sat_distance, sat_id in dst_sats_in_range:
+            sat_dist = float(curr_distances[sat_id])
+            if math.isinf(sat_dist):
                 continue
+            total_dist = sat_dist + sat_distance
+            if total_dist < best_initial_dist:
+                best_initial_dist = total_dist
+                best_dst_sat = sat_id
+        
+        if best_dst_sat is None or curr == best_dst_sat:
+            if curr == best_dst_sat:
+                my_if_idx = num_isls_per_sat[current_timestep_idx][curr] + gid_to_sat_gsl_if_idx[dst_gid]
+                # Forward: satellite directly to GS
+                fstate[(curr, dst_node_id)] = (dst_node_id, my_if_idx, 0)
+                # Reverse: GS directly back to satellite
+                fstate[(dst_node_id, curr)] = (curr, 0, my_if_idx)
+            return
+        
+        # For each timestep, find k-shortest paths and their delays
+        # timestep_candidates[t] = [(path, delay), ...]
+        timestep_candidates = []
+        
+        # Debug output for first satellite
+        if enable_verbose_logs and curr == 0:
+            print(f"      Satellite 0 → GS {dst_gid}: Using precomputed k-shortest paths (instant lookup)")
+        
+        for t in range(num_timesteps):
+            # Use sliding window cache with absolute timesteps
+            k_paths_list = k_paths_at(curr, best_dst_sat, t)
             
-            # Find best destination satellite
-            best_dst_sat = None
-            best_initial_dist = float('inf')
-            
-            for sat_distance, sat_id in dst_sats_in_range:
-                try:
-                    sat_dist = nx.shortest_path_length(
-                        sat_net_graph_only_satellites_with_isls[current_timestep_idx],
-                        curr, sat_id, weight='weight'
-                    )
-                    total_dist = sat_dist + sat_distance
-                    if total_dist < best_initial_dist:
-                        best_initial_dist = total_dist
-                        best_dst_sat = sat_id
-                except nx.NetworkXNoPath:
+            # Calculate delay for each path at this timestep
+            candidates = []
+            for path in k_paths_list:
+                if len(path) < 2:
                     continue
+                # Calculate delay of this path at timestep t
+                delay = 0.0
+                valid = True
+                for i in range(len(path) - 1):
+                    if not sat_net_graph_only_satellites_with_isls[t].has_edge(path[i], path[i+1]):
+                        valid = False
+                        break
+                    delay += sat_net_graph_only_satellites_with_isls[t][path[i]][path[i+1]].get('weight', 1.0)
+                
+                if valid:
+                    candidates.append((path, delay))
             
-            if best_dst_sat is None or curr == best_dst_sat:
-                if curr == best_dst_sat:
-                    my_if_idx = num_isls_per_sat[current_timestep_idx][curr] + gid_to_sat_gsl_if_idx[dst_gid]
-                    # Forward: satellite directly to GS
-                    fstate[(curr, dst_node_id)] = (dst_node_id, my_if_idx, 0)
-                    # Reverse: GS directly back to satellite
-                    fstate[(dst_node_id, curr)] = (curr, 0, my_if_idx)
-                continue
+            timestep_candidates.append(candidates)
+        
+        # Check if we have candidates at all timesteps
+        if not all(timestep_candidates):
+            return
+        
+        # JITTER MINIMIZATION ALGORITHM:
+        # 1. Find the timestep with the maximum of minimum delays (the "anchor")
+        min_delays_per_timestep = [min(delay for _, delay in candidates) for candidates in timestep_candidates]
+        anchor_timestep = min_delays_per_timestep.index(max(min_delays_per_timestep))
+        anchor_delay = min_delays_per_timestep[anchor_timestep]
+        
+        # 2. For each timestep, select the path whose delay is closest to anchor_delay
+        selected_paths = []
+        for t, candidates in enumerate(timestep_candidates):
+            best_path = None
+            best_diff = float('inf')
+            for path, delay in candidates:
+                diff = abs(delay - anchor_delay)
+                if diff < best_diff:
+                    best_diff = diff
+                    best_path = path
+            selected_paths.append(best_path)
+        
+        # 3. Use the selected path at current timestep for forwarding
+        current_path = selected_paths[current_timestep_idx]
+        if current_path and len(current_path) >= 2:
+            next_hop = current_path[1]
+            my_if_idx = sat_neighbor_to_if[current_timestep_idx][(curr, next_hop)]
+            # Forward route: satellite -> ground station
+            fstate[(curr, dst_node_id)] = (next_hop, my_if_idx, sat_neighbor_to_if[current_timestep_idx][(next_hop, curr)])
+            
+            # Reverse routes: each satellite on the path needs to know how to route BACK to the source satellite
+            # Path is: curr -> sat1 -> sat2 -> ... -> satN -> GS
+            # Reverse: GS -> satN (done below), satN -> ... -> sat2 -> sat1 -> curr
             
-            # For each timestep, find k-shortest paths and their delays
-            # timestep_candidates[t] = [(path, delay), ...]
-            timestep_candidates = []
+            # GS to last satellite on path
+            last_sat = current_path[-1]  # Last satellite before GS
+            gsl_if_idx = num_isls_per_sat[current_timestep_idx][last_sat] + gid_to_sat_gsl_if_idx[dst_gid]
+            fstate[(dst_node_id, curr)] = (last_sat, 0, gsl_if_idx)  # GS interface is always 0
             
-            # Debug output for first satellite
-            if enable_verbose_logs and curr == 0:
-                print(f"      Satellite 0 → GS {dst_gid}: Using precomputed k-shortest paths (instant lookup)")
+            # Each satellite on the path routes back toward curr
+            for i in range(len(current_path) - 1, 0, -1):
+                from_sat = current_path[i]  # Current position on reverse path
+                to_sat = current_path[i - 1]  # Next hop toward curr
+                my_if_idx = sat_neighbor_to_if[current_timestep_idx][(from_sat, to_sat)]
+                their_if_idx = sat_neighbor_to_if[current_timestep_idx][(to_sat, from_sat)]
+                # Each satellite routes TO the original source satellite (curr)
+                fstate[(from_sat, curr)] = (to_sat, my_if_idx, their_if_idx)
+
+    def route_gs_to_gs(src_gid, dst_gid):
+        """Forwarding entry of a ground station towards another ground station"""
+        src_node_id = num_satellites + src_gid
+        dst_node_id = num_satellites + dst_gid
+        
+        # Find satellites in range at current timestep
+        src_sats_in_range = ground_station_satellites_in_range_candidates[current_timestep_idx][src_gid]
+        dst_sats_in_range = ground_station_satellites_in_range_candidates[current_timestep_idx][dst_gid]
+        
+        # If either GS has no coverage, create a placeholder route
+        # ns-3 requires all routes to exist even if they won't be used
+        if not src_sats_in_range:
+            # No satellites in range of source GS - create placeholder to sat 0
+            # Packets sent will be dropped but ns-3 won't crash during initialization
+            fstate[(src_node_id, dst_node_id)] = (0, 0, 4)  # Route via sat 0
+            return
             
-            for t in range(num_timesteps):
-                # Use sliding window cache with absolute timesteps
-                absolute_t = current_absolute_timestep + t
-                cache_key = (curr, best_dst_sat, absolute_t)
-                k_paths_list = _global_k_paths_cache.get(cache_key, [])
+        if not dst_sats_in_range:
+            # Source has coverage but dest doesn't - route to closest satellite from source
+            # The packet will reach the satellite but destination GS is unreachable
+            best_src_sat = src_sats_in_range[0][1]  # Closest satellite to src
+            fstate[(src_node_id, dst_node_id)] = (
+                best_src_sat, 0,
+                num_isls_per_sat[current_timestep_idx][best_src_sat] + gid_to_sat_gsl_if_idx[src_gid]
+            )
+            return
+        
+        # Find best (src_sat, dst_sat) pair using LMSR jitter minimization
+        best_src_sat = None
+        best_jitter = float('inf')
+        
+        for src_sat_dist, src_sat in src_sats_in_range[:k_paths]:
+            for dst_sat_dist, dst_sat in dst_sats_in_range[:k_paths]:
+                # Check cache for this satellite pair (bidirectional)
+                cache_key = tuple(sorted([src_sat, dst_sat]))
                 
-                # Calculate delay for each path at this timestep
-                candidates = []
-                for path in k_paths_list:
-                    if len(path) < 2:
+                if cache_key in sat_pair_cache:
+                    jitter = sat_pair_cache[cache_key]
+                else:
+                    # For each timestep, find k-shortest paths between satellites
+                    timestep_candidates = []
+                    
+                    for t in range(num_timesteps):
+                        # Use sliding window cache with absolute timesteps
+                        k_paths_list = k_paths_at(src_sat, dst_sat, t)
+                        
+                        candidates = []
+                        for path in k_paths_list:
+                            if len(path) < 2:
+                                continue
+                            delay = 0.0
+                            valid = True
+                            for i in range(len(path) - 1):
+                                if not sat_net_graph_only_satellites_with_isls[t].has_edge(path[i], path[i+1]):
+                                    valid = False
+                                    break
+                                delay += sat_net_graph_only_satellites_with_isls[t][path[i]][path[i+1]].get('weight', 1.0)
+                            
+                            if valid:
+                                candidates.append((path, delay))
+                        
+                        timestep_candidates.append(candidates)
+                    
+                    # Check if we have candidates at all timesteps
+                    if not all(timestep_candidates):
                         continue
-                    # Calculate delay of this path at timestep t
-                    delay = 0.0
-                    valid = True
-                    for i in range(len(path) - 1):
-                        if not sat_net_graph_only_satellites_with_isls[t].has_edge(path[i], path[i+1]):
-                            valid = False
-                            break
-                        delay += sat_net_graph_only_satellites_with_isls[t][path[i]][path[i+1]].get('weight', 1.0)
                     
-                    if valid:
-                        candidates.append((path, delay))
+                    # Apply jitter minimization
+                    min_delays = [min(delay for _, delay in candidates) for candidates in timestep_candidates]
+                    anchor_timestep = min_delays.index(max(min_delays))
+                    anchor_delay = min_delays[anchor_timestep]
+                    
+                    # Select paths to equalize delays
+                    selected_delays = []
+                    for candidates in timestep_candidates:
+                        best_delay = min(candidates, key=lambda x: abs(x[1] - anchor_delay))[1]
+                        selected_delays.append(best_delay)
+                    
+                    # Calculate jitter after path selection
+                    jitter = max(selected_delays) - min(selected_delays)
+                    
+                    # Cache the result (bidirectional)
+                    sat_pair_cache[cache_key] = jitter
                 
-                timestep_candidates.append(candidates)
-            
-            # Check if we have candidates at all timesteps
-            if not all(timestep_candidates):
-                continue
-            
-            # JITTER MINIMIZATION ALGORITHM:
-            # 1. Find the timestep with the maximum of minimum delays (the "anchor")
-            min_delays_per_timestep = [min(delay for _, delay in candidates) for candidates in timestep_candidates]
-            anchor_timestep = min_delays_per_timestep.index(max(min_delays_per_timestep))
-            anchor_delay = min_delays_per_timestep[anchor_timestep]
-            
-            # 2. For each timestep, select the path whose delay is closest to anchor_delay
-            selected_paths = []
-            for t, candidates in enumerate(timestep_candidates):
-                best_path = None
-                best_diff = float('inf')
-                for path, delay in candidates:
-                    diff = abs(delay - anchor_delay)
-                    if diff < best_diff:
-                        best_diff = diff
-                        best_path = path
-                selected_paths.append(best_path)
+                if jitter < best_jitter:
+                    best_jitter = jitter
+                    best_src_sat = src_sat
+        
+        # Set forwarding entry for GS→GS
+        if best_src_sat is not None:
+            # Forward route: src_gs → best_src_sat → ... → dst_gs
+            fstate[(src_node_id, dst_node_id)] = (
+                best_src_sat, 0,
+                num_isls_per_sat[current_timestep_idx][best_src_sat] + gid_to_sat_gsl_if_idx[src_gid]
+            )
             
-            # 3. Use the selected path at current timestep for forwarding
-            current_path = selected_paths[current_timestep_idx]
-            if current_path and len(current_path) >= 2:
-                next_hop = current_path[1]
-                my_if_idx = sat_neighbor_to_if[current_timestep_idx][(curr, next_hop)]
-                # Forward route: satellite -> ground station
-                fstate[(curr, dst_node_id)] = (next_hop, my_if_idx, sat_neighbor_to_if[current_timestep_idx][(next_hop, curr)])
-                
-                # Reverse routes: each satellite on the path needs to know how to route BACK to the source satellite
-                # Path is: curr -> sat1 -> sat2 -> ... -> satN -> GS
-                # Reverse: GS -> satN (done below), satN -> ... -> sat2 -> sat1 -> curr
-                
-                # GS to last satellite on path
-                last_sat = current_path[-1]  # Last satellite before GS
-                gsl_if_idx = num_isls_per_sat[current_timestep_idx][last_sat] + gid_to_sat_gsl_if_idx[dst_gid]
-                fstate[(dst_node_id, curr)] = (last_sat, 0, gsl_if_idx)  # GS interface is always 0
-                
-                # Each satellite on the path routes back toward curr
-                for i in range(len(current_path) - 1, 0, -1):
-                    from_sat = current_path[i]  # Current position on reverse path
-                    to_sat = current_path[i - 1]  # Next hop toward curr
-                    my_if_idx = sat_neighbor_to_if[current_timestep_idx][(from_sat, to_sat)]
-                    their_if_idx = sat_neighbor_to_if[current_timestep_idx][(to_sat, from_sat)]
-                    # Each satellite routes TO the original source satellite (curr)
-                    fstate[(from_sat, curr)] = (to_sat, my_if_idx, their_if_idx)
-    
-    #################################
-    # GROUND STATION TO GROUND STATION
-    #################################
-    
-    if enable_verbose_logs:
-        print(f"  > Computing ground-station-to-ground-station forwarding entries...")
-    
+            # We also need the reverse GS→GS route, but it will be computed 
+            # when we process dst_gid → src_gid, so no need to add it here
+            # (the loop will naturally create both directions)
+
     # Cache to reuse path computations: (sat_a, sat_b) -> (jitter, best_delays_per_timestep)
     # Since graph is undirected, (A,B) and (B,A) have same jitter
     sat_pair_cache = {}
     
-    for src_gid in range(num_ground_stations):
-        src_node_id = num_satellites + src_gid
+    if demand_set is None:
+    
+        for curr in range(num_satellites):
+            # Progress indicator after each satellite (disabled for cleaner output)
+            # if enable_verbose_logs:
+            #     print(f"    Processing satellite {curr}/{num_satellites} ({100*curr//num_satellites}%)")
+            for dst_gid in range(num_ground_stations):
+                route_sat_to_gs(curr, dst_gid)
+        
+        #################################
+        # GROUND STATION TO GROUND STATION
+        #################################
         
         if enable_verbose_logs:
-            print(f"    Processing GS {src_gid} → all destinations...")
+            print(f"  > Computing ground-station-to-ground-station forwarding entries...")
         
-        for dst_gid in range(num_ground_stations):
-            if src_gid == dst_gid:
-                continue
+        for src_gid in range(num_ground_stations):
+            if enable_verbose_logs:
+                print(f"    Processing GS {src_gid} → all destinations...")
             
+            for dst_gid in range(num_ground_stations):
+                if src_gid != dst_gid:
+                    route_gs_to_gs(src_gid, dst_gid)
+    else:
+        # Only along the paths of the demanded pairs: from the source ground station to its first satellite,
+        # then hop by hop (each satellite choosing its own path) until the destination ground station
+        if enable_verbose_logs:
+            print(f"  > Computing forwarding entries along the paths of {len(demand_set)} demanded pairs...")
+        routed = set()
+        for src_gid, dst_gid in demand_set:
             dst_node_id = num_satellites + dst_gid
-            
-            # Find satellites in range at current timestep
-            src_sats_in_range = ground_station_satellites_in_range_candidates[current_timestep_idx][src_gid]
-            dst_sats_in_range = ground_station_satellites_in_range_candidates[current_timestep_idx][dst_gid]
-            
-            # If either GS has no coverage, create a placeholder route
-            # ns-3 requires all routes to exist even if they won't be used
-            if not src_sats_in_range:
-                # No satellites in range of source GS - create placeholder to sat 0
-                # Packets sent will be dropped but ns-3 won't crash during initialization
-                fstate[(src_node_id, dst_node_id)] = (0, 0, 4)  # Route via sat 0
-                continue
-                
-            if not dst_sats_in_range:
-                # Source has coverage but dest doesn't - route to closest satellite from source
-                # The packet will reach the satellite but destination GS is unreachable
-                best_src_sat = src_sats_in_range[0][1]  # Closest satellite to src
-                fstate[(src_node_id, dst_node_id)] = (
-                    best_src_sat, 0,
-                    num_isls_per_sat[current_timestep_idx][best_src_sat] + gid_to_sat_gsl_if_idx[src_gid]
-                )
-                continue
-            
-            # Find best (src_sat, dst_sat) pair using LMSR jitter minimization
-            best_src_sat = None
-            best_jitter = float('inf')
-            
-            for src_sat_dist, src_sat in src_sats_in_range[:k_paths]:
-                for dst_sat_dist, dst_sat in dst_sats_in_range[:k_paths]:
-                    # Check cache for this satellite pair (bidirectional)
-                    cache_key = tuple(sorted([src_sat, dst_sat]))
-                    
-                    if cache_key in sat_pair_cache:
-                        jitter = sat_pair_cache[cache_key]
-                    else:
-                        # For each timestep, find k-shortest paths between satellites
-                        timestep_candidates = []
-                        
-                        for t in range(num_timesteps):
-                            # Use sliding window cache with absolute timesteps
-                            absolute_t = current_absolute_timestep + t
-                            cache_key = (src_sat, dst_sat, absolute_t)
-                            k_paths_list = _global_k_paths_cache.get(cache_key, [])
-                            
-                            candidates = []
-                            for path in k_paths_list:
-                                if len(path) < 2:
-                                    continue
-                                delay = 0.0
-                                valid = True
-                                for i in range(len(path) - 1):
-                                    if not sat_net_graph_only_satellites_with_isls[t].has_edge(path[i], path[i+1]):
-                                        valid = False
-                                        break
-                                    delay += sat_net_graph_only_satellites_with_isls[t][path[i]][path[i+1]].get('weight', 1.0)
-                                
-                                if valid:
-                                    candidates.append((path, delay))
-                            
-                            timestep_candidates.append(candidates)
-                        
-                        # Check if we have candidates at all timesteps
-                        if not all(timestep_candidates):
-                            continue
-                        
-                        # Apply jitter minimization
-                        min_delays = [min(delay for _, delay in candidates) for candidates in timestep_candidates]
-                        anchor_timestep = min_delays.index(max(min_delays))
-                        anchor_delay = min_delays[anchor_timestep]
-                        
-                        # Select paths to equalize delays
-                        selected_delays = []
-                        for candidates in timestep_candidates:
-                            best_delay = min(candidates, key=lambda x: abs(x[1] - anchor_delay))[1]
-                            selected_delays.append(best_delay)
-                        
-                        # Calculate jitter after path selection
-                        jitter = max(selected_delays) - min(selected_delays)
-                        
-                        # Cache the result (bidirectional)
-                        sat_pair_cache[cache_key] = jitter
-                    
-                    if jitter < best_jitter:
-                        best_jitter = jitter
-                        best_src_sat = src_sat
-            
-            # Set forwarding entry for GS→GS
-            if best_src_sat is not None:
-                # Forward route: src_gs → best_src_sat → ... → dst_gs
-                fstate[(src_node_id, dst_node_id)] = (
-                    best_src_sat, 0,
-                    num_isls_per_sat[current_timestep_idx][best_src_sat] + gid_to_sat_gsl_if_idx[src_gid]
-                )
-                
-                # We also need the reverse GS→GS route, but it will be computed 
-                # when we process dst_gid → src_gid, so no need to add it here
-                # (the loop will naturally create both directions)
+            route_gs_to_gs(src_gid, dst_gid)
+            next_hop_decision = fstate.get((num_satellites + src_gid, dst_node_id))
+            while next_hop_decision is not None and next_hop_decision[0] < num_satellites:
+                curr = next_hop_decision[0]
+                if (curr, dst_gid) in routed:
+                    break
+                routed.add((curr, dst_gid))
+                route_sat_to_gs(curr, dst_gid)
+                next_hop_decision = fstate.get((curr, dst_node_id))
     
     # Write forwarding state to file
     output_filename = output_dynamic_state_dir + "/fstate_" + str(time_since_epoch_ns) + ".txt"
@@ -1176,7 +1432,7 @@ def calculate_lmsr(
         sat_to_gs_entries = sum(1 for (s, d) in fstate.keys() if s < num_satellites and d >= num_satellites)
         gs_to_gs_entries = sum(1 for (s, d) in fstate.keys() if s >= num_satellites and d >= num_satellites)
         print(f"    Sat→GS: {sat_to_gs_entries}, GS→GS: {gs_to_gs_entries}")
-        print(f"  > Global k-paths cache size: {len(_global_k_paths_cache)} path sets")
+        print(f"  > K-paths cache size: {len(k_paths_cache)} path sets ({k_paths_cache.num_bytes} bytes)")
         print(f"  > Timestep {current_timestep_seconds}s complete")
     
     with open(output_filename, "w+") as f_out:
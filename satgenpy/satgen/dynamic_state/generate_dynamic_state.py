@@ -21,10 +21,24 @@
 # SOFTWARE.
 
 from satgen.distance_tools import *
+from satgen.interfaces import InterfaceTable
+from satgen.tles import satellite_ephem_to_elements, satellite_ephem_from_elements
+from satgen.propagation import (
+    create_propagator,
+    read_ephemeris_cache,
+    CachedPropagator,
+    compute_window_geometry,
+    geometry_dtype
+)
 from astropy import units as u
+import functools
+import itertools
 import math
-import networkx as nx
 import numpy as np
+from .graph_snapshot import GraphSnapshot
+from .shortest_path_backends import get_shortest_path_backend
+from .demand_set import check_demand_set
+from .anchor_placement import ANCHOR_PLACEMENTS
 from .algorithm_free_one_only_gs_relays import algorithm_free_one_only_gs_relays
 from .algorithm_free_one_only_over_isls import algorithm_free_one_only_over_isls
 from .algorithm_paired_many_only_over_isls import algorithm_paired_many_only_over_isls
@@ -50,10 +64,64 @@ def generate_dynamic_state(
                                   # "algorithm_free_one_only_over_isls"
                                   # "algorithm_paired_many_only_over_isls"
                                   # "algorithm_jitter_minimized"
-        enable_verbose_logs
+        enable_verbose_logs,
+        propagation_engine="ephem",     # Options:
+                                        # "ephem" (per-pair distance computation)
+                                        # "sgp4" (batched propagation of all satellites)
+                                        # "analytic" (closed-form, circular drag-free constellations)
+        ephemeris_cache_filename=None,  # Ephemeris cache (on the same time grid) to read positions from
+        geometry_precision="float64",   # Options:
+                                        # "float64"
+                                        # "float32" (batched engines only, halves the geometry memory)
+        shortest_path_backend=None,     # Options (see get_shortest_path_backend()):
+                                        # None (the SATGEN_SHORTEST_PATH_BACKEND environment variable, else "scipy")
+                                        # "scipy", "networkx", "csr" (or any other registered backend)
+        num_workers=1,                  # Worker processes for the cold start of "algorithm_jitter_minimized"
+                                        # (the geometry and anchor data of its first lookahead window)
+        demand_set=None,                # (Source, destination) ground station identifier pairs to route, e.g.,
+                                        # the flows of an experiment: only the forwarding entries along their
+                                        # paths are calculated, all others drop (None: all pairs)
+        num_anchors=60,                 # Number of anchors of "algorithm_jitter_minimized"
+        anchor_placement="strided",     # Options (anchor placement of "algorithm_jitter_minimized"):
+                                        # "strided" (every (V / num_anchors)-th satellite identifier)
+                                        # "farthest_point" (k-center on ISL hop distance)
+                                        # "orbit_balanced" (the same number of anchors in every orbital plane)
+        anchor_reselection_interval=None,  # Time steps after which the anchors are placed again (None: never)
+        incremental_forwarding=False,   # Only calculate the forwarding decisions of "algorithm_jitter_minimized"
+                                        # whose inputs changed since the previous time step again
+        gs_relays_shortest_path_method="floyd_warshall"  # Options (next hops of "algorithm_free_one_only_gs_relays"):
+                                        # "floyd_warshall" (first neighbor promising the lowest all-pairs distance)
+                                        # "dijkstra" (reverse shortest path tree towards each ground station;
+                                        # can pick another next hop among paths of exactly equal length)
 ):
     if offset_ns % time_step_ns != 0:
         raise ValueError("Offset must be a multiple of time_step_ns")
+    if num_workers < 1:
+        raise ValueError("Number of worker processes must be at least one")
+    if anchor_placement not in ANCHOR_PLACEMENTS:
+        raise ValueError("Unknown anchor placement: " + str(anchor_placement))
+    if gs_relays_shortest_path_method not in ("floyd_warshall", "dijkstra"):
+        raise ValueError("Unknown shortest path method: " + str(gs_relays_shortest_path_method))
+    geometry_dtype(geometry_precision)  # Raises if the precision is unknown
+    shortest_path_backend = get_shortest_path_backend(shortest_path_backend)  # Raises if the backend is unknown
+    if demand_set is not None:
+        demand_set = check_demand_set(demand_set, len(ground_stations))
+    propagator = create_propagator(propagation_engine, epoch, satellites)
+    if propagator is None and geometry_precision != "float64":
+        raise ValueError("Single-precision geometry requires a batched propagation engine (e.g., \"sgp4\")")
+    if ephemeris_cache_filename is not None:
+        if propagator is None:
+            raise ValueError("The ephemeris cache requires a batched propagation engine (e.g., \"sgp4\")")
+        propagator = CachedPropagator(read_ephemeris_cache(ephemeris_cache_filename), time_step_ns, propagator)
+
+    # Satellites in range of the ground stations are tracked incrementally across time steps (batched engines only)
+    visibility_tracker = None
+    if propagator is not None:
+        visibility_tracker = GslVisibilityTracker(ground_station_positions_m(ground_stations), max_gsl_length_m)
+
+    # Interface identifiers do not change over time, so they are determined once for all time steps
+    interface_table = InterfaceTable(len(satellites), list_isls)
+
     prev_output = None
     i = 0
     total_iterations = int((simulation_end_time_ns - offset_ns) / time_step_ns)
@@ -79,7 +147,19 @@ def generate_dynamic_state(
             max_isl_length_m,
             dynamic_state_algorithm,
             prev_output,
-            enable_verbose_logs
+            enable_verbose_logs,
+            propagator,
+            visibility_tracker,
+            geometry_precision,
+            interface_table,
+            shortest_path_backend,
+            num_workers,
+            demand_set,
+            num_anchors,
+            anchor_placement,
+            anchor_reselection_interval,
+            incremental_forwarding,
+            gs_relays_shortest_path_method
         )
 
 
@@ -96,9 +176,25 @@ def generate_dynamic_state_at(
         max_isl_length_m,
         dynamic_state_algorithm,
         prev_output,
-        enable_verbose_logs
+        enable_verbose_logs,
+        propagator=None,
+        visibility_tracker=None,
+        geometry_precision="float64",
+        interface_table=None,
+        shortest_path_backend=None,
+        num_workers=1,
+        demand_set=None,
+        num_anchors=60,
+        anchor_placement="strided",
+        anchor_reselection_interval=None,
+        incremental_forwarding=False,
+        gs_relays_shortest_path_method="floyd_warshall"
 ):
 
+    # Interface identifiers (if not given, determined from the ISLs and GSL interface information)
+    if interface_table is None:
+        interface_table = InterfaceTable(len(satellites), list_isls)
+
     #
     # Call the dynamic state algorithm which:
     #
@@ -106,6 +202,14 @@ def generate_dynamic_state_at(
     # (b) Output the fstate_<t>.txt files
     #
 
+    # Window geometry generator bound to the propagator (for the lookahead algorithms, which keep their own window)
+    window_geometry_generator = functools.partial(
+        generate_window_geometry_at,
+        propagator=propagator,
+        visibility_tracker=visibility_tracker,
+        geometry_precision=geometry_precision
+    )
+
     # Algorithms that handle their own graph generation
     if dynamic_state_algorithm == "algorithm_jitter_minimized":
         return algorithm_jitter_minimized_lookahead(
@@ -121,7 +225,14 @@ def generate_dynamic_state_at(
             list_isls,
             max_gsl_length_m,
             max_isl_length_m,
-            generate_graph_state_at,
+            window_geometry_generator,
+            interface_table,
+            num_workers,
+            demand_set,
+            num_anchors,
+            anchor_placement,
+            anchor_reselection_interval,
+            incremental_forwarding
         )
 
     elif dynamic_state_algorithm == "algorithm_lmsr":
@@ -139,16 +250,14 @@ def generate_dynamic_state_at(
             list_isls,
             max_gsl_length_m,
             max_isl_length_m,
-            generate_graph_state_at,
+            window_geometry_generator,
+            interface_table,
+            shortest_path_backend,
+            demand_set
         )
 
     # Generate the current network graph
-    (
-        sat_net_graph_only_satellites_with_isls,
-        sat_net_graph_all_with_only_gsls,
-        ground_station_satellites_in_range,
-        num_isls_per_sat, sat_neighbor_to_if
-    ) = generate_graph_state_at(
+    graph_state = generate_graph_state_at(
         epoch,
         time_since_epoch_ns,
         satellites,
@@ -157,8 +266,17 @@ def generate_dynamic_state_at(
         list_gsl_interfaces_info,
         max_gsl_length_m,
         max_isl_length_m,
-        enable_verbose_logs
-    ).values()
+        enable_verbose_logs,
+        propagator,
+        visibility_tracker=visibility_tracker,
+        geometry_precision=geometry_precision,
+        interface_table=interface_table
+    )
+    sat_net_graph_only_satellites_with_isls = graph_state["sat_net_graph_only_satellites_with_isls"]
+    sat_net_graph_all_with_only_gsls = graph_state["sat_net_graph_all_with_only_gsls"]
+    ground_station_satellites_in_range = graph_state["ground_station_satellites_in_range"]
+    num_isls_per_sat = interface_table.num_isls_per_sat
+    sat_neighbor_to_if = interface_table.sat_neighbor_to_if
 
     if dynamic_state_algorithm == "algorithm_free_one_only_over_isls":
 
@@ -173,7 +291,9 @@ def generate_dynamic_state_at(
             sat_neighbor_to_if,
             list_gsl_interfaces_info,
             prev_output,
-            enable_verbose_logs
+            enable_verbose_logs,
+            shortest_path_backend,
+            demand_set
         )
 
     elif dynamic_state_algorithm == "algorithm_free_gs_one_sat_many_only_over_isls":
@@ -189,7 +309,9 @@ def generate_dynamic_state_at(
             sat_neighbor_to_if,
             list_gsl_interfaces_info,
             prev_output,
-            enable_verbose_logs
+            enable_verbose_logs,
+            shortest_path_backend,
+            demand_set
         )
 
     elif dynamic_state_algorithm == "algorithm_free_one_only_gs_relays":
@@ -203,7 +325,10 @@ def generate_dynamic_state_at(
             num_isls_per_sat,
             list_gsl_interfaces_info,
             prev_output,
-            enable_verbose_logs
+            enable_verbose_logs,
+            shortest_path_backend,
+            demand_set,
+            gs_relays_shortest_path_method
         )
 
     elif dynamic_state_algorithm == "algorithm_paired_many_only_over_isls":
@@ -219,7 +344,9 @@ def generate_dynamic_state_at(
             sat_neighbor_to_if,
             list_gsl_interfaces_info,
             prev_output,
-            enable_verbose_logs
+            enable_verbose_logs,
+            shortest_path_backend,
+            demand_set
         )
 
     else:
@@ -235,7 +362,30 @@ def generate_graph_state_at(
         list_gsl_interfaces_info,
         max_gsl_length_m,
         max_isl_length_m,
-        enable_verbose_logs):
+        enable_verbose_logs,
+        propagator=None,
+        geometry=None,
+        visibility_tracker=None,
+        geometry_precision="float64",
+        interface_table=None):
+    """
+    Generate the network graphs at a time instant.
+
+    Both graphs are GraphSnapshot (CSR arrays with a networkx-compatible adapter), built at once
+    from the edge arrays rather than adding nodes and edges one by one to an nx.Graph.
+
+    If a propagator is given, the positions of all satellites are computed at once
+    and all ISL and GSL distances are derived from them using numpy. Otherwise, each
+    distance is computed individually using ephem.
+
+    :param geometry:            Pre-computed geometry of this time instant (optional), dictionary with
+                                "isl_distances_m" (E,) and "ground_station_satellites_in_range"
+                                (see generate_graph_states_at)
+    :param visibility_tracker:  GSL visibility tracker carried across time steps (optional, batched propagation only)
+    :param geometry_precision:  Precision of the batched geometry ("float64" or "float32")
+    :param interface_table:     Interface identifiers (optional, InterfaceTable built once for all time steps;
+                                num_isls_per_sat and sat_neighbor_to_if of the graph state are its shared views)
+    """
     if enable_verbose_logs:
         print("FORWARDING STATE AT T = " + (str(time_since_epoch_ns))
               + "ns (= " + str(time_since_epoch_ns / 1e9) + " seconds)")
@@ -245,23 +395,26 @@ def generate_graph_state_at(
     if enable_verbose_logs:
         print("\nBASIC INFORMATION")
 
-    # Time
-    time = epoch + time_since_epoch_ns * u.ns
+    # Time (converted once to a numeric ephem date, which is passed to every ephem distance computation)
+    epoch_date = ephem_date(epoch)
+    date = ephem_date_at(epoch_date, time_since_epoch_ns)
     if enable_verbose_logs:
         print("  > Epoch.................. " + str(epoch))
         print("  > Time since epoch....... " + str(time_since_epoch_ns) + " ns")
-        print("  > Absolute time.......... " + str(time))
+        print("  > Absolute time.......... " + str(epoch + time_since_epoch_ns * u.ns))
 
-    # Graphs
-    sat_net_graph_only_satellites_with_isls = nx.Graph()
-    sat_net_graph_all_with_only_gsls = nx.Graph()
+    # Geometry of all satellites at once (if batched propagation is used)
+    if geometry is None and propagator is not None:
+        window_geometry = compute_window_geometry(
+            propagator, [time_since_epoch_ns], list_isls, ground_station_positions_m(ground_stations), max_gsl_length_m,
+            visibility_tracker, geometry_precision
+        )
+        geometry = {
+            "isl_distances_m": window_geometry["isl_distances_m"][0],
+            "ground_station_satellites_in_range": window_geometry["ground_station_satellites_in_range"][0]
+        }
 
     # Information
-    for i in range(len(satellites)):
-        sat_net_graph_only_satellites_with_isls.add_node(i)
-        sat_net_graph_all_with_only_gsls.add_node(i)
-    for i in range(len(satellites) + len(ground_stations)):
-        sat_net_graph_all_with_only_gsls.add_node(i)
     if enable_verbose_logs:
         print("  > Satellites............. " + str(len(satellites)))
         print("  > Ground stations........ " + str(len(ground_stations)))
@@ -273,17 +426,24 @@ def generate_graph_state_at(
     if enable_verbose_logs:
         print("\nISL INFORMATION")
 
+    # Interface mapping of ISLs (does not change over time)
+    if interface_table is None:
+        interface_table = InterfaceTable(len(satellites), list_isls)
+    num_isls_per_sat = interface_table.num_isls_per_sat
+    sat_neighbor_to_if = interface_table.sat_neighbor_to_if
+
     # ISL edges
-    total_num_isls = 0
-    num_isls_per_sat = [0] * len(satellites)
-    sat_neighbor_to_if = {}
-    for (a, b) in list_isls:
+    isl_distances_m = []
+    for isl_idx, (a, b) in enumerate(list_isls):
 
         # ISLs are not permitted to exceed their maximum distance
         # TODO: Technically, they can (could just be ignored by forwarding state calculation),
         # TODO: but practically, defining a permanent ISL between two satellites which
         # TODO: can go out of distance is generally unwanted
-        sat_distance_m = distance_m_between_satellites(satellites[a], satellites[b], str(epoch), str(time))
+        if geometry is not None:
+            sat_distance_m = float(geometry["isl_distances_m"][isl_idx])
+        else:
+            sat_distance_m = distance_m_between_satellites(satellites[a], satellites[b], epoch_date, date)
         if sat_distance_m > max_isl_length_m:
             raise ValueError(
                 "The distance between two satellites (%d and %d) "
@@ -291,17 +451,11 @@ def generate_graph_state_at(
                 % (a, b, sat_distance_m, max_isl_length_m, time_since_epoch_ns)
             )
 
-        # Add to networkx graph
-        sat_net_graph_only_satellites_with_isls.add_edge(
-            a, b, weight=sat_distance_m
-        )
+        # Edge weight of the graph
+        isl_distances_m.append(sat_distance_m)
 
-        # Interface mapping of ISLs
-        sat_neighbor_to_if[(a, b)] = num_isls_per_sat[a]
-        sat_neighbor_to_if[(b, a)] = num_isls_per_sat[b]
-        num_isls_per_sat[a] += 1
-        num_isls_per_sat[b] += 1
-        total_num_isls += 1
+    # Graph with only the satellites and their ISLs
+    sat_net_graph_only_satellites_with_isls = GraphSnapshot.from_edges(len(satellites), list_isls, isl_distances_m)
 
     if enable_verbose_logs:
         print("  > Total ISLs............. " + str(len(list_isls)))
@@ -332,26 +486,37 @@ def generate_graph_state_at(
     if enable_verbose_logs:
         print("\nGSL IN-RANGE INFORMATION")
 
-    # What satellites can a ground station see
+    # What satellites can a ground station see (if batched propagation is used,
+    # these were already found using a spatial index as part of the geometry)
     ground_station_satellites_in_range = []
+    gsl_edges = []
+    gsl_distances_m = []
     for ground_station in ground_stations:
         # Find satellites in range
         satellites_in_range = []
-        for sid in range(len(satellites)):
-            distance_m = distance_m_ground_station_to_satellite(
-                ground_station,
-                satellites[sid],
-                str(epoch),
-                str(time)
-            )
-            if distance_m <= max_gsl_length_m:
-                satellites_in_range.append((distance_m, sid))
-                sat_net_graph_all_with_only_gsls.add_edge(
-                    sid, len(satellites) + ground_station["gid"], weight=distance_m
+        if geometry is not None:
+            satellites_in_range = geometry["ground_station_satellites_in_range"][ground_station["gid"]]
+        else:
+            for sid in range(len(satellites)):
+                distance_m = distance_m_ground_station_to_satellite(
+                    ground_station,
+                    satellites[sid],
+                    epoch_date,
+                    date
                 )
+                if distance_m <= max_gsl_length_m:
+                    satellites_in_range.append((distance_m, sid))
+        for (distance_m, sid) in satellites_in_range:
+            gsl_edges.append((sid, len(satellites) + ground_station["gid"]))
+            gsl_distances_m.append(distance_m)
 
         ground_station_satellites_in_range.append(satellites_in_range)
 
+    # Graph with all nodes and only the GSLs
+    sat_net_graph_all_with_only_gsls = GraphSnapshot.from_edges(
+        len(satellites) + len(ground_stations), gsl_edges, gsl_distances_m
+    )
+
     # Print how many are in range
     ground_station_num_in_range = list(map(lambda x: len(x), ground_station_satellites_in_range))
     if enable_verbose_logs:
@@ -364,4 +529,191 @@ def generate_graph_state_at(
             'sat_net_graph_all_with_only_gsls': sat_net_graph_all_with_only_gsls,
             'ground_station_satellites_in_range': ground_station_satellites_in_range,
             'num_isls_per_sat': num_isls_per_sat,
-            'sat_neighbor_to_if': sat_neighbor_to_if, }
+            'sat_neighbor_to_if': sat_neighbor_to_if,
+            'interface_table': interface_table, }
+
+
+def generate_graph_states_at(
+        epoch,
+        times_since_epoch_ns,
+        satellites,
+        ground_stations,
+        list_isls,
+        list_gsl_interfaces_info,
+        max_gsl_length_m,
+        max_isl_length_m,
+        enable_verbose_logs,
+        propagator=None,
+        visibility_tracker=None,
+        geometry_precision="float64",
+        interface_table=None):
+    """
+    Generate the network graphs at multiple time instants (e.g., a lookahead window).
+
+    If a propagator is given, the geometry of the entire window (stacked (T, E) ISL lengths
+    and the satellites in range of each ground station) is computed in a single batched call,
+    after which only the graphs are built per time instant.
+
+    :param visibility_tracker:  GSL visibility tracker carried across time steps (optional, batched propagation only)
+    :param geometry_precision:  Precision of the batched geometry ("float64" or "float32")
+
+    :param interface_table:     Interface identifiers (optional, built once for the window if not given)
+
+    :return: List (T) of network graph states (as returned by generate_graph_state_at)
+    """
+    if interface_table is None:
+        interface_table = InterfaceTable(len(satellites), list_isls)
+    window_geometry = None
+    if propagator is not None and len(times_since_epoch_ns) > 0:
+        window_geometry = compute_window_geometry(
+            propagator, times_since_epoch_ns, list_isls, ground_station_positions_m(ground_stations), max_gsl_length_m,
+            visibility_tracker, geometry_precision
+        )
+    graph_states = []
+    for i, time_since_epoch_ns in enumerate(times_since_epoch_ns):
+        geometry = None
+        if window_geometry is not None:
+            geometry = {
+                "isl_distances_m": window_geometry["isl_distances_m"][i],
+                "ground_station_satellites_in_range": window_geometry["ground_station_satellites_in_range"][i]
+            }
+        graph_states.append(generate_graph_state_at(
+            epoch,
+            time_since_epoch_ns,
+            satellites,
+            ground_stations,
+            list_isls,
+            list_gsl_interfaces_info,
+            max_gsl_length_m,
+            max_isl_length_m,
+            enable_verbose_logs,
+            propagator,
+            geometry,
+            interface_table=interface_table
+        ))
+    return graph_states
+
+
+def generate_window_geometry_at(
+        epoch,
+        times_since_epoch_ns,
+        satellites,
+        ground_stations,
+        list_isls,
+        list_gsl_interfaces_info,
+        max_gsl_length_m,
+        max_isl_length_m,
+        enable_verbose_logs,
+        propagator=None,
+        visibility_tracker=None,
+        geometry_precision="float64",
+        process_pool=None):
+    """
+    Generate only the geometry of multiple time instants (e.g., a lookahead window): the ISL lengths
+    and the satellites in range of each ground station, without building any graph. The ISL topology
+    and interface numbering do not change over time, so a LookaheadWindow builds them only once
+    and stores this geometry per time instant.
+
+    Takes the same arguments as generate_graph_states_at (list_gsl_interfaces_info is not needed).
+
+    :param visibility_tracker:  GSL visibility tracker carried across time steps (optional, batched propagation only)
+    :param geometry_precision:  Precision of the batched geometry ("float64" or "float32")
+    :param process_pool:        Executor (e.g., concurrent.futures.ProcessPoolExecutor) to compute the time instants
+                                in parallel (optional, per-pair ephem computation only: a batched propagation
+                                computes all time instants in one call already)
+
+    :return: Dictionary with:
+             "isl_distances_m": numpy array (T, E) of ISL lengths in meters
+                                (geometry precision if batched, else float64)
+             "ground_station_satellites_in_range": list (T) of lists (G) of in-range (distance_m, sid)
+    """
+    if propagator is not None and len(times_since_epoch_ns) > 0:
+        window_geometry = compute_window_geometry(
+            propagator, times_since_epoch_ns, list_isls, ground_station_positions_m(ground_stations), max_gsl_length_m,
+            visibility_tracker, geometry_precision
+        )
+        isl_distances_m = window_geometry["isl_distances_m"]
+        ground_station_satellites_in_range = window_geometry["ground_station_satellites_in_range"]
+
+    elif process_pool is not None and len(times_since_epoch_ns) > 1:
+
+        # Each time instant in a worker (ephem satellites cannot be pickled, so their orbital elements are sent)
+        satellite_elements = [satellite_ephem_to_elements(satellite) for satellite in satellites]
+        window_geometries = list(process_pool.map(
+            generate_window_geometry_from_elements,
+            itertools.repeat(epoch),
+            [[time_since_epoch_ns] for time_since_epoch_ns in times_since_epoch_ns],
+            itertools.repeat(satellite_elements),
+            itertools.repeat(ground_stations),
+            itertools.repeat(list_isls),
+            itertools.repeat(max_gsl_length_m),
+            itertools.repeat(max_isl_length_m)
+        ))
+        isl_distances_m = np.concatenate([g["isl_distances_m"] for g in window_geometries])
+        ground_station_satellites_in_range = [g["ground_station_satellites_in_range"][0] for g in window_geometries]
+
+    else:
+
+        # Each distance individually using ephem (as generate_graph_state_at does without propagator)
+        epoch_date = ephem_date(epoch)
+        isl_distances_m = np.zeros((len(times_since_epoch_ns), len(list_isls)))
+        ground_station_satellites_in_range = []
+        for i, time_since_epoch_ns in enumerate(times_since_epoch_ns):
+            date = ephem_date_at(epoch_date, time_since_epoch_ns)
+            for isl_idx, (a, b) in enumerate(list_isls):
+                isl_distances_m[i, isl_idx] = distance_m_between_satellites(
+                    satellites[a], satellites[b], epoch_date, date
+                )
+            ground_station_satellites_in_range.append([])
+            for ground_station in ground_stations:
+                satellites_in_range = []
+                for sid in range(len(satellites)):
+                    distance_m = distance_m_ground_station_to_satellite(
+                        ground_station, satellites[sid], epoch_date, date
+                    )
+                    if distance_m <= max_gsl_length_m:
+                        satellites_in_range.append((distance_m, sid))
+                ground_station_satellites_in_range[i].append(satellites_in_range)
+
+    # ISLs are not permitted to exceed their maximum distance (the first violation is reported)
+    too_long = np.argwhere(isl_distances_m > max_isl_length_m)
+    if len(too_long) > 0:
+        time_idx, isl_idx = too_long[0]
+        raise ValueError(
+            "The distance between two satellites (%d and %d) "
+            "with an ISL exceeded the maximum ISL length (%.2fm > %.2fm at t=%dns)"
+            % (list_isls[isl_idx][0], list_isls[isl_idx][1], float(isl_distances_m[time_idx, isl_idx]),
+               max_isl_length_m, times_since_epoch_ns[time_idx])
+        )
+
+    if enable_verbose_logs:
+        print("  > Generated geometry of %d time instants (%d ISLs, %d ground stations)"
+              % (len(times_since_epoch_ns), len(list_isls), len(ground_stations)))
+
+    return {
+        "isl_distances_m": isl_distances_m,
+        "ground_station_satellites_in_range": ground_station_satellites_in_range
+    }
+
+
+def generate_window_geometry_from_elements(
+        epoch,
+        times_since_epoch_ns,
+        satellite_elements,
+        ground_stations,
+        list_isls,
+        max_gsl_length_m,
+        max_isl_length_m):
+    """
+    generate_window_geometry_at (per-pair ephem computation) for satellites given as orbital elements,
+    such that it can run in a worker process.
+
+    :param satellite_elements:  List of orbital elements of the satellites (see satellite_ephem_to_elements)
+
+    :return: Geometry (as returned by generate_window_geometry_at)
+    """
+    satellites = [satellite_ephem_from_elements(elements) for elements in satellite_elements]
+    return generate_window_geometry_at(
+        epoch, times_since_epoch_ns, satellites, ground_stations, list_isls, None, max_gsl_length_m,
+        max_isl_length_m, False
+    )
@@ -0,0 +1,296 @@
+import networkx as nx
+import numpy as np
+
+
+class GraphSnapshot:
+    """
+    Undirected weighted network graph of a single time step in compressed sparse row (CSR) form.
+
+    The neighbors of node u are indices[indptr[u]:indptr[u + 1]] with the edge weights (distance in meters)
+    weights[indptr[u]:indptr[u + 1]]. Every undirected edge is stored in both directions. The neighbors of
+    each node are in the order in which its edges were given, which is the same order in which networkx
+    iterates them had the edges been added one by one to an nx.Graph (such that tie-breaking among equal
+    distance next hops is unchanged).
+
+    The fstate calculations run directly on the arrays. For existing callers, a thin networkx-compatible
+    adapter is provided (number_of_nodes(), nodes(), neighbors(u), degree(u), has_edge(u, v), edges[(u, v)],
+    edges(data="weight"), graph[u][v], get_edge_data(u, v)), and to_networkx() converts it to an nx.Graph.
+    """
+
+    def __init__(self, num_nodes, indptr, indices, weights):
+        self.num_nodes = num_nodes
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int64)
+        self.weights = np.asarray(weights, dtype=np.float64)
+        if len(self.indptr) != num_nodes + 1:
+            raise ValueError("Index pointer must have one more entry than there are nodes")
+        if len(self.indices) != len(self.weights) or self.indptr[-1] != len(self.indices):
+            raise ValueError("Indices and weights must both have an entry for every directed edge")
+        self._adjacency = None
+
+    @classmethod
+    def from_edges(cls, num_nodes, edges, weights):
+        """
+        Build a graph snapshot from a list of undirected edges.
+
+        :param num_nodes:   Number of nodes (node identifiers are 0 to num_nodes - 1)
+        :param edges:       List or numpy array (E, 2) of undirected edges (a, b), each given once
+        :param weights:     List or numpy array (E,) of edge weights
+
+        :return: Graph snapshot
+        """
+        edges = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+        weights = np.asarray(weights, dtype=np.float64)
+        if len(weights) != len(edges):
+            raise ValueError("There must be exactly one weight per edge")
+        if np.any(edges[:, 0] == edges[:, 1]):
+            raise ValueError("Graph cannot contain self-loops")
+        if len(edges) > 0 and (np.min(edges) < 0 or np.max(edges) >= num_nodes):
+            raise ValueError("Edge endpoint is not a node of the graph")
+
+        # Both directions of edge k are entries 2k (a -> b) and 2k + 1 (b -> a), such that
+        # a stable sort on the source node keeps the edges of each node in the given order
+        sources = edges.ravel()
+        targets = edges[:, ::-1].ravel()
+        order = np.argsort(sources, kind="stable")
+        indptr = np.zeros(num_nodes + 1, dtype=np.int64)
+        np.cumsum(np.bincount(sources, minlength=num_nodes), out=indptr[1:])
+        return cls(num_nodes, indptr, targets[order], np.repeat(weights, 2)[order])
+
+    @classmethod
+    def from_networkx(cls, graph, weight="weight"):
+        """
+        Build a graph snapshot from an undirected nx.Graph whose nodes are 0 to n - 1.
+
+        :param graph:   nx.Graph
+        :param weight:  Edge attribute holding the weight (1.0 if an edge does not have it)
+
+        :return: Graph snapshot
+        """
+        num_nodes = graph.number_of_nodes()
+        if set(graph.nodes()) != set(range(num_nodes)):
+            raise ValueError("Graph nodes must be 0 to %d" % (num_nodes - 1))
+        indptr = np.zeros(num_nodes + 1, dtype=np.int64)
+        indices = []
+        weights = []
+        for u in range(num_nodes):
+            for v, data in graph.adj[u].items():
+                indices.append(v)
+                weights.append(data.get(weight, 1.0))
+            indptr[u + 1] = len(indices)
+        return cls(num_nodes, indptr, indices, weights)
+
+    def to_networkx(self):
+        """
+        Convert to an nx.Graph (with the same neighbor order).
+
+        :return: nx.Graph with edge attribute "weight"
+        """
+        # Undirected edge of each CSR entry
+        sources = np.repeat(np.arange(self.num_nodes), np.diff(self.indptr))
+        keys = np.minimum(sources, self.indices) * self.num_nodes + np.maximum(sources, self.indices)
+        unique_keys, edge_of_entry = np.unique(keys, return_inverse=True)
+        edge_of_entry = edge_of_entry.ravel().tolist()
+
+        # Adding the edges one by one yields the neighbor order of every node only if the edges are added
+        # in an order consistent with all of them: a topological order of "consecutive neighbors" constraints
+        successors = [[] for _ in range(len(unique_keys))]
+        num_predecessors = [0] * len(unique_keys)
+        indptr = self.indptr.tolist()
+        for u in range(self.num_nodes):
+            for k in range(indptr[u], indptr[u + 1] - 1):
+                successors[edge_of_entry[k]].append(edge_of_entry[k + 1])
+                num_predecessors[edge_of_entry[k + 1]] += 1
+        ready = [e for e in range(len(unique_keys)) if num_predecessors[e] == 0]
+        edge_order = []
+        while ready:
+            e = ready.pop()
+            edge_order.append(e)
+            for f in successors[e]:
+                num_predecessors[f] -= 1
+                if num_predecessors[f] == 0:
+                    ready.append(f)
+
+        adjacency = self._adjacency_lists()
+        graph = nx.Graph()
+        graph.add_nodes_from(range(self.num_nodes))
+        for e in edge_order:
+            u, v = divmod(int(unique_keys[e]), self.num_nodes)
+            graph.add_edge(u, v, weight=adjacency[u][v])
+        return graph
+
+    def to_scipy_sparse(self):
+        """
+        :return: scipy.sparse.csr_matrix (V, V) of the edge weights (sharing the arrays)
+        """
+        from scipy.sparse import csr_matrix
+        return csr_matrix((self.weights, self.indices, self.indptr), shape=(self.num_nodes, self.num_nodes))
+
+    def floyd_warshall(self):
+        """
+        All-pairs shortest path distances using the compiled Floyd-Warshall of scipy on the CSR arrays.
+
+        It relaxes dist[i, j] with dist[i, k] + dist[k, j] for k in node order, exactly as
+        nx.floyd_warshall_numpy does, hence the distances are bit-for-bit the same.
+
+        :return: Numpy array (V, V) of shortest path distances (inf if unreachable)
+        """
+        from scipy.sparse.csgraph import floyd_warshall
+        return floyd_warshall(self.to_scipy_sparse(), directed=True)
+
+    def shortest_path_distances_to(self, targets):
+        """
+        Shortest path distances of every node to only the given target nodes, using the compiled Dijkstra
+        of scipy from each target (the graph is undirected, so the distance from a target is the distance
+        to it). This is O(k E log V) for k targets instead of the O(V^3) of all-pairs Floyd-Warshall.
+
+        The distances are equal to those of floyd_warshall() up to floating point rounding, as the edge
+        weights of a path are summed in a different order.
+
+        :param targets:     List of target node identifiers
+
+        :return: Numpy array (V, k) of which column i holds the distances to targets[i] (inf if unreachable)
+        """
+        return self.shortest_path_trees_to(targets)[0]
+
+    def shortest_path_trees_to(self, targets):
+        """
+        Shortest path trees towards the given target nodes: a single-source Dijkstra from each target
+        (in reverse, which for an undirected graph is the same), whose predecessor of a node is the
+        next hop of that node on its shortest path to the target.
+
+        :param targets:     List of target node identifiers
+
+        :return: (distances, next_hops), both numpy arrays (V, k): column i holds the distances to targets[i]
+                 (inf if unreachable) and the next hops towards targets[i] (-1 for targets[i] itself and
+                 if unreachable)
+        """
+        from scipy.sparse.csgraph import dijkstra
+        targets = np.asarray(targets, dtype=np.int64)
+        if len(targets) == 0:
+            return np.zeros((self.num_nodes, 0)), np.zeros((self.num_nodes, 0), dtype=np.int64)
+        if np.min(targets) < 0 or np.max(targets) >= self.num_nodes:
+            raise ValueError("Target is not a node of the graph")
+        distances, predecessors = dijkstra(
+            self.to_scipy_sparse(), directed=True, indices=targets, return_predecessors=True
+        )
+        return distances.T, np.maximum(predecessors.T, -1).astype(np.int64)
+
+    def padded_neighbors(self):
+        """
+        Neighbors of every node as rectangular arrays (V, D), D being the maximum degree (at least 1), in
+        neighbor order.
+        Beyond the degree of a node, the neighbor is num_nodes and the entry is len(indices), such that
+        arrays indexed by node or by entry can be extended by one padding element (e.g., inf).
+
+        :return: (neighbors, entries), both numpy arrays (V, D), entries being the CSR entry indices
+        """
+        degrees = np.diff(self.indptr)
+        max_degree = max(1, int(np.max(degrees, initial=0)))
+        slots = np.arange(max_degree)
+        is_neighbor = slots[None, :] < degrees[:, None]
+        entries = np.where(is_neighbor, self.indptr[:-1, None] + slots[None, :], len(self.indices))
+        neighbors = np.append(self.indices, self.num_nodes)[entries]
+        return neighbors, entries
+
+    def _adjacency_lists(self):
+        """
+        Per node a dictionary of neighbor to weight (in neighbor order), built once on first use by the adapter.
+        """
+        if self._adjacency is None:
+            indptr = self.indptr.tolist()
+            indices = self.indices.tolist()
+            weights = self.weights.tolist()
+            self._adjacency = [
+                dict(zip(indices[indptr[u]:indptr[u + 1]], weights[indptr[u]:indptr[u + 1]]))
+                for u in range(self.num_nodes)
+            ]
+        return self._adjacency
+
+    # networkx-compatible adapter
+
+    def number_of_nodes(self):
+        return self.num_nodes
+
+    def number_of_edges(self):
+        return len(self.indices) // 2
+
+    def nodes(self):
+        return range(self.num_nodes)
+
+    def neighbors(self, u):
+        return iter(self._adjacency_lists()[u])
+
+    def degree(self, u):
+        return int(self.indptr[u + 1] - self.indptr[u])
+
+    def has_edge(self, u, v):
+        return 0 <= u < self.num_nodes and v in self._adjacency_lists()[u]
+
+    def get_edge_data(self, u, v, default=None):
+        if not self.has_edge(u, v):
+            return default
+        return {"weight": self._adjacency_lists()[u][v]}
+
+    def __getitem__(self, u):
+        return {v: {"weight": w} for v, w in self._adjacency_lists()[u].items()}
+
+    def __contains__(self, u):
+        return u in range(self.num_nodes)
+
+    def __len__(self):
+        return self.num_nodes
+
+    @property
+    def edges(self):
+        return _GraphSnapshotEdgeView(self)
+
+
+class _GraphSnapshotEdgeView:
+    """
+    Edges of a graph snapshot, as edges[(u, v)]["weight"] and edges(data="weight") like networkx.
+    """
+
+    def __init__(self, snapshot):
+        self.snapshot = snapshot
+
+    def __getitem__(self, edge):
+        u, v = edge
+        data = self.snapshot.get_edge_data(u, v)
+        if data is None:
+            raise KeyError("The edge %s-%s is not in the graph" % (u, v))
+        return data
+
+    def __call__(self, data=False):
+        return list(self._iterate(data))
+
+    def __iter__(self):
+        return self._iterate(False)
+
+    def __len__(self):
+        return self.snapshot.number_of_edges()
+
+    def _iterate(self, data):
+        # Each undirected edge once, from its lowest node (as networkx does for nodes 0 to n - 1)
+        for u, neighbors in enumerate(self.snapshot._adjacency_lists()):
+            for v, w in neighbors.items():
+                if v >= u:
+                    if data is False:
+                        yield u, v
+                    elif data is True:
+                        yield u, v, {"weight": w}
+                    else:
+                        yield u, v, (w if data == "weight" else None)
+
+
+def as_graph_snapshot(graph):
+    """
+    Graph snapshot of a graph, which is either already one or an nx.Graph (converted).
+
+    :param graph:   GraphSnapshot or nx.Graph (with nodes 0 to n - 1)
+
+    :return: Graph snapshot
+    """
+    if isinstance(graph, GraphSnapshot):
+        return graph
+    return GraphSnapshot.from_networkx(graph)
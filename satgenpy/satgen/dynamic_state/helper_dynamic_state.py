@@ -24,6 +24,7 @@ from satgen.isls import *
 from satgen.ground_stations import *
 from satgen.tles import *
 from satgen.interfaces import *
+from satgen.propagation import ephemeris_cache_filename, load_or_generate_ephemeris_cache
 from .generate_dynamic_state import generate_dynamic_state
 import os
 import math
@@ -46,7 +47,18 @@ def worker(args):
         max_gsl_length_m,
         max_isl_length_m,
         dynamic_state_algorithm,
-        print_logs
+        print_logs,
+        propagation_engine,
+        filename_ephemeris_cache,
+        geometry_precision,
+        shortest_path_backend,
+        num_workers,
+        demand_set,
+        num_anchors,
+        anchor_placement,
+        anchor_reselection_interval,
+        incremental_forwarding,
+        gs_relays_shortest_path_method
      ) = args
 
     # Generate dynamic state
@@ -67,13 +79,28 @@ def worker(args):
                                   # "algorithm_free_one_only_over_isls"
                                   # "algorithm_free_gs_one_sat_many_only_over_isls"
                                   # "algorithm_paired_many_only_over_isls"
-        print_logs
+        print_logs,
+        propagation_engine,
+        filename_ephemeris_cache,
+        geometry_precision,
+        shortest_path_backend,
+        num_workers,
+        demand_set,
+        num_anchors,
+        anchor_placement,
+        anchor_reselection_interval,
+        incremental_forwarding,
+        gs_relays_shortest_path_method
     )
 
 
 def help_dynamic_state(
         output_generated_data_dir, num_threads, name, time_step_ms, duration_s,
-        max_gsl_length_m, max_isl_length_m, dynamic_state_algorithm, print_logs
+        max_gsl_length_m, max_isl_length_m, dynamic_state_algorithm, print_logs,
+        propagation_engine="ephem", use_ephemeris_cache=False, geometry_precision="float64",
+        shortest_path_backend=None, num_workers=1, demand_set=None,
+        num_anchors=60, anchor_placement="strided", anchor_reselection_interval=None,
+        incremental_forwarding=False, gs_relays_shortest_path_method="floyd_warshall"
 ):
 
     # Directory
@@ -86,6 +113,17 @@ def help_dynamic_state(
     simulation_end_time_ns = duration_s * 1000 * 1000 * 1000
     time_step_ns = time_step_ms * 1000 * 1000
 
+    # Ephemeris cache (generated once before the threads start, after which it is only read)
+    filename_ephemeris_cache = None
+    if use_ephemeris_cache:
+        satellite_network_dir = output_generated_data_dir + "/" + name
+        load_or_generate_ephemeris_cache(
+            satellite_network_dir, time_step_ns, simulation_end_time_ns, propagation_engine, geometry_precision
+        )
+        filename_ephemeris_cache = ephemeris_cache_filename(
+            satellite_network_dir, time_step_ns, simulation_end_time_ns, propagation_engine, geometry_precision
+        )
+
     num_calculations = math.floor(simulation_end_time_ns / time_step_ns)
     calculations_per_thread = int(math.floor(float(num_calculations) / float(num_threads)))
     num_threads_with_one_more = num_calculations % num_threads
@@ -132,7 +170,18 @@ def help_dynamic_state(
             max_gsl_length_m,
             max_isl_length_m,
             dynamic_state_algorithm,
-            print_logs
+            print_logs,
+            propagation_engine,
+            filename_ephemeris_cache,
+            geometry_precision,
+            shortest_path_backend,
+            num_workers,
+            demand_set,
+            num_anchors,
+            anchor_placement,
+            anchor_reselection_interval,
+            incremental_forwarding,
+            gs_relays_shortest_path_method
         ))
 
         current += num_time_steps
@@ -0,0 +1,99 @@
+import sys
+
+
+class KShortestPathsCache:
+    """
+    k-shortest paths between satellite pairs of the time steps of a lookahead window (as used by LMSR,
+    see calculate_lmsr()), kept across time steps as the window moves forward.
+
+    Entries are keyed by the absolute time step (time since epoch in nanoseconds) and the (source, target)
+    satellite pair. Once a time step falls behind the window, its entries are evicted, so memory is bounded
+    by the number of time steps of the window.
+
+    Counters: hits and misses (lookups which found or did not find the paths), evictions (entries removed)
+    and bytes (size of the lists holding the paths of all entries, see path_list_bytes()).
+    """
+
+    def __init__(self):
+        self.entries = {}  # Time since epoch (ns) -> (source, target) -> list of paths
+        self.num_hits = 0
+        self.num_misses = 0
+        self.num_evictions = 0
+        self.num_bytes = 0
+
+    def get(self, time_since_epoch_ns, source, target):
+        """
+        :param time_since_epoch_ns: Time step (time since epoch in nanoseconds)
+        :param source:              Source satellite
+        :param target:              Target satellite
+
+        :return: List of paths, or None if not in the cache
+        """
+        paths = self.entries.get(time_since_epoch_ns, {}).get((source, target))
+        if paths is None:
+            self.num_misses += 1
+        else:
+            self.num_hits += 1
+        return paths
+
+    def missing_pairs(self, time_since_epoch_ns, pairs):
+        """
+        :param time_since_epoch_ns: Time step (time since epoch in nanoseconds)
+        :param pairs:               Iterable of (source, target) satellite pairs
+
+        :return: List of the pairs whose paths are not in the cache
+        """
+        at_time = self.entries.get(time_since_epoch_ns, {})
+        pairs = list(pairs)
+        missing = [pair for pair in pairs if pair not in at_time]
+        self.num_misses += len(missing)
+        self.num_hits += len(pairs) - len(missing)
+        return missing
+
+    def put(self, time_since_epoch_ns, source, target, paths):
+        """
+        :param time_since_epoch_ns: Time step (time since epoch in nanoseconds)
+        :param source:              Source satellite
+        :param target:              Target satellite
+        :param paths:               List of paths (each a list of satellites)
+        """
+        at_time = self.entries.setdefault(time_since_epoch_ns, {})
+        if (source, target) in at_time:
+            self.num_bytes -= path_list_bytes(at_time[(source, target)])
+        at_time[(source, target)] = paths
+        self.num_bytes += path_list_bytes(paths)
+
+    def evict_before(self, time_since_epoch_ns):
+        """
+        Evict the entries of the time steps before a time step (e.g., the first of the window).
+
+        :param time_since_epoch_ns: Time step (time since epoch in nanoseconds)
+        """
+        for t in [t for t in self.entries if t < time_since_epoch_ns]:
+            at_time = self.entries.pop(t)
+            self.num_evictions += len(at_time)
+            self.num_bytes -= sum(path_list_bytes(paths) for paths in at_time.values())
+
+    def __len__(self):
+        return sum(len(at_time) for at_time in self.entries.values())
+
+    def stats(self):
+        """
+        :return: Dictionary of the counters and the current number of entries
+        """
+        return {
+            "hits": self.num_hits,
+            "misses": self.num_misses,
+            "evictions": self.num_evictions,
+            "entries": len(self),
+            "bytes": self.num_bytes
+        }
+
+
+def path_list_bytes(paths):
+    """
+    :param paths:   List of paths (each a list of satellites)
+
+    :return: Size in bytes of the lists (the satellite identifiers themselves are shared integers)
+    """
+    return sys.getsizeof(paths) + sum(sys.getsizeof(path) for path in paths)
@@ -0,0 +1,115 @@
+import numpy as np
+from satgen.interfaces import InterfaceTable
+from .graph_snapshot import GraphSnapshot
+
+
+class LookaheadWindow:
+    """
+    Network states of a lookahead window of consecutive time steps, with the static and the dynamic part split.
+
+    The ISLs (list_isls) do not change during a run, so the ISL topology (CSR index pointer and neighbor
+    indices), the number of ISLs per satellite and the ISL interface numbering are built once. Per time step,
+    only the ISL lengths (a weight vector in ISL order) and the satellites in range of each ground station are
+    stored, in a ring buffer of lookahead_steps slots. Advancing the window overwrites the oldest slot with the
+    weights of the new time step, so memory does not scale with the number of graphs held.
+
+    Index i (0 <= i < lookahead_steps) refers to the i-th time step of the window, 0 being the current one.
+    """
+
+    def __init__(self, num_satellites, list_isls, lookahead_steps, weight_dtype=np.float64, interface_table=None):
+        if lookahead_steps < 1:
+            raise ValueError("Lookahead window must contain at least one time step")
+        self.num_satellites = num_satellites
+        self.num_isls = len(list_isls)
+        self.lookahead_steps = lookahead_steps
+
+        # Static ISL topology: the CSR entries of each satellite and the ISL of each entry (its weight index)
+        topology = GraphSnapshot.from_edges(num_satellites, list_isls, np.arange(len(list_isls)))
+        self.indptr = topology.indptr
+        self.indices = topology.indices
+        self.isl_of_entry = topology.weights.astype(np.int64)
+
+        # Static interface numbering of the ISLs (if not given, determined from the ISLs only)
+        if interface_table is None:
+            interface_table = InterfaceTable(num_satellites, list_isls)
+        self.interface_table = interface_table
+        self.num_isls_per_sat = interface_table.num_isls_per_sat
+        self.sat_neighbor_to_if = interface_table.sat_neighbor_to_if
+
+        # Dynamic part (ring buffer): slot (start + i) % lookahead_steps holds the i-th time step
+        self.start = 0
+        self.num_filled = 0
+        self.times_since_epoch_ns = [None] * lookahead_steps
+        self.isl_distances_m = np.zeros((lookahead_steps, self.num_isls), dtype=weight_dtype)
+        self.ground_station_satellites_in_range = [None] * lookahead_steps
+
+    def push(self, time_since_epoch_ns, isl_distances_m, ground_station_satellites_in_range):
+        """
+        Append the next time step to the window. Once the window is full, this replaces
+        its oldest time step (the window moves one time step forward).
+
+        :param time_since_epoch_ns:                 Time since epoch in nanoseconds
+        :param isl_distances_m:                     Numpy array (E,) of ISL lengths in meters (in list_isls order)
+        :param ground_station_satellites_in_range:  List (G) of lists of in-range (distance_m, sid)
+        """
+        if len(isl_distances_m) != self.num_isls:
+            raise ValueError("There must be exactly one ISL length per ISL")
+        if self.num_filled < self.lookahead_steps:
+            slot = (self.start + self.num_filled) % self.lookahead_steps
+            self.num_filled += 1
+        else:
+            slot = self.start
+            self.start = (self.start + 1) % self.lookahead_steps
+        self.times_since_epoch_ns[slot] = time_since_epoch_ns
+        self.isl_distances_m[slot] = isl_distances_m
+        self.ground_station_satellites_in_range[slot] = ground_station_satellites_in_range
+
+    def push_window_geometry(self, times_since_epoch_ns, window_geometry):
+        """
+        Append multiple time steps to the window.
+
+        :param times_since_epoch_ns:    List (T) of times since epoch in nanoseconds
+        :param window_geometry:         Geometry of these time steps (as returned by generate_window_geometry_at)
+        """
+        for i, time_since_epoch_ns in enumerate(times_since_epoch_ns):
+            self.push(
+                time_since_epoch_ns,
+                window_geometry["isl_distances_m"][i],
+                window_geometry["ground_station_satellites_in_range"][i]
+            )
+
+    def slot(self, i):
+        """
+        :param i:   Index in the window (0 is the current time step)
+
+        :return: Ring buffer slot of the i-th time step
+        """
+        if not 0 <= i < self.num_filled:
+            raise ValueError("Time step %d is not in the lookahead window (of %d time steps)" % (i, self.num_filled))
+        return (self.start + i) % self.lookahead_steps
+
+    def time_since_epoch_ns_at(self, i):
+        return self.times_since_epoch_ns[self.slot(i)]
+
+    def isl_graph_at(self, i):
+        """
+        Graph with only the satellites and their ISLs at the i-th time step, which shares the
+        static topology arrays and gathers its edge weights from the stored weight vector.
+
+        :param i:   Index in the window (0 is the current time step)
+
+        :return: GraphSnapshot (as sat_net_graph_only_satellites_with_isls of generate_graph_state_at)
+        """
+        weights = self.isl_distances_m[self.slot(i)].astype(np.float64)[self.isl_of_entry]
+        return GraphSnapshot(self.num_satellites, self.indptr, self.indices, weights)
+
+    def ground_station_satellites_in_range_at(self, i):
+        """
+        :param i:   Index in the window (0 is the current time step)
+
+        :return: List (G) of lists of in-range (distance_m, sid) at the i-th time step
+        """
+        return self.ground_station_satellites_in_range[self.slot(i)]
+
+    def __len__(self):
+        return self.num_filled
@@ -0,0 +1,219 @@
+import abc
+import heapq
+import os
+import networkx as nx
+import numpy as np
+from .csr_k_shortest_paths import CsrKShortestPaths
+from .graph_snapshot import GraphSnapshot, as_graph_snapshot
+
+# Environment variable selecting the shortest path backend if none is given explicitly
+SHORTEST_PATH_BACKEND_ENVIRONMENT_VARIABLE = "SATGEN_SHORTEST_PATH_BACKEND"
+DEFAULT_SHORTEST_PATH_BACKEND = "scipy"
+
+
+class ShortestPathBackend(abc.ABC):
+    """
+    Shortest path calculations on the network graph of a time step, behind a common interface such that
+    the implementation can be chosen per run:
+
+    - all_pairs_distances(graph):                   all-pairs shortest path distances (V, V)
+    - shortest_path_trees(graph, roots):            shortest path trees towards (i.e., from, the graph being
+                                                    undirected) each root, as (distances, next_hops) (V, k)
+    - k_shortest_paths(graph, pairs, k):            up to k shortest loopless paths for each (source, target)
+
+    The graph is a GraphSnapshot or an nx.Graph (with nodes 0 to n - 1); each backend converts it to the
+    form it needs. All backends yield the same shortest path distances (up to floating point rounding),
+    but can differ in which of several paths of exactly equal length they pick.
+
+    By default, k_shortest_paths() is Yen's algorithm on networkx (find_k_shortest_paths()); the scipy and
+    csr backends run it on the CSR arrays instead (CsrKShortestPaths), which yields exactly the same paths.
+    A backend must implement all_pairs_distances() and shortest_path_trees() (else it cannot be instantiated).
+    """
+
+    name = None
+
+    @abc.abstractmethod
+    def all_pairs_distances(self, graph):
+        """
+        :param graph:   GraphSnapshot or nx.Graph
+
+        :return: Numpy array (V, V) of shortest path distances (inf if unreachable)
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def shortest_path_trees(self, graph, roots):
+        """
+        :param graph:   GraphSnapshot or nx.Graph
+        :param roots:   List of root (target) node identifiers
+
+        :return: (distances, next_hops), both numpy arrays (V, k): column i holds the distances to roots[i]
+                 (inf if unreachable) and the next hops towards roots[i] (-1 for roots[i] itself and if
+                 unreachable), as GraphSnapshot.shortest_path_trees_to(roots)
+        """
+        raise NotImplementedError
+
+    def k_shortest_paths(self, graph, pairs, k):
+        """
+        :param graph:   GraphSnapshot or nx.Graph
+        :param pairs:   List of (source, target)
+        :param k:       Maximum number of paths per pair
+
+        :return: List (one per pair) of lists of up to k paths (each a list of node identifiers),
+                 shortest first (empty if the target is unreachable)
+        """
+        from .fstate_calculation import find_k_shortest_paths
+        graph = graph.to_networkx() if isinstance(graph, GraphSnapshot) else graph
+        return [find_k_shortest_paths(graph, source, target, k=k) for source, target in pairs]
+
+    @staticmethod
+    def check_roots(num_nodes, roots):
+        roots = [int(r) for r in roots]
+        if len(roots) > 0 and (min(roots) < 0 or max(roots) >= num_nodes):
+            raise ValueError("Root is not a node of the graph")
+        return roots
+
+
+class ScipyShortestPathBackend(ShortestPathBackend):
+    """
+    Compiled scipy.sparse.csgraph routines on the CSR arrays of the graph snapshot: Floyd-Warshall for
+    all pairs (bit-for-bit the same as nx.floyd_warshall_numpy) and a Dijkstra from each root.
+    scipy has no k-shortest paths, so those are calculated with Yen's algorithm on the CSR arrays
+    (CsrKShortestPaths).
+    """
+
+    name = "scipy"
+
+    def all_pairs_distances(self, graph):
+        return as_graph_snapshot(graph).floyd_warshall()
+
+    def shortest_path_trees(self, graph, roots):
+        return as_graph_snapshot(graph).shortest_path_trees_to(roots)
+
+    def k_shortest_paths(self, graph, pairs, k):
+        engine = CsrKShortestPaths(graph)
+        return [engine.k_shortest_paths(source, target, k) for source, target in pairs]
+
+
+class NetworkxShortestPathBackend(ShortestPathBackend):
+    """
+    networkx routines on an nx.Graph: nx.floyd_warshall_numpy for all pairs, a Dijkstra from each root
+    (whose next hop is the first predecessor found at the final distance) and Yen's k-shortest paths.
+    """
+
+    name = "networkx"
+
+    def all_pairs_distances(self, graph):
+        graph = graph.to_networkx() if isinstance(graph, GraphSnapshot) else graph
+        return nx.floyd_warshall_numpy(graph, nodelist=list(range(graph.number_of_nodes())))
+
+    def shortest_path_trees(self, graph, roots):
+        graph = graph.to_networkx() if isinstance(graph, GraphSnapshot) else graph
+        roots = self.check_roots(graph.number_of_nodes(), roots)
+        distances = np.full((graph.number_of_nodes(), len(roots)), np.inf)
+        next_hops = np.full((graph.number_of_nodes(), len(roots)), -1, dtype=np.int64)
+        for i, root in enumerate(roots):
+            predecessors, root_distances = nx.dijkstra_predecessor_and_distance(graph, root)
+            for node, distance in root_distances.items():
+                distances[node, i] = distance
+                if predecessors[node]:
+                    next_hops[node, i] = predecessors[node][0]
+        return distances, next_hops
+
+
+class CsrShortestPathBackend(ShortestPathBackend):
+    """
+    Plain numpy and Python routines directly on the CSR arrays (without a conversion to another graph
+    library): Floyd-Warshall for all pairs as V vectorized relaxation rounds (the same relaxation order
+    as nx.floyd_warshall_numpy, hence the same distances), a binary heap Dijkstra from each root, and
+    Yen's k-shortest paths with node and edge masks instead of graph copies (CsrKShortestPaths).
+    """
+
+    name = "csr"
+
+    def all_pairs_distances(self, graph):
+        graph = as_graph_snapshot(graph)
+        sources = np.repeat(np.arange(graph.num_nodes), np.diff(graph.indptr))
+        distances = np.full((graph.num_nodes, graph.num_nodes), np.inf)
+        np.minimum.at(distances, (sources, graph.indices), graph.weights)
+        np.fill_diagonal(distances, 0.0)
+        for k in range(graph.num_nodes):
+            np.minimum(distances, distances[:, k, None] + distances[None, k, :], out=distances)
+        return distances
+
+    def shortest_path_trees(self, graph, roots):
+        graph = as_graph_snapshot(graph)
+        roots = self.check_roots(graph.num_nodes, roots)
+        indptr = graph.indptr.tolist()
+        edges = list(zip(graph.indices.tolist(), graph.weights.tolist()))
+        adjacency = [edges[indptr[u]:indptr[u + 1]] for u in range(graph.num_nodes)]
+        distances = np.full((graph.num_nodes, len(roots)), np.inf)
+        next_hops = np.full((graph.num_nodes, len(roots)), -1, dtype=np.int64)
+        for i, root in enumerate(roots):
+            dist = [np.inf] * graph.num_nodes
+            pred = [-1] * graph.num_nodes
+            dist[root] = 0.0
+            heap = [(0.0, root)]
+            while heap:
+                dist_u, u = heapq.heappop(heap)
+                if dist_u > dist[u]:
+                    continue
+                for v, w in adjacency[u]:
+                    dist_v = dist_u + w
+                    if dist_v < dist[v]:
+                        dist[v] = dist_v
+                        pred[v] = u
+                        heapq.heappush(heap, (dist_v, v))
+            distances[:, i] = dist
+            next_hops[:, i] = pred
+        return distances, next_hops
+
+    def k_shortest_paths(self, graph, pairs, k):
+        engine = CsrKShortestPaths(graph)
+        return [engine.k_shortest_paths(source, target, k) for source, target in pairs]
+
+
+# Registered backends by name
+SHORTEST_PATH_BACKENDS = {}
+
+
+def register_shortest_path_backend(backend):
+    """
+    Register a shortest path backend under its name (replacing any backend already registered under it).
+
+    :param backend:     ShortestPathBackend instance
+    """
+    if not isinstance(backend, ShortestPathBackend) or not backend.name:
+        raise ValueError("Shortest path backend must be a named ShortestPathBackend")
+    SHORTEST_PATH_BACKENDS[backend.name] = backend
+
+
+def get_shortest_path_backend(backend=None):
+    """
+    Shortest path backend to use.
+
+    :param backend:     Name of a registered backend ("scipy", "networkx", "csr", ...), a ShortestPathBackend
+                        instance, or None for the one named by the environment variable
+                        SATGEN_SHORTEST_PATH_BACKEND (if it is not set, "scipy")
+
+    :return: ShortestPathBackend instance
+    """
+    if isinstance(backend, ShortestPathBackend):
+        return backend
+    if backend is None:
+        backend = os.environ.get(SHORTEST_PATH_BACKEND_ENVIRONMENT_VARIABLE, DEFAULT_SHORTEST_PATH_BACKEND)
+    if backend not in SHORTEST_PATH_BACKENDS:
+        raise ValueError("Unknown shortest path backend: " + str(backend))
+    return SHORTEST_PATH_BACKENDS[backend]
+
+
+def shortest_path_backend_names():
+    """
+    :return: Names of the registered shortest path backends
+    """
+    return sorted(SHORTEST_PATH_BACKENDS)
+
+
+register_shortest_path_backend(ScipyShortestPathBackend())
+register_shortest_path_backend(NetworkxShortestPathBackend())
+register_shortest_path_backend(CsrShortestPathBackend())
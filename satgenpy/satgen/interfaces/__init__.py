@@ -1,2 +1,3 @@
 from .read_gsl_interfaces_info import read_gsl_interfaces_info
 from .generate_simple_gsl_interfaces_info import generate_simple_gsl_interfaces_info
+from .interface_table import InterfaceTable
@@ -0,0 +1,42 @@
+import numpy as np
+
+
+class InterfaceTable:
+    """
+    Interface identifiers of the ISLs of a constellation, built once from the ISLs (which do not change during
+    a run) instead of every time step.
+
+    Interface numbering (as used in the fstate and gsl_if_bandwidth files):
+
+    - Satellite: first its ISL interfaces 0 .. num_isls_per_sat[sid] - 1, one per ISL in the order of list_isls
+      (the ISL in neighbor slot i uses interface i), followed by its GSL interfaces starting at num_isls_per_sat[sid]
+    - Ground station: only GSL interfaces, starting at 0
+
+    The algorithms receive num_isls_per_sat (list) and sat_neighbor_to_if (dictionary (a, b) -> interface id of
+    a to b); every time step shares these same objects.
+    """
+
+    def __init__(self, num_satellites, list_isls):
+        isls = np.asarray(list_isls, dtype=np.int64).reshape(-1, 2)
+        if np.any(isls[:, 0] == isls[:, 1]):
+            raise ValueError("A satellite cannot have an ISL to itself")
+        if len(isls) > 0 and (np.min(isls) < 0 or np.max(isls) >= num_satellites):
+            raise ValueError("ISL endpoint is not a satellite")
+        self.num_satellites = num_satellites
+
+        # Neighbor slot of both endpoints of each ISL: the number of earlier ISLs of that satellite
+        # (endpoints in order a_0, b_0, a_1, b_1, ..., ranked within each satellite by a stable sort)
+        endpoints = isls.ravel()
+        order = np.argsort(endpoints, kind="stable")
+        counts = np.bincount(endpoints, minlength=num_satellites)
+        group_start = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        slots = np.zeros(len(endpoints), dtype=np.int64)
+        slots[order] = np.arange(len(endpoints)) - group_start[endpoints[order]]
+        slots = slots.reshape(-1, 2)
+
+        # The ISL in neighbor slot i of a satellite uses its interface i
+        self.num_isls_per_sat = counts.tolist()
+        self.sat_neighbor_to_if = {}
+        for (a, b), (slot_a, slot_b) in zip(isls.tolist(), slots.tolist()):
+            self.sat_neighbor_to_if[(a, b)] = slot_a
+            self.sat_neighbor_to_if[(b, a)] = slot_b
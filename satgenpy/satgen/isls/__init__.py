@@ -1,3 +1,4 @@
 from .read_isls import read_isls
 from .generate_plus_grid_isls import generate_plus_grid_isls
 from .generate_empty_isls import generate_empty_isls
+from .validate_isl_lengths import validate_isl_lengths
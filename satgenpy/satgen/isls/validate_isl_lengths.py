@@ -0,0 +1,71 @@
+import numpy as np
+
+
+# Number of time steps which are propagated (and checked) at once
+ISL_VALIDATION_CHUNK_TIME_STEPS = 256
+
+
+def validate_isl_lengths(propagator, times_since_epoch_ns, list_isls, max_isl_length_m,
+                         chunk_time_steps=ISL_VALIDATION_CHUNK_TIME_STEPS):
+    """
+    Check the length of every ISL at every time step against the maximum ISL length.
+
+    Instead of raising on the first ISL which is too long (as the dynamic state generation does),
+    all ISL lengths of all time steps are computed as (T, E) array operations over the propagated
+    positions (in chunks of time steps), and every violation is reported. This permits evaluating
+    an ISL layout (e.g., generate_plus_grid_isls with a different isl_shift) in a single pass.
+
+    :param propagator:              Propagator (with satellite_positions_m_at_times), e.g., created by
+                                    create_propagator("sgp4", ...) or a CachedPropagator over an ephemeris cache
+    :param times_since_epoch_ns:    List or numpy array (T,) of times since epoch in nanoseconds
+    :param list_isls:               List (E) of ISLs as (a, b) satellite id pairs
+    :param max_isl_length_m:        Maximum ISL length in meters
+    :param chunk_time_steps:        Number of time steps propagated at once
+
+    :return: Dictionary with:
+             "valid": True iff no ISL ever exceeds the maximum ISL length
+             "violations": list of (a, b, time_since_epoch_ns, distance_m) of every ISL which is too long
+                           at a time step, ordered by time and then by ISL order
+             "violating_isls": list of (a, b, number of time steps too long, maximum distance_m),
+                               ordered by ISL order
+             "max_isl_distance_m": longest ISL length across all time steps (0.0 if there are none)
+    """
+    if chunk_time_steps < 1:
+        raise ValueError("Chunk must contain at least one time step")
+    times_since_epoch_ns = np.asarray(times_since_epoch_ns, dtype=np.int64)
+    isls = np.asarray(list_isls, dtype=np.int64).reshape(-1, 2)
+
+    violations = []
+    num_violations_per_isl = np.zeros(len(isls), dtype=np.int64)
+    max_distance_m_per_isl = np.zeros(len(isls))
+    if len(isls) > 0:
+        for start in range(0, len(times_since_epoch_ns), chunk_time_steps):
+            chunk_times_ns = times_since_epoch_ns[start:start + chunk_time_steps]
+            # Lengths in float64 (as the window geometry), also from float32 positions
+            satellite_positions_m = propagator.satellite_positions_m_at_times(chunk_times_ns).astype(
+                np.float64, copy=False
+            )
+            isl_distances_m = np.linalg.norm(
+                satellite_positions_m[:, isls[:, 0], :] - satellite_positions_m[:, isls[:, 1], :], axis=2
+            )
+            too_long = isl_distances_m > max_isl_length_m
+            num_violations_per_isl += np.sum(too_long, axis=0)
+            max_distance_m_per_isl = np.maximum(max_distance_m_per_isl, np.max(isl_distances_m, axis=0))
+            for time_idx, isl_idx in zip(*np.nonzero(too_long)):
+                violations.append((
+                    int(isls[isl_idx, 0]),
+                    int(isls[isl_idx, 1]),
+                    int(chunk_times_ns[time_idx]),
+                    float(isl_distances_m[time_idx, isl_idx])
+                ))
+
+    return {
+        "valid": len(violations) == 0,
+        "violations": violations,
+        "violating_isls": [
+            (int(isls[isl_idx, 0]), int(isls[isl_idx, 1]),
+             int(num_violations_per_isl[isl_idx]), float(max_distance_m_per_isl[isl_idx]))
+            for isl_idx in np.nonzero(num_violations_per_isl)[0]
+        ],
+        "max_isl_distance_m": float(np.max(max_distance_m_per_isl)) if len(isls) > 0 else 0.0
+    }
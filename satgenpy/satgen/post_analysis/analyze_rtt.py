@@ -25,6 +25,7 @@ from satgen.distance_tools import *
 from satgen.isls import *
 from satgen.ground_stations import *
 from satgen.tles import *
+from satgen.propagation import load_or_generate_ephemeris_cache
 import exputil
 import numpy as np
 from .print_routes_and_rtt import print_routes_and_rtt
@@ -38,7 +39,7 @@ GEODESIC_ECDF_PLOT_CUTOFF_KM = 500
 
 def analyze_rtt(
         output_data_dir, satellite_network_dir, dynamic_state_update_interval_ms,
-        simulation_end_time_s, satgenpy_dir_with_ending_slash
+        simulation_end_time_s, satgenpy_dir_with_ending_slash, use_ephemeris_cache=False
 ):
 
     # Dynamic state directory
@@ -73,6 +74,14 @@ def analyze_rtt(
     max_gsl_length_m = exputil.parse_positive_float(description.get_property_or_fail("max_gsl_length_m"))
     max_isl_length_m = exputil.parse_positive_float(description.get_property_or_fail("max_isl_length_m"))
 
+    # Satellite positions from the ephemeris cache (shared with the dynamic state generation)
+    ephemeris_positions_m = None
+    if use_ephemeris_cache:
+        ephemeris_positions_m = load_or_generate_ephemeris_cache(
+            satellite_network_dir, dynamic_state_update_interval_ns, simulation_end_time_ns
+        )
+        visibility_tracker = GslVisibilityTracker(ground_station_positions_m(ground_stations), max_gsl_length_m)
+
     # Analysis
     rtt_list_per_pair = []
     for i in range(len(ground_stations)):
@@ -86,7 +95,7 @@ def analyze_rtt(
     fstate = {}
     num_iterations = simulation_end_time_ns / dynamic_state_update_interval_ns
     it = 1
-    for t in range(0, simulation_end_time_ns, dynamic_state_update_interval_ns):
+    for t_idx, t in enumerate(range(0, simulation_end_time_ns, dynamic_state_update_interval_ns)):
 
         # Read in forwarding state
         with open(satellite_network_dynamic_state_dir + "/fstate_" + str(t) + ".txt", "r") as f_in:
@@ -98,8 +107,11 @@ def analyze_rtt(
                 fstate[(current, destination)] = next_hop
 
             # Given we are going to graph often, we can pre-compute the edge lengths
-            graph_with_distance = construct_graph_with_distances(epoch, t, satellites, ground_stations,
-                                                                 list_isls, max_gsl_length_m, max_isl_length_m)
+            graph_with_distance = construct_graph_with_distances(
+                epoch, t, satellites, ground_stations, list_isls, max_gsl_length_m, max_isl_length_m,
+                ephemeris_positions_m[t_idx] if use_ephemeris_cache else None,
+                visibility_tracker if use_ephemeris_cache else None
+            )
 
             # Go over each pair of ground stations and calculate the length
             for src in range(len(ground_stations)):
@@ -191,7 +203,8 @@ def analyze_rtt(
                 ))
                 print_routes_and_rtt(base_output_dir, satellite_network_dir, dynamic_state_update_interval_ms,
                                      simulation_end_time_s, len(satellites) + largest_rtt_delta_list[i][3],
-                                     len(satellites) + largest_rtt_delta_list[i][4], satgenpy_dir_with_ending_slash)
+                                     len(satellites) + largest_rtt_delta_list[i][4], satgenpy_dir_with_ending_slash,
+                                     use_ephemeris_cache)
                 already_plotted_nodes.add(largest_rtt_delta_list[i][3])
                 already_plotted_nodes.add(largest_rtt_delta_list[i][4])
                 num_plotted += 1
@@ -223,7 +236,8 @@ def analyze_rtt(
                 ))
                 print_routes_and_rtt(base_output_dir, satellite_network_dir, dynamic_state_update_interval_ms,
                                      simulation_end_time_s, len(satellites) + most_unreachable_list[i][1],
-                                     len(satellites) + most_unreachable_list[i][2], satgenpy_dir_with_ending_slash)
+                                     len(satellites) + most_unreachable_list[i][2], satgenpy_dir_with_ending_slash,
+                                     use_ephemeris_cache)
                 already_plotted_nodes.add(most_unreachable_list[i][1])
                 already_plotted_nodes.add(most_unreachable_list[i][2])
                 num_plotted += 1
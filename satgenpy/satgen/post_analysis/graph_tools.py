@@ -22,36 +22,65 @@
 
 from satgen.distance_tools import *
 import networkx as nx
-from astropy import units as u
+import numpy as np
 
 
 def construct_graph_with_distances(epoch, time_since_epoch_ns, satellites, ground_stations, list_isls,
-                                   max_gsl_length_m, max_isl_length_m):
+                                   max_gsl_length_m, max_isl_length_m, satellite_positions_m=None,
+                                   visibility_tracker=None):
+    """
+    Construct the graph of all ISLs and GSLs in range at a time instant.
 
-    # Time
-    time = epoch + time_since_epoch_ns * u.ns
+    If the satellite positions are given (e.g., a time slice of an ephemeris cache), all distances
+    are computed from them at once, otherwise each distance is computed individually using ephem.
+
+    :param satellite_positions_m:   Numpy array (N, 3) of satellite ECEF positions in meters (optional)
+    :param visibility_tracker:      GSL visibility tracker carried across consecutive time instants
+                                    (optional, only used if the satellite positions are given)
+    """
+
+    # Time (converted once to a numeric ephem date)
+    epoch_date = ephem_date(epoch)
+    date = ephem_date_at(epoch_date, time_since_epoch_ns)
 
     # Graph
     sat_net_graph_with_gs = nx.Graph()
 
     # ISLs
-    for (a, b) in list_isls:
+    if satellite_positions_m is not None:
+        isl_distances_m = distances_m_between_satellite_pairs(satellite_positions_m, list_isls)
+    for isl_idx, (a, b) in enumerate(list_isls):
 
         # Only ISLs which are close enough are considered
-        sat_distance_m = distance_m_between_satellites(satellites[a], satellites[b], str(epoch), str(time))
+        if satellite_positions_m is not None:
+            sat_distance_m = float(isl_distances_m[isl_idx])
+        else:
+            sat_distance_m = distance_m_between_satellites(satellites[a], satellites[b], epoch_date, date)
         if sat_distance_m <= max_isl_length_m:
             sat_net_graph_with_gs.add_edge(
                 a, b, weight=sat_distance_m
             )
 
     # GSLs
-    for ground_station in ground_stations:
+    if satellite_positions_m is not None and visibility_tracker is not None:
+        satellites_in_range_per_ground_station = visibility_tracker.satellites_in_range(satellite_positions_m)
+    elif satellite_positions_m is not None:
+        satellites_in_range_per_ground_station = ground_station_satellites_in_range_m(
+            ground_station_positions_m(ground_stations), satellite_positions_m, max_gsl_length_m
+        )
+    for gs_idx, ground_station in enumerate(ground_stations):
 
         # Find satellites in range
-        for sid in range(len(satellites)):
-            distance_m = distance_m_ground_station_to_satellite(ground_station, satellites[sid], str(epoch), str(time))
-            if distance_m <= max_gsl_length_m:
+        if satellite_positions_m is not None:
+            for (distance_m, sid) in satellites_in_range_per_ground_station[gs_idx]:
                 sat_net_graph_with_gs.add_edge(len(satellites) + ground_station["gid"], sid, weight=distance_m)
+        else:
+            for sid in range(len(satellites)):
+                distance_m = distance_m_ground_station_to_satellite(
+                    ground_station, satellites[sid], epoch_date, date
+                )
+                if distance_m <= max_gsl_length_m:
+                    sat_net_graph_with_gs.add_edge(len(satellites) + ground_station["gid"], sid, weight=distance_m)
 
     return sat_net_graph_with_gs
 
@@ -61,10 +90,17 @@ def compute_path_length_with_graph(path, graph):
 
 
 def compute_path_length_without_graph(path, epoch, time_since_epoch_ns, satellites, ground_stations, list_isls,
-                                      max_gsl_length_m, max_isl_length_m):
+                                      max_gsl_length_m, max_isl_length_m, satellite_positions_m=None):
+    """
+    Compute the length of a path hop-by-hop, checking that each hop is a valid ISL / GSL.
 
-    # Time
-    time = epoch + time_since_epoch_ns * u.ns
+    :param satellite_positions_m:   Numpy array (N, 3) of satellite ECEF positions in meters (optional,
+                                    if not given each hop distance is computed individually using ephem)
+    """
+
+    # Time (converted once to a numeric ephem date)
+    epoch_date = ephem_date(epoch)
+    date = ephem_date_at(epoch_date, time_since_epoch_ns)
 
     # Go hop-by-hop and compute
     path_length_m = 0.0
@@ -75,12 +111,17 @@ def compute_path_length_without_graph(path, epoch, time_since_epoch_ns, satellit
         
         # Satellite to satellite
         if from_node_id < len(satellites) and to_node_id < len(satellites):
-            sat_distance_m = distance_m_between_satellites(
-                satellites[from_node_id],
-                satellites[to_node_id],
-                str(epoch),
-                str(time)
-            )
+            if satellite_positions_m is not None:
+                sat_distance_m = float(np.linalg.norm(
+                    satellite_positions_m[from_node_id] - satellite_positions_m[to_node_id]
+                ))
+            else:
+                sat_distance_m = distance_m_between_satellites(
+                    satellites[from_node_id],
+                    satellites[to_node_id],
+                    epoch_date,
+                    date
+                )
             if sat_distance_m > max_isl_length_m \
                     or ((to_node_id, from_node_id) not in list_isls and (from_node_id, to_node_id) not in list_isls):
                 raise ValueError("Invalid ISL hop")
@@ -89,12 +130,17 @@ def compute_path_length_without_graph(path, epoch, time_since_epoch_ns, satellit
         # Ground station to satellite
         elif from_node_id >= len(satellites) and to_node_id < len(satellites):
             ground_station = ground_stations[from_node_id - len(satellites)]
-            distance_m = distance_m_ground_station_to_satellite(
-                ground_station,
-                satellites[to_node_id],
-                str(epoch),
-                str(time)
-            )
+            if satellite_positions_m is not None:
+                distance_m = float(np.linalg.norm(
+                    ground_station_positions_m([ground_station])[0] - satellite_positions_m[to_node_id]
+                ))
+            else:
+                distance_m = distance_m_ground_station_to_satellite(
+                    ground_station,
+                    satellites[to_node_id],
+                    epoch_date,
+                    date
+                )
             if distance_m > max_gsl_length_m:
                 raise ValueError("Invalid GSL hop from " + str(from_node_id) + " to " + str(to_node_id)
                                  + " (" + str(distance_m) + " larger than " + str(max_gsl_length_m) + ")")
@@ -103,12 +149,17 @@ def compute_path_length_without_graph(path, epoch, time_since_epoch_ns, satellit
         # Satellite to ground station
         elif from_node_id < len(satellites) and to_node_id >= len(satellites):
             ground_station = ground_stations[to_node_id - len(satellites)]
-            distance_m = distance_m_ground_station_to_satellite(
-                ground_station,
-                satellites[from_node_id],
-                str(epoch),
-                str(time)
-            )
+            if satellite_positions_m is not None:
+                distance_m = float(np.linalg.norm(
+                    ground_station_positions_m([ground_station])[0] - satellite_positions_m[from_node_id]
+                ))
+            else:
+                distance_m = distance_m_ground_station_to_satellite(
+                    ground_station,
+                    satellites[from_node_id],
+                    epoch_date,
+                    date
+                )
             if distance_m > max_gsl_length_m:
                 raise ValueError("Invalid GSL hop from " + str(from_node_id) + " to " + str(to_node_id)
                                  + " (" + str(distance_m) + " larger than " + str(max_gsl_length_m) + ")")
@@ -24,6 +24,7 @@ from .graph_tools import *
 from satgen.isls import *
 from satgen.ground_stations import *
 from satgen.tles import *
+from satgen.propagation import load_or_generate_ephemeris_cache
 import exputil
 import cartopy
 import cartopy.crs as ccrs
@@ -38,10 +39,29 @@ SATELLITE_UNUSED_COLOR = "red"
 ISL_COLOR = "#eb6b38"
 
 
+def satellite_latitude_longitude_deg(satellite, epoch_date, time_moment_date, sub_satellite_points, node_id):
+    """
+    Latitude and longitude (degrees) of the point on Earth directly below a satellite.
+
+    :param epoch_date:              Ephem date of the epoch (float)
+    :param time_moment_date:        Ephem date of the time moment (float)
+    :param sub_satellite_points:    Pre-computed (latitudes, longitudes) of all satellites (e.g., from
+                                    the ephemeris cache), or None to compute it using ephem
+    """
+    if sub_satellite_points is not None:
+        return float(sub_satellite_points[0][node_id]), float(sub_satellite_points[1][node_id])
+    shadow_ground_station = create_basic_ground_station_for_satellite_shadow(
+        satellite,
+        epoch_date,
+        time_moment_date
+    )
+    return float(shadow_ground_station["latitude_degrees_str"]), float(shadow_ground_station["longitude_degrees_str"])
+
+
 def print_graphical_routes_and_rtt(
         base_output_dir, satellite_network_dir,
         dynamic_state_update_interval_ms,
-        simulation_end_time_s, src, dst
+        simulation_end_time_s, src, dst, use_ephemeris_cache=False
 ):
 
     # Local shell
@@ -72,11 +92,19 @@ def print_graphical_routes_and_rtt(
     max_gsl_length_m = exputil.parse_positive_float(description.get_property_or_fail("max_gsl_length_m"))
     max_isl_length_m = exputil.parse_positive_float(description.get_property_or_fail("max_isl_length_m"))
 
+    # Satellite positions from the ephemeris cache (shared with the dynamic state generation)
+    ephemeris_positions_m = None
+    if use_ephemeris_cache:
+        ephemeris_positions_m = load_or_generate_ephemeris_cache(
+            satellite_network_dir, dynamic_state_update_interval_ns, simulation_end_time_ns
+        )
+
     # For each time moment
     fstate = {}
     current_path = []
     rtt_ns_list = []
-    for t in range(0, simulation_end_time_ns, dynamic_state_update_interval_ns):
+    for t_idx, t in enumerate(range(0, simulation_end_time_ns, dynamic_state_update_interval_ns)):
+        satellite_positions_m = ephemeris_positions_m[t_idx] if use_ephemeris_cache else None
         with open(satellite_network_dynamic_state_dir + "/fstate_" + str(t) + ".txt", "r") as f_in:
             for line in f_in:
                 spl = line.split(",")
@@ -91,10 +119,12 @@ def print_graphical_routes_and_rtt(
             if path_there is not None and path_back is not None:
                 length_src_to_dst_m = compute_path_length_without_graph(path_there, epoch, t, satellites,
                                                                         ground_stations, list_isls,
-                                                                        max_gsl_length_m, max_isl_length_m)
+                                                                        max_gsl_length_m, max_isl_length_m,
+                                                                        satellite_positions_m)
                 length_dst_to_src_m = compute_path_length_without_graph(path_back, epoch, t,
                                                                         satellites, ground_stations, list_isls,
-                                                                        max_gsl_length_m, max_isl_length_m)
+                                                                        max_gsl_length_m, max_isl_length_m,
+                                                                        satellite_positions_m)
                 rtt_ns = (length_src_to_dst_m + length_dst_to_src_m) * 1000000000.0 / 299792458.0
             else:
                 length_src_to_dst_m = 0.0
@@ -132,17 +162,17 @@ def print_graphical_routes_and_rtt(
                 ax.add_feature(cartopy.feature.BORDERS, edgecolor='gray', linewidth=0.2)
                 
                 # Time moment
-                time_moment_str = str(epoch + t * u.ns)
+                epoch_date = ephem_date(epoch)
+                time_moment_date = ephem_date_at(epoch_date, t)
+                sub_satellite_points = (
+                    sub_satellite_points_degrees(satellite_positions_m) if use_ephemeris_cache else None
+                )
 
                 # Other satellites
                 for node_id in range(len(satellites)):
-                    shadow_ground_station = create_basic_ground_station_for_satellite_shadow(
-                        satellites[node_id],
-                        str(epoch),
-                        time_moment_str
+                    latitude_deg, longitude_deg = satellite_latitude_longitude_deg(
+                        satellites[node_id], epoch_date, time_moment_date, sub_satellite_points, node_id
                     )
-                    latitude_deg = float(shadow_ground_station["latitude_degrees_str"])
-                    longitude_deg = float(shadow_ground_station["longitude_degrees_str"])
 
                     # Other satellite
                     plt.plot(
@@ -221,13 +251,9 @@ def print_graphical_routes_and_rtt(
 
                         # From coordinates
                         if from_node_id < len(satellites):
-                            shadow_ground_station = create_basic_ground_station_for_satellite_shadow(
-                                satellites[from_node_id],
-                                str(epoch),
-                                time_moment_str
+                            from_latitude_deg, from_longitude_deg = satellite_latitude_longitude_deg(
+                                satellites[from_node_id], epoch_date, time_moment_date, sub_satellite_points, from_node_id
                             )
-                            from_latitude_deg = float(shadow_ground_station["latitude_degrees_str"])
-                            from_longitude_deg = float(shadow_ground_station["longitude_degrees_str"])
                         else:
                             from_latitude_deg = float(
                                 ground_stations[from_node_id - len(satellites)]["latitude_degrees_str"]
@@ -238,13 +264,9 @@ def print_graphical_routes_and_rtt(
 
                         # To coordinates
                         if to_node_id < len(satellites):
-                            shadow_ground_station = create_basic_ground_station_for_satellite_shadow(
-                                satellites[to_node_id],
-                                str(epoch),
-                                time_moment_str
+                            to_latitude_deg, to_longitude_deg = satellite_latitude_longitude_deg(
+                                satellites[to_node_id], epoch_date, time_moment_date, sub_satellite_points, to_node_id
                             )
-                            to_latitude_deg = float(shadow_ground_station["latitude_degrees_str"])
-                            to_longitude_deg = float(shadow_ground_station["longitude_degrees_str"])
                         else:
                             to_latitude_deg = float(
                                 ground_stations[to_node_id - len(satellites)]["latitude_degrees_str"]
@@ -284,13 +306,9 @@ def print_graphical_routes_and_rtt(
                     for v in range(0, len(current_path)):
                         node_id = current_path[v]
                         if node_id < len(satellites):
-                            shadow_ground_station = create_basic_ground_station_for_satellite_shadow(
-                                satellites[node_id],
-                                str(epoch),
-                                time_moment_str
+                            latitude_deg, longitude_deg = satellite_latitude_longitude_deg(
+                                satellites[node_id], epoch_date, time_moment_date, sub_satellite_points, node_id
                             )
-                            latitude_deg = float(shadow_ground_station["latitude_degrees_str"])
-                            longitude_deg = float(shadow_ground_station["longitude_degrees_str"])
                             # min_latitude = min(min_latitude, latitude_deg)
                             # max_latitude = max(max_latitude, latitude_deg)
                             # min_longitude = min(min_longitude, longitude_deg)
@@ -24,12 +24,14 @@ from .graph_tools import *
 from satgen.isls import *
 from satgen.ground_stations import *
 from satgen.tles import *
+from satgen.propagation import load_or_generate_ephemeris_cache
 import exputil
 import tempfile
 
 
 def print_routes_and_rtt(base_output_dir, satellite_network_dir, dynamic_state_update_interval_ms,
-                         simulation_end_time_s, src, dst, satgenpy_dir_with_ending_slash):
+                         simulation_end_time_s, src, dst, satgenpy_dir_with_ending_slash,
+                         use_ephemeris_cache=False):
 
     # Local shell
     local_shell = exputil.LocalShell()
@@ -59,6 +61,13 @@ def print_routes_and_rtt(base_output_dir, satellite_network_dir, dynamic_state_u
     max_gsl_length_m = exputil.parse_positive_float(description.get_property_or_fail("max_gsl_length_m"))
     max_isl_length_m = exputil.parse_positive_float(description.get_property_or_fail("max_isl_length_m"))
 
+    # Satellite positions from the ephemeris cache (shared with the dynamic state generation)
+    ephemeris_positions_m = None
+    if use_ephemeris_cache:
+        ephemeris_positions_m = load_or_generate_ephemeris_cache(
+            satellite_network_dir, dynamic_state_update_interval_ns, simulation_end_time_ns
+        )
+
     # Write data file
 
     data_path_filename = data_dir + "/networkx_path_" + str(src) + "_to_" + str(dst) + ".txt"
@@ -68,7 +77,8 @@ def print_routes_and_rtt(base_output_dir, satellite_network_dir, dynamic_state_u
         fstate = {}
         current_path = []
         rtt_ns_list = []
-        for t in range(0, simulation_end_time_ns, dynamic_state_update_interval_ns):
+        for t_idx, t in enumerate(range(0, simulation_end_time_ns, dynamic_state_update_interval_ns)):
+            satellite_positions_m = ephemeris_positions_m[t_idx] if use_ephemeris_cache else None
 
             with open(satellite_network_dynamic_state_dir + "/fstate_" + str(t) + ".txt", "r") as f_in:
                 for line in f_in:
@@ -84,10 +94,12 @@ def print_routes_and_rtt(base_output_dir, satellite_network_dir, dynamic_state_u
                 if path_there is not None and path_back is not None:
                     length_src_to_dst_m = compute_path_length_without_graph(path_there, epoch, t, satellites,
                                                                             ground_stations, list_isls,
-                                                                            max_gsl_length_m, max_isl_length_m)
+                                                                            max_gsl_length_m, max_isl_length_m,
+                                                                            satellite_positions_m)
                     length_dst_to_src_m = compute_path_length_without_graph(path_back, epoch, t,
                                                                             satellites, ground_stations, list_isls,
-                                                                            max_gsl_length_m, max_isl_length_m)
+                                                                            max_gsl_length_m, max_isl_length_m,
+                                                                            satellite_positions_m)
                     rtt_ns = (length_src_to_dst_m + length_dst_to_src_m) * 1000000000.0 / 299792458.0
                 else:
                     length_src_to_dst_m = 0.0
@@ -0,0 +1,23 @@
+from .sgp4_propagator import (
+    Sgp4Propagator,
+    create_satrec_from_ephem,
+    julian_date_at,
+    greenwich_mean_sidereal_time_rad,
+    teme_to_ecef
+)
+from .analytic_propagator import AnalyticCircularPropagator
+from .create_propagator import create_propagator
+from .ephemeris_cache import (
+    CachedPropagator,
+    ephemeris_cache_key,
+    ephemeris_cache_filename,
+    generate_ephemeris_cache,
+    read_ephemeris_cache,
+    load_or_generate_ephemeris_cache
+)
+from .geometry_precision import (
+    geometry_dtype,
+    float32_path_length_error_bound_m,
+    float32_rtt_error_bound_ns
+)
+from .window_geometry import compute_window_geometry
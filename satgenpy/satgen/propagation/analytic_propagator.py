@@ -0,0 +1,179 @@
+import numpy as np
+from .sgp4_propagator import (
+    create_satrec_from_ephem,
+    julian_date_at,
+    greenwich_mean_sidereal_time_rad,
+    teme_to_ecef,
+    Sgp4Propagator
+)
+
+
+# Largest eccentricity (the TLE format cannot store an eccentricity of exactly 0, only 0.0000001)
+ANALYTIC_MAX_ECCENTRICITY = 1e-6
+
+# Default time instants (since epoch) at which the analytic propagation is checked against SGP-4
+ANALYTIC_ACCURACY_CHECK_TIMES_NS = [0, 60 * 1000 * 1000 * 1000, 3600 * 1000 * 1000 * 1000]
+
+# Default maximum position difference with SGP-4
+ANALYTIC_ACCURACY_CHECK_MAX_ERROR_M = 1.0
+
+
+class AnalyticCircularPropagator:
+    """
+    Closed-form propagator for circular, drag-free constellations (e.g., Walker constellations
+    as generated by generate_tles_from_scratch_manual / generate_tles_from_scratch_with_sgp).
+
+    Without drag and eccentricity, the SGP-4 model reduces to secular J2 rates of the mean
+    anomaly, argument of perigee and right ascension of the ascending node, the J3 long-period
+    terms and the J2 short-period terms, which are evaluated for all satellites at all time
+    instants at once using numpy trigonometry (time instants x satellites).
+
+    On creation, the positions are checked against (non-vectorized) SGP-4 propagation.
+    """
+
+    def __init__(self, epoch, satellites,
+                 accuracy_check_times_ns=ANALYTIC_ACCURACY_CHECK_TIMES_NS,
+                 accuracy_check_max_error_m=ANALYTIC_ACCURACY_CHECK_MAX_ERROR_M):
+        self.epoch = epoch
+        self.num_satellites = len(satellites)
+
+        # Orbital elements and (J2 / J3) constants as initialized by SGP-4
+        satrecs = [create_satrec_from_ephem(satellite, sid + 1) for sid, satellite in enumerate(satellites)]
+        for sid, satrec in enumerate(satrecs):
+            if satrec.ecco > ANALYTIC_MAX_ECCENTRICITY or satrec.bstar != 0.0 or satrec.ndot != 0.0:
+                raise ValueError(
+                    "Satellite %d is not in a circular drag-free orbit (eccentricity %g, drag %g, decay %g)"
+                    % (sid, satrec.ecco, satrec.bstar, satrec.ndot)
+                )
+            if satrec.method != "n":
+                raise ValueError("Satellite %d is not a near-Earth satellite (orbital period >= 225 minutes)" % sid)
+        self.epoch_jd = np.array([satrec.jdsatepoch for satrec in satrecs])
+        self.epoch_fr = np.array([satrec.jdsatepochF for satrec in satrecs])
+        self.mo = np.array([satrec.mo for satrec in satrecs])
+        self.argpo = np.array([satrec.argpo for satrec in satrecs])
+        self.nodeo = np.array([satrec.nodeo for satrec in satrecs])
+        self.inclo = np.array([satrec.inclo for satrec in satrecs])
+        self.mdot = np.array([satrec.mdot for satrec in satrecs])
+        self.argpdot = np.array([satrec.argpdot for satrec in satrecs])
+        self.nodedot = np.array([satrec.nodedot for satrec in satrecs])
+        self.am = np.array([satrec.am for satrec in satrecs])  # Mean semi-major axis (Earth radii)
+        self.ecco = np.maximum(np.array([satrec.ecco for satrec in satrecs]), 1e-6)  # SGP-4 lower bound
+        self.j2 = satrecs[0].j2
+        self.radius_earth_km = satrecs[0].radiusearthkm
+        sinio = np.sin(self.inclo)
+        cosio = np.cos(self.inclo)
+        self.aycof = -0.5 * satrecs[0].j3oj2 * sinio
+        self.xlcof = -0.25 * satrecs[0].j3oj2 * sinio * (3.0 + 5.0 * cosio) \
+            / np.where(np.abs(cosio + 1.0) > 1.5e-12, 1.0 + cosio, 1.5e-12)
+        self.con41 = 3.0 * cosio * cosio - 1.0
+        self.x1mth2 = 1.0 - cosio * cosio
+        self.x7thm1 = 7.0 * cosio * cosio - 1.0
+
+        # Built-in accuracy check
+        if accuracy_check_times_ns is not None and len(accuracy_check_times_ns) > 0:
+            error_m = self.max_error_m_against_sgp4(Sgp4Propagator(epoch, satellites), accuracy_check_times_ns)
+            if error_m > accuracy_check_max_error_m:
+                raise ValueError(
+                    "Analytic propagation deviates %.3f m from SGP-4 (more than the permitted %.3f m)"
+                    % (error_m, accuracy_check_max_error_m)
+                )
+
+    def satellite_positions_m_at(self, time_since_epoch_ns):
+        """
+        Positions of all satellites at a single time instant.
+
+        :param time_since_epoch_ns: Time since epoch in nanoseconds
+
+        :return: Numpy array (N, 3) of ECEF positions in meters
+        """
+        return self.satellite_positions_m_at_times([time_since_epoch_ns])[0]
+
+    def satellite_positions_m_at_times(self, times_since_epoch_ns):
+        """
+        Positions of all satellites at multiple time instants in a single vectorized call.
+
+        :param times_since_epoch_ns: List or numpy array (T,) of times since epoch in nanoseconds
+
+        :return: Numpy array (T, N, 3) of ECEF positions in meters
+        """
+        jd, fr = julian_date_at(self.epoch, times_since_epoch_ns)
+        fr = np.asarray(fr)[:, np.newaxis]
+
+        # Minutes since each satellite's TLE epoch (T, N)
+        t = ((jd - self.epoch_jd) + (fr - self.epoch_fr)) * 1440.0
+
+        # Secular J2 rates (angles are not wrapped to [0, 2 * pi), as they are only used within trigonometry)
+        argpm = self.argpo + self.argpdot * t
+        nodem = self.nodeo + self.nodedot * t
+        xlm = self.mo + self.mdot * t + argpm + nodem
+
+        # Long-period (J3) periodics
+        axnl = self.ecco * np.cos(argpm)
+        temp = 1.0 / (self.am * (1.0 - self.ecco * self.ecco))
+        aynl = self.ecco * np.sin(argpm) + temp * self.aycof
+        xl = xlm + temp * self.xlcof * axnl
+
+        # Kepler's equation (converges within a few iterations for near-circular orbits)
+        u = xl - nodem
+        eo1 = u
+        for _ in range(10):
+            sineo1 = np.sin(eo1)
+            coseo1 = np.cos(eo1)
+            tem5 = (u - aynl * coseo1 + axnl * sineo1 - eo1) / (1.0 - coseo1 * axnl - sineo1 * aynl)
+            eo1 = eo1 + np.clip(tem5, -0.95, 0.95)
+            if np.max(np.abs(tem5)) < 1e-12:
+                break
+        sineo1 = np.sin(eo1)
+        coseo1 = np.cos(eo1)
+
+        # Short-period (J2) periodics
+        ecose = axnl * coseo1 + aynl * sineo1
+        esine = axnl * sineo1 - aynl * coseo1
+        el2 = axnl * axnl + aynl * aynl
+        pl = self.am * (1.0 - el2)
+        rl = self.am * (1.0 - ecose)
+        betal = np.sqrt(1.0 - el2)
+        temp = esine / (1.0 + betal)
+        sinu = self.am / rl * (sineo1 - aynl - axnl * temp)
+        cosu = self.am / rl * (coseo1 - axnl + aynl * temp)
+        su = np.arctan2(sinu, cosu)
+        sin2u = (cosu + cosu) * sinu
+        cos2u = 1.0 - 2.0 * sinu * sinu
+        temp1 = 0.5 * self.j2 / pl
+        temp2 = temp1 / pl
+        cosip = np.cos(self.inclo)
+        sinip = np.sin(self.inclo)
+        mrt = rl * (1.0 - 1.5 * temp2 * betal * self.con41) + 0.5 * temp1 * self.x1mth2 * cos2u
+        su = su - 0.25 * temp2 * self.x7thm1 * sin2u
+        xnode = nodem + 1.5 * temp2 * cosip * sin2u
+        xinc = self.inclo + 1.5 * temp2 * cosip * sinip * cos2u
+
+        # Orientation
+        sinsu = np.sin(su)
+        cossu = np.cos(su)
+        snod = np.sin(xnode)
+        cnod = np.cos(xnode)
+        sini = np.sin(xinc)
+        cosi = np.cos(xinc)
+        radius_m = mrt * self.radius_earth_km * 1000.0
+        positions_teme_m = np.empty(t.shape + (3,))
+        positions_teme_m[..., 0] = radius_m * (-snod * cosi * sinsu + cnod * cossu)
+        positions_teme_m[..., 1] = radius_m * (cnod * cosi * sinsu + snod * cossu)
+        positions_teme_m[..., 2] = radius_m * (sini * sinsu)
+
+        return teme_to_ecef(positions_teme_m, greenwich_mean_sidereal_time_rad(jd, fr))
+
+    def max_error_m_against_sgp4(self, sgp4_propagator, times_since_epoch_ns):
+        """
+        Largest position difference between the analytic and the SGP-4 propagation.
+
+        :param sgp4_propagator:         SGP-4 propagator of the same satellites
+        :param times_since_epoch_ns:    Time instants (since epoch) at which to compare
+
+        :return: Maximum distance (across all satellites and time instants) in meters
+        """
+        return float(np.max(np.linalg.norm(
+            self.satellite_positions_m_at_times(times_since_epoch_ns)
+            - sgp4_propagator.satellite_positions_m_at_times(times_since_epoch_ns),
+            axis=2
+        )))
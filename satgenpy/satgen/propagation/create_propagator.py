@@ -0,0 +1,26 @@
+from .sgp4_propagator import Sgp4Propagator
+from .analytic_propagator import AnalyticCircularPropagator
+
+
+def create_propagator(propagation_engine, epoch, satellites):
+    """
+    Create the propagator which computes satellite positions for the dynamic state generation.
+
+    :param propagation_engine:  Propagation engine, options:
+                                "ephem": per-pair ephem distance computation (default; returns None)
+                                "sgp4":  batched SGP-4 propagation of all satellites at once
+                                "analytic": closed-form propagation of circular drag-free constellations
+                                            (checked against SGP-4 on creation)
+    :param epoch:               Epoch (astropy Time)
+    :param satellites:          List of ephem satellites
+
+    :return: Propagator instance, or None if the per-pair ephem distance functions are to be used
+    """
+    if propagation_engine == "ephem":
+        return None
+    elif propagation_engine == "sgp4":
+        return Sgp4Propagator(epoch, satellites)
+    elif propagation_engine == "analytic":
+        return AnalyticCircularPropagator(epoch, satellites)
+    else:
+        raise ValueError("Unknown propagation engine: " + str(propagation_engine))
@@ -0,0 +1,181 @@
+import hashlib
+import os
+import numpy as np
+from satgen.tles import read_tles
+from .create_propagator import create_propagator
+from .geometry_precision import geometry_dtype
+
+
+# Version of the ephemeris cache layout (part of the content hash, increment if the layout changes)
+EPHEMERIS_CACHE_VERSION = 2
+
+# Number of time steps which are propagated (and written) at once
+EPHEMERIS_CACHE_CHUNK_TIME_STEPS = 256
+
+
+def ephemeris_cache_key(filename_tles, time_step_ns, duration_ns, propagation_engine="sgp4",
+                        geometry_precision="float64"):
+    """
+    Content hash identifying an ephemeris cache.
+
+    :param filename_tles:       Filename of the TLEs (tles.txt)
+    :param time_step_ns:        Time step in nanoseconds
+    :param duration_ns:         Duration in nanoseconds
+    :param propagation_engine:  Propagation engine which computes the positions
+    :param geometry_precision:  Precision in which the positions are stored ("float64" or "float32")
+
+    :return: Hexadecimal SHA-256 digest of the TLEs content and the time grid parameters
+    """
+    sha256 = hashlib.sha256()
+    with open(filename_tles, "rb") as f_in:
+        sha256.update(f_in.read())
+    sha256.update((
+        "version=%d,time_step_ns=%d,duration_ns=%d,propagation_engine=%s,geometry_precision=%s"
+        % (EPHEMERIS_CACHE_VERSION, time_step_ns, duration_ns, propagation_engine, geometry_precision)
+    ).encode("utf-8"))
+    return sha256.hexdigest()
+
+
+def ephemeris_cache_filename(satellite_network_dir, time_step_ns, duration_ns, propagation_engine="sgp4",
+                             geometry_precision="float64"):
+    """
+    Filename of the ephemeris cache of a satellite network, which is placed next to its dynamic state directories.
+
+    :param satellite_network_dir:   Satellite network directory (containing tles.txt)
+    :param time_step_ns:            Time step in nanoseconds
+    :param duration_ns:             Duration in nanoseconds
+    :param propagation_engine:      Propagation engine which computes the positions
+    :param geometry_precision:      Precision in which the positions are stored ("float64" or "float32")
+
+    :return: Filename of the ephemeris cache (.npy)
+    """
+    return "%s/ephemeris_%dms_for_%ds_%s.npy" % (
+        satellite_network_dir,
+        time_step_ns // 1000000,
+        duration_ns // 1000000000,
+        ephemeris_cache_key(
+            satellite_network_dir + "/tles.txt", time_step_ns, duration_ns, propagation_engine, geometry_precision
+        )[:16]
+    )
+
+
+def generate_ephemeris_cache(filename_out, propagator, time_step_ns, duration_ns, geometry_precision="float64"):
+    """
+    Propagate all satellites over the time grid [0, duration) and write their positions
+    as a (T, N, 3) float64 (or float32) array of ECEF coordinates (meters) in .npy format.
+
+    The file is first written under a temporary name and then renamed, such that
+    concurrent readers never observe a partially written cache.
+
+    :param filename_out:    Output filename (.npy)
+    :param propagator:      Propagator (with satellite_positions_m_at_times)
+    :param time_step_ns:    Time step in nanoseconds
+    :param duration_ns:     Duration in nanoseconds
+    :param geometry_precision:  Precision in which the positions are stored ("float64" or "float32")
+    """
+    times_ns = np.arange(0, duration_ns, time_step_ns, dtype=np.int64)
+    filename_temp = filename_out + ".%d.tmp" % os.getpid()
+    positions_m = np.lib.format.open_memmap(
+        filename_temp, mode="w+", dtype=geometry_dtype(geometry_precision), shape=(len(times_ns), propagator.num_satellites, 3)
+    )
+    for start in range(0, len(times_ns), EPHEMERIS_CACHE_CHUNK_TIME_STEPS):
+        chunk_times_ns = times_ns[start:start + EPHEMERIS_CACHE_CHUNK_TIME_STEPS]
+        positions_m[start:start + len(chunk_times_ns)] = propagator.satellite_positions_m_at_times(chunk_times_ns)
+    positions_m.flush()
+    del positions_m
+    os.replace(filename_temp, filename_out)
+
+
+def read_ephemeris_cache(filename):
+    """
+    Open an ephemeris cache as read-only memory map (nothing is loaded until it is accessed).
+
+    :param filename:    Ephemeris cache filename (.npy)
+
+    :return: Numpy memmap (T, N, 3) of ECEF positions in meters (float64 or float32)
+    """
+    positions_m = np.load(filename, mmap_mode="r")
+    if positions_m.ndim != 3 or positions_m.shape[2] != 3 or positions_m.dtype not in (np.float64, np.float32):
+        raise ValueError("Ephemeris cache " + filename + " is not a (T, N, 3) float64 or float32 array")
+    return positions_m
+
+
+def load_or_generate_ephemeris_cache(satellite_network_dir, time_step_ns, duration_ns, propagation_engine="sgp4",
+                                     geometry_precision="float64"):
+    """
+    Open the ephemeris cache of a satellite network, generating it first if it does not yet exist.
+
+    :param satellite_network_dir:   Satellite network directory (containing tles.txt)
+    :param time_step_ns:            Time step in nanoseconds
+    :param duration_ns:             Duration in nanoseconds
+    :param propagation_engine:      Propagation engine which computes the positions (cannot be "ephem")
+    :param geometry_precision:      Precision in which the positions are stored ("float64" or "float32")
+
+    :return: Numpy memmap (T, N, 3) of ECEF positions in meters
+    """
+    if propagation_engine == "ephem":
+        raise ValueError("The ephemeris cache requires a batched propagation engine (e.g., \"sgp4\")")
+    filename = ephemeris_cache_filename(
+        satellite_network_dir, time_step_ns, duration_ns, propagation_engine, geometry_precision
+    )
+    if not os.path.isfile(filename):
+        tles = read_tles(satellite_network_dir + "/tles.txt")
+        propagator = create_propagator(propagation_engine, tles["epoch"], tles["satellites"])
+        generate_ephemeris_cache(filename, propagator, time_step_ns, duration_ns, geometry_precision)
+    return read_ephemeris_cache(filename)
+
+
+class CachedPropagator:
+    """
+    Propagator which serves satellite positions from an ephemeris cache.
+
+    Times on the cached time grid are a memory-mapped array lookup. Times off the grid
+    or beyond its end (e.g., the lookahead of the jitter-minimized / LMSR routers)
+    are delegated to the fallback propagator. Positions are returned in the precision of the cache.
+    """
+
+    def __init__(self, positions_m, time_step_ns, fallback_propagator=None):
+        self.positions_m = positions_m
+        self.time_step_ns = time_step_ns
+        self.num_satellites = positions_m.shape[1]
+        self.fallback_propagator = fallback_propagator
+
+    def satellite_positions_m_at(self, time_since_epoch_ns):
+        """
+        Positions of all satellites at a single time instant.
+
+        :param time_since_epoch_ns: Time since epoch in nanoseconds
+
+        :return: Numpy array (N, 3) of ECEF positions in meters
+        """
+        index, remainder = divmod(time_since_epoch_ns, self.time_step_ns)
+        if remainder == 0 and 0 <= index < self.positions_m.shape[0]:
+            return np.array(self.positions_m[index])
+        if self.fallback_propagator is None:
+            raise ValueError("Time %d ns is not in the ephemeris cache and there is no fallback propagator"
+                             % time_since_epoch_ns)
+        return self.fallback_propagator.satellite_positions_m_at(time_since_epoch_ns).astype(
+            self.positions_m.dtype, copy=False
+        )
+
+    def satellite_positions_m_at_times(self, times_since_epoch_ns):
+        """
+        Positions of all satellites at multiple time instants.
+
+        :param times_since_epoch_ns: List or numpy array (T,) of times since epoch in nanoseconds
+
+        :return: Numpy array (T, N, 3) of ECEF positions in meters
+        """
+        times_since_epoch_ns = np.asarray(times_since_epoch_ns, dtype=np.int64)
+        indices, remainders = np.divmod(times_since_epoch_ns, self.time_step_ns)
+        in_cache = (remainders == 0) & (indices >= 0) & (indices < self.positions_m.shape[0])
+        positions_m = np.empty((len(times_since_epoch_ns), self.num_satellites, 3), dtype=self.positions_m.dtype)
+        positions_m[in_cache] = self.positions_m[indices[in_cache]]
+        if not np.all(in_cache):
+            if self.fallback_propagator is None:
+                raise ValueError("Times %s are not in the ephemeris cache and there is no fallback propagator"
+                                 % str(list(times_since_epoch_ns[~in_cache])))
+            positions_m[~in_cache] = self.fallback_propagator.satellite_positions_m_at_times(
+                times_since_epoch_ns[~in_cache]
+            )
+        return positions_m
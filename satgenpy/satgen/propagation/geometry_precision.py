@@ -0,0 +1,73 @@
+import math
+import numpy as np
+
+
+# Unit roundoff of float32 (round-to-nearest): the relative error of storing a value in float32
+FLOAT32_UNIT_ROUNDOFF = 2.0 ** -24
+
+# Speed of light (m/s)
+SPEED_OF_LIGHT_M_PER_S = 299792458.0
+
+
+def geometry_dtype(geometry_precision):
+    """
+    Numpy data type in which the geometry (satellite positions, ISL lengths) is stored.
+
+    :param geometry_precision:  Geometry precision, options:
+                                "float64": double precision (default)
+                                "float32": single precision, halves the memory of positions and ISL lengths
+                                           (see float32_path_length_error_bound_m for the resulting error)
+
+    :return: Numpy data type
+    """
+    if geometry_precision == "float64":
+        return np.float64
+    elif geometry_precision == "float32":
+        return np.float32
+    else:
+        raise ValueError("Unknown geometry precision: " + str(geometry_precision))
+
+
+def float32_path_length_error_bound_m(num_isl_hops, num_gsl_hops, max_satellite_radius_m, max_isl_length_m):
+    """
+    Upper bound on the path length difference between the float32 and the float64 geometry.
+
+    In float32 mode, the satellite positions are rounded to float32 once (each coordinate by at most
+    FLOAT32_UNIT_ROUNDOFF * max_satellite_radius_m), the distances are computed from the rounded positions
+    in float64, and the ISL lengths are rounded to float32 when stored. The ground station positions and
+    GSL distances remain float64. Hence:
+
+    - An ISL hop differs by at most 2 * sqrt(3) * u * max_satellite_radius_m + u * max_isl_length_m
+    - A GSL hop differs by at most sqrt(3) * u * max_satellite_radius_m
+
+    For Kuiper-630 (radius ~7009 km, max. ISL length ~5017 km) this is ~1.75 m per ISL hop and ~0.72 m
+    per GSL hop.
+
+    :param num_isl_hops:            Number of ISL hops of the path
+    :param num_gsl_hops:            Number of GSL hops of the path
+    :param max_satellite_radius_m:  Largest distance of a satellite to the center of the Earth in meters
+    :param max_isl_length_m:        Maximum ISL length in meters
+
+    :return: Maximum absolute path length difference in meters
+    """
+    position_error_m = math.sqrt(3.0) * FLOAT32_UNIT_ROUNDOFF * max_satellite_radius_m
+    isl_hop_error_m = 2.0 * position_error_m + FLOAT32_UNIT_ROUNDOFF * max_isl_length_m
+    gsl_hop_error_m = position_error_m
+    return num_isl_hops * isl_hop_error_m + num_gsl_hops * gsl_hop_error_m
+
+
+def float32_rtt_error_bound_ns(num_isl_hops, num_gsl_hops, max_satellite_radius_m, max_isl_length_m):
+    """
+    Upper bound on the RTT difference between the float32 and the float64 geometry
+    (the path length bound, traversed twice at the speed of light).
+
+    :param num_isl_hops:            Number of ISL hops of the path (one way)
+    :param num_gsl_hops:            Number of GSL hops of the path (one way)
+    :param max_satellite_radius_m:  Largest distance of a satellite to the center of the Earth in meters
+    :param max_isl_length_m:        Maximum ISL length in meters
+
+    :return: Maximum absolute RTT difference in nanoseconds
+    """
+    return 2.0 * float32_path_length_error_bound_m(
+        num_isl_hops, num_gsl_hops, max_satellite_radius_m, max_isl_length_m
+    ) * 1000000000.0 / SPEED_OF_LIGHT_M_PER_S
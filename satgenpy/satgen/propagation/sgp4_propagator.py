@@ -0,0 +1,151 @@
+import math
+import numpy as np
+from sgp4.api import Satrec, SatrecArray, WGS72
+from satgen.distance_tools.distance_tools import EPHEM_DATE_TO_JULIAN_DATE, NS_PER_DAY
+
+
+# Julian date of the SGP-4 epoch zero point: 1949-12-31 00:00
+SGP4_EPOCH_JULIAN_DATE = 2433281.5
+
+
+def create_satrec_from_ephem(satellite, satnum):
+    """
+    Create an SGP-4 satellite record from the orbital elements of an ephem satellite.
+
+    The elements are taken from the ephem object (rather than re-reading the TLE) such that
+    the same (possibly rounded) element values ephem itself propagates are used.
+
+    :param satellite:   Ephem satellite (as read by read_tles)
+    :param satnum:      Satellite number
+
+    :return: SGP-4 satellite record (sgp4.api.Satrec)
+    """
+    satrec = Satrec()
+    satrec.sgp4init(
+        WGS72,                                                              # Gravity model (same as ns-3)
+        'i',                                                                # Improved operating mode
+        satnum,                                                             # Satellite number
+        float(satellite._epoch) + EPHEM_DATE_TO_JULIAN_DATE - SGP4_EPOCH_JULIAN_DATE,  # Epoch (days since 1949)
+        satellite._drag,                                                    # B-star drag term
+        satellite._decay,                                                   # First derivative of mean motion
+        0.0,                                                                # Second derivative of mean motion
+        satellite._e,                                                       # Eccentricity
+        float(satellite._ap),                                               # Argument of perigee (radians)
+        float(satellite._inc),                                              # Inclination (radians)
+        float(satellite._M),                                                # Mean anomaly (radians)
+        satellite._n * 2.0 * math.pi / 1440.0,                              # Mean motion (radians/minute)
+        float(satellite._raan)                                              # Right ascension of asc. node (radians)
+    )
+    return satrec
+
+
+def julian_date_at(epoch, time_since_epoch_ns):
+    """
+    Two-part Julian date of a time instant relative to the epoch.
+
+    The epoch is interpreted the same way as ephem interprets str(epoch), i.e., its calendar value
+    is taken as UT irrespective of the astropy time scale it was created with.
+
+    :param epoch:                   Epoch (astropy Time)
+    :param time_since_epoch_ns:     Time since epoch in nanoseconds (int or numpy array of int)
+
+    :return: Tuple (jd, fr) of whole and fractional Julian date (fr can be an array)
+    """
+    jd = float(epoch.jd1)
+    fr = float(epoch.jd2) + np.asarray(time_since_epoch_ns, dtype=np.float64) / NS_PER_DAY
+    return jd, fr
+
+
+def greenwich_mean_sidereal_time_rad(jd, fr):
+    """
+    Greenwich mean sidereal time (IAU-82 model, as used by SGP-4 and the ns-3 satellite model).
+
+    :param jd:  Whole part of the Julian date (UT1)
+    :param fr:  Fractional part of the Julian date (float or numpy array)
+
+    :return: GMST in radians within [0, 2 * pi)
+    """
+    t_ut1 = ((jd - 2451545.0) + fr) / 36525.0
+    gmst_s = (
+        -6.2e-6 * t_ut1 * t_ut1 * t_ut1
+        + 0.093104 * t_ut1 * t_ut1
+        + (876600.0 * 3600.0 + 8640184.812866) * t_ut1
+        + 67310.54841
+    )
+    return np.mod(np.radians(np.mod(gmst_s, 86400.0) / 240.0), 2.0 * math.pi)
+
+
+def teme_to_ecef(positions_teme, gmst_rad):
+    """
+    Rotate positions from the TEME frame to the Earth-fixed frame (polar motion is ignored).
+
+    :param positions_teme:  Positions (..., 3) in the TEME frame
+    :param gmst_rad:        Greenwich mean sidereal time in radians (scalar or broadcastable to positions[..., 0])
+
+    :return: Positions (..., 3) in the Earth-centered Earth-fixed frame
+    """
+    cos_gmst = np.cos(gmst_rad)
+    sin_gmst = np.sin(gmst_rad)
+    positions_ecef = np.empty_like(positions_teme)
+    positions_ecef[..., 0] = cos_gmst * positions_teme[..., 0] + sin_gmst * positions_teme[..., 1]
+    positions_ecef[..., 1] = -sin_gmst * positions_teme[..., 0] + cos_gmst * positions_teme[..., 1]
+    positions_ecef[..., 2] = positions_teme[..., 2]
+    return positions_ecef
+
+
+class Sgp4Propagator:
+    """
+    Batched constellation propagator.
+
+    All satellites are propagated at once using a vectorized SGP-4 (sgp4.api.SatrecArray),
+    and the positions are returned as an (N, 3) array of Earth-centered Earth-fixed (ECEF)
+    coordinates in meters. This replaces creating an ephem observer and re-computing
+    both satellites for every single distance.
+
+    Distances based on these positions differ slightly from the ephem-based distance functions
+    (order of tens of meters), as ephem uses a different Earth radius and applies a
+    light-time correction for topocentric ranges. The Earth model (WGS72, GMST rotation)
+    matches the one used by the ns-3 satellite model.
+    """
+
+    def __init__(self, epoch, satellites):
+        self.epoch = epoch
+        self.num_satellites = len(satellites)
+        self.satrec_array = SatrecArray([
+            create_satrec_from_ephem(satellite, sid + 1) for sid, satellite in enumerate(satellites)
+        ])
+
+    def satellite_positions_m_at(self, time_since_epoch_ns):
+        """
+        Positions of all satellites at a single time instant.
+
+        :param time_since_epoch_ns: Time since epoch in nanoseconds
+
+        :return: Numpy array (N, 3) of ECEF positions in meters
+        """
+        jd, fr = julian_date_at(self.epoch, time_since_epoch_ns)
+        error_codes, positions_teme_km, _ = self.satrec_array.sgp4(np.array([jd]), np.array([fr]))
+        if np.any(error_codes != 0):
+            raise ValueError(
+                "SGP-4 propagation failed for satellite(s) %s at t=%dns"
+                % (str(list(np.nonzero(error_codes[:, 0])[0])), time_since_epoch_ns)
+            )
+        return teme_to_ecef(positions_teme_km[:, 0, :] * 1000.0, greenwich_mean_sidereal_time_rad(jd, fr))
+
+    def satellite_positions_m_at_times(self, times_since_epoch_ns):
+        """
+        Positions of all satellites at multiple time instants in a single vectorized call.
+
+        :param times_since_epoch_ns: List or numpy array (T,) of times since epoch in nanoseconds
+
+        :return: Numpy array (T, N, 3) of ECEF positions in meters
+        """
+        jd, fr = julian_date_at(self.epoch, times_since_epoch_ns)
+        error_codes, positions_teme_km, _ = self.satrec_array.sgp4(np.full(len(fr), jd), fr)
+        if np.any(error_codes != 0):
+            raise ValueError(
+                "SGP-4 propagation failed for satellite(s) %s"
+                % str(list(np.nonzero(np.any(error_codes != 0, axis=1))[0]))
+            )
+        positions_teme_m = np.swapaxes(positions_teme_km, 0, 1) * 1000.0
+        return teme_to_ecef(positions_teme_m, greenwich_mean_sidereal_time_rad(jd, fr)[:, np.newaxis])
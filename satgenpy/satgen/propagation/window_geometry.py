@@ -0,0 +1,56 @@
+import numpy as np
+from satgen.distance_tools import ground_station_satellites_in_range_m
+from .geometry_precision import geometry_dtype
+
+
+def compute_window_geometry(propagator, times_since_epoch_ns, list_isls, ground_station_positions, max_gsl_length_m,
+                            visibility_tracker=None, geometry_precision="float64"):
+    """
+    Compute the ISL lengths and GSL visibility for a window of time instants at once.
+
+    All satellites are propagated for all time instants in a single call, and the ISL lengths
+    are computed as one (T, E) array operation.
+
+    In float32 precision, the satellite positions are rounded to float32 once, all distances are computed
+    in float64 from the rounded positions, and the ISL lengths are stored in float32 (see
+    float32_path_length_error_bound_m for the resulting error bound).
+
+    :param propagator:                  Propagator (with satellite_positions_m_at_times)
+    :param times_since_epoch_ns:        List (T) of times since epoch in nanoseconds
+    :param list_isls:                   List (E) of ISLs as (a, b) satellite id pairs
+    :param ground_station_positions:    Numpy array (G, 3) of ground station positions in meters
+    :param max_gsl_length_m:            Maximum GSL length in meters
+    :param visibility_tracker:          GSL visibility tracker (optional, carries the candidate satellites
+                                        of each ground station across time steps, see GslVisibilityTracker)
+    :param geometry_precision:          Precision in which positions and ISL lengths are stored ("float64" or "float32")
+
+    :return: Dictionary with:
+             "satellite_positions_m": numpy array (T, N, 3) of satellite ECEF positions in meters (geometry precision)
+             "isl_distances_m": numpy array (T, E) of ISL lengths in meters (geometry precision)
+             "ground_station_satellites_in_range": list (T) of lists (G) of in-range (distance_m, sid)
+                                                   in ascending sid order
+    """
+    dtype = geometry_dtype(geometry_precision)
+    satellite_positions_m = np.asarray(propagator.satellite_positions_m_at_times(times_since_epoch_ns), dtype=dtype)
+    if len(list_isls) > 0:
+        isls = np.asarray(list_isls, dtype=np.int64)
+        isl_distances_m = np.linalg.norm(np.subtract(
+            satellite_positions_m[:, isls[:, 0], :], satellite_positions_m[:, isls[:, 1], :], dtype=np.float64
+        ), axis=2).astype(dtype, copy=False)
+    else:
+        isl_distances_m = np.zeros((len(times_since_epoch_ns), 0), dtype=dtype)
+    if visibility_tracker is not None:
+        ground_station_satellites_in_range = [
+            visibility_tracker.satellites_in_range(satellite_positions_m[i])
+            for i in range(len(times_since_epoch_ns))
+        ]
+    else:
+        ground_station_satellites_in_range = [
+            ground_station_satellites_in_range_m(ground_station_positions, satellite_positions_m[i], max_gsl_length_m)
+            for i in range(len(times_since_epoch_ns))
+        ]
+    return {
+        "satellite_positions_m": satellite_positions_m,
+        "isl_distances_m": isl_distances_m,
+        "ground_station_satellites_in_range": ground_station_satellites_in_range
+    }
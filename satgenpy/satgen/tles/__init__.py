@@ -1,6 +1,8 @@
 from .read_tles import (
     read_tles,
-    satellite_ephem_to_str
+    satellite_ephem_to_str,
+    satellite_ephem_to_elements,
+    satellite_ephem_from_elements
 )
 from .generate_tles_from_scratch import (
     generate_tles_from_scratch_manual,
@@ -21,6 +21,8 @@
 # SOFTWARE.
 
 import ephem
+import math
+import numpy as np
 from astropy.time import Time
 from astropy import units as u
 
@@ -94,3 +96,53 @@ def satellite_ephem_to_str(satellite_ephem):
     res += "  _raan = " + str(satellite_ephem._raan) + "\n"
     res += "}"
     return res
+
+
+def satellite_ephem_to_elements(satellite_ephem):
+    """
+    Orbital elements of an ephem satellite as a picklable tuple (ephem satellites themselves cannot be
+    pickled, e.g., to send them to a worker process). ephem stores the angles in single precision degrees,
+    and these exact values are taken, such that satellite_ephem_from_elements() restores the satellite
+    bit-for-bit.
+
+    :param satellite_ephem:     ephem.EarthSatellite
+
+    :return: Tuple (name, epoch, inclination, RAAN, argument of perigee, mean anomaly (all four in degrees),
+             eccentricity, mean motion, decay, drag, orbit number)
+    """
+    return (
+        satellite_ephem.name,
+        float(satellite_ephem._epoch),
+        float(np.float32(math.degrees(satellite_ephem._inc))),
+        float(np.float32(math.degrees(satellite_ephem._raan))),
+        float(np.float32(math.degrees(satellite_ephem._ap))),
+        float(np.float32(math.degrees(satellite_ephem._M))),
+        satellite_ephem._e,
+        satellite_ephem._n,
+        satellite_ephem._decay,
+        satellite_ephem._drag,
+        satellite_ephem._orbit
+    )
+
+
+def satellite_ephem_from_elements(elements):
+    """
+    :param elements:    Orbital elements (as returned by satellite_ephem_to_elements())
+
+    :return: ephem.EarthSatellite
+    """
+    satellite_ephem = ephem.EarthSatellite()
+    (
+        satellite_ephem.name,
+        satellite_ephem._epoch,
+        satellite_ephem._inc,
+        satellite_ephem._raan,
+        satellite_ephem._ap,
+        satellite_ephem._M,
+        satellite_ephem._e,
+        satellite_ephem._n,
+        satellite_ephem._decay,
+        satellite_ephem._drag,
+        satellite_ephem._orbit
+    ) = elements
+    return satellite_ephem
@@ -0,0 +1,54 @@
+import numpy as np
+
+from satgen.interfaces.interface_table import InterfaceTable
+
+
+def torus_isls(num_orbs, num_sats_per_orb):
+    """
+    ISLs of a torus grid of satellites: each satellite to the next one in its orbit and to the same one
+    in the next orbit.
+
+    :param num_orbs:            Number of orbits
+    :param num_sats_per_orb:    Number of satellites per orbit
+
+    :return: List of ISLs (a, b)
+    """
+    isls = []
+    for o in range(num_orbs):
+        for s in range(num_sats_per_orb):
+            sid = o * num_sats_per_orb + s
+            isls.append((sid, o * num_sats_per_orb + (s + 1) % num_sats_per_orb))
+            isls.append((sid, ((o + 1) % num_orbs) * num_sats_per_orb + s))
+    return isls
+
+
+def torus_with_ground_stations(num_orbs, num_sats_per_orb, num_ground_stations, seed, with_ties=False):
+    """
+    Torus grid of satellites (see torus_isls()) with random ISL lengths, and ground stations each in range
+    of every (num_ground_stations + 1)-th satellite (ground station gid starting at satellite gid).
+
+    :param num_orbs:                Number of orbits
+    :param num_sats_per_orb:        Number of satellites per orbit
+    :param num_ground_stations:     Number of ground stations
+    :param seed:                    Seed of the random ISL and GSL lengths
+    :param with_ties:               True to draw the lengths from a handful of values (such that there are
+                                    many equal distance paths) instead of uniformly
+
+    :return: (num_satellites, isls, isl_weights, ground_station_satellites_in_range, interfaces), interfaces
+             being the InterfaceTable of the ISLs (num_isls_per_sat, sat_neighbor_to_if)
+    """
+    rng = np.random.default_rng(seed)
+    num_satellites = num_orbs * num_sats_per_orb
+    isls = torus_isls(num_orbs, num_sats_per_orb)
+    if with_ties:
+        isl_weights = rng.choice([1000.0, 2000.0, 3000.0], len(isls)).tolist()
+    else:
+        isl_weights = rng.uniform(1000000.0, 5000000.0, len(isls)).tolist()
+    ground_station_satellites_in_range = [
+        [
+            (float(rng.choice([500.0, 700.0]) if with_ties else rng.uniform(500000.0, 1000000.0)), sid)
+            for sid in range(gid, num_satellites, num_ground_stations + 1)
+        ]
+        for gid in range(num_ground_stations)
+    ]
+    return num_satellites, isls, isl_weights, ground_station_satellites_in_range, InterfaceTable(num_satellites, isls)
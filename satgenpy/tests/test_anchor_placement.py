@@ -0,0 +1,111 @@
+import unittest
+
+import exputil
+import numpy as np
+
+from satgen.tles import *
+from satgen.isls import *
+from satgen.dynamic_state.graph_snapshot import *
+from satgen.dynamic_state.anchor_placement import *
+from satgen.dynamic_state.algorithm_jitter_minimized import JitterMinimizedRouter
+
+
+class TestAnchorPlacement(unittest.TestCase):
+
+    def setUp(self):
+        self.local_shell = exputil.LocalShell()
+        self.temp_dir = "temp_anchor_placement_test"
+        self.local_shell.make_full_dir(self.temp_dir)
+
+        # 6 orbits of 8 satellites in a +grid, in which satellite 9 lost its ISLs but the one to satellite 10
+        self.num_orbs, self.num_sats_per_orb = 6, 8
+        generate_tles_from_scratch_manual(
+            self.temp_dir + "/tles.txt", "Test", self.num_orbs, self.num_sats_per_orb, True, 53.0, 0.0000001, 0.0, 15.19
+        )
+        generate_plus_grid_isls(self.temp_dir + "/isls.txt", self.num_orbs, self.num_sats_per_orb, 0, 0)
+        self.satellites = read_tles(self.temp_dir + "/tles.txt")["satellites"]
+        self.isls = [
+            (a, b) for (a, b) in read_isls(self.temp_dir + "/isls.txt", len(self.satellites))
+            if 9 not in (a, b) or 10 in (a, b)
+        ]
+        rng = np.random.default_rng(5)
+        self.graph = GraphSnapshot.from_edges(
+            len(self.satellites), self.isls, rng.uniform(1000000.0, 2000000.0, len(self.isls))
+        )
+
+    def tearDown(self):
+        self.local_shell.remove_force_recursive(self.temp_dir)
+
+    def max_hops_to_nearest_anchor(self, anchors):
+        from scipy.sparse.csgraph import dijkstra
+        hops = dijkstra(self.graph.to_scipy_sparse(), directed=True, unweighted=True, indices=anchors)
+        return int(np.max(np.min(hops, axis=0)))
+
+    def test_orbital_planes(self):
+        planes = orbital_planes(self.satellites)
+        self.assertEqual(len(planes), self.num_orbs)
+        for o, plane in enumerate(planes):
+            self.assertEqual(sorted(plane), list(range(o * self.num_sats_per_orb, (o + 1) * self.num_sats_per_orb)))
+
+    def test_select_anchors(self):
+        degrees = np.diff(self.graph.indptr)
+        self.assertEqual(degrees[9], 1)
+        for anchor_placement in ANCHOR_PLACEMENTS:
+            for num_anchors in [1, 5, 12]:
+                anchors = select_anchors(anchor_placement, num_anchors, self.satellites, self.graph)
+                self.assertEqual(len(anchors), num_anchors)
+                self.assertEqual(len(set(anchors)), num_anchors)
+                for anchor in anchors:
+                    self.assertGreaterEqual(degrees[anchor], 2)
+
+        # Strided as before, farthest point never farther (in hops) from the nearest anchor
+        self.assertEqual(select_anchors("strided", 6, self.satellites, self.graph), [0, 8, 16, 24, 32, 40])
+        self.assertEqual(select_anchors("strided", 48, self.satellites, self.graph)[8:10], [8, 10])
+        for num_anchors in [3, 6, 12]:
+            self.assertLessEqual(
+                self.max_hops_to_nearest_anchor(
+                    select_anchors("farthest_point", num_anchors, self.satellites, self.graph)
+                ),
+                self.max_hops_to_nearest_anchor(select_anchors("strided", num_anchors, self.satellites, self.graph))
+            )
+
+        # Orbit balanced: per plane at most one anchor more than in any other
+        planes = orbital_planes(self.satellites)
+        for num_anchors in [4, 6, 15]:
+            anchors = select_anchors("orbit_balanced", num_anchors, self.satellites, self.graph)
+            per_plane = [len(set(plane).intersection(anchors)) for plane in planes]
+            self.assertEqual(sum(per_plane), num_anchors)
+            self.assertLessEqual(max(per_plane) - min(per_plane), 1)
+
+        with self.assertRaises(ValueError):
+            select_anchors("strided", 0, self.satellites, self.graph)
+        with self.assertRaises(ValueError):
+            select_anchors("random", 5, self.satellites, self.graph)
+
+    def test_router_reselection(self):
+        with self.assertRaises(ValueError):
+            JitterMinimizedRouter(anchor_placement="random")
+        with self.assertRaises(ValueError):
+            JitterMinimizedRouter(anchor_reselection_interval=0)
+
+        # Without an interval, the anchors are only selected at the first time step
+        router = JitterMinimizedRouter(num_anchors=6, anchor_placement="farthest_point")
+        self.assertTrue(router.select_anchors(6, self.satellites, self.graph))
+        anchors = router.anchors
+        rng = np.random.default_rng(6)
+        other_graph = GraphSnapshot.from_edges(
+            len(self.satellites), self.isls, rng.uniform(1000000.0, 2000000.0, len(self.isls))
+        )
+        router.num_steps = 2
+        self.assertFalse(router.select_anchors(6, self.satellites, other_graph))
+        self.assertEqual(router.anchors, anchors)
+
+        # With an interval, on the graph of that time step
+        router = JitterMinimizedRouter(num_anchors=6, anchor_placement="farthest_point", anchor_reselection_interval=2)
+        router.select_anchors(6, self.satellites, self.graph)
+        router.num_steps = 1
+        self.assertFalse(router.select_anchors(6, self.satellites, other_graph))
+        router.num_steps = 2
+        changed = router.select_anchors(6, self.satellites, other_graph)
+        self.assertEqual(router.anchors, select_anchors("farthest_point", 6, self.satellites, other_graph))
+        self.assertEqual(changed, router.anchors != anchors)
@@ -0,0 +1,94 @@
+import concurrent.futures
+import unittest
+
+import numpy as np
+
+from satgen.dynamic_state.graph_snapshot import *
+from satgen.dynamic_state.anchor_shortest_paths import *
+from satgen.dynamic_state.fstate_calculation import *
+
+
+class TestAnchorShortestPaths(unittest.TestCase):
+
+    def assert_path(self, snapshot, path, distance):
+        total = 0.0
+        for u, v in zip(path[:-1], path[1:]):
+            total += snapshot.edges[(u, v)]["weight"]
+        self.assertAlmostEqual(total, distance, delta=1e-6 * distance)
+
+    def test_anchor_data(self):
+        num_orbs, num_sats_per_orb = 7, 9
+        num_satellites = num_orbs * num_sats_per_orb
+        isls = []
+        for o in range(num_orbs):
+            for s in range(num_sats_per_orb):
+                sid = o * num_sats_per_orb + s
+                isls.append((sid, o * num_sats_per_orb + (s + 1) % num_sats_per_orb))
+                isls.append((sid, ((o + 1) % num_orbs) * num_sats_per_orb + s))
+        rng = np.random.default_rng(3)
+        snapshot = GraphSnapshot.from_edges(num_satellites + 1, isls, rng.uniform(1000000.0, 5000000.0, len(isls)))
+        anchors = [0, 13, 31, 50, 50, num_satellites + 7]  # Duplicate and out of range anchors are ignored
+        anchor_data = compute_anchor_data_for_timestep(snapshot, anchors)
+        nearest_anchor = anchor_data['nearest_anchor']
+        anchor_to_anchor = anchor_data['anchor_to_anchor']
+        self.assertIsInstance(nearest_anchor.trees, AnchorShortestPathTrees)
+        self.assertEqual(nearest_anchor.trees.parents.shape, (4, num_satellites + 1))
+
+        # Every satellite finds its nearest anchor, bit-for-bit at the distance of a Dijkstra from the anchor
+        expected_distances, _ = snapshot.shortest_path_trees_to([0, 13, 31, 50])
+        self.assertEqual(len(nearest_anchor), num_satellites)
+        self.assertNotIn(num_satellites, nearest_anchor)
+        self.assertEqual(nearest_anchor.anchor_and_distance(num_satellites), (None, float('inf')))
+        for sid in range(num_satellites):
+            anchor, distance, path = nearest_anchor[sid]
+            self.assertEqual(distance, np.min(expected_distances[sid]))
+            self.assertEqual(nearest_anchor.anchor_and_distance(sid), (anchor, distance))
+            self.assertEqual((path[0], path[-1]), (anchor, sid))
+            self.assert_path(snapshot, path, distance)
+        self.assertEqual(nearest_anchor[13], (13, 0.0, [13]))
+
+        # Anchor pairs (those discovered before nearer anchors claimed the nodes between them) in both
+        # directions, along the same path
+        self.assertGreater(len(anchor_to_anchor), 0)
+        for (src_anchor, dst_anchor), entry in anchor_to_anchor.items():
+            self.assertEqual((entry['path'][0], entry['path'][-1]), (src_anchor, dst_anchor))
+            self.assertEqual(entry['next_hop'], entry['path'][1])
+            self.assertEqual(entry['distance'], anchor_to_anchor.distance(src_anchor, dst_anchor))
+            self.assertEqual(entry['next_hop'], anchor_to_anchor.next_hop(src_anchor, dst_anchor))
+            self.assertEqual(anchor_to_anchor[(dst_anchor, src_anchor)]['path'], entry['path'][::-1])
+            self.assertEqual(anchor_to_anchor[(dst_anchor, src_anchor)]['distance'], entry['distance'])
+            self.assert_path(snapshot, entry['path'], entry['distance'])
+        self.assertNotIn((0, 0), anchor_to_anchor)
+        self.assertEqual(anchor_to_anchor.distance(0, 0), float('inf'))
+        self.assertIsNone(anchor_to_anchor.next_hop(0, 0))
+
+        # The same as full dictionaries
+        self.assertEqual(nearest_anchor.trees.to_dict(), anchor_data)
+
+    def test_dense_arrays(self):
+        snapshot = GraphSnapshot.from_edges(6, [(0, 1), (1, 2), (2, 3), (3, 4)], [1.0, 2.0, 3.0, 4.0])
+        anchor_data = compute_anchor_data_for_timestep(snapshot, [4, 0])
+        trees = anchor_data['nearest_anchor'].trees
+
+        # Positions in another anchor list, node 5 is not connected to any anchor
+        positions, distances, anchor_distances = trees.dense_arrays([7, 0, 4])
+        self.assertEqual(positions.tolist(), [1, 1, 1, 2, 2, -1])
+        self.assertEqual(distances.tolist(), [0.0, 1.0, 3.0, 4.0, 0.0, float('inf')])
+        self.assertEqual(anchor_distances.shape, (3, 3))
+        for i, src_anchor in enumerate([7, 0, 4]):
+            for j, dst_anchor in enumerate([7, 0, 4]):
+                self.assertEqual(
+                    anchor_distances[i, j], anchor_data['anchor_to_anchor'].distance(src_anchor, dst_anchor)
+                )
+        self.assertEqual(anchor_distances[1, 2], 10.0)
+        self.assertEqual(anchor_distances[0, 1], float('inf'))
+
+    def test_worker_process(self):
+        isls = [(i, (i + 1) % 12) for i in range(12)] + [(i, (i + 6) % 12) for i in range(6)]
+        snapshot = GraphSnapshot.from_edges(12, isls, np.linspace(1000.0, 2000.0, len(isls)))
+
+        # Snapshots and anchor data are picklable, so the anchor data can be computed in a worker process
+        with concurrent.futures.ProcessPoolExecutor(max_workers=1) as process_pool:
+            anchor_data = process_pool.submit(compute_anchor_data_for_timestep, snapshot, [0, 4, 8]).result()
+        self.assertEqual(anchor_data, compute_anchor_data_for_timestep(snapshot, [0, 4, 8]))
+        self.assertIs(anchor_data['nearest_anchor'].trees, anchor_data['anchor_to_anchor'].trees)
@@ -0,0 +1,95 @@
+import unittest
+
+import exputil
+
+from satgen.dynamic_state.graph_snapshot import *
+from satgen.dynamic_state.demand_set import *
+from satgen.dynamic_state.fstate_calculation import *
+
+from constellation_fixtures import *
+
+
+class TestDemandSet(unittest.TestCase):
+
+    def assert_demand_fstate(self, num_satellites, demand_set, fstate, demand_fstate):
+        self.assertEqual(fstate.keys(), demand_fstate.keys())
+
+        # Along the paths of the demanded pairs the same decisions as without demand set
+        on_paths = set()
+        for src_gid, dst_gid in demand_set:
+            dst_gs_node_id = num_satellites + dst_gid
+            node = num_satellites + src_gid
+            while node != dst_gs_node_id and (node, dst_gs_node_id) not in on_paths:  # Paths may merge
+                on_paths.add((node, dst_gs_node_id))
+                self.assertEqual(demand_fstate[(node, dst_gs_node_id)], fstate[(node, dst_gs_node_id)])
+                node = demand_fstate[(node, dst_gs_node_id)][0]
+                self.assertNotEqual(node, -1)
+
+        # All others drop
+        for key, next_hop_decision in demand_fstate.items():
+            if key not in on_paths:
+                self.assertEqual(next_hop_decision, (-1, -1, -1))
+
+    def test_check_demand_set(self):
+        self.assertEqual(check_demand_set([(0, 2), [1, 2], (0, 2)], 3), [(0, 2), (1, 2)])
+        with self.assertRaises(ValueError):
+            check_demand_set([(0, 3)], 3)
+        with self.assertRaises(ValueError):
+            check_demand_set([(1, 1)], 3)
+        with self.assertRaises(ValueError):
+            check_demand_set([(0, 1, 2)], 3)
+        with self.assertRaises(ValueError):
+            check_demand_set([], 3)
+
+        # A forwarding loop ends the path (the decisions along it are kept)
+        loop = {(5, 11): (6, 0, 0), (6, 11): (7, 0, 0), (7, 11): (6, 0, 0)}
+        decision_of = restrict_to_demand_set(
+            [(0, 1)], 10, lambda node, dst_gid: loop.get((node, 10 + dst_gid), (5, 0, 0))
+        )
+        self.assertEqual(decision_of(7, 1), (6, 0, 0))
+        self.assertEqual(decision_of(8, 1), (-1, -1, -1))
+        self.assertEqual(decision_of(11, 0), (-1, -1, -1))
+
+    def test_fstate(self):
+        local_shell = exputil.LocalShell()
+        temp_dir = "temp_demand_set_test"
+        local_shell.make_full_dir(temp_dir)
+
+        num_satellites, isls, isl_weights, ground_station_satellites_in_range, interfaces = \
+            torus_with_ground_stations(6, 7, 4, 11)
+        num_ground_stations = len(ground_station_satellites_in_range)
+        num_isls_per_sat, sat_neighbor_to_if = interfaces.num_isls_per_sat, interfaces.sat_neighbor_to_if
+        demand_set = [(0, 2), (1, 2), (3, 0)]
+
+        # Only over ISLs
+        snapshot = GraphSnapshot.from_edges(num_satellites, isls, isl_weights)
+        fstates = [
+            calculate_fstate_shortest_path_without_gs_relaying(
+                temp_dir, 0, num_satellites, num_ground_stations, snapshot, num_isls_per_sat,
+                [0] * num_ground_stations, ground_station_satellites_in_range, sat_neighbor_to_if, None, False,
+                demand_set=demand
+            )
+            for demand in [None, demand_set]
+        ]
+        self.assert_demand_fstate(num_satellites, demand_set, fstates[0], fstates[1])
+
+        # Including ground station relays
+        gsls = [
+            (num_satellites + gid, sid)
+            for gid, in_range in enumerate(ground_station_satellites_in_range) for _, sid in in_range
+        ]
+        gsl_weights = [distance_m for in_range in ground_station_satellites_in_range for distance_m, _ in in_range]
+        snapshot = GraphSnapshot.from_edges(
+            num_satellites + num_ground_stations, isls + gsls, isl_weights + gsl_weights
+        )
+        for method in ["dijkstra", "floyd_warshall"]:
+            fstates = [
+                calculate_fstate_shortest_path_with_gs_relaying(
+                    temp_dir, 0, num_satellites, num_ground_stations, snapshot, num_isls_per_sat,
+                    [0] * num_ground_stations, sat_neighbor_to_if, None, False, method, demand_set=demand
+                )
+                for demand in [None, demand_set]
+            ]
+            self.assert_demand_fstate(num_satellites, demand_set, fstates[0], fstates[1])
+
+        local_shell.remove_force_recursive(temp_dir)
@@ -28,6 +28,7 @@ import math
 from astropy.time import Time
 from astropy import units as u
 import exputil
+import numpy as np
 
 from satgen.distance_tools import *
 from satgen.ground_stations import *
@@ -320,3 +321,127 @@ class TestDistanceTools(unittest.TestCase):
             straight_shadow_distance_m,
             delta=20000  # 20km
         )
+
+    def test_ground_station_satellites_in_range(self):
+
+        # Satellites on a shell at 630 km, ground stations on the surface
+        random = np.random.default_rng(123)
+        satellite_directions = random.normal(size=(500, 3))
+        satellite_positions_m = satellite_directions / np.linalg.norm(satellite_directions, axis=1)[:, None] \
+            * (6378135.0 + 630000.0)
+        ground_station_directions = random.normal(size=(50, 3))
+        ground_station_positions = ground_station_directions \
+            / np.linalg.norm(ground_station_directions, axis=1)[:, None] * 6378135.0
+
+        # Exactly the same as the linear scan (in sid order)
+        max_gsl_length_m = 1260000.0
+        in_range = ground_station_satellites_in_range_m(
+            ground_station_positions, satellite_positions_m, max_gsl_length_m
+        )
+        self.assertEqual(len(in_range), 50)
+        for gid in range(50):
+            distances_m = distances_m_ground_station_to_satellites(
+                ground_station_positions[gid], satellite_positions_m
+            )
+            expected = [(float(distances_m[sid]), int(sid)) for sid in np.nonzero(distances_m <= max_gsl_length_m)[0]]
+            self.assertEqual(in_range[gid], expected)
+        self.assertGreater(sum(map(len, in_range)), 0)
+
+        # A satellite exactly at the maximum distance is still in range
+        gid = next(gid for gid in range(50) if len(in_range[gid]) > 0)
+        exact_max_gsl_length_m = in_range[gid][-1][0]
+        self.assertIn(
+            in_range[gid][-1],
+            ground_station_satellites_in_range_m(
+                ground_station_positions[gid:gid + 1], satellite_positions_m, exact_max_gsl_length_m
+            )[0]
+        )
+
+    def test_numeric_ephem_date(self):
+        kuiper_satellite_0 = ephem.readtle(
+            "Kuiper-630 0",
+            "1 00001U 00000ABC 00001.00000000  .00000000  00000-0  00000+0 0    04",
+            "2 00001  51.9000   0.0000 0000001   0.0000   0.0000 14.80000000    02"
+        )
+        kuiper_satellite_1 = ephem.readtle(
+            "Kuiper-630 1",
+            "1 00002U 00000ABC 00001.00000000  .00000000  00000-0  00000+0 0    05",
+            "2 00002  51.9000   0.0000 0000001   0.0000  10.5882 14.80000000    07"
+        )
+        ground_station = {
+            "gid": 0,
+            "name": "Paris",
+            "latitude_degrees_str": "48.8566",
+            "longitude_degrees_str": "2.3522",
+            "elevation_m_float": 0.0,
+        }
+
+        # Epoch
+        epoch = Time("2000-01-01 00:00:00", scale="tdb")
+        epoch_date = ephem_date(epoch)
+        self.assertEqual(epoch_date, float(ephem.Date(str(epoch))))
+        self.assertEqual(ephem_date(epoch_date), epoch_date)
+        self.assertEqual(ephem_date_from_julian_date(epoch.jd1 + epoch.jd2), epoch_date)
+
+        # For millisecond-aligned times, the numeric date yields exactly the same distances as the string
+        for time_since_epoch_ns in [0, 1000000, 100000000, 1000000000, 123456000000, 100 * 60000000000]:
+            time = epoch + time_since_epoch_ns * u.ns
+            date = ephem_date_at(epoch_date, time_since_epoch_ns)
+            self.assertEqual(date, float(ephem.Date(str(time))))
+            self.assertEqual(
+                distance_m_between_satellites(kuiper_satellite_0, kuiper_satellite_1, epoch_date, date),
+                distance_m_between_satellites(kuiper_satellite_0, kuiper_satellite_1, str(epoch), str(time))
+            )
+            self.assertEqual(
+                distance_m_ground_station_to_satellite(ground_station, kuiper_satellite_0, epoch_date, date),
+                distance_m_ground_station_to_satellite(ground_station, kuiper_satellite_0, str(epoch), str(time))
+            )
+            self.assertEqual(
+                create_basic_ground_station_for_satellite_shadow(kuiper_satellite_1, epoch_date, date),
+                create_basic_ground_station_for_satellite_shadow(kuiper_satellite_1, str(epoch), str(time))
+            )
+
+    def test_gsl_visibility_tracker(self):
+
+        # Satellites on a shell at 630 km, ground stations on the surface
+        random = np.random.default_rng(456)
+        satellite_directions = random.normal(size=(500, 3))
+        satellite_positions_m = satellite_directions / np.linalg.norm(satellite_directions, axis=1)[:, None] \
+            * (6378135.0 + 630000.0)
+        ground_station_directions = random.normal(size=(50, 3))
+        ground_station_positions = ground_station_directions \
+            / np.linalg.norm(ground_station_directions, axis=1)[:, None] * 6378135.0
+
+        # Rotate the shell by ~7 km per time step, such that satellites enter and leave the range
+        max_gsl_length_m = 1260000.0
+        tracker = GslVisibilityTracker(ground_station_positions, max_gsl_length_m, guard_band_m=30000.0)
+        angle_rad = 7000.0 / (6378135.0 + 630000.0)
+        rotation = np.array([
+            [1.0, 0.0, 0.0],
+            [0.0, math.cos(angle_rad), -math.sin(angle_rad)],
+            [0.0, math.sin(angle_rad), math.cos(angle_rad)]
+        ])
+        num_changes = 0
+        previous = None
+        for _ in range(50):
+            expected = ground_station_satellites_in_range_m(
+                ground_station_positions, satellite_positions_m, max_gsl_length_m
+            )
+            result = tracker.satellites_in_range(satellite_positions_m)
+            self.assertEqual(result, expected)
+            if previous is not None:
+                num_changes += sum(
+                    set(sid for _, sid in a) != set(sid for _, sid in b) for a, b in zip(previous, result)
+                )
+            previous = result
+            satellite_positions_m = satellite_positions_m @ rotation.T
+
+        # Visibility changed, and the candidates were refreshed only every few time steps
+        self.assertGreater(num_changes, 0)
+        self.assertEqual(tracker.num_updates, 50)
+        self.assertGreater(tracker.num_refreshes, 1)
+        self.assertLess(tracker.num_refreshes, 20)
+
+        # Invalid guard band
+        with self.assertRaises(ValueError):
+            GslVisibilityTracker(ground_station_positions, max_gsl_length_m, guard_band_m=-1.0)
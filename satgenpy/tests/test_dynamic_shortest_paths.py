@@ -0,0 +1,111 @@
+import unittest
+
+import numpy as np
+
+from satgen.dynamic_state.graph_snapshot import *
+from satgen.dynamic_state.dynamic_shortest_paths import *
+
+from constellation_fixtures import *
+
+
+class TestDynamicShortestPaths(unittest.TestCase):
+
+    def assert_shortest_path_trees(self, snapshot, roots, distances, next_hops):
+        expected_distances, _ = snapshot.shortest_path_trees_to(roots)
+        self.assertTrue(np.array_equal(distances, expected_distances))
+        for i, root in enumerate(roots):
+            for node in range(snapshot.num_nodes):
+                if node == root or np.isinf(distances[node, i]):
+                    self.assertEqual(next_hops[node, i], -1)
+                else:
+                    next_hop = next_hops[node, i]
+                    self.assertEqual(
+                        distances[node, i], distances[next_hop, i] + snapshot.edges[(node, next_hop)]["weight"]
+                    )
+
+    def test_slowly_changing_weights(self):
+        isls = torus_isls(8, 6)
+        rng = np.random.default_rng(5)
+        weights = rng.uniform(1000000.0, 5000000.0, len(isls))
+        drift = rng.uniform(-20000.0, 20000.0, len(isls))
+        roots = [0, 7, 13, 30, 47]
+        trees = DynamicShortestPathTrees(max_invalid_fraction=1.0)
+        for t in range(30):
+            snapshot = GraphSnapshot.from_edges(48, isls, weights + t * drift)
+            distances, next_hops = trees.update(snapshot, roots)
+            self.assertEqual(distances.shape, (48, 5))
+
+            # Bit-for-bit the distances of a Dijkstra from scratch
+            self.assert_shortest_path_trees(snapshot, roots, distances, next_hops)
+
+        # Only the first time step is calculated from scratch, the others keep or repair their trees
+        self.assertEqual(trees.statistics["num_updates"], 30)
+        self.assertEqual(trees.statistics["num_full_recomputes"], 1)
+        self.assertEqual(trees.statistics["num_trees_calculated"], 5)
+        self.assertEqual(trees.statistics["num_trees_kept"] + trees.statistics["num_trees_repaired"], 29 * 5)
+        self.assertGreater(trees.statistics["num_trees_repaired"], 0)
+
+    def test_changing_roots_and_topology(self):
+        isls = torus_isls(5, 5)
+        rng = np.random.default_rng(2)
+        weights = rng.uniform(1000.0, 2000.0, len(isls))
+        trees = DynamicShortestPathTrees(max_invalid_fraction=1.0)
+        trees.update(GraphSnapshot.from_edges(26, isls, weights), [3, 11])
+
+        # A new root is calculated from scratch, a dropped root is forgotten
+        snapshot = GraphSnapshot.from_edges(26, isls, weights * 1.001)
+        distances, next_hops = trees.update(snapshot, [20, 3])
+        self.assert_shortest_path_trees(snapshot, [20, 3], distances, next_hops)
+        self.assertEqual(trees.statistics["num_trees_calculated"], 3)
+        self.assertEqual(trees.roots, [20, 3])
+
+        # Removing tree edges and adding an edge (to the isolated node 25) repairs the trees
+        snapshot = GraphSnapshot.from_edges(26, isls[4:] + [(25, 3)], np.append(weights[4:], 500.0))
+        distances, next_hops = trees.update(snapshot, [20, 3])
+        self.assert_shortest_path_trees(snapshot, [20, 3], distances, next_hops)
+        self.assertEqual(trees.statistics["num_full_recomputes"], 1)
+
+        # Disconnecting a root leaves only itself reachable
+        remaining_isls = [(a, b) for (a, b) in isls if 20 not in (a, b)]
+        snapshot = GraphSnapshot.from_edges(26, remaining_isls, [1000.0] * len(remaining_isls))
+        distances, next_hops = trees.update(snapshot, [20, 3])
+        self.assert_shortest_path_trees(snapshot, [20, 3], distances, next_hops)
+        self.assertEqual(np.sum(np.isfinite(distances[:, 0])), 1)
+
+        # Another number of nodes cannot carry any tree
+        snapshot = GraphSnapshot.from_edges(25, isls, weights)
+        distances, next_hops = trees.update(snapshot, [20, 3])
+        self.assert_shortest_path_trees(snapshot, [20, 3], distances, next_hops)
+        self.assertEqual(trees.statistics["num_full_recomputes"], 2)
+
+    def test_fallback_to_full_recompute(self):
+        isls = torus_isls(4, 4)
+        rng = np.random.default_rng(9)
+        roots = [0, 5, 10, 15]
+
+        # Completely new weights invalidate most trees
+        trees = DynamicShortestPathTrees(max_invalid_fraction=0.0)
+        for t in range(5):
+            snapshot = GraphSnapshot.from_edges(16, isls, rng.uniform(1.0, 10.0, len(isls)))
+            distances, next_hops = trees.update(snapshot, roots)
+            self.assert_shortest_path_trees(snapshot, roots, distances, next_hops)
+        self.assertEqual(trees.statistics["num_trees_repaired"], 0)
+        self.assertEqual(trees.statistics["num_trees_kept"] + trees.statistics["num_trees_calculated"], 5 * 4)
+        self.assertEqual(trees.statistics["num_trees_calculated"], 4 * trees.statistics["num_full_recomputes"])
+        self.assertGreater(trees.statistics["num_full_recomputes"], 1)
+
+        # Unchanged weights keep all trees, even if no tree may be invalidated
+        num_full_recomputes = trees.statistics["num_full_recomputes"]
+        trees.update(snapshot, roots)
+        self.assertEqual(trees.statistics["num_full_recomputes"], num_full_recomputes)
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            DynamicShortestPathTrees(max_invalid_fraction=1.5)
+        snapshot = GraphSnapshot.from_edges(3, [(0, 1)], [1.0])
+        trees = DynamicShortestPathTrees()
+        with self.assertRaises(ValueError):
+            trees.update(snapshot, [3])
+        distances, next_hops = trees.update(snapshot, [])
+        self.assertEqual(distances.shape, (3, 0))
+        self.assertEqual(next_hops.shape, (3, 0))
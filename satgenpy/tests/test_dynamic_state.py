@@ -21,7 +21,9 @@
 # SOFTWARE.
 
 
+import concurrent.futures
 import exputil
+import numpy as np
 import unittest
 from satgen import *
 
@@ -196,3 +198,144 @@ class TestDynamicState(unittest.TestCase):
 
         # Clean up
         local_shell.remove_force_recursive(temp_gen_data)
+
+    def test_graph_states_window(self):
+        local_shell = exputil.LocalShell()
+        temp_dir = "temp_graph_states_window"
+        local_shell.make_full_dir(temp_dir)
+        local_shell.write_file(
+            temp_dir + "/ground_stations.txt",
+            (
+                "0,Luanda,-8.836820,13.234320,0.000000,6135530.183815,1442953.502786,-973332.344974\n"
+                "1,Lagos,6.453060,3.395830,0.000000,6326864.177950,375422.898833,712064.787620\n"
+                "2,Kinshasa,-4.327580,15.313570,0.000000,6134256.671861,1679704.404461,-478073.165313"
+            )
+        )
+        local_shell.write_file(
+            temp_dir + "/tles.txt",
+            (
+                "1 3\n"
+                "Starlink-550 0\n"
+                "1 01308U 00000ABC 00001.00000000  .00000000  00000-0  00000+0 0    05\n"
+                "2 01308  53.0000 295.0000 0000001   0.0000 155.4545 15.19000000    04\n"
+                "Starlink-550 1\n"
+                "1 01309U 00000ABC 00001.00000000  .00000000  00000-0  00000+0 0    06\n"
+                "2 01309  53.0000 295.0000 0000001   0.0000 171.8182 15.19000000    04\n"
+                "Starlink-550 2\n"
+                "1 01310U 00000ABC 00001.00000000  .00000000  00000-0  00000+0 0    08\n"
+                "2 01310  53.0000 295.0000 0000001   0.0000 188.1818 15.19000000    03"
+            )
+        )
+        ground_stations = read_ground_stations_extended(temp_dir + "/ground_stations.txt")
+        tles = read_tles(temp_dir + "/tles.txt")
+        satellites = tles["satellites"]
+        list_isls = [(0, 1), (1, 2)]
+        list_gsl_interfaces_info = [{"number_of_interfaces": 1, "aggregate_max_bandwidth": 1.0}] * 6
+        times_since_epoch_ns = [0, 20000000000, 40000000000, 60000000000]
+        local_shell.remove_force_recursive(temp_dir)
+
+        for propagation_engine in ["ephem", "sgp4"]:
+            propagator = create_propagator(propagation_engine, tles["epoch"], satellites)
+
+            # A window of graph states is the same as generating each of them separately
+            graph_states = generate_graph_states_at(
+                tles["epoch"], times_since_epoch_ns, satellites, ground_stations, list_isls,
+                list_gsl_interfaces_info, 1089686.4181956202, 5016591.2330984278, False, propagator
+            )
+            self.assertEqual(len(graph_states), len(times_since_epoch_ns))
+            for i, time_since_epoch_ns in enumerate(times_since_epoch_ns):
+                graph_state = generate_graph_state_at(
+                    tles["epoch"], time_since_epoch_ns, satellites, ground_stations, list_isls,
+                    list_gsl_interfaces_info, 1089686.4181956202, 5016591.2330984278, False, propagator
+                )
+                self.assertEqual(
+                    graph_states[i]["ground_station_satellites_in_range"],
+                    graph_state["ground_station_satellites_in_range"]
+                )
+                self.assertEqual(
+                    sorted(graph_states[i]["sat_net_graph_only_satellites_with_isls"].edges(data="weight")),
+                    sorted(graph_state["sat_net_graph_only_satellites_with_isls"].edges(data="weight"))
+                )
+                self.assertEqual(graph_states[i]["sat_neighbor_to_if"], graph_state["sat_neighbor_to_if"])
+
+            # The satellites in range change over the window
+            self.assertNotEqual(
+                graph_states[0]["ground_station_satellites_in_range"],
+                graph_states[-1]["ground_station_satellites_in_range"]
+            )
+
+            # Tracking the satellites in range incrementally yields the same graph states
+            if propagator is not None:
+                tracked_graph_states = generate_graph_states_at(
+                    tles["epoch"], times_since_epoch_ns, satellites, ground_stations, list_isls,
+                    list_gsl_interfaces_info, 1089686.4181956202, 5016591.2330984278, False, propagator,
+                    GslVisibilityTracker(ground_station_positions_m(ground_stations), 1089686.4181956202)
+                )
+                for i in range(len(times_since_epoch_ns)):
+                    self.assertEqual(
+                        tracked_graph_states[i]["ground_station_satellites_in_range"],
+                        graph_states[i]["ground_station_satellites_in_range"]
+                    )
+
+            # Only the geometry of the window (as kept by the lookahead routers) is the same as well
+            window_geometry = generate_window_geometry_at(
+                tles["epoch"], times_since_epoch_ns, satellites, ground_stations, list_isls,
+                list_gsl_interfaces_info, 1089686.4181956202, 5016591.2330984278, False, propagator
+            )
+            self.assertEqual(window_geometry["isl_distances_m"].shape, (len(times_since_epoch_ns), len(list_isls)))
+            for i in range(len(times_since_epoch_ns)):
+                self.assertEqual(
+                    window_geometry["ground_station_satellites_in_range"][i],
+                    graph_states[i]["ground_station_satellites_in_range"]
+                )
+            with self.assertRaises(ValueError):
+                generate_window_geometry_at(
+                    tles["epoch"], times_since_epoch_ns, satellites, ground_stations, list_isls,
+                    list_gsl_interfaces_info, 1089686.4181956202, 1000.0, False, propagator
+                )
+
+            # Computing the time instants in worker processes yields the same geometry
+            with concurrent.futures.ProcessPoolExecutor(max_workers=2) as process_pool:
+                parallel_window_geometry = generate_window_geometry_at(
+                    tles["epoch"], times_since_epoch_ns, satellites, ground_stations, list_isls,
+                    list_gsl_interfaces_info, 1089686.4181956202, 5016591.2330984278, False, propagator,
+                    process_pool=process_pool
+                )
+            self.assertTrue(np.array_equal(
+                parallel_window_geometry["isl_distances_m"], window_geometry["isl_distances_m"]
+            ))
+            self.assertEqual(
+                parallel_window_geometry["ground_station_satellites_in_range"],
+                window_geometry["ground_station_satellites_in_range"]
+            )
+
+            # Lookahead window of three time steps, which is moved one time step forward
+            window = LookaheadWindow(len(satellites), list_isls, 3)
+            window.push_window_geometry(times_since_epoch_ns[:3], window_geometry)
+            self.assertEqual(len(window), 3)
+            window.push(
+                times_since_epoch_ns[3],
+                window_geometry["isl_distances_m"][3],
+                window_geometry["ground_station_satellites_in_range"][3]
+            )
+            self.assertEqual(len(window), 3)
+            self.assertEqual(window.num_isls_per_sat, graph_states[0]["num_isls_per_sat"])
+            self.assertEqual(window.sat_neighbor_to_if, graph_states[0]["sat_neighbor_to_if"])
+            for i in range(3):
+                self.assertEqual(window.time_since_epoch_ns_at(i), times_since_epoch_ns[i + 1])
+                self.assertEqual(
+                    window.ground_station_satellites_in_range_at(i),
+                    graph_states[i + 1]["ground_station_satellites_in_range"]
+                )
+                self.assertEqual(
+                    window.isl_graph_at(i).edges(data="weight"),
+                    graph_states[i + 1]["sat_net_graph_only_satellites_with_isls"].edges(data="weight")
+                )
+            with self.assertRaises(ValueError):
+                window.isl_graph_at(3)
+            with self.assertRaises(ValueError):
+                window.push(0, [1.0], [])
+
+            # The interface identifiers are determined once for the whole window
+            self.assertIs(graph_states[0]["interface_table"], graph_states[-1]["interface_table"])
+            self.assertIs(graph_states[0]["sat_neighbor_to_if"], graph_states[-1]["sat_neighbor_to_if"])
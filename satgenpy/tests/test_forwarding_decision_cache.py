@@ -0,0 +1,93 @@
+import unittest
+
+import exputil
+import numpy as np
+
+from satgen.dynamic_state.graph_snapshot import *
+from satgen.dynamic_state.forwarding_decision_cache import *
+from satgen.dynamic_state.fstate_calculation import *
+from satgen.interfaces.interface_table import *
+
+from constellation_fixtures import *
+
+
+class TestForwardingDecisionCache(unittest.TestCase):
+
+    def test_outdated(self):
+        cache = ForwardingDecisionCache()
+        never = np.zeros(4, dtype=bool)
+        cache.advance(np.array([0, 0, 3, 3]), np.array([-1, 0, -1, 3]), {1: (0, 1), 2: (3, 2)})
+        best_dst_sats = np.array([1, 1, 2, -1])
+        self.assertTrue(np.all(cache.outdated(0, best_dst_sats, never)))
+        for sat in range(4):
+            cache.store(0, sat, int(best_dst_sats[sat]), (sat, 0, 0))
+        self.assertFalse(np.any(cache.outdated(0, best_dst_sats, never)))
+        self.assertEqual(cache.decision(0, 2), (2, 0, 0))
+        self.assertEqual((cache.num_calculated, cache.num_reused), (4, 1))
+
+        # Nearest anchor switch of satellite 1, path change of egress satellite 2, other egress satellite
+        cache.advance(np.array([0, 3, 3, 3]), np.array([-1, 2, -1, 3]), {1: (0, 1), 2: (3, 1, 2)})
+        self.assertEqual(cache.outdated(0, best_dst_sats, never).tolist(), [False, True, True, False])
+        self.assertEqual(cache.outdated(0, np.array([1, 1, 2, 1]), never).tolist(), [False, True, True, True])
+        self.assertEqual(cache.outdated(0, best_dst_sats, np.array([True, False, False, False])).tolist(),
+                         [True, True, True, False])
+
+        # An egress satellite which was not in range at the previous time step has no known path
+        cache.advance(np.array([0, 3, 3, 3]), np.array([-1, 2, -1, 3]), {1: (0, 1)})
+        cache.advance(np.array([0, 3, 3, 3]), np.array([-1, 2, -1, 3]), {1: (0, 1), 2: (3, 1, 2)})
+        self.assertTrue(cache.outdated(0, best_dst_sats, never)[2])
+
+        # Decisions towards another ground station are not known yet
+        self.assertTrue(np.all(cache.outdated(1, best_dst_sats, never)))
+
+    def test_same_forwarding_state(self):
+        local_shell = exputil.LocalShell()
+        temp_dir = "temp_forwarding_decision_cache_test"
+        local_shell.make_full_dir(temp_dir)
+
+        # Torus of 8 x 9 satellites with ISL lengths and visibility changing over time
+        num_orbs, num_sats_per_orb, num_ground_stations = 8, 9, 5
+        num_satellites = num_orbs * num_sats_per_orb
+        isls = torus_isls(num_orbs, num_sats_per_orb)
+        interfaces = InterfaceTable(num_satellites, isls)
+        num_isls_per_sat, sat_neighbor_to_if = interfaces.num_isls_per_sat, interfaces.sat_neighbor_to_if
+        rng = np.random.default_rng(7)
+        base_weights = rng.uniform(1000000.0, 2000000.0, len(isls))
+        phases = rng.uniform(0.0, 2.0 * np.pi, len(isls))
+        num_steps, window = 12, 4
+        graphs = [
+            GraphSnapshot.from_edges(num_satellites, isls, base_weights * (1.0 + 0.4 * np.sin(0.5 * t + phases)))
+            for t in range(num_steps + window)
+        ]
+        in_range = [
+            [
+                [(float(rng.uniform(500000.0, 1000000.0)), int(sid))
+                 for sid in sorted(rng.choice(num_satellites, 3, replace=False))]
+                for _ in range(num_ground_stations)
+            ]
+            for _ in range(num_steps + window)
+        ]
+
+        # Sliding lookahead window, with and without decision cache
+        for demand_set in [None, [(0, 1), (2, 1), (4, 3)]]:
+            decision_cache = ForwardingDecisionCache()
+            prev = [None, None]
+            prev_anchor_data = [None, None]
+            num_reused = 0
+            for t in range(num_steps):
+                fstates = []
+                for i, cache in enumerate([None, decision_cache]):
+                    fstate, prev_anchor_data[i] = calculate_anchor_lmsr_path_complete_forwarding(
+                        temp_dir, t, num_satellites, num_ground_stations, graphs[t:t + window],
+                        [num_isls_per_sat] * window, list(range(num_ground_stations)), in_range[t:t + window],
+                        [sat_neighbor_to_if] * window, [0, 20, 40, 60], prev[i], prev_anchor_data[i], False,
+                        demand_set=demand_set, decision_cache=cache
+                    )
+                    prev[i] = fstate
+                    fstates.append(fstate)
+                self.assertEqual(fstates[0], fstates[1])
+                num_reused += decision_cache.num_reused
+            if demand_set is None:
+                self.assertGreater(num_reused, 0)
+
+        local_shell.remove_force_recursive(temp_dir)
@@ -0,0 +1,261 @@
+import unittest
+
+import exputil
+import networkx as nx
+import numpy as np
+
+from satgen.dynamic_state.graph_snapshot import *
+from satgen.dynamic_state.fstate_calculation import *
+from satgen.interfaces.interface_table import *
+
+from constellation_fixtures import *
+
+
+class TestGraphSnapshot(unittest.TestCase):
+
+    def test_from_edges(self):
+        edges = [(0, 3), (2, 0), (1, 0), (3, 2), (4, 1)]
+        weights = [5.0, 1.5, 2.0, 7.25, 3.0]
+        snapshot = GraphSnapshot.from_edges(6, edges, weights)
+        graph = nx.Graph()
+        graph.add_nodes_from(range(6))
+        for (a, b), w in zip(edges, weights):
+            graph.add_edge(a, b, weight=w)
+
+        # CSR arrays
+        self.assertEqual(snapshot.indptr.tolist(), [0, 3, 5, 7, 9, 10, 10])
+        self.assertEqual(snapshot.indices.tolist(), [3, 2, 1, 0, 4, 0, 3, 0, 2, 1])
+        self.assertEqual(snapshot.weights.tolist(), [5.0, 1.5, 2.0, 2.0, 3.0, 1.5, 7.25, 5.0, 7.25, 3.0])
+
+        # Adapter behaves as the nx.Graph (including the neighbor order)
+        self.assertEqual(snapshot.number_of_nodes(), 6)
+        self.assertEqual(snapshot.number_of_edges(), 5)
+        self.assertEqual(list(snapshot.nodes()), list(graph.nodes()))
+        for u in range(6):
+            self.assertEqual(list(snapshot.neighbors(u)), list(graph.neighbors(u)))
+            self.assertEqual(snapshot.degree(u), graph.degree(u))
+            for v in range(6):
+                self.assertEqual(snapshot.has_edge(u, v), graph.has_edge(u, v))
+                self.assertEqual(snapshot.get_edge_data(u, v), graph.get_edge_data(u, v))
+            for v in graph.neighbors(u):
+                self.assertEqual(snapshot.edges[(u, v)]["weight"], graph.edges[(u, v)]["weight"])
+                self.assertEqual(snapshot[u][v].get("weight", 1.0), graph[u][v].get("weight", 1.0))
+        self.assertEqual(snapshot.edges(data="weight"), list(graph.edges(data="weight")))
+        self.assertEqual(list(snapshot.edges), list(graph.edges))
+        self.assertIn(5, snapshot)
+        self.assertNotIn(6, snapshot)
+        self.assertFalse(snapshot.has_edge(7, 0))
+        with self.assertRaises(KeyError):
+            snapshot.edges[(0, 4)]
+
+        # Conversions
+        converted = snapshot.to_networkx()
+        self.assertEqual(list(converted.edges(data="weight")), list(graph.edges(data="weight")))
+        for u in range(6):
+            self.assertEqual(list(converted.neighbors(u)), list(graph.neighbors(u)))
+        from_networkx = GraphSnapshot.from_networkx(graph)
+        self.assertEqual(from_networkx.indptr.tolist(), snapshot.indptr.tolist())
+        self.assertEqual(from_networkx.indices.tolist(), snapshot.indices.tolist())
+        self.assertEqual(from_networkx.weights.tolist(), snapshot.weights.tolist())
+        self.assertIs(as_graph_snapshot(snapshot), snapshot)
+        self.assertEqual(as_graph_snapshot(graph).indices.tolist(), snapshot.indices.tolist())
+        self.assertEqual(snapshot.to_scipy_sparse()[3, 2], 7.25)
+
+        # Without edges
+        empty = GraphSnapshot.from_edges(3, [], [])
+        self.assertEqual(empty.indptr.tolist(), [0, 0, 0, 0])
+        self.assertEqual(empty.edges(data="weight"), [])
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            GraphSnapshot.from_edges(3, [(0, 1)], [1.0, 2.0])
+        with self.assertRaises(ValueError):
+            GraphSnapshot.from_edges(3, [(1, 1)], [1.0])
+        with self.assertRaises(ValueError):
+            GraphSnapshot.from_edges(3, [(0, 3)], [1.0])
+        with self.assertRaises(ValueError):
+            GraphSnapshot(3, [0, 1, 2], [1, 0], [1.0, 1.0])
+        with self.assertRaises(ValueError):
+            GraphSnapshot(2, [0, 1, 3], [1, 0], [1.0, 1.0])
+        graph = nx.Graph()
+        graph.add_edge(1, 2)
+        with self.assertRaises(ValueError):
+            GraphSnapshot.from_networkx(graph)
+
+    def test_floyd_warshall(self):
+        num_satellites, isls = 6 * 5, torus_isls(6, 5)
+        rng = np.random.default_rng(2)
+        isl_weights = rng.uniform(1000000.0, 5000000.0, len(isls)).tolist()
+
+        # Two more nodes, one of them unreachable
+        edges = isls + [(0, num_satellites)]
+        weights = isl_weights + [123456.789]
+        snapshot = GraphSnapshot.from_edges(num_satellites + 2, edges, weights)
+        graph = nx.Graph()
+        graph.add_nodes_from(range(num_satellites + 2))
+        for (a, b), w in zip(edges, weights):
+            graph.add_edge(a, b, weight=w)
+
+        # Bit-for-bit the same as networkx
+        dist = snapshot.floyd_warshall()
+        self.assertTrue(np.array_equal(dist, nx.floyd_warshall_numpy(graph)))
+        self.assertTrue(math.isinf(dist[0, num_satellites + 1]))
+        self.assertEqual(dist[num_satellites + 1, num_satellites + 1], 0.0)
+
+    def test_shortest_path_distances_to(self):
+        num_satellites, isls = 6 * 5, torus_isls(6, 5)
+        rng = np.random.default_rng(3)
+        isl_weights = rng.uniform(1000000.0, 5000000.0, len(isls)).tolist()
+        snapshot = GraphSnapshot.from_edges(num_satellites + 1, isls, isl_weights)
+        dist = snapshot.floyd_warshall()
+
+        # Columns are the distances to the targets (equal to Floyd-Warshall up to rounding)
+        targets = [17, 3, num_satellites, 3]
+        dist_to = snapshot.shortest_path_distances_to(targets)
+        self.assertEqual(dist_to.shape, (num_satellites + 1, 4))
+        self.assertTrue(np.allclose(dist_to, dist[:, targets], rtol=1e-12, atol=0.0))
+        self.assertTrue(np.all(np.isinf(dist_to[:num_satellites, 2])))
+        self.assertEqual(dist_to[17, 0], 0.0)
+
+        # Trees: the next hop of a node is a neighbor one edge closer to the target
+        dist_tree, next_hops = snapshot.shortest_path_trees_to(targets)
+        self.assertTrue(np.array_equal(dist_tree, dist_to))
+        for node in range(num_satellites):
+            for i in [0, 1]:
+                if node == targets[i]:
+                    self.assertEqual(next_hops[node, i], -1)
+                else:
+                    next_hop = next_hops[node, i]
+                    self.assertTrue(snapshot.has_edge(node, next_hop))
+                    self.assertAlmostEqual(
+                        dist_to[node, i], snapshot.edges[(node, next_hop)]["weight"] + dist_to[next_hop, i], delta=1e-6
+                    )
+        self.assertTrue(np.all(next_hops[:, 2] == -1))
+        self.assertEqual(snapshot.shortest_path_trees_to([])[1].shape, (num_satellites + 1, 0))
+
+        # No targets, and a target which is not a node
+        self.assertEqual(snapshot.shortest_path_distances_to([]).shape, (num_satellites + 1, 0))
+        with self.assertRaises(ValueError):
+            snapshot.shortest_path_distances_to([num_satellites + 1])
+
+    def test_padded_neighbors(self):
+        snapshot = GraphSnapshot.from_edges(5, [(0, 3), (2, 0), (1, 0), (3, 2)], [5.0, 1.5, 2.0, 7.25])
+        neighbors, entries = snapshot.padded_neighbors()
+        self.assertEqual(neighbors.tolist(), [[3, 2, 1], [0, 5, 5], [0, 3, 5], [0, 2, 5], [5, 5, 5]])
+        self.assertEqual(entries.tolist(), [[0, 1, 2], [3, 8, 8], [4, 5, 8], [6, 7, 8], [8, 8, 8]])
+        neighbors, entries = GraphSnapshot.from_edges(2, [], []).padded_neighbors()
+        self.assertEqual(neighbors.tolist(), [[2], [2]])
+        self.assertEqual(entries.tolist(), [[0], [0]])
+
+    def test_fstate_tie_breaking(self):
+        local_shell = exputil.LocalShell()
+        temp_dir = "temp_graph_snapshot_test"
+        local_shell.make_full_dir(temp_dir)
+
+        # Square 0 - {1, 2} - 3 of equal length ISLs, in both neighbor orders of satellite 0
+        for isls, first_neighbor in [([(0, 1), (0, 2), (1, 3), (2, 3)], 1), ([(0, 2), (0, 1), (1, 3), (2, 3)], 2)]:
+            interfaces = InterfaceTable(4, isls)
+            num_isls_per_sat, sat_neighbor_to_if = interfaces.num_isls_per_sat, interfaces.sat_neighbor_to_if
+
+            # Equal distance next hops: the first neighbor; equal distance satellites
+            # in range of the destination: the lowest satellite identifier
+            fstate = calculate_fstate_shortest_path_without_gs_relaying(
+                temp_dir, 0, 4, 2, GraphSnapshot.from_edges(4, isls, [1000.0] * 4), num_isls_per_sat, [0, 0],
+                [[(500.0, 3)], [(600.0, 2), (600.0, 1)]], sat_neighbor_to_if, None, False
+            )
+            self.assertEqual(fstate[(0, 4)][0], first_neighbor)
+            self.assertEqual(fstate[(3, 4)], (4, 2, 0))
+            self.assertEqual(fstate[(0, 5)][0], 1)
+            self.assertEqual(fstate[(3, 5)][0], 1)
+            self.assertEqual(fstate[(5, 4)], (1, 0, 2))
+            self.assertEqual(fstate[(4, 5)], (3, 0, 2))
+
+            # Same with ground station relays (ground station 4 at satellite 0, 5 at satellite 3)
+            graph = GraphSnapshot.from_edges(6, isls + [(0, 4), (3, 5)], [1000.0] * 4 + [500.0, 500.0])
+            fstate = calculate_fstate_shortest_path_with_gs_relaying(
+                temp_dir, 0, 4, 2, graph, num_isls_per_sat, [0, 0], sat_neighbor_to_if, None, False,
+                "floyd_warshall"
+            )
+            self.assertEqual(fstate[(0, 5)][0], first_neighbor)
+            self.assertEqual(fstate[(4, 5)], (0, 0, 2))
+            self.assertEqual(fstate[(0, 4)], (4, 2, 0))
+
+            # The default keeps the first neighbor among equal length paths
+            self.assertEqual(calculate_fstate_shortest_path_with_gs_relaying(
+                temp_dir, 0, 4, 2, graph, num_isls_per_sat, [0, 0], sat_neighbor_to_if, None, False
+            ), fstate)
+
+            # With the shortest path trees (opt-in), the next hops among equal length paths are those of the tree
+            fstate_dijkstra = calculate_fstate_shortest_path_with_gs_relaying(
+                temp_dir, 0, 4, 2, graph, num_isls_per_sat, [0, 0], sat_neighbor_to_if, None, False, "dijkstra"
+            )
+            next_hop = fstate_dijkstra[(0, 5)][0]
+            self.assertIn(next_hop, [1, 2])
+            self.assertEqual(
+                fstate_dijkstra[(0, 5)],
+                (next_hop, sat_neighbor_to_if[(0, next_hop)], sat_neighbor_to_if[(next_hop, 0)])
+            )
+            self.assertEqual(fstate_dijkstra[(next_hop, 5)][0], 3)
+            for key in [(4, 5), (0, 4), (1, 4), (2, 4), (3, 5), (5, 4)]:
+                self.assertEqual(fstate_dijkstra[key], fstate[key])
+
+        local_shell.remove_force_recursive(temp_dir)
+
+    def test_fstate_on_snapshot(self):
+        local_shell = exputil.LocalShell()
+        temp_dir = "temp_graph_snapshot_test"
+        local_shell.make_full_dir(temp_dir)
+
+        for seed in range(3):
+            num_satellites, isls, isl_weights, ground_station_satellites_in_range, interfaces = \
+                torus_with_ground_stations(4, 6, 3, seed, with_ties=True)
+            num_ground_stations = len(ground_station_satellites_in_range)
+            num_isls_per_sat, sat_neighbor_to_if = interfaces.num_isls_per_sat, interfaces.sat_neighbor_to_if
+            gsl_edges = []
+            gsl_weights = []
+            for gid, in_range in enumerate(ground_station_satellites_in_range):
+                for distance_m, sid in in_range:
+                    gsl_edges.append((sid, num_satellites + gid))
+                    gsl_weights.append(distance_m)
+
+            # Same graphs, as snapshot and as nx.Graph
+            snapshot_isls = GraphSnapshot.from_edges(num_satellites, isls, isl_weights)
+            snapshot_complete = GraphSnapshot.from_edges(
+                num_satellites + num_ground_stations, isls + gsl_edges, isl_weights + gsl_weights
+            )
+            fstates = []
+            for graph_isls, graph_complete in [
+                (snapshot_isls, snapshot_complete),
+                (snapshot_isls.to_networkx(), snapshot_complete.to_networkx())
+            ]:
+                fstates.append((
+                    calculate_fstate_shortest_path_without_gs_relaying(
+                        temp_dir, 0, num_satellites, num_ground_stations, graph_isls, num_isls_per_sat,
+                        [0] * num_ground_stations, ground_station_satellites_in_range, sat_neighbor_to_if, None, False
+                    ),
+                    calculate_fstate_shortest_path_with_gs_relaying(
+                        temp_dir, 0, num_satellites, num_ground_stations, graph_complete, num_isls_per_sat,
+                        [0] * num_ground_stations, sat_neighbor_to_if, None, False
+                    ),
+                    compute_anchor_data_for_timestep(graph_isls, [0, 7, 14])
+                ))
+            self.assertEqual(fstates[0], fstates[1])
+
+            # Dijkstra from only the ground station visible satellites yields the same as Floyd-Warshall
+            for backend in ["dijkstra", "floyd_warshall"]:
+                self.assertEqual(
+                    calculate_fstate_shortest_path_without_gs_relaying(
+                        temp_dir, 0, num_satellites, num_ground_stations, snapshot_isls, num_isls_per_sat,
+                        [0] * num_ground_stations, ground_station_satellites_in_range, sat_neighbor_to_if, None, False,
+                        backend
+                    ),
+                    fstates[0][0]
+                )
+            with self.assertRaises(ValueError):
+                calculate_fstate_shortest_path_without_gs_relaying(
+                    temp_dir, 0, num_satellites, num_ground_stations, snapshot_isls, num_isls_per_sat,
+                    [0] * num_ground_stations, ground_station_satellites_in_range, sat_neighbor_to_if, None, False,
+                    "bellman_ford"
+                )
+
+        local_shell.remove_force_recursive(temp_dir)
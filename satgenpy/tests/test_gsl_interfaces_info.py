@@ -126,3 +126,27 @@ class TestGslInterfacesInfo(unittest.TestCase):
         except ValueError:
             self.assertTrue(True)
         os.remove("gsl_interfaces_info.temp.txt")
+
+    def test_interface_table(self):
+        list_isls = [(0, 1), (2, 0), (1, 2), (3, 0)]
+        table = satgen.InterfaceTable(5, list_isls)
+
+        # Same as assigning the interfaces ISL by ISL
+        self.assertEqual(table.num_isls_per_sat, [3, 2, 2, 1, 0])
+        self.assertEqual(table.sat_neighbor_to_if, {
+            (0, 1): 0, (1, 0): 0,
+            (2, 0): 0, (0, 2): 1,
+            (1, 2): 1, (2, 1): 1,
+            (3, 0): 0, (0, 3): 2
+        })
+
+        # Without ISLs
+        table = satgen.InterfaceTable(2, [])
+        self.assertEqual(table.num_isls_per_sat, [0, 0])
+        self.assertEqual(table.sat_neighbor_to_if, {})
+
+        # Invalid
+        with self.assertRaises(ValueError):
+            satgen.InterfaceTable(2, [(1, 1)])
+        with self.assertRaises(ValueError):
+            satgen.InterfaceTable(2, [(0, 2)])
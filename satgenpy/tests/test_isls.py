@@ -25,6 +25,7 @@ import unittest
 from math import floor
 import os
 import exputil
+import numpy as np
 
 
 class TestIsls(unittest.TestCase):
@@ -173,3 +174,56 @@ class TestIsls(unittest.TestCase):
         except ValueError:
             self.assertTrue(True)
         os.remove("isls.txt.tmp")
+
+    def test_validate_isl_lengths(self):
+        satgen.generate_tles_from_scratch_with_sgp(
+            "tles.txt.tmp", "Kuiper-630", 12, 12, False, 51.9, 0.0000001, 0.0, 14.80
+        )
+        tles = satgen.read_tles("tles.txt.tmp")
+        os.remove("tles.txt.tmp")
+        propagator = satgen.create_propagator("sgp4", tles["epoch"], tles["satellites"])
+        times_since_epoch_ns = list(range(0, 600 * 1000 * 1000 * 1000, 10 * 1000 * 1000 * 1000))
+        max_isl_length_m = 5016591.2330984278
+
+        # Neighboring satellites in adjacent orbits are always within range
+        isls_list = satgen.generate_plus_grid_isls("isls.txt.tmp", 12, 12, 0)
+        os.remove("isls.txt.tmp")
+        report = satgen.validate_isl_lengths(propagator, times_since_epoch_ns, isls_list, max_isl_length_m)
+        self.assertTrue(report["valid"])
+        self.assertEqual(report["violations"], [])
+        self.assertEqual(report["violating_isls"], [])
+        self.assertGreater(report["max_isl_distance_m"], 0.0)
+        self.assertLessEqual(report["max_isl_distance_m"], max_isl_length_m)
+
+        # Shifted by half an orbit, the ISLs to the adjacent orbits are too long
+        isls_list = satgen.generate_plus_grid_isls("isls.txt.tmp", 12, 12, 6)
+        os.remove("isls.txt.tmp")
+        report = satgen.validate_isl_lengths(
+            propagator, times_since_epoch_ns, isls_list, max_isl_length_m, chunk_time_steps=7
+        )
+        self.assertFalse(report["valid"])
+
+        # Every violation is reported (the same as checking each ISL at each time step)
+        expected_violations = []
+        for t in times_since_epoch_ns:
+            satellite_positions_m = propagator.satellite_positions_m_at(t)
+            for (a, b) in isls_list:
+                distance_m = float(np.linalg.norm(satellite_positions_m[a] - satellite_positions_m[b]))
+                if distance_m > max_isl_length_m:
+                    expected_violations.append((a, b, t))
+        self.assertGreater(len(expected_violations), 0)
+        self.assertEqual([(a, b, t) for (a, b, t, _) in report["violations"]], expected_violations)
+        for (a, b, _, distance_m) in report["violations"]:
+            self.assertGreater(distance_m, max_isl_length_m)
+        self.assertEqual(
+            sum(num_violations for (_, _, num_violations, _) in report["violating_isls"]),
+            len(expected_violations)
+        )
+        self.assertEqual(
+            report["max_isl_distance_m"],
+            max(max_distance_m for (_, _, _, max_distance_m) in report["violating_isls"])
+        )
+
+        # Invalid chunk size
+        with self.assertRaises(ValueError):
+            satgen.validate_isl_lengths(propagator, times_since_epoch_ns, isls_list, max_isl_length_m, 0)
@@ -0,0 +1,91 @@
+import unittest
+
+import exputil
+import numpy as np
+
+from satgen.dynamic_state.graph_snapshot import *
+from satgen.dynamic_state.k_paths_cache import *
+from satgen.dynamic_state.fstate_calculation import *
+from satgen.interfaces.interface_table import *
+
+from constellation_fixtures import *
+
+
+class TestKShortestPathsCache(unittest.TestCase):
+
+    def test_cache(self):
+        cache = KShortestPathsCache()
+        self.assertIsNone(cache.get(0, 1, 2))
+        cache.put(0, 1, 2, [[1, 2], [1, 3, 2]])
+        cache.put(100000000, 1, 2, [[1, 4, 2]])
+        cache.put(100000000, 2, 1, [[2, 1]])
+        self.assertEqual(cache.get(0, 1, 2), [[1, 2], [1, 3, 2]])
+        self.assertEqual(cache.get(100000000, 1, 2), [[1, 4, 2]])
+        self.assertEqual(cache.missing_pairs(100000000, [(1, 2), (2, 1), (1, 3)]), [(1, 3)])
+        self.assertEqual(len(cache), 3)
+        self.assertEqual(cache.num_bytes, sum(path_list_bytes(paths) for paths in [
+            [[1, 2], [1, 3, 2]], [[1, 4, 2]], [[2, 1]]
+        ]))
+
+        # Time steps behind the window are evicted (sub-second time steps are kept apart)
+        cache.evict_before(100000000)
+        self.assertIsNone(cache.get(0, 1, 2))
+        self.assertEqual(cache.stats(), {
+            "hits": 4, "misses": 3, "evictions": 1, "entries": 2, "bytes": cache.num_bytes
+        })
+        cache.evict_before(200000000)
+        self.assertEqual((len(cache), cache.num_bytes, cache.num_evictions), (0, 0, 3))
+
+    def test_lmsr_window(self):
+        local_shell = exputil.LocalShell()
+        temp_dir = "temp_k_paths_cache_test"
+        local_shell.make_full_dir(temp_dir)
+
+        # Torus of 4 x 4 satellites with two ground stations, moving window of 3 time steps of 100 ms
+        num_orbs, num_sats_per_orb, num_ground_stations = 4, 4, 2
+        num_satellites = num_orbs * num_sats_per_orb
+        isls = torus_isls(num_orbs, num_sats_per_orb)
+        interfaces = InterfaceTable(num_satellites, isls)
+        num_isls_per_sat, sat_neighbor_to_if = interfaces.num_isls_per_sat, interfaces.sat_neighbor_to_if
+        rng = np.random.default_rng(2)
+        num_steps, window = 4, 3
+        graphs = [
+            GraphSnapshot.from_edges(num_satellites, isls, rng.uniform(1000000.0, 2000000.0, len(isls)))
+            for _ in range(num_steps + window)
+        ]
+        in_range = [[[(700000.0, 0), (800000.0, 1)], [(750000.0, 10)]]] * (num_steps + window)
+        times_ns = [t * 100000000 for t in range(num_steps + window)]
+        num_pairs = (num_satellites - 1) * 3  # Towards the 3 satellites in range
+
+        cache = KShortestPathsCache()
+        for t in range(num_steps):
+            fstates = []
+            for k_paths_cache in [cache, None]:
+                fstate, _ = calculate_lmsr(
+                    temp_dir, times_ns[t], num_satellites, num_ground_stations, graphs[t:t + window],
+                    [num_isls_per_sat] * window, list(range(num_ground_stations)), in_range[t:t + window],
+                    [sat_neighbor_to_if] * window, None, None, False,
+                    k_paths_cache=k_paths_cache, window_times_since_epoch_ns=times_ns[t:t + window]
+                )
+                fstates.append(fstate)
+            self.assertEqual(fstates[0], fstates[1])
+
+            # Only the time steps of the window are kept, only the newest is calculated
+            self.assertEqual(sorted(cache.entries.keys()), times_ns[t:t + window])
+            self.assertEqual(cache.num_evictions, t * num_pairs)
+            self.assertEqual(cache.num_misses, (window + t) * num_pairs)
+
+        with self.assertRaises(ValueError):
+            calculate_lmsr(
+                temp_dir, 0, num_satellites, num_ground_stations, graphs[:window],
+                [num_isls_per_sat] * window, list(range(num_ground_stations)), in_range[:window],
+                [sat_neighbor_to_if] * window, None, None, False, window_times_since_epoch_ns=times_ns[:2]
+            )
+        with self.assertRaises(ValueError):
+            calculate_lmsr(
+                temp_dir, 0, num_satellites, num_ground_stations, graphs[:window],
+                [num_isls_per_sat] * window, list(range(num_ground_stations)), in_range[:window],
+                [sat_neighbor_to_if] * window, None, None, False, k_paths_cache=KShortestPathsCache()
+            )
+
+        local_shell.remove_force_recursive(temp_dir)
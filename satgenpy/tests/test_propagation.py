@@ -0,0 +1,257 @@
+import os
+import unittest
+
+import ephem
+import exputil
+import numpy as np
+from astropy.time import Time
+from astropy import units as u
+
+from satgen.distance_tools import *
+from satgen.propagation import *
+from satgen.tles import *
+
+
+class TestPropagation(unittest.TestCase):
+
+    def setUp(self):
+        self.epoch = Time("2000-01-01 00:00:00", scale="tdb")
+        self.satellites = [
+            ephem.readtle(
+                "Kuiper-630 0",
+                "1 00001U 00000ABC 00001.00000000  .00000000  00000-0  00000+0 0    04",
+                "2 00001  51.9000   0.0000 0000001   0.0000   0.0000 14.80000000    02"
+            ),
+            ephem.readtle(
+                "Kuiper-630 1",
+                "1 00002U 00000ABC 00001.00000000  .00000000  00000-0  00000+0 0    05",
+                "2 00002  51.9000   0.0000 0000001   0.0000  10.5882 14.80000000    07"
+            ),
+            ephem.readtle(
+                "Kuiper-630 18",
+                "1 00019U 00000ABC 00001.00000000  .00000000  00000-0  00000+0 0    03",
+                "2 00019  51.9000   0.0000 0000001   0.0000 190.5882 14.80000000    04"
+            ),
+            ephem.readtle(
+                "Telesat-1015 18",
+                "1 00019U 00000ABC 00001.00000000  .00000000  00000-0  00000+0 0    03",
+                "2 00019  98.9800  13.3333 0000001   0.0000 152.3077 13.66000000    04"
+            ),
+        ]
+
+    def test_sgp4_matches_ephem_distances(self):
+        propagator = create_propagator("sgp4", self.epoch, self.satellites)
+        for time_since_epoch_ns in [0, 1000000, 1000000000, 60000000000, 100 * 60000000000]:
+            time = self.epoch + time_since_epoch_ns * u.ns
+            positions_m = propagator.satellite_positions_m_at(time_since_epoch_ns)
+            self.assertEqual(positions_m.shape, (len(self.satellites), 3))
+
+            # Satellite to satellite (ephem uses a slightly larger Earth radius, ~4 m per 1000 km)
+            pairs = [(0, 1), (0, 2), (1, 3), (2, 3)]
+            distances_m = distances_m_between_satellite_pairs(positions_m, pairs)
+            for i, (a, b) in enumerate(pairs):
+                expected_m = distance_m_between_satellites(
+                    self.satellites[a], self.satellites[b], str(self.epoch), str(time)
+                )
+                self.assertAlmostEqual(distances_m[i], expected_m, delta=1e-5 * expected_m)
+
+            # Ground station to satellite (ephem applies light-time correction, so within 100 m)
+            for sid in range(len(self.satellites)):
+                shadow = create_basic_ground_station_for_satellite_shadow(
+                    self.satellites[sid], str(self.epoch), str(time)
+                )
+                distance_m = distances_m_ground_station_to_satellites(
+                    ground_station_positions_m([shadow])[0],
+                    positions_m
+                )[sid]
+                self.assertAlmostEqual(
+                    distance_m,
+                    distance_m_ground_station_to_satellite(shadow, self.satellites[sid], str(self.epoch), str(time)),
+                    delta=100.0
+                )
+
+    def test_create_propagator(self):
+        self.assertIsNone(create_propagator("ephem", self.epoch, self.satellites))
+        self.assertIsInstance(create_propagator("sgp4", self.epoch, self.satellites), Sgp4Propagator)
+        self.assertIsInstance(
+            create_propagator("analytic", self.epoch, self.satellites), AnalyticCircularPropagator
+        )
+        with self.assertRaises(ValueError):
+            create_propagator("does_not_exist", self.epoch, self.satellites)
+
+    def test_analytic_matches_sgp4(self):
+        analytic_propagator = AnalyticCircularPropagator(self.epoch, self.satellites)
+        sgp4_propagator = Sgp4Propagator(self.epoch, self.satellites)
+        times_ns = [0, 1000000, 1000000000, 60000000000, 100 * 60000000000, 86400000000000]
+        positions_m = analytic_propagator.satellite_positions_m_at_times(times_ns)
+        self.assertEqual(positions_m.shape, (len(times_ns), len(self.satellites), 3))
+        self.assertLess(analytic_propagator.max_error_m_against_sgp4(sgp4_propagator, times_ns), 0.001)
+        for i, time_since_epoch_ns in enumerate(times_ns):
+            np.testing.assert_allclose(
+                analytic_propagator.satellite_positions_m_at(time_since_epoch_ns), positions_m[i], rtol=0, atol=1e-6
+            )
+
+        # Eccentric orbits or drag are not supported
+        eccentric_satellite = ephem.readtle(
+            "Eccentric",
+            "1 00001U 00000ABC 00001.00000000  .00000000  00000-0  00000+0 0    04",
+            "2 00001  51.9000   0.0000 0010000   0.0000   0.0000 14.80000000    02"
+        )
+        with self.assertRaises(ValueError):
+            AnalyticCircularPropagator(self.epoch, [eccentric_satellite])
+        with self.assertRaises(ValueError):
+            AnalyticCircularPropagator(
+                self.epoch, self.satellites, accuracy_check_max_error_m=-1.0
+            )
+
+    def test_sub_satellite_points(self):
+        propagator = create_propagator("sgp4", self.epoch, self.satellites)
+        for time_since_epoch_ns in [0, 60000000000]:
+            time = self.epoch + time_since_epoch_ns * u.ns
+            latitudes_deg, longitudes_deg = sub_satellite_points_degrees(
+                propagator.satellite_positions_m_at(time_since_epoch_ns)
+            )
+            for sid in range(len(self.satellites)):
+                shadow = create_basic_ground_station_for_satellite_shadow(
+                    self.satellites[sid], str(self.epoch), str(time)
+                )
+                self.assertAlmostEqual(latitudes_deg[sid], float(shadow["latitude_degrees_str"]), delta=0.01)
+                self.assertAlmostEqual(longitudes_deg[sid], float(shadow["longitude_degrees_str"]), delta=0.01)
+
+    def test_ephemeris_cache(self):
+        local_shell = exputil.LocalShell()
+        satellite_network_dir = "temp_ephemeris_cache/network"
+        local_shell.make_full_dir(satellite_network_dir)
+        local_shell.write_file(
+            satellite_network_dir + "/tles.txt",
+            (
+                "1 2\n"
+                "Kuiper-630 0\n"
+                "1 00001U 00000ABC 00001.00000000  .00000000  00000-0  00000+0 0    04\n"
+                "2 00001  51.9000   0.0000 0000001   0.0000   0.0000 14.80000000    02\n"
+                "Kuiper-630 1\n"
+                "1 00002U 00000ABC 00001.00000000  .00000000  00000-0  00000+0 0    05\n"
+                "2 00002  51.9000   0.0000 0000001   0.0000  10.5882 14.80000000    07"
+            )
+        )
+        tles = read_tles(satellite_network_dir + "/tles.txt")
+        time_step_ns = 100000000
+        duration_ns = 2000000000
+
+        # Generated once, afterwards the same file is opened
+        filename = ephemeris_cache_filename(satellite_network_dir, time_step_ns, duration_ns)
+        self.assertFalse(os.path.isfile(filename))
+        positions_m = load_or_generate_ephemeris_cache(satellite_network_dir, time_step_ns, duration_ns)
+        self.assertTrue(os.path.isfile(filename))
+        self.assertIsInstance(positions_m, np.memmap)
+        self.assertEqual(positions_m.shape, (20, 2, 3))
+        self.assertEqual(filename, ephemeris_cache_filename(satellite_network_dir, time_step_ns, duration_ns))
+        self.assertNotEqual(filename, ephemeris_cache_filename(satellite_network_dir, time_step_ns, 2 * duration_ns))
+
+        # Same positions as propagating directly
+        propagator = create_propagator("sgp4", tles["epoch"], tles["satellites"])
+        cached_propagator = CachedPropagator(positions_m, time_step_ns, propagator)
+        for t in [0, 300000000, 1900000000, 2000000000, 150000000]:
+            np.testing.assert_allclose(
+                cached_propagator.satellite_positions_m_at(t),
+                propagator.satellite_positions_m_at(t),
+                rtol=0, atol=1e-6
+            )
+
+        times_ns = [0, 150000000, 1900000000, 2000000000, 300000000]
+        np.testing.assert_allclose(
+            cached_propagator.satellite_positions_m_at_times(times_ns),
+            propagator.satellite_positions_m_at_times(times_ns),
+            rtol=0, atol=1e-6
+        )
+
+        # Without fallback, times outside of the cache are not possible
+        with self.assertRaises(ValueError):
+            CachedPropagator(positions_m, time_step_ns).satellite_positions_m_at(duration_ns)
+        with self.assertRaises(ValueError):
+            CachedPropagator(positions_m, time_step_ns).satellite_positions_m_at_times([0, duration_ns])
+        with self.assertRaises(ValueError):
+            load_or_generate_ephemeris_cache(satellite_network_dir, time_step_ns, duration_ns, "ephem")
+
+        # Single-precision cache (a different file), served in single precision (also by the fallback)
+        filename_float32 = ephemeris_cache_filename(satellite_network_dir, time_step_ns, duration_ns, "sgp4", "float32")
+        self.assertNotEqual(filename, filename_float32)
+        positions_float32_m = load_or_generate_ephemeris_cache(
+            satellite_network_dir, time_step_ns, duration_ns, "sgp4", "float32"
+        )
+        self.assertTrue(os.path.isfile(filename_float32))
+        self.assertEqual(positions_float32_m.dtype, np.float32)
+        np.testing.assert_array_equal(positions_float32_m, np.asarray(positions_m).astype(np.float32))
+        cached_propagator_float32 = CachedPropagator(positions_float32_m, time_step_ns, propagator)
+        self.assertEqual(cached_propagator_float32.satellite_positions_m_at(duration_ns).dtype, np.float32)
+        self.assertEqual(cached_propagator_float32.satellite_positions_m_at_times(times_ns).dtype, np.float32)
+
+        del positions_m
+        del positions_float32_m
+        local_shell.remove_force_recursive("temp_ephemeris_cache")
+
+    def test_float32_geometry(self):
+        local_shell = exputil.LocalShell()
+        local_shell.make_full_dir("temp_float32_geometry")
+        generate_tles_from_scratch_with_sgp(
+            "temp_float32_geometry/tles.txt", "Kuiper-630", 12, 12, False, 51.9, 0.0000001, 0.0, 14.80
+        )
+        tles = read_tles("temp_float32_geometry/tles.txt")
+        local_shell.remove_force_recursive("temp_float32_geometry")
+        propagator = create_propagator("sgp4", tles["epoch"], tles["satellites"])
+        list_isls = [(i * 12 + j, i * 12 + (j + 1) % 12) for i in range(12) for j in range(12)] \
+            + [(i * 12 + j, ((i + 1) % 12) * 12 + j) for i in range(12) for j in range(12)]
+        ground_station_positions = np.array([
+            geodetic2cartesian(latitude, longitude, 0.0)
+            for latitude in range(-50, 60, 10) for longitude in range(-180, 180, 20)
+        ])
+        max_gsl_length_m = 1260000.0
+        max_isl_length_m = 5016591.2330984278
+        times_ns = list(range(0, 600 * 1000 * 1000 * 1000, 20 * 1000 * 1000 * 1000))
+
+        geometry_float64 = compute_window_geometry(
+            propagator, times_ns, list_isls, ground_station_positions, max_gsl_length_m
+        )
+        geometry_float32 = compute_window_geometry(
+            propagator, times_ns, list_isls, ground_station_positions, max_gsl_length_m,
+            geometry_precision="float32"
+        )
+        self.assertEqual(geometry_float32["satellite_positions_m"].dtype, np.float32)
+        self.assertEqual(geometry_float32["isl_distances_m"].dtype, np.float32)
+        self.assertEqual(geometry_float64["isl_distances_m"].dtype, np.float64)
+
+        # Every ISL and GSL hop is within its error bound
+        max_satellite_radius_m = float(np.max(np.linalg.norm(geometry_float64["satellite_positions_m"], axis=2)))
+        isl_hop_bound_m = float32_path_length_error_bound_m(1, 0, max_satellite_radius_m, max_isl_length_m)
+        gsl_hop_bound_m = float32_path_length_error_bound_m(0, 1, max_satellite_radius_m, max_isl_length_m)
+        isl_errors_m = np.abs(
+            geometry_float32["isl_distances_m"].astype(np.float64) - geometry_float64["isl_distances_m"]
+        )
+        self.assertGreater(np.max(isl_errors_m), 0.0)
+        self.assertLessEqual(np.max(isl_errors_m), isl_hop_bound_m)
+        num_gsls = 0
+        for t_idx in range(len(times_ns)):
+            for gid in range(len(ground_station_positions)):
+                distances_float32_m = dict(
+                    (sid, d) for (d, sid) in geometry_float32["ground_station_satellites_in_range"][t_idx][gid]
+                )
+                for (distance_m, sid) in geometry_float64["ground_station_satellites_in_range"][t_idx][gid]:
+                    if sid in distances_float32_m:
+                        self.assertLessEqual(abs(distances_float32_m[sid] - distance_m), gsl_hop_bound_m)
+                        num_gsls += 1
+        self.assertGreater(num_gsls, 0)
+
+        # The path bound adds up the hop bounds, and is well below a microsecond of RTT for Kuiper-630
+        self.assertAlmostEqual(
+            float32_path_length_error_bound_m(20, 2, max_satellite_radius_m, max_isl_length_m),
+            20 * isl_hop_bound_m + 2 * gsl_hop_bound_m
+        )
+        self.assertLess(isl_hop_bound_m, 2.0)
+        self.assertLess(gsl_hop_bound_m, 1.0)
+        self.assertLess(float32_rtt_error_bound_ns(20, 2, max_satellite_radius_m, max_isl_length_m), 1000.0)
+
+        # Precision options
+        self.assertEqual(geometry_dtype("float64"), np.float64)
+        self.assertEqual(geometry_dtype("float32"), np.float32)
+        with self.assertRaises(ValueError):
+            geometry_dtype("float16")
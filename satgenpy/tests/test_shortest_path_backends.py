@@ -0,0 +1,167 @@
+import os
+import unittest
+
+import exputil
+import networkx as nx
+import numpy as np
+
+from satgen.dynamic_state.graph_snapshot import *
+from satgen.dynamic_state.shortest_path_backends import *
+from satgen.dynamic_state.csr_k_shortest_paths import *
+from satgen.dynamic_state.dynamic_shortest_paths import *
+from satgen.dynamic_state.fstate_calculation import *
+
+from constellation_fixtures import *
+
+
+class TestShortestPathBackends(unittest.TestCase):
+
+    def test_registry(self):
+        self.assertEqual(shortest_path_backend_names(), ["csr", "networkx", "scipy"])
+        self.assertIsInstance(get_shortest_path_backend("networkx"), NetworkxShortestPathBackend)
+        backend = CsrShortestPathBackend()
+        self.assertIs(get_shortest_path_backend(backend), backend)
+        with self.assertRaises(ValueError):
+            get_shortest_path_backend("bellman_ford")
+
+        # Without a name, the environment variable (else scipy)
+        previous = os.environ.pop(SHORTEST_PATH_BACKEND_ENVIRONMENT_VARIABLE, None)
+        try:
+            self.assertIsInstance(get_shortest_path_backend(), ScipyShortestPathBackend)
+            os.environ[SHORTEST_PATH_BACKEND_ENVIRONMENT_VARIABLE] = "csr"
+            self.assertIsInstance(get_shortest_path_backend(), CsrShortestPathBackend)
+            self.assertIsInstance(get_shortest_path_backend("scipy"), ScipyShortestPathBackend)
+            os.environ[SHORTEST_PATH_BACKEND_ENVIRONMENT_VARIABLE] = "unknown"
+            with self.assertRaises(ValueError):
+                get_shortest_path_backend()
+        finally:
+            os.environ.pop(SHORTEST_PATH_BACKEND_ENVIRONMENT_VARIABLE, None)
+            if previous is not None:
+                os.environ[SHORTEST_PATH_BACKEND_ENVIRONMENT_VARIABLE] = previous
+
+        # Registering another backend
+        class CountingBackend(ScipyShortestPathBackend):
+            name = "counting"
+            num_calls = 0
+
+            def shortest_path_trees(self, graph, roots):
+                self.num_calls += 1
+                return super().shortest_path_trees(graph, roots)
+
+        counting = CountingBackend()
+        register_shortest_path_backend(counting)
+        try:
+            self.assertIs(get_shortest_path_backend("counting"), counting)
+            snapshot = GraphSnapshot.from_edges(3, [(0, 1), (1, 2)], [1.0, 2.0])
+            DynamicShortestPathTrees(shortest_path_backend="counting").update(snapshot, [0])
+            self.assertEqual(counting.num_calls, 1)
+        finally:
+            del SHORTEST_PATH_BACKENDS["counting"]
+        class UnnamedBackend(ScipyShortestPathBackend):
+            name = None
+
+        with self.assertRaises(ValueError):
+            register_shortest_path_backend(UnnamedBackend())
+
+        # A backend lacking one of the shortest path calculations cannot be instantiated
+        class IncompleteBackend(ShortestPathBackend):
+            name = "incomplete"
+
+            def all_pairs_distances(self, graph):
+                return np.zeros((0, 0))
+
+        with self.assertRaises(TypeError):
+            IncompleteBackend()
+        with self.assertRaises(TypeError):
+            ShortestPathBackend()
+
+    def test_same_results(self):
+        num_satellites, isls, isl_weights, _, _ = torus_with_ground_stations(5, 6, 3, 4)
+        snapshot = GraphSnapshot.from_edges(num_satellites + 1, isls, isl_weights)
+        graph = snapshot.to_networkx()
+        expected_all_pairs = nx.floyd_warshall_numpy(graph)
+        roots = [0, 13, num_satellites, 29]
+        expected_distances, _ = snapshot.shortest_path_trees_to(roots)
+        pairs = [(0, 17), (5, 6), (29, 0), (3, num_satellites)]
+        expected_paths = [find_k_shortest_paths(graph, source, target, k=3) for source, target in pairs]
+
+        for name in shortest_path_backend_names():
+            backend = get_shortest_path_backend(name)
+            for g in [snapshot, graph]:
+
+                # All pairs: the same relaxation order as networkx
+                self.assertTrue(np.array_equal(backend.all_pairs_distances(g), expected_all_pairs))
+
+                # Trees: the distances of a Dijkstra (summed from the root), next hops along shortest paths
+                distances, next_hops = backend.shortest_path_trees(g, roots)
+                self.assertTrue(np.array_equal(distances, expected_distances))
+                for i, root in enumerate(roots):
+                    for node in range(num_satellites + 1):
+                        if node == root or np.isinf(distances[node, i]):
+                            self.assertEqual(next_hops[node, i], -1)
+                        else:
+                            next_hop = next_hops[node, i]
+                            self.assertEqual(
+                                distances[node, i], distances[next_hop, i] + graph[node][next_hop]["weight"]
+                            )
+                with self.assertRaises(ValueError):
+                    backend.shortest_path_trees(g, [num_satellites + 1])
+
+                # k-shortest paths
+                self.assertEqual(backend.k_shortest_paths(g, pairs, 3), expected_paths)
+        self.assertEqual(len(expected_paths[0]), 3)
+        self.assertEqual(expected_paths[3], [])
+
+    def test_csr_k_shortest_paths(self):
+
+        # Torus with few distinct ISL lengths: many paths of equal length, picked the same as networkx
+        num_satellites, isls = 5 * 6, torus_isls(5, 6)
+        isl_weights = np.random.default_rng(5).integers(1, 3, len(isls)).astype(float)
+        snapshot = GraphSnapshot.from_edges(num_satellites, isls, isl_weights)
+        graph = snapshot.to_networkx()
+        engine = CsrKShortestPaths(snapshot)
+        for source in range(0, num_satellites, 7):
+            for target in range(num_satellites):
+                self.assertEqual(
+                    engine.k_shortest_paths(source, target, 4), find_k_shortest_paths(graph, source, target, k=4)
+                )
+
+        # No node or edge is left removed, an unreachable target has no paths
+        self.assertFalse(any(engine.removed_nodes) or any(engine.removed_entries))
+        disconnected = CsrKShortestPaths(GraphSnapshot.from_edges(4, [(0, 1), (1, 2), (2, 0)], [1.0, 1.0, 1.0]))
+        self.assertEqual(disconnected.k_shortest_paths(0, 3, 3), [])
+        self.assertEqual(disconnected.k_shortest_paths(0, 2, 3), [[0, 2], [0, 1, 2]])
+        self.assertEqual(disconnected.k_shortest_paths(1, 1, 3), [[1]])
+        with self.assertRaises(ValueError):
+            disconnected.k_shortest_paths(0, 4, 3)
+
+    def test_fstate(self):
+        local_shell = exputil.LocalShell()
+        temp_dir = "temp_shortest_path_backends_test"
+        local_shell.make_full_dir(temp_dir)
+
+        num_satellites, isls, isl_weights, ground_station_satellites_in_range, interfaces = \
+            torus_with_ground_stations(4, 5, 3, 7)
+        num_ground_stations = len(ground_station_satellites_in_range)
+        num_isls_per_sat, sat_neighbor_to_if = interfaces.num_isls_per_sat, interfaces.sat_neighbor_to_if
+        snapshot = GraphSnapshot.from_edges(num_satellites, isls, isl_weights)
+
+        # The forwarding state is the same for every backend and method
+        fstates = []
+        for name in shortest_path_backend_names():
+            for method in ["dijkstra", "floyd_warshall"]:
+                fstates.append(calculate_fstate_shortest_path_without_gs_relaying(
+                    temp_dir, 0, num_satellites, num_ground_stations, snapshot, num_isls_per_sat,
+                    [0] * num_ground_stations, ground_station_satellites_in_range, sat_neighbor_to_if, None, False,
+                    method, shortest_path_backend=name
+                ))
+        for fstate in fstates[1:]:
+            self.assertEqual(fstate, fstates[0])
+        with self.assertRaises(ValueError):
+            calculate_fstate_shortest_path_without_gs_relaying(
+                temp_dir, 0, num_satellites, num_ground_stations, snapshot, num_isls_per_sat,
+                [0] * num_ground_stations, ground_station_satellites_in_range, sat_neighbor_to_if, None, False,
+                shortest_path_backend="unknown"
+            )
+
+        local_shell.remove_force_recursive(temp_dir)
@@ -26,6 +26,7 @@ import os
 from astropy.time import Time
 import math
 import ephem
+import pickle
 
 
 def test_tles_generation(
@@ -116,6 +117,15 @@ def test_tles_generation(
         self.assertEqual(tles_manual["satellites"][i]._orbit, 0)  # Number of orbit revolutions done at epoch
         self.assertAlmostEqual(tles_manual["satellites"][i]._raan, math.radians(orbit * 360.0 / num_orbits), 5)
 
+    # The orbital elements (picklable) restore the satellites exactly
+    for satellite in tles_sgp["satellites"]:
+        self.assertEqual(
+            satgen.satellite_ephem_to_str(satgen.satellite_ephem_from_elements(
+                pickle.loads(pickle.dumps(satgen.satellite_ephem_to_elements(satellite)))
+            )),
+            satgen.satellite_ephem_to_str(satellite)
+        )
+
     # Finally remove the temporary files
     os.remove("tles_manual.txt.tmp")
     os.remove("tles_sgp.txt.tmp")